@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+pytest 公共配置
+
+1. 将项目根目录加入 Python 路径,测试中按 src.xxx 导入
+2. test.py 与 test_input_monitor.py 是需要游戏画面/键鼠监听的手动脚本,不参与 pytest 收集
+3. replay_collector: 回放合成画面的 DataCollector 工厂
+"""
+
+import sys
+import logging
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到系统路径
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+collect_ignore = ['test.py', 'test_input_monitor.py']
+
+CONFIG_PATH = project_root / 'config/env/status_collection_config.yaml'
+
+
+@pytest.fixture
+def replay_collector(tmp_path):
+    """回放合成画面(与录制OCR结果)的 DataCollector 工厂
+
+    make(basic_config=None, area_config=None, frames=2) 中 basic_config/area_config
+    为合并到默认采集配置上的覆盖项;创建的采集器在测试结束时关闭
+    """
+    from src.benchmark.pipeline_benchmark import PipelineBenchmark
+    from src.benchmark.synthetic_frames import SyntheticFrameGenerator
+    from src.utils.config_manager import ConfigManager
+
+    collectors = []
+
+    def make(basic_config=None, area_config=None, frames=2):
+        benchmark = PipelineBenchmark(CONFIG_PATH, tmp_path / 'recording', work_dir=tmp_path / 'work')
+        config_manager = benchmark.load_config('test', {'basic_config': basic_config or {}})
+        config_manager.area_config = ConfigManager._merge_config(config_manager.area_config, area_config or {})
+        generator = SyntheticFrameGenerator(config_manager.basic_config, config_manager.area_config,
+                                            logging.getLogger('synthetic_frames'))
+        recording_dir = generator.generate(tmp_path / 'recording', frames)
+        collector = benchmark.build_collector(config_manager, recording_dir)
+        collectors.append(collector)
+        return collector
+
+    yield make
+    for collector in collectors:
+        collector.close()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""异步运行时测试: 输出与同步处理一致,阶段超时的结果不写入之后的帧"""
+
+import time
+import asyncio
+
+from src.data.async_collector import AsyncDataCollector
+
+REGIONS = ['title_area', 'char_revival', 'char_eat_food', 'target_hp']
+
+
+def test_matches_sync_process_frame(replay_collector):
+    sync_data = replay_collector(basic_config={'ocr_warmup': 'sync'}).process_frame(REGIONS)
+    runtime = AsyncDataCollector(replay_collector(basic_config={'ocr_warmup': 'sync'}))
+    try:
+        async_data = asyncio.run(runtime.process_frame(REGIONS))
+    finally:
+        runtime.close()
+    assert async_data == sync_data
+
+
+def test_timed_out_stage_does_not_leak_into_next_frame(replay_collector):
+    collector = replay_collector(basic_config={
+        'ocr_warmup': 'sync',
+        'async_runtime': {'stage_timeouts': {'ocr': 0.05}}
+    })
+    collector.text_recognizer.latency_ms = {'char_eat_food': 300.0}
+    runtime = AsyncDataCollector(collector)
+
+    try:
+        first = asyncio.run(runtime.process_frame(REGIONS))
+        # 上一帧超时的OCR仍在运行(持有 ocr_lock),本帧的OCR区域直接跳过识别,不需要OCR的区域照常处理
+        assert runtime.ocr_busy()
+        second = asyncio.run(runtime.process_frame(REGIONS))
+        for data in (first, second):
+            assert 'char_eat_food' not in data
+            assert 'target_hp' in data
+        assert 'char_eat_food' not in collector.ocr_results
+
+        # 等待超时的识别结束,它的结果不能写入之后帧的中间结果
+        time.sleep(0.7)
+        assert not runtime.ocr_busy()
+        assert 'char_eat_food' not in collector.ocr_results
+        assert 'char_eat_food' not in collector.preprocessed_images
+
+        collector.text_recognizer.latency_ms = 0.0
+        third = asyncio.run(runtime.process_frame(REGIONS))
+        assert 'char_eat_food' in third and 'title_area' in third
+    finally:
+        runtime.close()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""数据处理测试
+
+1. 共用处理方法的区域在并行调用时使用各自的裁切坐标
+2. 量条处理方法在按配置坐标裁切、预处理后的画面上读数正确(空量条、接近满格、满量条)
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.benchmark.synthetic_frames import GAUGE_REGIONS, SyntheticFrameGenerator
+from src.environment.data_processor import DataProcessor
+from src.environment.image_preprocessor import ImagePreprocessor
+from src.environment.ocr_result import OCRResult
+from src.environment.screen_splitter import ScreenSplitter
+from src.utils.config_manager import ConfigManager
+
+from conftest import CONFIG_PATH
+
+logger = logging.getLogger('test_data_processor')
+
+AREA_CONFIG = {
+    'nearby_monster_name_1': {'screen_split': {'coordinates': [100, 200, 80, 20]}},
+    'nearby_monster_name_2': {'screen_split': {'coordinates': [500, 600, 80, 20]}}
+}
+
+
+def _ocr_result() -> OCRResult:
+    box = [[10, 5], [30, 5], [30, 15], [10, 15]]
+    return OCRResult([box], [0.99], ['山贼'])
+
+
+def test_nearby_monster_regions_use_own_coordinates():
+    processor = DataProcessor({}, AREA_CONFIG, logger)
+    image = np.zeros((20, 80, 3), dtype=np.uint8)
+    expected = {
+        'nearby_monster_name_1': {'name_groups': [{'text': '山贼', 'center_x': 120, 'center_y': 210}]},
+        'nearby_monster_name_2': {'name_groups': [{'text': '山贼', 'center_x': 520, 'center_y': 610}]}
+    }
+    for region_name, result in expected.items():
+        assert processor.process_region(region_name, _ocr_result(), image, AREA_CONFIG[region_name]) == result
+
+    # 同一波次并行处理时互不干扰
+    regions = list(expected) * 200
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(
+            lambda region_name: processor.process_region(region_name, _ocr_result(), image, AREA_CONFIG[region_name]),
+            regions))
+    assert all(result == expected[region_name] for region_name, result in zip(regions, results))
+
+
+# 各量条在给定填充比例下的读数(量条宽77像素,技能经验56像素,被攻击血条32像素)
+GAUGE_READINGS = {
+    0.0: {
+        'char_vitality': {'hp': 0}, 'char_neigong': {'mp': 0}, 'char_head': {'head': 0},
+        'char_hand': {'hand': 0}, 'char_foot': {'foot': 0}, 'char_qigong': {'char_qigong': 0},
+        'skill_exp_min': {'skill_exp_min': 0}, 'skill_exp_max': {'skill_exp_max': 0},
+        'char_be_attack': {'status': False, 'screen_hp': 0}
+    },
+    0.95: {
+        'char_vitality': {'hp': 95}, 'char_neigong': {'mp': 95}, 'char_head': {'head': 95},
+        'char_hand': {'hand': 95}, 'char_foot': {'foot': 95}, 'char_qigong': {'char_qigong': 95},
+        # 已填满9格,未满不归零
+        'skill_exp_min': {'skill_exp_min': 95}, 'skill_exp_max': {'skill_exp_max': 9},
+        'char_be_attack': {'status': True, 'screen_hp': 94}
+    },
+    0.97: {
+        'char_vitality': {'hp': 97}, 'char_neigong': {'mp': 97}, 'char_head': {'head': 97},
+        'char_hand': {'hand': 97}, 'char_foot': {'foot': 97}, 'char_qigong': {'char_qigong': 97},
+        # 54/56像素(96.4%)仍只填满9格
+        'skill_exp_min': {'skill_exp_min': 96}, 'skill_exp_max': {'skill_exp_max': 9},
+        'char_be_attack': {'status': True, 'screen_hp': 97}
+    },
+    1.0: {
+        'char_vitality': {'hp': 100}, 'char_neigong': {'mp': 100}, 'char_head': {'head': 100},
+        'char_hand': {'hand': 100}, 'char_foot': {'foot': 100}, 'char_qigong': {'char_qigong': 100},
+        # 技能经验满格时归零
+        'skill_exp_min': {'skill_exp_min': 0}, 'skill_exp_max': {'skill_exp_max': 0},
+        'char_be_attack': {'status': True, 'screen_hp': 100}
+    }
+}
+
+
+@pytest.mark.parametrize('fill', sorted(GAUGE_READINGS))
+def test_gauge_handlers_on_frame_crops(fill):
+    config_manager = ConfigManager(CONFIG_PATH)
+    basic_config, area_config = config_manager.basic_config, config_manager.area_config
+    generator = SyntheticFrameGenerator(basic_config, area_config, logger, seed=0)
+    state = generator.sample_state(np.random.default_rng(0))
+    state['gauges'] = {region_name: fill for region_name in GAUGE_REGIONS}
+    frame, _, _ = generator.render(state)
+
+    # 与采集器相同的裁切与预处理
+    splitter = ScreenSplitter(basic_config, area_config, logger)
+    preprocessor = ImagePreprocessor(basic_config, area_config, logger)
+    processor = DataProcessor(basic_config, area_config, logger)
+    readings = {}
+    for region_name in GAUGE_REGIONS:
+        image = preprocessor.region_specific_methods[region_name](splitter.split_region(frame, region_name))
+        readings[region_name] = processor.process_region(region_name, OCRResult.empty(), image,
+                                                         area_config.get(region_name, {}))
+    assert readings == GAUGE_READINGS[fill]
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""帧截止时间测试: 按预算卸载、关键区域与新鲜度标注"""
+
+import logging
+
+from src.data.frame_deadline import FrameDeadline
+from src.data.region_scheduler import RegionScheduler
+
+logger = logging.getLogger('test_frame_deadline')
+
+AREA_CONFIG = {
+    'critical': {'priority': 10},
+    'high': {'priority': 5},
+    'low': {'priority': 1}
+}
+
+
+def _deadline(budget_ms=100.0, max_stale_age=5.0) -> FrameDeadline:
+    return FrameDeadline({'deadline': {'Enabled': True, 'frame_budget_ms': budget_ms,
+                                       'critical_priority': 10, 'max_stale_age': max_stale_age}}, logger)
+
+
+def _scheduler(costs) -> RegionScheduler:
+    scheduler = RegionScheduler({}, AREA_CONFIG, logger)
+    scheduler.costs.update(costs)
+    return scheduler
+
+
+def test_low_priority_regions_shed_when_over_budget():
+    deadline = _deadline()
+    scheduler = _scheduler({'critical': 150.0, 'high': 60.0, 'low': 30.0})
+    deadline.start_frame(100.0)
+    for region_name in AREA_CONFIG:
+        deadline.measured(region_name, 99.0)
+    admitted, shed = deadline.admit(['low', 'high', 'critical'], scheduler)
+    # 关键区域超出预算也处理,并保持波次中的原有顺序
+    assert admitted == ['critical']
+    assert shed == ['low', 'high']
+    assert deadline.shed_counts == {'low': 1, 'high': 1}
+
+
+def test_stale_region_becomes_critical():
+    deadline = _deadline(budget_ms=10.0, max_stale_age=5.0)
+    scheduler = _scheduler({'low': 50.0})
+    deadline.measured('low', 100.0)
+    deadline.start_frame(104.0)
+    assert deadline.admit(['low'], scheduler) == ([], ['low'])
+    deadline.start_frame(105.0)
+    assert deadline.admit(['low'], scheduler) == (['low'], [])
+
+
+def test_freshness_reports_measurement_age():
+    deadline = _deadline()
+    deadline.measured('high', 100.0)
+    deadline.start_frame(102.5)
+    deadline.measured('critical', 102.5)
+    assert deadline.freshness(['critical', 'high', 'low']) == {
+        'critical': {'fresh': True, 'age': 0.0},
+        'high': {'fresh': False, 'age': 2.5},
+        'low': {'fresh': False, 'age': None}
+    }
+
+
+def test_region_without_result_is_not_fresh(replay_collector):
+    # char_revival 不分割,没有可识别的图像,本帧不产生结果
+    collector = replay_collector(basic_config={'deadline': {'Enabled': True}, 'ocr_warmup': 'sync'},
+                                 area_config={'char_revival': {'screen_split': {'Enabled': False}}})
+    data = collector.process_frame(['char_revival', 'char_eat_food'])
+    assert 'char_revival' not in data
+    assert 'char_eat_food' in data
+    assert 'freshness' not in data
+    assert collector.freshness == {
+        'char_revival': {'fresh': False, 'age': None},
+        'char_eat_food': {'fresh': True, 'age': 0.0}
+    }
+    # freshness 与区域结果分开保存,不写入状态管理器
+    assert 'freshness' not in collector.state_manager.get_current_state()
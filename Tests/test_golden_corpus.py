@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""黄金输出语料测试: 采集时记录、回放语料检查一致,处理结果变化时报告差异"""
+
+import json
+import logging
+
+from src.benchmark.golden_check import GoldenChecker
+from src.benchmark.pipeline_benchmark import PipelineBenchmark
+from src.data.golden_corpus import load_golden, to_jsonable
+
+from conftest import CONFIG_PATH
+
+logger = logging.getLogger('test_golden_corpus')
+
+FRAMES = 3
+
+
+def _record(replay_collector):
+    """回放合成画面采集 FRAMES 帧并记录语料,返回采集器、语料目录与各帧处理结果"""
+    collector = replay_collector(basic_config={
+        'ocr_warmup': 'sync',
+        'golden_corpus': {'Enabled': True, 'interval': 1, 'skip_unchanged': False}
+    }, frames=FRAMES)
+    regions = [region_name for region_name, config in collector.area_config.items()
+               if isinstance(config, dict) and config.get('data_processor', {}).get('Enabled')]
+    outputs = [collector.process_frame(regions) for _ in range(FRAMES)]
+    collector.golden_recorder.close()
+    return collector, collector.golden_recorder.corpus_dir, outputs
+
+
+def test_record_then_check_round_trip(replay_collector, tmp_path):
+    collector, corpus_dir, outputs = _record(replay_collector)
+    regions, golden = load_golden(corpus_dir)
+    assert sorted(golden) == ['000000', '000001', '000002']
+    assert sorted((corpus_dir / 'frames').iterdir()) == [corpus_dir / 'frames' / f'{name}.png' for name in sorted(golden)]
+    for name, data in zip(sorted(golden), outputs):
+        recorded = golden[name]['outputs']
+        assert recorded and set(recorded) <= set(regions)
+        assert recorded == {region_name: to_jsonable(data[region_name]) for region_name in recorded}
+
+    # 当前代码回放语料与记录一致
+    report = GoldenChecker(collector.basic_config, collector.area_config, logger).check(corpus_dir)
+    assert set(report) == set(regions)
+    assert all(entry['frames'] == FRAMES and entry['accuracy'] == 1.0 for entry in report.values())
+
+    # 语料即回放录制目录: 经 ReplayCapture 重新采集得到相同的处理结果
+    benchmark = PipelineBenchmark(CONFIG_PATH, corpus_dir, work_dir=tmp_path / 'replay')
+    config_manager = benchmark.load_config('golden', {'basic_config': {'ocr_warmup': 'sync'}})
+    config_manager.area_config = collector.area_config
+    replayed = benchmark.build_collector(config_manager, corpus_dir)
+    try:
+        for name in sorted(golden):
+            data = replayed.process_frame(list(regions))
+            assert replayed.screen_capture.current_name == name
+            assert {region_name: to_jsonable(data[region_name]) for region_name in golden[name]['outputs']} \
+                == golden[name]['outputs']
+    finally:
+        replayed.close()
+
+
+def test_check_reports_changed_outputs_and_bless(replay_collector):
+    collector, corpus_dir, _ = _record(replay_collector)
+    golden_file = corpus_dir / 'golden.json'
+    with open(golden_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data['frames']['000001']['outputs']['char_be_attack']['screen_hp'] += 50
+    with open(golden_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+    checker = GoldenChecker(collector.basic_config, collector.area_config, logger)
+    report = checker.check(corpus_dir)
+    assert report['char_be_attack']['matched'] == FRAMES - 1
+    assert [example['frame'] for example in report['char_be_attack']['examples']] == ['000001']
+    assert all(entry['accuracy'] == 1.0 for region_name, entry in report.items() if region_name != 'char_be_attack')
+
+    # 写回当前输出后再次检查一致
+    checker.check(corpus_dir, bless=True)
+    assert checker.check(corpus_dir)['char_be_attack']['accuracy'] == 1.0
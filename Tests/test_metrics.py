@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""性能指标测试: 直方图分位数与注册表"""
+
+import json
+import math
+
+import numpy as np
+
+from src.utils.metrics import BUCKET_GROWTH, LatencyHistogram, MetricsRegistry
+
+
+def _exact_percentile(values, quantile):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(quantile * len(ordered))) - 1]
+
+
+def test_percentiles_within_bucket_error():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(mean=2.0, sigma=1.0, size=5000).tolist()
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.observe(value)
+    for quantile in (0.0, 0.5, 0.9, 0.95, 0.99):
+        exact = _exact_percentile(values, quantile)
+        estimate = histogram.percentile(quantile)
+        # 返回所在桶的上边界: 不低于真实值,且误差不超过一个桶宽
+        assert exact <= estimate <= exact * BUCKET_GROWTH
+    assert histogram.percentile(1.0) == max(values)
+    assert math.isclose(histogram.mean, sum(values) / len(values))
+
+
+def test_percentile_edge_cases():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.99) == 0.0
+    histogram.observe(3.0)
+    assert histogram.summary() == {'count': 1, 'mean': 3.0, 'p50': 3.0, 'p95': 3.0, 'p99': 3.0, 'max': 3.0}
+    # 超出分桶范围的样本落入最后一个桶,按实际最大值返回
+    histogram.observe(1e6)
+    assert histogram.percentile(0.99) == 1e6
+
+
+def test_registry_snapshot_and_dump(tmp_path):
+    registry = MetricsRegistry().configure({'dump_file': 'metrics.json', 'report_interval': 0}, tmp_path)
+    registry.observe('ocr', 'game_area', 10.0)
+    registry.observe('ocr', 'game_area', 20.0)
+    registry.increment('skipped', 'game_area')
+    registry.set_gauge('queue_depth', 2)
+    assert registry.percentile('ocr', 'game_area', 0.5) <= 10.0 * BUCKET_GROWTH
+    assert registry.percentile('ocr', 'coord', 0.5) == 0.0
+
+    path = registry.dump()
+    snapshot = json.loads(path.read_text(encoding='utf-8'))
+    assert snapshot['latency']['ocr']['game_area']['count'] == 2
+    assert snapshot['counters'] == {'skipped': {'game_area': 1}}
+    assert snapshot['gauges'] == {'queue_depth': 2}
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry().configure({'Enabled': False})
+    with registry.timer('ocr', 'game_area'):
+        pass
+    registry.increment('skipped')
+    assert registry.snapshot()['latency'] == {}
+    assert registry.snapshot()['counters'] == {}
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""名字标签跟踪测试: 移动后的关联、外观变化重新识别、确认间隔与丢失删除"""
+
+import logging
+
+import numpy as np
+
+from src.environment.name_tag_tracker import NameTagTracker
+
+logger = logging.getLogger('test_name_tag_tracker')
+
+TAG_SIZE = (40, 12)  # (宽, 高)
+
+
+def _patterns(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (TAG_SIZE[1], TAG_SIZE[0]), dtype=np.uint8) for _ in range(count)]
+
+
+def _frame(tags):
+    """按 [(图案, (x, y))] 绘制区域图像,返回图像与对应的检测框"""
+    image = np.zeros((200, 300), dtype=np.uint8)
+    boxes = []
+    for pattern, (x, y) in tags:
+        image[y:y + TAG_SIZE[1], x:x + TAG_SIZE[0]] = pattern
+        boxes.append([[x, y], [x + TAG_SIZE[0] - 1, y], [x + TAG_SIZE[0] - 1, y + TAG_SIZE[1] - 1],
+                      [x, y + TAG_SIZE[1] - 1]])
+    return image, np.array(boxes, dtype=np.float64).reshape(-1, 4, 2)
+
+
+class Recognizer:
+    """按检测框下标返回预设文本,并记录每帧请求识别的下标"""
+
+    def __init__(self):
+        self.texts = []
+        self.calls = []
+
+    def __call__(self, indices):
+        self.calls.append(list(indices))
+        return [(self.texts[index], 0.9) for index in indices]
+
+
+def _tracker(**config):
+    return NameTagTracker({'max_distance': 40, 'confirm_interval': 100, 'max_missed': 2, **config}, logger)
+
+
+def test_moved_tags_keep_track_ids_and_text():
+    tracker, recognizer = _tracker(), Recognizer()
+    a, b = _patterns(2)
+    recognizer.texts = ['山贼', '商人']
+    first = tracker.update(*_frame([(a, (20, 30)), (b, (200, 120))]), recognizer)
+    assert recognizer.calls == [[0, 1]]
+
+    # 两个标签都移动了若干像素,检测顺序也发生变化: 按位置与外观关联,不重新识别
+    recognizer.texts = ['?', '?']
+    second = tracker.update(*_frame([(b, (212, 126)), (a, (30, 34))]), recognizer)
+    assert recognizer.calls == [[0, 1]]
+    assert second.texts == ['商人', '山贼']
+    assert second.track_ids.tolist() == first.track_ids.tolist()[::-1]
+    assert tracker.track_count == 2
+
+
+def test_appearance_change_triggers_re_ocr():
+    tracker, recognizer = _tracker(), Recognizer()
+    a, b = _patterns(2)
+    recognizer.texts = ['山贼']
+    first = tracker.update(*_frame([(a, (20, 30))]), recognizer)
+
+    # 位置不变而内容变化: 沿用轨迹ID,重新识别文本
+    recognizer.texts = ['商人']
+    second = tracker.update(*_frame([(b, (20, 30))]), recognizer)
+    assert recognizer.calls == [[0], [0]]
+    assert second.texts == ['商人']
+    assert second.track_ids.tolist() == first.track_ids.tolist()
+
+
+def test_confirm_interval_re_ocrs_stable_tracks():
+    tracker, recognizer = _tracker(confirm_interval=3), Recognizer()
+    (a,) = _patterns(1)
+    recognizer.texts = ['山贼']
+    for _ in range(7):
+        tracker.update(*_frame([(a, (20, 30))]), recognizer)
+    # 第1帧新建轨迹,之后每3帧确认一次
+    assert [len(call) for call in recognizer.calls] == [1, 1, 1]
+    assert tracker.stats == {'detections': 7, 'recognized': 3}
+
+
+def test_missing_tracks_removed_after_max_missed():
+    tracker, recognizer = _tracker(max_missed=2), Recognizer()
+    a, b = _patterns(2)
+    recognizer.texts = ['山贼', '商人']
+    first = tracker.update(*_frame([(a, (20, 30)), (b, (200, 120))]), recognizer)
+
+    # b 连续丢失2帧仍保留,第3帧删除
+    for expected_tracks in (2, 2, 1):
+        tracker.update(*_frame([(a, (20, 30))]), recognizer)
+        assert tracker.track_count == expected_tracks
+    assert tracker.ids.tolist() == first.track_ids.tolist()[:1]
+
+    # 重新出现时作为新轨迹识别
+    recognizer.texts = ['商人']
+    result = tracker.update(*_frame([(b, (200, 120))]), recognizer)
+    assert recognizer.calls[-1] == [0]
+    assert result.track_ids.tolist() == [3]
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""OCR参数自动调优测试: 覆盖配置写出生效参数并保留未调优区域的结果"""
+
+import logging
+from types import SimpleNamespace
+
+import yaml
+
+from src.benchmark.ocr_autotuner import OCRAutotuner
+
+logger = logging.getLogger('test_ocr_autotuner')
+
+AREA_CONFIG = {
+    'char_hp': {
+        'text_recognizer': {'ocr_params': {'det_limit_side_len': 320, 'rec_batch_num': 6}},
+        'image_preprocess': {'scale_factor': 3}
+    },
+    'char_mp': {
+        'text_recognizer': {'ocr_params': {'det_limit_side_len': 640}},
+        'image_preprocess': {'scale_factor': 2}
+    }
+}
+
+
+def _autotuner() -> OCRAutotuner:
+    return OCRAutotuner(SimpleNamespace(area_config=AREA_CONFIG), {}, logger)
+
+
+def test_current_config_best_is_written():
+    overlay = _autotuner().build_overlay({'char_hp': {'best': {}}})
+    assert overlay == {'char_hp': {
+        'text_recognizer': {'ocr_params': {'det_limit_side_len': 320, 'rec_batch_num': 6}},
+        'image_preprocess': {'scale_factor': 3}
+    }}
+
+
+def test_save_keeps_regions_missing_from_corpus(tmp_path):
+    overlay_path = tmp_path / 'overlay.yaml'
+    overlay_path.write_text(yaml.safe_dump({
+        'char_mp': {'text_recognizer': {'ocr_params': {'det_limit_side_len': 640}}},
+        'char_hp': {'image_preprocess': {'scale_factor': 4}}
+    }), encoding='utf-8')
+
+    results = {'char_hp': {'best': {'ocr_params': {'rec_batch_num': 1}, 'scale_factor': 2}}}
+    _autotuner().save(results, overlay_path)
+
+    saved = yaml.safe_load(overlay_path.read_text(encoding='utf-8'))
+    assert saved['char_mp'] == {'text_recognizer': {'ocr_params': {'det_limit_side_len': 640}}}
+    assert saved['char_hp'] == {
+        'text_recognizer': {'ocr_params': {'det_limit_side_len': 320, 'rec_batch_num': 1}},
+        'image_preprocess': {'scale_factor': 2}
+    }
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""OCR守护进程测试: 协议编解码与进程内识别结果一致,跟踪器按客户端连接隔离"""
+
+import time
+import socket
+import logging
+import threading
+
+import numpy as np
+import pytest
+
+from src.environment.ocr_daemon import (OP_OCR, OCRDaemon, OCRDaemonClient, decode_request, decode_response,
+                                        encode_error, encode_request, encode_response)
+from src.environment.ocr_result import OCRResult
+from src.environment.text_recognizer import TextRecognizer
+
+logger = logging.getLogger('test_ocr_daemon')
+
+
+def _roundtrip(payload: bytes, decode):
+    left, right = socket.socketpair()
+    try:
+        left.sendall(payload)
+        return decode(right)
+    finally:
+        left.close()
+        right.close()
+
+
+def test_response_matches_in_process_result():
+    result = OCRResult([[[10.9, 20.2], [51.9, 20.2], [51.9, 35.7], [10.9, 35.7]]], [0.987], ['山贼'],
+                       track_ids=[7])
+    restored = _roundtrip(encode_response(result), decode_response)
+    assert restored.details == result.details == [
+        {'text': '山贼', 'confidence': 0.987, 'box': [[10, 20], [51, 20], [51, 35], [10, 35]], 'center': [31, 27],
+         'track_id': 7}
+    ]
+
+
+def test_error_response_raises():
+    with pytest.raises(RuntimeError, match='模型未加载'):
+        _roundtrip(encode_error('模型未加载'), decode_response)
+
+
+def test_request_roundtrip():
+    image = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+    op, region_name, decoded = _roundtrip(encode_request(OP_OCR, 'game_area', image), decode_request)
+    assert (op, region_name) == (OP_OCR, 'game_area')
+    np.testing.assert_array_equal(decoded, image)
+
+
+class TrackingOCR:
+    """只返回固定检测框的OCR替身,记录识别的文本框数量"""
+
+    BOX = [[10, 10], [60, 10], [60, 24], [10, 24]]
+
+    def __init__(self):
+        self.recognized = 0
+
+    def ocr(self, image, det=True, rec=True, cls=False):
+        if det:
+            return [[self.BOX]]
+        self.recognized += len(image)
+        return [[('山贼', 0.99)] * len(image)]
+
+
+def test_trackers_are_kept_per_client_connection(tmp_path):
+    basic_config = {'base_output_dir': str(tmp_path), 'show_ocr_log': True,
+                    'ocr_daemon': {'socket_path': str(tmp_path / 'ocr.sock'), 'timeout': 5.0}}
+    area_config = {'game_area': {'text_recognizer': {'Enabled': True, 'tracker': {'Enabled': True}}}}
+    recognizer = TextRecognizer(basic_config, area_config, logger, use_daemon=False)
+    recognizer.ready.wait()
+    recognizer._warmup_error = None
+    recognizer.ocr = TrackingOCR()
+
+    daemon = OCRDaemon.__new__(OCRDaemon)
+    daemon.logger = logger
+    daemon.config = {'socket_path': basic_config['ocr_daemon']['socket_path']}
+    daemon.recognizer = recognizer
+    daemon._ocr_lock = threading.Lock()
+    daemon.server = None
+    server_thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    server_thread.start()
+
+    image = np.full((40, 80, 3), 255, dtype=np.uint8)
+    image[12:22, 12:58] = 0
+    clients = [OCRDaemonClient(basic_config, logger) for _ in range(2)]
+    try:
+        for _ in range(50):
+            if clients[0].ping():
+                break
+            time.sleep(0.05)
+        first = clients[0].recognize(image, 'game_area')
+        # 同一连接的下一帧复用轨迹,不再识别
+        assert clients[0].recognize(image, 'game_area').track_ids.tolist() == first.track_ids.tolist() == [1]
+        assert recognizer.ocr.recognized == 1
+        # 另一个连接有自己的跟踪器: 新轨迹需要识别,轨迹ID从1开始
+        other = clients[1].recognize(image, 'game_area')
+        assert other.track_ids.tolist() == [1]
+        assert recognizer.ocr.recognized == 2
+        assert recognizer.trackers == {}
+    finally:
+        for client in clients:
+            client.close()
+        daemon.shutdown()
+        server_thread.join(5)
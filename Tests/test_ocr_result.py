@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""OCR识别结果测试: 二进制序列化往返与兼容视图"""
+
+import numpy as np
+
+from src.environment.ocr_result import OCRResult
+
+
+def _paddle_lines():
+    return [
+        [[[10.9, 20.2], [51.9, 20.2], [51.9, 35.7], [10.9, 35.7]], ('山贼 等级9', 0.987)],
+        [[[100.0, 5.0], [131.0, 5.0], [131.0, 16.0], [100.0, 16.0]], ('HP', 0.5)],
+        [[[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]], ('', 0.1)],
+    ]
+
+
+def test_bytes_round_trip_keeps_geometry_and_texts():
+    result = OCRResult.from_paddle(_paddle_lines())
+    restored = OCRResult.from_bytes(result.to_bytes())
+    assert restored.texts == result.texts
+    np.testing.assert_array_equal(restored.boxes, result.boxes)
+    # 中心点基于未取整坐标计算,序列化后保持不变
+    np.testing.assert_array_equal(restored.centers, result.centers)
+    assert restored.confidences.tolist() == result.confidences.tolist()
+    assert restored.track_ids is None
+
+
+def test_bytes_round_trip_keeps_track_ids():
+    result = OCRResult.from_paddle(_paddle_lines())
+    result.track_ids = np.array([7, -1, 3], dtype=np.int64)
+    restored = OCRResult.from_bytes(memoryview(result.to_bytes()))
+    assert restored.track_ids.tolist() == [7, -1, 3]
+    assert [detail['track_id'] for detail in restored.details] == [7, -1, 3]
+
+
+def test_empty_round_trip():
+    restored = OCRResult.from_bytes(OCRResult.empty().to_bytes())
+    assert restored.texts == []
+    assert restored.boxes.shape == (0, 4, 2)
+
+
+def test_dict_view_and_filters():
+    result = OCRResult.from_paddle(_paddle_lines())
+    assert result.to_dict()['details'][0] == {
+        'text': '山贼 等级9', 'confidence': 0.987, 'box': [[10, 20], [51, 20], [51, 35], [10, 35]], 'center': [31, 27]
+    }
+    assert OCRResult.from_dict(result.to_dict()).details == result.details
+    assert result.non_empty().texts == ['山贼 等级9', 'HP']
+    assert result.offset(5, 10).centers.tolist() == [[36, 37], [120, 20], [5, 10]]
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""处理结果比较测试"""
+
+from src.utils.output_diff import diff_outputs
+
+
+def test_equal_outputs_have_no_diff():
+    output = {'hp': 80, 'name_groups': [{'name': '山贼', 'center_x': 512.0}], 'status': True}
+    assert diff_outputs(output, dict(output)) == []
+
+
+def test_tolerance_applies_by_nearest_field_name():
+    expected = {'name_groups': [{'center_x': 512, 'level': 3}]}
+    actual = {'name_groups': [{'center_x': 517, 'level': 4}]}
+    assert diff_outputs(expected, actual, {'center_x': 5}) == ['name_groups[0].level: 期望 3, 实际 4']
+    assert diff_outputs(expected, actual, {'center_x': 4, 'level': 1}) == [
+        'name_groups[0].center_x: 期望 512, 实际 517'
+    ]
+
+
+def test_missing_extra_and_length_diffs():
+    expected = {'hp': 80, 'lines': ['a', 'b']}
+    actual = {'mp': 10, 'lines': ['a']}
+    assert sorted(diff_outputs(expected, actual)) == [
+        'hp: 缺失, 期望 80',
+        'lines: 长度 期望 2, 实际 1',
+        'mp: 多出, 实际 10'
+    ]
+    assert 'mp: 多出, 实际 10' not in diff_outputs(expected, actual, strict=False)
+
+
+def test_floats_are_rounded_in_messages():
+    assert diff_outputs({'ratio': 0.123456}, {'ratio': 0.5}) == ['ratio: 期望 0.1235, 实际 0.5']
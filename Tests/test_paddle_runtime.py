@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Paddle推理运行时测试: 每个模型只创建一个预测器,输入缓冲区按尺寸缓存"""
+
+import logging
+
+import numpy as np
+
+from src.environment.paddle_runtime import PaddleInferenceOCR
+
+logger = logging.getLogger('test_paddle_runtime')
+
+
+class RecordingPredictor:
+    """记录输入形状的预测器替身,输出全为blank的识别结果"""
+
+    def __init__(self, classes: int):
+        self.classes = classes
+        self.shapes = []
+
+    def get_input_names(self):
+        return ['x']
+
+    def get_output_names(self):
+        return ['y']
+
+    def get_input_handle(self, name):
+        return self
+
+    def get_output_handle(self, name):
+        return self
+
+    def reshape(self, shape):
+        self.shapes.append(tuple(shape))
+
+    def copy_from_cpu(self, data):
+        pass
+
+    def run(self):
+        pass
+
+    def copy_to_cpu(self):
+        return np.zeros((self.shapes[-1][0], 10, self.classes), dtype=np.float32)
+
+
+def test_one_predictor_per_model(tmp_path):
+    dict_path = tmp_path / 'keys.txt'
+    dict_path.write_text('山\n贼\n', encoding='utf-8')
+    runtime = PaddleInferenceOCR({'rec_char_dict_path': str(dict_path), 'rec_batch_num': 4, 'max_buffers': 3}, logger)
+    created = []
+
+    def create_predictor(model_dir):
+        created.append(model_dir)
+        return RecordingPredictor(len(runtime.characters))
+
+    runtime._create_predictor = create_predictor
+
+    # 不同宽度与批次大小的文本行
+    for width, count in [(100, 1), (400, 3), (900, 4), (1600, 2), (400, 3)]:
+        crops = [np.zeros((48, width, 3), dtype=np.uint8)] * count
+        assert runtime.recognize(crops) == [('', 0.0)] * count
+
+    predictor = runtime._predictors['rec'][0]
+    assert created == [runtime.rec_model_dir]
+    assert len(set(predictor.shapes)) == 4
+    assert len(runtime._buffers) == 3
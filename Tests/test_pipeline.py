@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""流水线测试: 有序输出、丢帧策略与停止前排空"""
+
+import time
+import logging
+import threading
+
+from src.data.pipeline import Pipeline, PipelinedCollector, Stage
+
+logger = logging.getLogger('test_pipeline')
+
+REGIONS = ['title_area', 'char_revival', 'char_eat_food', 'target_hp']
+
+
+def _collect(pipeline, count, timeout=5.0):
+    outputs = []
+    deadline = time.monotonic() + timeout
+    while len(outputs) < count and time.monotonic() < deadline:
+        output = pipeline.get(timeout=0.1)
+        if output is not None:
+            outputs.append(output)
+    return outputs
+
+
+def test_outputs_in_frame_order():
+    pipeline = Pipeline([Stage('double', lambda x: x * 2, drop_policy='block'),
+                         Stage('inc', lambda x: x + 1, drop_policy='block')], logger)
+    pipeline.start()
+    try:
+        for value in range(5):
+            pipeline.submit(value)
+        assert _collect(pipeline, 5) == [(i, i * 2 + 1) for i in range(5)]
+        assert pipeline.in_flight == 0
+    finally:
+        pipeline.stop()
+
+
+def test_drop_oldest_keeps_newest_frames():
+    gate = threading.Event()
+
+    def wait(x):
+        gate.wait(5)
+        return x
+
+    pipeline = Pipeline([Stage('wait', wait, queue_size=1), Stage('tail', lambda x: x, drop_policy='block')], logger)
+    pipeline.start()
+    try:
+        pipeline.submit(0)
+        time.sleep(0.1)  # 第0帧进入工作者,阻塞在 gate
+        for value in range(1, 5):
+            pipeline.submit(value)
+        gate.set()
+        outputs = list(pipeline.drain(5.0))
+    finally:
+        pipeline.stop()
+    # 输入队列深度为1: 第1~3帧依次被更新的帧挤掉
+    assert outputs == [(0, 0), (4, 4)]
+    assert pipeline.report()['wait']['dropped'] == 3
+    assert pipeline.in_flight == 0
+
+
+def test_drain_counts_filtered_and_failed_frames():
+    def stage(x):
+        if x == 1:
+            raise ValueError('bad frame')
+        time.sleep(0.02)
+        return None if x == 2 else x
+
+    pipeline = Pipeline([Stage('stage', stage, drop_policy='block')], logger)
+    pipeline.start()
+    try:
+        for value in range(5):
+            pipeline.submit(value)
+        outputs = list(pipeline.drain(5.0))
+    finally:
+        pipeline.stop()
+    assert outputs == [(0, 0), (3, 3), (4, 4)]
+    assert pipeline.report()['stage']['errors'] == 1
+
+
+def test_collector_run_outputs_every_submitted_frame(replay_collector):
+    collector = replay_collector(basic_config={'ocr_warmup': 'sync', 'pipeline': {'drop_policy': 'block'}})
+    results = []
+    PipelinedCollector(collector).run(REGIONS, on_result=lambda frame_id, result: results.append(frame_id),
+                                      max_frames=4)
+    assert results == [0, 1, 2, 3]
+
+
+def test_collector_state_is_written_on_capture_thread(replay_collector):
+    collector = replay_collector(basic_config={'ocr_warmup': 'sync', 'pipeline': {'drop_policy': 'block'}})
+    threads = []
+
+    def on_thread(func):
+        def wrapper(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return func(*args, **kwargs)
+        return wrapper
+
+    collector.region_scheduler.record = on_thread(collector.region_scheduler.record)
+    collector.region_graph.evaluate = on_thread(collector.region_graph.evaluate)
+    collector.frame_deadline.measured = on_thread(collector.frame_deadline.measured)
+    PipelinedCollector(collector).run(REGIONS, max_frames=3)
+    assert threads and all(thread is threading.main_thread() for thread in threads)
+
+
+def test_collector_publishes_predictions_and_freshness(replay_collector):
+    collector = replay_collector(
+        basic_config={'ocr_warmup': 'sync', 'deadline': {'Enabled': True}, 'pipeline': {'drop_policy': 'block'}},
+        area_config={'char_eat_food': {'state_estimator': {'Enabled': True, 'tolerance': 100.0, 'max_age': 60.0}}}
+    )
+    results = []
+    pipelined = PipelinedCollector(collector)
+    # 逐帧提交: 第一帧输出并写回状态估计后,第二帧的 char_eat_food 使用预测值
+    for _ in range(2):
+        pipelined.run(['char_eat_food'], on_result=lambda frame_id, result: results.append(result), max_frames=1)
+    first, second = results
+    assert 'char_eat_food' in first['data']
+    assert second['data']['char_eat_food'] == first['data']['char_eat_food']
+    assert first['freshness']['char_eat_food']['fresh']
+    assert not second['freshness']['char_eat_food']['fresh']
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""性能剖析测试: OCR后台预热完成前不开始剖析"""
+
+import json
+import threading
+
+from src.utils.profiling import FrameProfiler
+
+
+def test_run_waits_for_background_ocr_warmup(replay_collector, tmp_path):
+    collector = replay_collector()
+    # 模拟OCR模型仍在后台预热
+    collector.text_recognizer.ready.clear()
+    timer = threading.Timer(0.2, collector.text_recognizer.ready.set)
+    timer.start()
+    try:
+        output_dir = FrameProfiler(collector, output_dir=tmp_path / 'profiles').run(
+            ['char_revival', 'char_eat_food'], frames=2, warmup=1)
+    finally:
+        timer.cancel()
+
+    assert not any(name == 'skipped_warming' for name, _ in collector.metrics.counters)
+    report = json.loads((output_dir / 'report.json').read_text(encoding='utf-8'))
+    assert report['frames'] == 2
+    assert 'ocr' in report['wall']
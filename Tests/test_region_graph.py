@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""区域依赖图测试: 拓扑顺序、环检测与门控剪除"""
+
+import logging
+
+import pytest
+
+from src.data.region_graph import RegionGraph
+
+logger = logging.getLogger('test_region_graph')
+
+
+def _graph(area_config):
+    return RegionGraph({}, area_config, logger)
+
+
+AREA_CONFIG = {
+    'skill': {},
+    'target_panel': {'dependencies': ['target_name', 'target_hp'], 'control_type': 'disable_when_false'},
+    'target_name': {},
+    'target_hp': {'dependencies': ['target_buff'], 'control_type': 'disable_when_false'},
+    'target_buff': {},
+}
+
+
+def test_gates_come_before_their_dependencies():
+    graph = _graph(AREA_CONFIG)
+    assert graph.order == ['target_panel', 'target_hp', 'skill', 'target_name', 'target_buff']
+    assert graph.ancestors['target_buff'] == {'target_panel', 'target_hp'}
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError):
+        _graph({
+            'a': {'dependencies': ['b'], 'control_type': 'disable_when_false'},
+            'b': {'dependencies': ['a'], 'control_type': 'disable_when_false'},
+        })
+
+
+def test_unknown_dependencies_and_control_types_are_ignored():
+    graph = _graph({
+        'a': {'dependencies': ['missing'], 'control_type': 'disable_when_false'},
+        'b': {'dependencies': ['a'], 'control_type': 'unsupported'},
+    })
+    assert graph.gates == {}
+    assert graph.order == ['a', 'b']
+
+
+def test_waves_follow_dependencies():
+    graph = _graph(AREA_CONFIG)
+    waves = list(graph.waves(list(AREA_CONFIG)))
+    assert waves == [['target_panel', 'skill'], ['target_hp', 'target_name'], ['target_buff']]
+
+
+def test_closed_gate_prunes_whole_subtree():
+    graph = _graph(AREA_CONFIG)
+    waves = graph.waves(list(AREA_CONFIG))
+    assert next(waves) == ['target_panel', 'skill']
+    graph.evaluate('target_panel', {'status': False})
+    assert list(waves) == []
+    assert not graph.is_active('target_buff')
+
+    # 门控重新开启后恢复依赖区域
+    graph.evaluate('target_panel', {'status': True})
+    assert list(graph.waves(['target_buff', 'target_hp'])) == [['target_hp'], ['target_buff']]
+
+
+def test_non_dict_result_keeps_gate_open():
+    graph = _graph(AREA_CONFIG)
+    graph.evaluate('target_panel', None)
+    assert graph.gate_open['target_panel']
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""区域调度测试: 刷新间隔、预算与饥饿"""
+
+import logging
+
+from src.data.region_scheduler import RegionScheduler
+
+logger = logging.getLogger('test_region_scheduler')
+
+FRAME_PERIOD = 0.1
+
+
+def _simulate(area_config, costs, frames=200, budget_ms=100.0, starvation_factor=3.0):
+    """按固定帧间隔模拟调度,返回调度器与各区域运行的帧序号"""
+    scheduler = RegionScheduler(
+        {'scheduler': {'Enabled': True, 'frame_budget_ms': budget_ms, 'starvation_factor': starvation_factor}},
+        area_config, logger)
+    run_frames = {region_name: [] for region_name in area_config}
+    for frame in range(frames):
+        now = frame * FRAME_PERIOD
+        for region_name in scheduler.select(list(area_config), now):
+            scheduler.record(region_name, costs[region_name], now)
+            run_frames[region_name].append(frame)
+    scheduler.run_frames = run_frames
+    return scheduler
+
+
+def test_disabled_selects_all_regions():
+    scheduler = RegionScheduler({}, {'a': {}, 'b': {}}, logger)
+    assert scheduler.select(['a', 'b'], 0.0) == ['a', 'b']
+
+
+def test_refresh_interval_limits_rate():
+    scheduler = _simulate({'fast': {}, 'slow': {'refresh_interval': 1.0}}, {'fast': 1.0, 'slow': 1.0})
+    assert scheduler.run_counts['fast'] == 200
+    # 20秒内每秒一次(首帧立即运行)
+    assert 19 <= scheduler.run_counts['slow'] <= 21
+
+
+def test_every_frame_region_is_not_starved_by_higher_priority():
+    scheduler = _simulate({'hi': {'priority': 9}, 'lo': {}}, {'hi': 80.0, 'lo': 40.0})
+    assert scheduler.run_counts['hi'] == 200
+    # 预算只够高优先级区域,低优先级区域约每 starvation_factor 帧作为饥饿区域运行一次
+    gaps = [later - earlier for earlier, later in zip(scheduler.run_frames['lo'], scheduler.run_frames['lo'][1:])]
+    assert scheduler.run_counts['lo'] >= 200 / 4
+    assert max(gaps) <= 4
+
+
+def test_budget_respected_without_starvation():
+    scheduler = _simulate({'hi': {'priority': 9}, 'lo': {}}, {'hi': 30.0, 'lo': 40.0})
+    assert scheduler.run_counts == {'hi': 200, 'lo': 200}
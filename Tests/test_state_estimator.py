@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""状态估计测试: 字段模型外推与重新测量判定"""
+
+import logging
+
+from src.environment.state_estimator import StateEstimator
+
+logger = logging.getLogger('test_state_estimator')
+
+
+def _estimator(**config):
+    estimator_config = {'Enabled': True, 'tolerance': 1.0, 'growth': 0.5, 'max_age': 5.0}
+    estimator_config.update(config)
+    area_config = {'coord': {'state_estimator': estimator_config}, 'skill': {}}
+    return StateEstimator({}, area_config, logger)
+
+
+def test_disabled_region_always_needs_measurement():
+    estimator = _estimator()
+    estimator.observe('skill', {'level': 3}, 0.0)
+    assert not estimator.is_enabled('skill')
+    assert estimator.predict('skill', 1.0) == {}
+    assert estimator.regions_to_measure(['skill', 'coord'], 0.0) == ['skill', 'coord']
+
+
+def test_linear_fields_extrapolate_smoothed_velocity():
+    estimator = _estimator(fields={'x': 'linear'})
+    estimator.observe('coord', {'x': 100, 'map': '村庄'}, 0.0)
+    estimator.observe('coord', {'x': 110, 'map': '村庄'}, 1.0)
+    # 平滑后的速率为 0.5 * 10 = 5/秒,整数字段四舍五入
+    assert estimator.predict('coord', 3.0) == {'x': 120, 'map': '村庄'}
+
+
+def test_clock_field_advances_with_real_time():
+    estimator = _estimator(fields={'time': 'clock'})
+    estimator.observe('coord', {'time': '23:59:58'}, 10.0)
+    assert estimator.predict('coord', 13.0) == {'time': '00:00:01'}
+    # 识别失败时保留原有估计
+    estimator.observe('coord', {'time': '2?:00'}, 11.0)
+    assert estimator.predict('coord', 13.0) == {'time': '00:00:01'}
+
+
+def test_uncertainty_triggers_remeasurement():
+    estimator = _estimator(tolerance=1.0, growth=0.5, max_age=5.0)
+    assert estimator.needs_measurement('coord', 0.0)
+    estimator.observe('coord', {'x': 100}, 0.0)
+    assert estimator.uncertainty('coord', 1.0) == 0.5
+    assert not estimator.needs_measurement('coord', 1.0)
+    assert estimator.needs_measurement('coord', 2.0)
+
+
+def test_prediction_error_raises_growth():
+    estimator = _estimator(growth=0.1, max_age=100.0)
+    estimator.observe('coord', {'x': 100}, 0.0)
+    estimator.observe('coord', {'x': 104}, 1.0)
+    # constant 模型预测误差为 4/秒,大于配置的增长速率
+    assert estimator.uncertainty('coord', 1.5) == 2.0
+    assert estimator.needs_measurement('coord', 1.5)
+
+
+def test_changed_text_field_requires_measurement_and_hold_is_ignored():
+    estimator = _estimator(fields={'ping': 'hold'}, max_age=100.0)
+    estimator.observe('coord', {'ping': 30}, 0.0)
+    estimator.observe('coord', {'ping': 90}, 1.0)
+    assert estimator.uncertainty('coord', 3.0) == 0.0
+
+    estimator = _estimator(max_age=100.0)
+    estimator.observe('coord', {'map': '村庄'}, 0.0)
+    estimator.observe('coord', {'map': '森林'}, 1.0)
+    assert estimator.needs_measurement('coord', 1.1)
+
+
+def test_max_age_forces_measurement():
+    estimator = _estimator(growth=0.0, max_age=2.0)
+    estimator.observe('coord', {'x': 1}, 0.0)
+    assert not estimator.needs_measurement('coord', 1.9)
+    assert estimator.needs_measurement('coord', 2.0)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""列式状态日志测试: 往返一致、跨段读取单个字段、不完整段、进程退出时写出剩余缓冲"""
+
+import sys
+import logging
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+from src.environment.state_log import (StateLogReader, StateLogWriter, flatten_state, unflatten_state,
+                                       SEGMENT_SUFFIX)
+
+logger = logging.getLogger('test_state_log')
+
+
+def _session(state_dir: Path) -> Path:
+    sessions = [path for path in state_dir.iterdir() if path.is_dir()]
+    assert len(sessions) == 1
+    return sessions[0]
+
+
+def test_flatten_round_trip_keeps_empty_dicts():
+    state = {'a': {'x': 1, 'y': [1, 2]}, 'b': {'k': {}}, 'c': {}, 'timestamp': 't'}
+    columns = flatten_state(state)
+    assert columns == {'a.x': 1, 'a.y': [1, 2], 'b.k': {}, 'c': {}, 'timestamp': 't'}
+    assert unflatten_state(columns) == state
+
+
+def test_round_trip_across_segments(tmp_path):
+    states = []
+    for index in range(25):
+        state = {
+            'char_be_attack': {'status': index % 2 == 0, 'screen_hp': index},
+            'target_panel': {'rate': index / 10},
+            'title_area': {'time': f"12:00:{index:02d}"},
+            'game_area': {'name_groups': [{'text': '铁匠', 'center_x': index}]},
+            'empty': {}
+        }
+        # 部分帧缺少字段,同一列在不同段中类型不同(int 与 float)
+        if index % 3:
+            state['target_hp'] = {'hp': index if index < 10 else index + 0.5}
+        states.append(state)
+
+    writer = StateLogWriter(tmp_path, logger, segment_rows=10, flush_interval=0, compression='zlib')
+    for state in states:
+        writer.append(state)
+    writer.close()
+
+    reader = StateLogReader(_session(tmp_path), logger)
+    assert len(reader.segments) == 3
+    assert len(reader) == 25
+    assert list(reader.iter_states()) == states
+
+    values, present = reader.read_field('char_be_attack.screen_hp')
+    assert values.dtype == np.int64
+    assert values.tolist() == list(range(25))
+    assert present.all()
+
+    values, present = reader.read_field('target_hp.hp')
+    assert values.dtype == np.float64
+    assert present.tolist() == [bool(index % 3) for index in range(25)]
+    assert values[present].tolist() == [index if index < 10 else index + 0.5 for index in range(25) if index % 3]
+
+    names, present = reader.read_field('game_area.name_groups')
+    assert names[3] == [{'text': '铁匠', 'center_x': 3}]
+
+    values, present = reader.read_field('missing.field')
+    assert not present.any() and len(present) == 25
+
+
+def test_incomplete_segment_is_skipped(tmp_path):
+    writer = StateLogWriter(tmp_path, logger, segment_rows=5, flush_interval=0)
+    for index in range(10):
+        writer.append({'a': {'x': index}})
+    writer.close()
+    session = _session(tmp_path)
+    complete = sorted(session.glob(f"*{SEGMENT_SUFFIX}"))
+    (session / f"seg_999999{SEGMENT_SUFFIX}").write_bytes(complete[0].read_bytes()[:40])
+    (session / f"seg_000002{SEGMENT_SUFFIX}.tmp").write_bytes(b'')
+
+    reader = StateLogReader(session, logger)
+    assert len(reader.segments) == 2
+    assert reader.read_field('a.x')[0].tolist() == list(range(10))
+
+
+def test_buffer_written_at_interpreter_exit(tmp_path):
+    """没有调用 close() 时,进程正常退出也要写出缓冲中的状态"""
+    project_root = Path(__file__).parent.parent
+    script = (
+        "import sys, logging\n"
+        f"sys.path.insert(0, {str(project_root)!r})\n"
+        "from src.environment.state_log import StateLogWriter\n"
+        f"writer = StateLogWriter({str(tmp_path)!r}, logging.getLogger('w'), segment_rows=1024, flush_interval=0)\n"
+        "for index in range(50):\n"
+        "    writer.append({'a': {'x': index}})\n"
+    )
+    subprocess.run([sys.executable, '-c', script], check=True, timeout=60)
+
+    reader = StateLogReader(_session(tmp_path), logger)
+    assert len(reader) == 50
+    assert reader.read_field('a.x')[0].tolist() == list(range(50))
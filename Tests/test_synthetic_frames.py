@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""合成画面测试: 各区域的处理结果与真值一致(包括空量条、满量条等边界情况)"""
+
+import logging
+
+from src.benchmark.synthetic_frames import PRESETS, SyntheticFrameGenerator, check_accuracy
+from src.utils.config_manager import ConfigManager
+
+from conftest import CONFIG_PATH
+
+logger = logging.getLogger('test_synthetic_frames')
+
+
+def test_verify_matches_ground_truth(tmp_path):
+    config_manager = ConfigManager(CONFIG_PATH)
+    for seed in range(4):
+        generator = SyntheticFrameGenerator(config_manager.basic_config, config_manager.area_config, logger, seed=seed)
+        recording_dir = generator.generate(tmp_path / str(seed), 2 * len(PRESETS), presets=list(PRESETS))
+        report = check_accuracy(config_manager.basic_config, config_manager.area_config, recording_dir, logger)
+        mismatched = {region_name: entry['examples'] for region_name, entry in report.items() if entry['accuracy'] < 1}
+        assert not mismatched, f"seed {seed}: {mismatched}"
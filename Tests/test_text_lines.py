@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""文本行组装测试: 与原 DataProcessor 中逐个比较的合并规则一致"""
+
+import numpy as np
+
+from src.environment.ocr_result import OCRResult
+from src.environment.text_lines import assemble_line_texts, assemble_lines, group_rows
+
+
+def _box(x1, y1, x2, y2):
+    return [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+
+
+def _baseline_lines(details, x_gap, joiner, y_threshold=10):
+    """原 DataProcessor 处理方法中的文本行合并规则(黄金参考)"""
+    text_boxes = []
+    for detail in details:
+        text = detail['text'].strip()
+        if text:
+            box = detail['box']
+            text_boxes.append({'text': text, 'center_y': sum(point[1] for point in box) / 4,
+                               'left_x': min(point[0] for point in box), 'right_x': max(point[0] for point in box)})
+    text_boxes.sort(key=lambda x: x['center_y'])
+
+    merged_lines, current_line, current_y = [], [], None
+
+    def flush():
+        current_line.sort(key=lambda x: x['left_x'])
+        merged_lines.append(joiner.join(item['text'] for item in current_line))
+
+    for box in text_boxes:
+        if current_y is None:
+            current_y = box['center_y']
+            current_line.append(box)
+        elif abs(box['center_y'] - current_y) <= y_threshold:
+            if x_gap is None or box['left_x'] - current_line[-1]['right_x'] <= x_gap:
+                current_line.append(box)
+            else:
+                flush()
+                current_line = [box]
+        else:
+            flush()
+            current_line = [box]
+            current_y = box['center_y']
+    if current_line:
+        flush()
+    return merged_lines
+
+
+def test_rows_anchor_on_first_box():
+    rows = group_rows(np.array([0.0, 9.0, 12.0, 21.0, 30.0]), 10)
+    assert [row.tolist() for row in rows] == [[0, 1], [2, 3], [4]]
+
+
+def test_staggered_boxes_compare_with_previous_box_in_y_order():
+    # "2"与前一个框("-1")的间隔超过阈值而另起一段; "3"在y顺序上紧随"2",并入同一段后按左边界排序
+    details = [
+        {'text': '-1', 'box': _box(0, 0, 20, 10)},
+        {'text': '2', 'box': _box(50, 1, 60, 11)},
+        {'text': '3', 'box': _box(22, 2, 48, 12)},
+    ]
+    expected = _baseline_lines(details, 15, '')
+    assert expected == ['-1', '32']
+    assert assemble_line_texts({'details': details}, x_gap=15, joiner='') == expected
+
+
+def test_matches_baseline_on_random_layouts():
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        count = int(rng.integers(1, 12))
+        lefts = rng.integers(0, 200, count)
+        widths = rng.integers(3, 60, count)
+        tops = rng.integers(0, 60, count)
+        texts = [str(index) for index in range(count)]
+        boxes = [_box(int(x), int(y), int(x + w), int(y + 10)) for x, y, w in zip(lefts, tops, widths)]
+        details = [{'text': text, 'box': box} for text, box in zip(texts, boxes)]
+        result = OCRResult(boxes, [0.99] * count, texts)
+        for x_gap, joiner in [(None, ' '), (15, ''), (30, '')]:
+            expected = _baseline_lines(details, x_gap, joiner)
+            assert assemble_line_texts({'details': details}, x_gap=x_gap, joiner=joiner) == expected
+            assert assemble_line_texts(result, x_gap=x_gap, joiner=joiner) == expected
+
+
+def test_line_geometry():
+    lines = assemble_lines(['山贼', '等级', '9'], np.array([_box(0, 0, 20, 10), _box(24, 2, 44, 12), _box(100, 40, 110, 50)]))
+    assert lines == [
+        {'text': '山贼 等级', 'box': [0.0, 0.0, 44.0, 12.0], 'center_y': 6.0, 'indices': [0, 1]},
+        {'text': '9', 'box': [100.0, 40.0, 110.0, 50.0], 'center_y': 45.0, 'indices': [2]}
+    ]
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""文本候选框测试: 合成二值图上的候选框数量、排列顺序与边界裁剪"""
+
+import numpy as np
+
+from src.environment.text_proposals import DEFAULT_PROPOSAL_CONFIG, crop_boxes, propose_text_boxes
+
+
+def _word(image, x, y, chars=4, char_w=5, gap=3, height=10):
+    """画一个由若干字符块组成的名字(黑字),返回外接矩形 (x1, y1, x2, y2)"""
+    for index in range(chars):
+        left = x + index * (char_w + gap)
+        image[y:y + height, left:left + char_w] = 0
+    return x, y, x + chars * (char_w + gap) - gap - 1, y + height - 1
+
+
+def _box(x1, y1, x2, y2):
+    return [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+
+
+def test_proposals_count_order_and_padding():
+    image = np.full((120, 240), 255, dtype=np.uint8)
+    right = _word(image, 150, 60)
+    bottom = _word(image, 30, 90, chars=2)
+    left = _word(image, 20, 60)
+    top = _word(image, 100, 20, chars=3)
+    corner = _word(image, 0, 0, chars=2)
+    edge = _word(image, 229, 110, chars=1, char_w=11)
+    image[40:42, 60:62] = 0     # 噪点: 小于最小尺寸
+    image[5:115, 200:210] = 0   # 竖条: 高于最大高度
+
+    config = dict(DEFAULT_PROPOSAL_CONFIG, padding=2)
+    boxes = propose_text_boxes(image, config)
+
+    # 从上到下、同一行从左到右;外扩2像素并裁剪到图像内
+    expected = [
+        _box(0, 0, corner[2] + 2, corner[3] + 2),
+        _box(top[0] - 2, top[1] - 2, top[2] + 2, top[3] + 2),
+        _box(left[0] - 2, left[1] - 2, left[2] + 2, left[3] + 2),
+        _box(right[0] - 2, right[1] - 2, right[2] + 2, right[3] + 2),
+        _box(bottom[0] - 2, bottom[1] - 2, bottom[2] + 2, bottom[3] + 2),
+        _box(edge[0] - 2, edge[1] - 2, 239, 119),
+    ]
+    assert boxes.dtype == np.float32
+    assert boxes.tolist() == expected
+
+    crops = crop_boxes(image, boxes)
+    assert [crop.shape for crop in crops] == [
+        (y2 - y1 + 1, x2 - x1 + 1, 3) for (x1, y1), _, (x2, y2), _ in expected
+    ]
+
+
+def test_light_text_and_empty_image():
+    assert propose_text_boxes(np.full((40, 80), 255, dtype=np.uint8), dict(DEFAULT_PROPOSAL_CONFIG)).shape == (0, 4, 2)
+
+    # 深底浅字
+    image = np.zeros((40, 80), dtype=np.uint8)
+    image[10:20, 10:40] = 255
+    boxes = propose_text_boxes(image, dict(DEFAULT_PROPOSAL_CONFIG, text_dark=False, padding=0))
+    assert boxes.tolist() == [_box(10, 10, 39, 19)]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""文字识别测试: 守护进程请求失败后按退避重试,回退模型在后台加载,区域OCR实例随参数更新"""
+
+import time
+import logging
+
+import numpy as np
+
+from src.environment.ocr_result import OCRResult
+from src.environment.text_recognizer import TextRecognizer
+
+logger = logging.getLogger('test_text_recognizer')
+
+BOX = [[0, 0], [20, 0], [20, 10], [0, 10]]
+
+
+class FakeDaemon:
+    """可切换可用状态的守护进程客户端替身"""
+
+    def __init__(self):
+        self.down = False
+        self.requests = 0
+
+    def recognize(self, image, region_name=None):
+        self.requests += 1
+        if self.down:
+            raise ConnectionError('守护进程已退出')
+        return OCRResult([BOX], [0.99], ['daemon'])
+
+    def close(self):
+        pass
+
+
+class FakeOCR:
+    """进程内OCR替身"""
+
+    def ocr(self, image, cls=False):
+        return [[[BOX, ('local', 0.99)]]]
+
+
+def _recognizer(tmp_path) -> TextRecognizer:
+    basic_config = {
+        'base_output_dir': str(tmp_path),
+        'show_ocr_log': True,
+        'ocr_daemon': {'retry_interval': 0.2, 'max_retry_interval': 0.4}
+    }
+    recognizer = TextRecognizer(basic_config, {'chat': {'text_recognizer': {'Enabled': True}}}, logger,
+                                use_daemon=False)
+    recognizer.ready.wait()
+    recognizer._warmup_error = None
+    recognizer.daemon = FakeDaemon()
+
+    def load_local_models():
+        time.sleep(0.1)
+        recognizer.ocr = FakeOCR()
+        recognizer._local_loaded.set()
+
+    recognizer._load_local_models = load_local_models
+    return recognizer
+
+
+def test_daemon_failure_backs_off_and_reconnects(tmp_path):
+    recognizer = _recognizer(tmp_path)
+    daemon = recognizer.daemon
+    image = np.zeros((10, 20, 3), dtype=np.uint8)
+    assert recognizer._recognize(image, 'chat').texts == ['daemon']
+
+    # 请求失败: 不在帧内同步加载模型,回退模型加载完成前返回空结果
+    daemon.down = True
+    start = time.perf_counter()
+    assert recognizer._recognize(image, 'chat').texts == []
+    assert time.perf_counter() - start < 0.05
+    assert recognizer.daemon is daemon
+
+    # 退避期间不再请求守护进程,使用回退模型
+    recognizer._fallback_thread.join()
+    requests = daemon.requests
+    assert recognizer._recognize(image, 'chat').texts == ['local']
+    assert daemon.requests == requests
+
+    # 连续失败时间隔加倍
+    time.sleep(0.25)
+    assert recognizer._recognize(image, 'chat').texts == ['local']
+    assert daemon.requests == requests + 1
+    assert recognizer._daemon_backoff == 0.4
+
+    # 守护进程恢复后重新使用
+    daemon.down = False
+    time.sleep(0.45)
+    assert recognizer._recognize(image, 'chat').texts == ['daemon']
+    assert recognizer._daemon_backoff == 0.0
+
+
+def test_region_ocr_is_recreated_when_params_change(tmp_path):
+    recognizer = _recognizer(tmp_path)
+    created = []
+
+    def create_ocr_instance(custom_params=None):
+        created.append(dict(custom_params))
+        return FakeOCR()
+
+    recognizer._create_ocr_instance = create_ocr_instance
+    params = {'drop_score': 0.5}
+    first = recognizer._get_region_ocr('chat', params)
+    assert recognizer._get_region_ocr('chat', {'drop_score': 0.5}) is first
+    # 参数在原字典上修改(覆盖配置重新加载)或换成另一组参数时重新创建
+    params['drop_score'] = 0.3
+    second = recognizer._get_region_ocr('chat', params)
+    assert second is not first
+    assert recognizer._get_region_ocr('chat', {'drop_score': 0.3}) is second
+    assert created == [{'drop_score': 0.5}, {'drop_score': 0.3}]
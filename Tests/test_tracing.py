@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""帧级追踪测试: Chrome trace-event 输出、帧过滤、环形缓冲区与慢帧自动输出"""
+
+import json
+import threading
+import time
+
+from src.utils.tracing import Tracer, get_tracer, traced
+
+
+def test_dump_writes_chrome_trace_events(tmp_path):
+    tracer = Tracer().configure({'Enabled': True, 'slow_frame_ms': 0})
+    tracer.begin_frame(1)
+    with tracer.span('TextRecognizer.process_and_recognize', 'game_area', boxes=3):
+        pass
+
+    # 工作线程处理另一帧
+    def worker():
+        tracer.set_thread_frame(2)
+        with tracer.span('DataProcessor.process_region', 'char_vitality'):
+            pass
+    thread = threading.Thread(target=worker, name='pipeline-process')
+    thread.start()
+    thread.join()
+    tracer.end_frame()
+
+    path = tracer.dump(tmp_path / 'trace.json')
+    with open(path, 'r', encoding='utf-8') as f:
+        trace = json.load(f)
+    assert trace['displayTimeUnit'] == 'ms'
+
+    metadata = [event for event in trace['traceEvents'] if event['ph'] == 'M']
+    assert {event['args']['name'] for event in metadata} == {threading.current_thread().name, 'pipeline-process'}
+    assert all(event['name'] == 'thread_name' for event in metadata)
+
+    spans = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+    assert [(event['name'], event['cat'], event['args']) for event in spans] == [
+        ('TextRecognizer.process_and_recognize', 'game_area', {'frame_id': 1, 'region': 'game_area', 'boxes': 3}),
+        ('DataProcessor.process_region', 'char_vitality', {'frame_id': 2, 'region': 'char_vitality'}),
+        ('frame', 'frame', {'frame_id': 1}),
+    ]
+    for event in spans:
+        assert event['ts'] >= 0 and event['dur'] >= 0
+        assert set(event) == {'name', 'cat', 'ph', 'ts', 'dur', 'pid', 'tid', 'args'}
+    assert spans[0]['tid'] != spans[1]['tid']
+    # 整帧区间覆盖帧内区间
+    frame = spans[2]
+    assert frame['ts'] <= spans[0]['ts'] and spans[0]['ts'] + spans[0]['dur'] <= frame['ts'] + frame['dur']
+
+    # 只输出指定帧
+    filtered = tracer.trace_events(frame_ids=[2])['traceEvents']
+    assert [event['name'] for event in filtered if event['ph'] == 'X'] == ['DataProcessor.process_region']
+
+
+def test_buffer_size_and_disabled_tracer():
+    tracer = Tracer().configure({'Enabled': True, 'buffer_size': 3})
+    for index in range(5):
+        tracer.add_span(f'span_{index}', 0, 1000, frame_id=index)
+    assert [event['name'] for event in tracer.events] == ['span_2', 'span_3', 'span_4']
+
+    tracer.configure({'Enabled': False})
+    with tracer.span('ignored'):
+        pass
+    tracer.begin_frame(9)
+    assert tracer.end_frame() is None
+    assert len(tracer.events) == 3
+
+
+def test_slow_frame_dumps_automatically(tmp_path):
+    tracer = Tracer().configure({'Enabled': True, 'slow_frame_ms': 1, 'min_dump_interval': 60,
+                                 'output_dir': 'traces'}, base_dir=tmp_path)
+    tracer.begin_frame(1)
+    time.sleep(0.005)
+    path = tracer.end_frame()
+    assert path is not None and path.parent == tmp_path / 'traces'
+    assert path.name.endswith('_slow_frame_1.json')
+
+    # 最小间隔内不重复输出
+    tracer.begin_frame(2)
+    time.sleep(0.005)
+    assert tracer.end_frame() is None
+
+
+def test_traced_records_region_argument():
+    class Processor:
+        @traced('Processor.process_region', region_arg='region_name')
+        def process_region(self, region_name, value):
+            return value * 2
+
+    tracer = get_tracer()
+    tracer.configure({'Enabled': True})
+    try:
+        tracer.clear()
+        tracer.set_thread_frame(5)
+        assert Processor().process_region('target_hp', 21) == 42
+        assert Processor().process_region(region_name=['a', 'b'], value=1) == 2
+        assert [(event['name'], event['args']) for event in tracer.events] == [
+            ('Processor.process_region', {'frame_id': 5, 'region': 'target_hp'}),
+            ('Processor.process_region', {'frame_id': 5, 'region': 'a,b'}),
+        ]
+    finally:
+        tracer.set_thread_frame(None)
+        tracer.configure({'Enabled': False})
+        tracer.clear()
@@ -4,8 +4,7 @@ import logging
 from pathlib import Path
 from src.utils.config_parser import ConfigParser
 from src.data.collector import DataCollector
-from src.agents.rl_agent import RLAgent
-from src.environment.window_manager import WindowManager
+# RLAgent(torch) 与 WindowManager(win32) 在对应模式中才导入,避免拖慢 collect 模式启动
 
 logger = logging.getLogger(__name__)
 
@@ -21,17 +20,30 @@ def parse_args():
                       help='数据采集持续时间(秒),仅在collect模式下有效')
     parser.add_argument('--model_path', type=str, default=None,
                       help='模型加载路径,用于test模式')
+    parser.add_argument('--profile', type=str, default=None,
+                      choices=['cprofile', 'sampling', 'tracemalloc'],
+                      help='性能剖析模式: 按采集配置处理 --profile_frames 帧,输出按阶段/区域分组的报告后退出')
+    parser.add_argument('--profile_frames', type=int, default=50,
+                      help='性能剖析的帧数')
+    parser.add_argument('--profile_warmup', type=int, default=1,
+                      help='性能剖析前的预热帧数(不计入剖析)')
+    parser.add_argument('--profile_config', type=str, default='config/env/status_collection_config.yaml',
+                      help='性能剖析使用的采集配置文件路径')
+    parser.add_argument('--profile_output', type=str, default=None,
+                      help='性能剖析输出目录,默认为 base_output_dir/profiles')
     return parser.parse_args()
 
 def train(config):
     """训练模式"""
     logger.info("开始训练模式")
+    from src.agents.rl_agent import RLAgent
     agent = RLAgent(config)
     agent.train()
 
 def test(config, model_path):
     """测试模式"""
     logger.info("开始测试模式")
+    from src.agents.rl_agent import RLAgent
     agent = RLAgent(config)
     agent.load(model_path)
     # TODO: 实现测试逻辑
@@ -79,6 +91,17 @@ def main():
         logger.error(f"加载配置文件失败: {e}")
         return
 
+    # 性能剖析: 与 src/data/collector.py --profile 相同,处理N帧后输出报告
+    if args.profile:
+        from src.utils.profiling import profile_collection
+        try:
+            output_dir = profile_collection(args.profile_config, mode=args.profile, frames=args.profile_frames,
+                                            warmup=args.profile_warmup, output_dir=args.profile_output)
+            logger.info(f"性能剖析报告: {output_dir}")
+        except KeyboardInterrupt:
+            logger.info("程序被用户中断")
+        return
+
     # 获取游戏窗口配置
     game_config = config.get("windows_game", {})
     window_name = game_config.get("window_name")
@@ -89,6 +112,7 @@ def main():
 
     # 初始化窗口管理器并移动窗口
     # try:
+    #     from src.environment.window_manager import WindowManager
     #     window_manager = WindowManager(window_name)
     #     logger.info(f"成功找到游戏窗口: {window_manager.window_title}")
     #     window_manager.move_window(left, top)
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+黄金输出回归检查模块
+
+用当前代码回放黄金输出语料(src/data/golden_corpus.py 记录),逐区域比较处理结果:
+1. 从语料截图按当前配置的坐标分割区域,按区域配置执行预处理
+2. OCR: replay 使用语料中记录的OCR结果(只检查分割/预处理/数据处理的改动);
+   live 使用当前的 TextRecognizer 重新识别(检查OCR参数、批处理等的改动,需要OCR模型)
+3. 调用 DataProcessor.process_region,与记录的处理结果逐字段比较,数值字段按容差比较
+4. 按区域报告一致率与差异示例;有差异时退出码为1
+5. --bless 将当前输出写回语料,作为新的黄金输出(确认改动符合预期后使用)
+
+用法:
+    python src/benchmark/golden_check.py --corpus <语料目录> [<语料目录> ...]
+    python src/benchmark/golden_check.py --corpus <语料目录> --tolerance hp=2 center_x=3
+    python src/benchmark/golden_check.py --corpus <语料目录> --ocr live --report golden_report.json
+
+主要类与函数:
+- GoldenChecker: 黄金输出回归检查
+- parse_tolerances: 解析命令行容差
+"""
+
+import sys
+import json
+import argparse
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+# 获取项目根目录并添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.config_manager import ConfigManager
+from src.utils.output_diff import diff_outputs
+from src.environment.ocr_result import OCRResult
+from src.data.golden_corpus import SCHEMA_VERSION, load_golden, to_jsonable, write_json
+
+# OCR模式
+OCR_MODES = ('replay', 'live')
+
+# 默认数值容差: 量条百分比允许相差1,名字中心允许相差2像素,模板匹配度允许相差0.02
+DEFAULT_TOLERANCES = {
+    'hp': 1,
+    'mp': 1,
+    'head': 1,
+    'hand': 1,
+    'foot': 1,
+    'char_qigong': 1,
+    'screen_hp': 1,
+    'target_hp': 1,
+    'skill_exp_min': 1,
+    'center_x': 2,
+    'center_y': 2,
+    'rate': 0.02
+}
+
+# 每个区域保留的差异示例数
+MAX_EXAMPLES = 5
+
+
+def parse_tolerances(items: Sequence[str]) -> Dict[str, float]:
+    """解析 字段=容差 形式的命令行参数"""
+    tolerances = {}
+    for item in items:
+        field, _, value = item.partition('=')
+        if not field or not value:
+            raise ValueError(f"容差格式应为 字段=数值: {item}")
+        tolerances[field] = float(value)
+    return tolerances
+
+
+class GoldenChecker:
+    """
+    黄金输出回归检查
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        ocr_mode (str): OCR模式(replay/live)
+        tolerances (Dict[str, float]): 数值容差
+    """
+
+    MODULE_NAME = 'GoldenChecker'
+
+    def __init__(self, basic_config: dict, area_config: dict, logger: logging.Logger,
+                 ocr_mode: str = 'replay', tolerances: Optional[Dict[str, float]] = None):
+        """初始化回归检查
+
+        Args:
+            basic_config: 基础配置字典
+            area_config: 区域配置字典
+            logger: 日志实例
+            ocr_mode: OCR模式,见 OCR_MODES
+            tolerances: 数值容差,默认 DEFAULT_TOLERANCES
+        """
+        from src.environment.screen_splitter import ScreenSplitter
+        from src.environment.image_preprocessor import ImagePreprocessor
+        from src.environment.data_processor import DataProcessor
+
+        self.logger = logger
+        self.basic_config = basic_config
+        self.area_config = area_config
+        self.ocr_mode = ocr_mode
+        self.tolerances = dict(DEFAULT_TOLERANCES if tolerances is None else tolerances)
+
+        # 被测模块的日志不输出,避免淹没报告
+        handler_logger = logging.getLogger(f"{self.MODULE_NAME}.handlers")
+        handler_logger.propagate = False
+        handler_logger.addHandler(logging.NullHandler())
+        self.screen_splitter = ScreenSplitter(basic_config, area_config, handler_logger)
+        self.image_preprocessor = ImagePreprocessor(basic_config, area_config, handler_logger)
+        self.data_processor = DataProcessor(basic_config, area_config, handler_logger)
+        self.text_recognizer = None
+        if ocr_mode == 'live':
+            from src.environment.text_recognizer import TextRecognizer
+            self.text_recognizer = TextRecognizer(basic_config, area_config, logger)
+            self.text_recognizer.wait_until_ready()
+
+    def process(self, region_name: str, screen: np.ndarray, recorded_ocr: Optional[Dict[str, Any]]) -> Any:
+        """用当前代码处理一个区域,流程与 DataCollector 的逐区域处理一致
+
+        Returns:
+            Any: 可JSON序列化的处理结果
+        """
+        region_config = self.area_config[region_name]
+        image = self.screen_splitter.split_region(screen, region_name)
+        if image is None:
+            return None
+        # 分割结果是整屏的视图,部分预处理会原地修改图像(如 game_area),复制后互不影响
+        image = image.copy()
+        if region_config.get('image_preprocess', {}).get('Enabled'):
+            image = self.image_preprocessor.process_images({region_name: image}, regions_to_process=[region_name])[region_name]
+
+        if not region_config.get('text_recognizer', {}).get('Enabled'):
+            data = image
+        elif self.text_recognizer is not None:
+            data = self.text_recognizer.process_regions(regions={region_name: image}).get(region_name, {})
+        else:
+            data = OCRResult.from_dict(recorded_ocr) if recorded_ocr else OCRResult.empty()
+        return to_jsonable(self.data_processor.process_region(region_name, data, image, region_config))
+
+    def check(self, corpus_dir: Union[str, Path], regions: Optional[Sequence[str]] = None,
+              bless: bool = False) -> Dict[str, Dict[str, Any]]:
+        """检查一个语料目录
+
+        Args:
+            corpus_dir: 语料目录
+            regions: 只检查指定区域
+            bless: 是否将当前输出写回语料
+
+        Returns:
+            Dict: {区域名: {'frames', 'matched', 'accuracy', 'examples'}}
+        """
+        from src.environment.replay import load_recording
+
+        corpus_dir = Path(corpus_dir)
+        recorded_regions, golden = load_golden(corpus_dir)
+        names, frames, ocr_results = load_recording(corpus_dir)
+
+        for region_name, coordinates in recorded_regions.items():
+            current = self.area_config.get(region_name, {}).get('screen_split', {}).get('coordinates')
+            if current is not None and coordinates is not None and list(current) != list(coordinates):
+                self.logger.warning(f"区域 {region_name} 的坐标与记录时不同: {coordinates} -> {current}")
+
+        report: Dict[str, Dict[str, Any]] = {}
+        for name, screen in zip(names, frames):
+            frame = golden.get(name)
+            if frame is None:
+                continue
+            for region_name, expected in frame['outputs'].items():
+                if regions and region_name not in regions:
+                    continue
+                entry = report.setdefault(region_name, {'frames': 0, 'matched': 0, 'examples': []})
+                entry['frames'] += 1
+                if region_name not in self.area_config:
+                    diffs = ['区域配置已不存在']
+                    actual = expected
+                else:
+                    actual = self.process(region_name, screen, ocr_results.get(name, {}).get(region_name))
+                    diffs = diff_outputs(expected, actual, self.tolerances)
+                if diffs:
+                    if len(entry['examples']) < MAX_EXAMPLES:
+                        entry['examples'].append({'frame': name, 'diffs': diffs})
+                else:
+                    entry['matched'] += 1
+                if bless:
+                    frame['outputs'][region_name] = actual
+
+        for entry in report.values():
+            entry['accuracy'] = round(entry['matched'] / entry['frames'], 4) if entry['frames'] else 1.0
+
+        if bless:
+            with open(corpus_dir / 'golden.json', 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data['frames'] = golden
+            write_json(corpus_dir / 'golden.json', data)
+            self.logger.info(f"已将当前输出写回语料: {corpus_dir / 'golden.json'}")
+        return dict(sorted(report.items()))
+
+
+def merge_reports(reports: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """合并多个语料目录的检查结果"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for report in reports:
+        for region_name, entry in report.items():
+            total = merged.setdefault(region_name, {'frames': 0, 'matched': 0, 'examples': []})
+            total['frames'] += entry['frames']
+            total['matched'] += entry['matched']
+            total['examples'].extend(entry['examples'][:MAX_EXAMPLES - len(total['examples'])])
+    for entry in merged.values():
+        entry['accuracy'] = round(entry['matched'] / entry['frames'], 4) if entry['frames'] else 1.0
+    return dict(sorted(merged.items()))
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='黄金输出回归检查')
+    parser.add_argument('--config', type=str, default=str(project_root / 'config/env/status_collection_config.yaml'),
+                        help='采集配置文件路径')
+    parser.add_argument('--corpus', type=str, nargs='+', required=True,
+                        help='语料目录(可多个)')
+    parser.add_argument('--regions', type=str, nargs='*', default=None,
+                        help='只检查指定区域')
+    parser.add_argument('--ocr', type=str, default='replay', choices=OCR_MODES,
+                        help='OCR模式: replay 使用记录的OCR结果, live 使用当前OCR重新识别')
+    parser.add_argument('--tolerance', type=str, nargs='*', default=[],
+                        help='数值容差 字段=数值,覆盖默认值')
+    parser.add_argument('--report', type=str, default=None,
+                        help='JSON报告输出路径')
+    parser.add_argument('--bless', action='store_true',
+                        help='将当前输出写回语料,作为新的黄金输出')
+    return parser.parse_args()
+
+
+def main():
+    """
+    主函数
+
+    功能:
+    1. 加载配置与语料
+    2. 逐个语料目录回放并比较
+    3. 输出按区域的一致率与差异示例,有差异时退出码为1
+    """
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(GoldenChecker.MODULE_NAME)
+
+    config_manager = ConfigManager(args.config)
+    tolerances = dict(DEFAULT_TOLERANCES)
+    tolerances.update(parse_tolerances(args.tolerance))
+    checker = GoldenChecker(config_manager.basic_config, config_manager.area_config, logger,
+                            ocr_mode=args.ocr, tolerances=tolerances)
+
+    report = merge_reports([checker.check(corpus, regions=args.regions, bless=args.bless) for corpus in args.corpus])
+    mismatched = 0
+    for region_name, entry in report.items():
+        logger.info(f"{region_name:<24} {entry['matched']}/{entry['frames']} ({entry['accuracy']:.1%})")
+        for example in entry['examples']:
+            logger.warning(f"    {example['frame']}: {'; '.join(example['diffs'][:5])}")
+        mismatched += entry['frames'] - entry['matched']
+
+    if args.report:
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({
+                'schema_version': SCHEMA_VERSION,
+                'corpus': args.corpus,
+                'ocr': args.ocr,
+                'tolerances': tolerances,
+                'regions': report
+            }, f, ensure_ascii=False, indent=2)
+        logger.info(f"已保存检查报告: {args.report}")
+
+    if args.bless:
+        logger.info(f"已更新黄金输出,其中 {mismatched} 个区域结果与原记录不同")
+    elif mismatched:
+        logger.warning(f"共 {mismatched} 个区域结果与黄金输出不一致")
+        sys.exit(1)
+    else:
+        logger.info("全部区域结果与黄金输出一致")
+
+
+if __name__ == "__main__":
+    main()
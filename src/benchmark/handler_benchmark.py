@@ -0,0 +1,498 @@
+# -*- coding: utf-8 -*-
+"""
+区域处理函数微基准测试模块
+
+该模块负责:
+1. 逐个运行 ImagePreprocessor.region_specific_methods 与 DataProcessor.region_process_mapping 中的区域处理函数
+2. 输入夹具有两种来源:
+   - recorded: 从录制的整窗口截图中按区域坐标裁切(录制目录格式见 src/environment/replay.py),
+     数据处理函数使用录制的OCR结果
+   - synthetic: 按配置的区域尺寸生成的裁切图像(文本、量条)与对应的OCR结果
+   数据处理函数的输入图像为该区域预处理函数的输出,与采集流程一致
+3. 统计每次调用的耗时分布(微秒)与内存分配(tracemalloc,单独一轮,不影响计时)
+4. 与保存的基线对比,耗时或峰值分配超过阈值时标记为回退(退出码为1)
+
+用法:
+    python src/benchmark/handler_benchmark.py --recording <录制目录> --baseline handler_baseline.json
+    python src/benchmark/handler_benchmark.py --update_baseline handler_baseline.json
+
+主要类与函数:
+- HandlerBenchmark: 区域处理函数微基准测试主类
+- synthetic_fixture: 生成区域的合成夹具
+- find_regressions: 与基线对比
+"""
+
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+# 获取项目根目录并添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.config_manager import ConfigManager
+from src.environment.ocr_result import OCRResult
+from src.environment.image_preprocessor import ImagePreprocessor
+from src.environment.data_processor import DataProcessor
+from src.environment.screen_splitter import ScreenSplitter
+from src.benchmark.pipeline_benchmark import git_revision
+
+# 结果文件格式版本
+SCHEMA_VERSION = 1
+
+# 夹具来源
+FIXTURE_SOURCES = ('recorded', 'synthetic')
+
+# 合成夹具的OCR文本(按区域),未列出的区域没有文本
+SYNTHETIC_TEXTS = {
+    'title_area': ['1]:2025/1/15 12:34:56(123ms)'],
+    'chat_messages': ['[世界]张三: 有人组队吗', '[门派]李四: 收到', '系统: 获得经验 120', '[世界]王五: 出售生药'],
+    'active_skills': ['无名剑法 12', '无名拳法 8', '回避 3'],
+    'char_coordinates': ['87:84'],
+    'char_revival': ['剩下30秒重新站立'],
+    'char_eat_food': ['服用了生药。'],
+    'char_blood_loss': ['-123'],
+    'target_name': ['野狼'],
+    'nearby_monster_name_1': ['野狼', '骷髅'],
+    'nearby_monster_name_2': ['野狼', '骷髅']
+}
+
+# game_area 合成夹具中的名字标签数量与候选名字
+CROWD_SIZE = 30
+CROWD_NAMES = ['野狼', '骷髅', '山贼', '黑熊', '狐狸', '张三', '李四', '王五']
+
+# 高度不超过该值的区域视为量条,合成夹具绘制按比例填充的量条
+GAUGE_MAX_HEIGHT = 12
+
+# 合成文本行高(像素)
+LINE_HEIGHT = 14
+
+
+def synthetic_fixture(region_name: str, coordinates: List[int],
+                      rng: np.random.Generator) -> Tuple[np.ndarray, OCRResult]:
+    """按区域尺寸生成合成夹具
+
+    量条区域: 深色底上按随机比例填充红色量条;
+    文本区域: 深色底上按行绘制白色文本块,并生成位置一致的OCR结果
+
+    Args:
+        region_name: 区域名称
+        coordinates: 区域坐标 [x1, y1, x2, y2]
+        rng: 随机数生成器
+
+    Returns:
+        Tuple[np.ndarray, OCRResult]: (裁切图像, OCR结果)
+    """
+    x1, y1, x2, y2 = coordinates
+    width, height = max(1, x2 - x1), max(1, y2 - y1)
+    image = np.full((height, width, 3), 16, dtype=np.uint8)
+
+    if height <= GAUGE_MAX_HEIGHT and region_name not in SYNTHETIC_TEXTS:
+        fill = int(width * rng.uniform(0.2, 0.9))
+        image[:, :fill] = (0, 0, 220)
+        image[:, fill:] = 0
+        return image, OCRResult.empty()
+
+    if region_name == 'game_area':
+        texts = [CROWD_NAMES[i] for i in rng.integers(0, len(CROWD_NAMES), CROWD_SIZE)]
+        origins = [(int(rng.integers(0, max(1, width - 40))), int(rng.integers(LINE_HEIGHT, height)))
+                   for _ in texts]
+    else:
+        texts = SYNTHETIC_TEXTS.get(region_name, [])
+        origins = [(2, LINE_HEIGHT * (row + 1)) for row in range(len(texts))]
+
+    boxes = []
+    for text, (x, y) in zip(texts, origins):
+        text_width = min(width - x, 12 * len(text))
+        boxes.append([[x, y - LINE_HEIGHT + 2], [x + text_width, y - LINE_HEIGHT + 2], [x + text_width, y], [x, y]])
+        # 白色文本块(Hershey字体不支持中文,只模拟像素分布)
+        cv2.putText(image, 'X' * len(text), (x, y - 2), cv2.FONT_HERSHEY_PLAIN, 0.9, (255, 255, 255), 1)
+    confidences = rng.uniform(0.8, 1.0, len(texts)).tolist()
+    return image, OCRResult(boxes if boxes else None, confidences, texts)
+
+
+def latency_us(samples_ns: List[int]) -> Dict[str, float]:
+    """每次调用耗时的分布(微秒)"""
+    if not samples_ns:
+        return {'min': 0.0, 'median': 0.0, 'p95': 0.0, 'mean': 0.0}
+    values = np.asarray(samples_ns, dtype=np.float64) / 1000
+    return {
+        'min': round(float(values.min()), 3),
+        'median': round(float(np.median(values)), 3),
+        'p95': round(float(np.percentile(values, 95)), 3),
+        'mean': round(float(values.mean()), 3)
+    }
+
+
+class HandlerBenchmark:
+    """
+    区域处理函数微基准测试主类
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        basic_config (dict): 基础配置
+        area_config (dict): 区域配置
+        image_preprocessor (ImagePreprocessor): 图像预处理器
+        data_processor (DataProcessor): 数据处理器
+    """
+
+    MODULE_NAME = 'HandlerBenchmark'
+
+    def __init__(self, basic_config: dict, area_config: dict, logger: logging.Logger,
+                 handler_logger: Optional[logging.Logger] = None):
+        """初始化微基准测试
+
+        Args:
+            basic_config: 基础配置字典
+            area_config: 区域配置字典
+            logger: 日志实例
+            handler_logger: 被测处理器使用的日志实例,默认不输出(避免日志I/O计入耗时)
+        """
+        self.logger = logger
+        self.basic_config = basic_config
+        self.area_config = area_config
+        if handler_logger is None:
+            handler_logger = logging.getLogger(f"{self.MODULE_NAME}.handlers")
+            handler_logger.propagate = False
+            handler_logger.addHandler(logging.NullHandler())
+        self.image_preprocessor = ImagePreprocessor(basic_config, area_config, handler_logger)
+        self.data_processor = DataProcessor(basic_config, area_config, handler_logger)
+        self.screen_splitter = ScreenSplitter(basic_config, area_config, handler_logger)
+
+    def regions(self) -> List[str]:
+        """有处理函数且配置了分割坐标的区域"""
+        handled = set(self.image_preprocessor.region_specific_methods) | set(self.data_processor.region_process_mapping)
+        return [
+            region_name for region_name, config in self.area_config.items()
+            if region_name in handled and isinstance(config, dict)
+            and (config.get('screen_split') or {}).get('coordinates')
+        ]
+
+    # 夹具
+    def recorded_fixtures(self, recording_dir: Union[str, Path], regions: List[str],
+                          limit: int = 5) -> Dict[str, List[Tuple[np.ndarray, Any]]]:
+        """从录制目录裁切各区域的夹具
+
+        Returns:
+            Dict[str, List]: {区域名: [(裁切图像, OCR结果), ...]},没有录制OCR结果时为空结果
+        """
+        from src.environment.replay import load_recording
+        names, frames, ocr_results = load_recording(recording_dir, limit=limit)
+        fixtures = {}
+        for name, frame in zip(names, frames):
+            for region_name in regions:
+                crop = self.screen_splitter.split_region(frame, region_name)
+                if crop is None or crop.size == 0:
+                    continue
+                data = ocr_results.get(name, {}).get(region_name)
+                ocr_result = OCRResult.from_dict(data) if data else OCRResult.empty()
+                fixtures.setdefault(region_name, []).append((np.ascontiguousarray(crop), ocr_result))
+        return fixtures
+
+    def synthetic_fixtures(self, regions: List[str], count: int = 5,
+                           seed: int = 0) -> Dict[str, List[Tuple[np.ndarray, Any]]]:
+        """按配置的区域尺寸生成各区域的合成夹具
+
+        Returns:
+            Dict[str, List]: {区域名: [(裁切图像, OCR结果), ...]}
+        """
+        rng = np.random.default_rng(seed)
+        return {
+            region_name: [
+                synthetic_fixture(region_name, self.area_config[region_name]['screen_split']['coordinates'], rng)
+                for _ in range(count)
+            ]
+            for region_name in regions
+        }
+
+    # 计时
+    @staticmethod
+    def measure(call: Callable, inputs: List[Callable[[], tuple]], repeat: int = 50, warmup: int = 3,
+                alloc_calls: int = 5) -> Dict[str, Any]:
+        """测量一个处理函数
+
+        Args:
+            call: 处理函数
+            inputs: 每个夹具的参数构造函数(每次调用前构造新的参数副本,不计入耗时)
+            repeat: 每个夹具的计时调用次数
+            warmup: 每个夹具的预热调用次数
+            alloc_calls: 每个夹具的内存分配统计调用次数
+
+        Returns:
+            Dict: {'calls', 'per_call_us': {min, median, p95, mean},
+                   'alloc': {'net_bytes_per_call', 'peak_bytes_per_call'}}
+        """
+        for make_args in inputs:
+            for _ in range(warmup):
+                call(*make_args())
+
+        samples = []
+        perf_counter_ns = time.perf_counter_ns
+        for _ in range(repeat):
+            for make_args in inputs:
+                args = make_args()
+                start = perf_counter_ns()
+                call(*args)
+                samples.append(perf_counter_ns() - start)
+
+        # 内存分配单独统计: tracemalloc 会明显拖慢调用
+        net_total, peak_max, alloc_count = 0, 0, 0
+        tracemalloc.start()
+        try:
+            for make_args in inputs:
+                for _ in range(alloc_calls):
+                    args = make_args()
+                    before = tracemalloc.get_traced_memory()[0]
+                    tracemalloc.reset_peak()
+                    result = call(*args)
+                    current, peak = tracemalloc.get_traced_memory()
+                    net_total += current - before
+                    peak_max = max(peak_max, peak - before)
+                    alloc_count += 1
+                    del result
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'calls': len(samples),
+            'per_call_us': latency_us(samples),
+            'alloc': {
+                'net_bytes_per_call': int(net_total / alloc_count) if alloc_count else 0,
+                'peak_bytes_per_call': peak_max
+            }
+        }
+
+    def run(self, fixtures_by_source: Dict[str, Dict[str, List[Tuple[np.ndarray, Any]]]],
+            repeat: int = 50, warmup: int = 3, alloc_calls: int = 5) -> Dict[str, Dict[str, Any]]:
+        """在所有夹具上运行全部区域处理函数
+
+        Args:
+            fixtures_by_source: {夹具来源: {区域名: [(裁切图像, OCR结果), ...]}}
+            repeat / warmup / alloc_calls: 见 measure
+
+        Returns:
+            Dict: {'image_preprocessor.<区域>' 或 'data_processor.<区域>': {夹具来源: 测量结果}}
+        """
+        preprocess_methods = self.image_preprocessor.region_specific_methods
+        process_methods = self.data_processor.region_process_mapping
+        results: Dict[str, Dict[str, Any]] = {}
+
+        for source, fixtures in fixtures_by_source.items():
+            for region_name, samples in fixtures.items():
+                region_config = self.area_config.get(region_name, {})
+                shape = list(samples[0][0].shape)
+
+                # 预处理函数: 输入为裁切图像
+                preprocess = preprocess_methods.get(region_name)
+                preprocessed = [crop for crop, _ in samples]
+                if preprocess is not None:
+                    measured = self.measure(
+                        preprocess,
+                        [lambda crop=crop: (crop.copy(),) for crop, _ in samples],
+                        repeat=repeat, warmup=warmup, alloc_calls=alloc_calls
+                    )
+                    measured.update({'handler': preprocess.__name__, 'input_shape': shape})
+                    results.setdefault(f"image_preprocessor.{region_name}", {})[source] = measured
+                    preprocessed = [preprocess(crop.copy()) for crop, _ in samples]
+
+                # 数据处理函数: 输入为OCR结果与预处理后的图像,经 process_region 调用(部分函数依赖当前区域配置)
+                process = process_methods.get(region_name)
+                if process is not None:
+                    measured = self.measure(
+                        lambda ocr_result, image, region_name=region_name: self.data_processor.process_region(
+                            region_name, ocr_result, image, region_config),
+                        [
+                            lambda ocr_result=ocr_result, image=image: (
+                                OCRResult(ocr_result.boxes, ocr_result.confidences, ocr_result.texts,
+                                          ocr_result.centers, ocr_result.track_ids),
+                                image.copy()
+                            )
+                            for (_, ocr_result), image in zip(samples, preprocessed)
+                        ],
+                        repeat=repeat, warmup=warmup, alloc_calls=alloc_calls
+                    )
+                    measured.update({'handler': process.__name__, 'input_shape': shape})
+                    results.setdefault(f"data_processor.{region_name}", {})[source] = measured
+
+                self.logger.info(f"[{source}] {region_name} 完成")
+        return dict(sorted(results.items()))
+
+    def save_results(self, results: Dict[str, Any], output_dir: Union[str, Path], settings: Dict[str, Any]) -> Path:
+        """保存测试结果为JSON文件
+
+        Args:
+            results: run 返回的结果
+            output_dir: 输出目录
+            settings: 运行参数,记录在结果中
+
+        Returns:
+            Path: 结果文件路径
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        created = datetime.now()
+        output_file = output_dir / f"handler_benchmark_{created.strftime('%Y%m%d_%H%M%S')}.json"
+        report = {
+            'schema_version': SCHEMA_VERSION,
+            'created': created.isoformat(timespec='seconds'),
+            'git': git_revision(),
+            'host': {
+                'node': platform.node(),
+                'platform': platform.platform(),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'opencv': cv2.__version__
+            },
+            'settings': settings,
+            'results': results
+        }
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.logger.info(f"已保存基准测试结果: {output_file}")
+        return output_file
+
+
+# 与基线对比
+def find_regressions(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                     threshold: float = 0.2, min_delta_us: float = 2.0) -> List[Dict[str, Any]]:
+    """找出相对基线变慢或分配变多的处理函数
+
+    耗时比较每次调用的中位数:超过基线 (1 + threshold) 倍且绝对差值超过 min_delta_us 时视为回退;
+    峰值分配超过基线 (1 + threshold) 倍且多于1KiB时视为回退
+
+    Args:
+        results: 本次结果 {处理函数: {夹具来源: 测量结果}}
+        baseline: 基线结果,格式相同
+        threshold: 相对阈值
+        min_delta_us: 耗时回退的最小绝对差值(微秒)
+
+    Returns:
+        List[Dict]: 回退列表,每项包含 handler/source/metric/baseline/current/change
+    """
+    regressions = []
+    for handler, sources in results.items():
+        for source, current in sources.items():
+            base = baseline.get(handler, {}).get(source)
+            if base is None:
+                continue
+            checks = [
+                ('median_us', base['per_call_us']['median'], current['per_call_us']['median'], min_delta_us),
+                ('peak_bytes', base['alloc']['peak_bytes_per_call'], current['alloc']['peak_bytes_per_call'], 1024)
+            ]
+            for metric, old, new, min_delta in checks:
+                if new > old * (1 + threshold) and new - old > min_delta:
+                    regressions.append({
+                        'handler': handler,
+                        'source': source,
+                        'metric': metric,
+                        'baseline': old,
+                        'current': new,
+                        'change': round((new - old) / old, 3) if old else None
+                    })
+    return regressions
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='区域处理函数微基准测试')
+    parser.add_argument('--config', type=str, default=str(project_root / 'config/env/status_collection_config.yaml'),
+                        help='采集配置文件路径')
+    parser.add_argument('--recording', type=str, default=None,
+                        help='录制目录(frames/ 截图与可选的 ocr_results.json),为空时只使用合成夹具')
+    parser.add_argument('--sources', type=str, nargs='*', default=list(FIXTURE_SOURCES), choices=FIXTURE_SOURCES,
+                        help='夹具来源')
+    parser.add_argument('--regions', type=str, nargs='*', default=None,
+                        help='只测试指定区域')
+    parser.add_argument('--fixtures', type=int, default=5,
+                        help='每个区域的夹具数量(录制帧数/合成数量)')
+    parser.add_argument('--repeat', type=int, default=50,
+                        help='每个夹具的计时调用次数')
+    parser.add_argument('--warmup', type=int, default=3,
+                        help='每个夹具的预热调用次数')
+    parser.add_argument('--alloc_calls', type=int, default=5,
+                        help='每个夹具的内存分配统计调用次数')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='合成夹具的随机种子')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='对比的基线结果文件')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='回退的相对阈值')
+    parser.add_argument('--min_delta_us', type=float, default=2.0,
+                        help='耗时回退的最小绝对差值(微秒)')
+    parser.add_argument('--update_baseline', type=str, default=None,
+                        help='将本次结果写入该基线文件')
+    parser.add_argument('--output', type=str, default='benchmark_results',
+                        help='结果输出目录')
+    return parser.parse_args()
+
+
+def main():
+    """
+    主函数
+
+    功能:
+    1. 加载配置并准备录制/合成夹具
+    2. 逐个测量区域处理函数
+    3. 保存JSON结果,指定基线时输出回退(有回退时退出码为1)
+    """
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(HandlerBenchmark.MODULE_NAME)
+
+    config_manager = ConfigManager(args.config)
+    benchmark = HandlerBenchmark(config_manager.basic_config, config_manager.area_config, logger)
+    regions = [region for region in benchmark.regions() if not args.regions or region in args.regions]
+
+    fixtures_by_source = {}
+    if 'recorded' in args.sources:
+        if args.recording:
+            fixtures_by_source['recorded'] = benchmark.recorded_fixtures(args.recording, regions, limit=args.fixtures)
+        else:
+            logger.warning("未指定 --recording,跳过录制夹具")
+    if 'synthetic' in args.sources:
+        fixtures_by_source['synthetic'] = benchmark.synthetic_fixtures(regions, count=args.fixtures, seed=args.seed)
+
+    results = benchmark.run(fixtures_by_source, repeat=args.repeat, warmup=args.warmup, alloc_calls=args.alloc_calls)
+    for handler, sources in results.items():
+        for source, measured in sources.items():
+            logger.info(
+                f"{handler:<40} [{source:<9}] {measured['handler']:<36} "
+                f"median={measured['per_call_us']['median']:.1f}us p95={measured['per_call_us']['p95']:.1f}us "
+                f"peak={measured['alloc']['peak_bytes_per_call'] / 1024:.1f}KiB"
+            )
+    settings = {key: value for key, value in vars(args).items() if key not in ('baseline', 'update_baseline', 'output')}
+    output_file = benchmark.save_results(results, args.output, settings)
+
+    if args.update_baseline:
+        Path(args.update_baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.update_baseline).write_bytes(output_file.read_bytes())
+        logger.info(f"已更新基线: {args.update_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = find_regressions(results, baseline, threshold=args.threshold, min_delta_us=args.min_delta_us)
+        for item in regressions:
+            logger.warning(f"回退: {item['handler']} [{item['source']}] {item['metric']} "
+                           f"{item['baseline']} -> {item['current']} ({item['change']:+.1%})"
+                           if item['change'] is not None else
+                           f"回退: {item['handler']} [{item['source']}] {item['metric']} "
+                           f"{item['baseline']} -> {item['current']}")
+        if regressions:
+            sys.exit(1)
+        logger.info("与基线相比没有回退")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+OCR参数自动调优模块
+
+该模块负责:
+1. 针对每个区域,在OCR参数空间与预处理放大倍数上搜索
+2. 在带标注的裁切图像语料上评估每组参数(复用 ocr_benchmark)
+3. 选出满足目标准确率且延迟最低的参数组
+4. 将结果写入覆盖配置文件(ocr_params/scale_factor),由 ConfigManager 合并加载
+
+搜索空间文件(YAML)格式:
+    target_accuracy: 0.95       # 完全匹配率下限
+    max_cer: 0.05               # 字符错误率上限(可选)
+    latency_metric: p95         # 比较延迟使用的分位数: p50/p95/p99
+    max_trials: 40              # 每个区域最多评估的参数组数,超出时随机抽样
+    seed: 0
+    search_space:               # 所有区域共用的搜索空间
+      det_limit_side_len: [160, 320, 640, 1040]
+      det_db_thresh: [0.2, 0.3]
+      rec_batch_num: [1, 6]
+      scale_factor: [2, 3, 4]
+    regions:                    # 可选,按区域覆盖搜索空间中的维度
+      char_coordinates:
+        scale_factor: [1]
+
+生成的覆盖配置可通过 basic_config.config_overlay 引用。
+
+主要类:
+- OCRAutotuner: 按区域搜索OCR参数的自动调优器
+"""
+
+import sys
+import json
+import random
+import argparse
+import itertools
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+import yaml
+
+# 获取项目根目录并添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logger_manager import LoggerManager
+from src.benchmark.ocr_benchmark import OCRBenchmark, load_corpus, apply_param_set
+
+
+class OCRAutotuner:
+    """
+    按区域搜索OCR参数的自动调优器
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        benchmark (OCRBenchmark): 用于评估参数组的基准测试实例
+        target_accuracy (float): 完全匹配率下限
+        max_cer (Optional[float]): 字符错误率上限
+        latency_metric (str): 比较延迟使用的分位数
+        max_trials (int): 每个区域最多评估的参数组数
+    """
+
+    MODULE_NAME = 'OCRAutotuner'
+
+    def __init__(self, benchmark: OCRBenchmark, search_config: Dict[str, Any], logger: logging.Logger):
+        """初始化自动调优器
+
+        Args:
+            benchmark: OCR基准测试实例
+            search_config: 搜索空间配置
+            logger: 日志实例
+        """
+        self.logger = logger
+        self.benchmark = benchmark
+        self.search_space = search_config.get('search_space') or {}
+        self.region_spaces = search_config.get('regions') or {}
+        self.target_accuracy = float(search_config.get('target_accuracy', 0.95))
+        self.max_cer = search_config.get('max_cer')
+        self.latency_metric = search_config.get('latency_metric', 'p95')
+        self.max_trials = int(search_config.get('max_trials', 40))
+        self.random = random.Random(search_config.get('seed', 0))
+
+    def candidates(self, region_name: str) -> List[Dict[str, Any]]:
+        """生成区域的候选参数组
+
+        第一个候选始终为当前配置(空参数组),用于作为基线
+
+        Args:
+            region_name: 区域名称
+
+        Returns:
+            List[Dict]: 候选参数组列表
+        """
+        space = dict(self.search_space)
+        space.update(self.region_spaces.get(region_name) or {})
+        keys = list(space.keys())
+        combos = list(itertools.product(*(space[key] for key in keys))) if keys else []
+
+        if len(combos) > self.max_trials - 1:
+            combos = self.random.sample(combos, self.max_trials - 1)
+
+        candidates = [{}]
+        for values in combos:
+            candidate = {'ocr_params': {}}
+            for key, value in zip(keys, values):
+                if key == 'scale_factor':
+                    candidate['scale_factor'] = value
+                else:
+                    candidate['ocr_params'][key] = value
+            candidates.append(candidate)
+        return candidates
+
+    def meets_target(self, metrics: Dict[str, Any]) -> bool:
+        """评估结果是否满足准确率目标"""
+        if metrics['exact_match'] < self.target_accuracy:
+            return False
+        if self.max_cer is not None and metrics['cer'] > float(self.max_cer):
+            return False
+        return True
+
+    def tune_region(self, region_name: str, samples: List[Dict[str, Any]],
+                    warmup: int = 1, repeat: int = 1) -> Dict[str, Any]:
+        """调优单个区域
+
+        Args:
+            region_name: 区域名称
+            samples: 该区域的样本
+            warmup: 每组参数的预热次数
+            repeat: 每个样本的重复次数
+
+        Returns:
+            Dict: {'best': 最优参数组, 'metrics': 最优指标, 'met_target': 是否达标, 'trials': 所有评估记录}
+        """
+        trials = []
+        for index, candidate in enumerate(self.candidates(region_name)):
+            area_config = apply_param_set(self.benchmark.area_config, candidate, [region_name])
+            components = self.benchmark.build_components(area_config)
+            metrics = self.benchmark.evaluate_region(components, area_config, samples, warmup=warmup, repeat=repeat)
+            trials.append({'param_set': candidate, 'metrics': metrics, 'met_target': self.meets_target(metrics)})
+            self.logger.info(
+                f"[{region_name}] 试验 {index + 1}: {candidate or '当前配置'} -> "
+                f"{self.latency_metric}={metrics['latency_ms'][self.latency_metric]}ms "
+                f"完全匹配={metrics['exact_match']} CER={metrics['cer']}"
+            )
+
+        feasible = [trial for trial in trials if trial['met_target']]
+        if feasible:
+            best = min(feasible, key=lambda trial: trial['metrics']['latency_ms'][self.latency_metric])
+        else:
+            # 没有达标的参数组时选择准确率最高的,并给出警告
+            best = max(trials, key=lambda trial: (trial['metrics']['exact_match'], -trial['metrics']['cer']))
+            self.logger.warning(f"区域 {region_name} 没有参数组达到目标准确率 {self.target_accuracy}")
+
+        return {
+            'best': best['param_set'],
+            'metrics': best['metrics'],
+            'met_target': best['met_target'],
+            'trials': trials
+        }
+
+    def tune(self, samples: List[Dict[str, Any]], warmup: int = 1, repeat: int = 1) -> Dict[str, Any]:
+        """对语料中出现的每个区域分别调优
+
+        Returns:
+            Dict: {区域名: tune_region 的结果}
+        """
+        samples_by_region = {}
+        for sample in samples:
+            samples_by_region.setdefault(sample['region'], []).append(sample)
+
+        results = {}
+        for region_name, region_samples in samples_by_region.items():
+            self.logger.info(f"开始调优区域: {region_name} ({len(region_samples)} 个样本)")
+            results[region_name] = self.tune_region(region_name, region_samples, warmup=warmup, repeat=repeat)
+        return results
+
+    def build_overlay(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """根据调优结果生成覆盖配置
+
+        每个调优过的区域都写出生效的参数(最优为当前配置时写出当前值),
+        这样覆盖文件本身就记录了该区域调优后的完整结果
+
+        Args:
+            results: tune 的返回值
+
+        Returns:
+            Dict: {区域名: {'text_recognizer': {'ocr_params': ...}, 'image_preprocess': {'scale_factor': ...}}}
+        """
+        overlay = {}
+        for region_name, result in results.items():
+            region_overlay = {}
+            tuned_config = apply_param_set(self.benchmark.area_config, result['best'], [region_name])[region_name]
+            ocr_params = (tuned_config.get('text_recognizer') or {}).get('ocr_params')
+            if ocr_params:
+                region_overlay['text_recognizer'] = {'ocr_params': ocr_params}
+            scale_factor = (tuned_config.get('image_preprocess') or {}).get('scale_factor')
+            if scale_factor is not None:
+                region_overlay['image_preprocess'] = {'scale_factor': scale_factor}
+            if region_overlay:
+                overlay[region_name] = region_overlay
+        return overlay
+
+    def save(self, results: Dict[str, Any], overlay_path: Path, report_dir: Optional[Path] = None):
+        """保存覆盖配置与调优报告
+
+        覆盖配置文件已存在时合并写入,本次未调优(不在语料中)的区域保留之前的结果
+
+        Args:
+            results: tune 的返回值
+            overlay_path: 覆盖配置文件路径(YAML)
+            report_dir: 调优报告目录,为None时不保存报告
+        """
+        overlay_path = Path(overlay_path)
+        overlay_path.parent.mkdir(parents=True, exist_ok=True)
+        overlay = {}
+        if overlay_path.exists():
+            with open(overlay_path, 'r', encoding='utf-8') as f:
+                overlay = yaml.safe_load(f) or {}
+        overlay = ConfigManager._merge_config(overlay, self.build_overlay(results))
+        created = datetime.now()
+        header = (
+            f"# OCR参数自动调优生成的覆盖配置 ({created.isoformat(timespec='seconds')})\n"
+            f"# 目标完全匹配率: {self.target_accuracy}, 延迟指标: {self.latency_metric}\n"
+            f"# 在 basic_config.config_overlay 中引用此文件以生效\n"
+        )
+        with open(overlay_path, 'w', encoding='utf-8') as f:
+            f.write(header)
+            yaml.safe_dump(overlay, f, allow_unicode=True, sort_keys=False)
+        self.logger.info(f"已保存覆盖配置: {overlay_path}")
+
+        if report_dir is not None:
+            report_dir = Path(report_dir)
+            report_dir.mkdir(parents=True, exist_ok=True)
+            report_file = report_dir / f"ocr_autotune_{created.strftime('%Y%m%d_%H%M%S')}.json"
+            with open(report_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'created': created.isoformat(timespec='seconds'),
+                    'target_accuracy': self.target_accuracy,
+                    'max_cer': self.max_cer,
+                    'latency_metric': self.latency_metric,
+                    'regions': results
+                }, f, ensure_ascii=False, indent=2)
+            self.logger.info(f"已保存调优报告: {report_file}")
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='按区域自动调优OCR参数')
+    parser.add_argument('--config', type=str, default=str(project_root / 'config/env/status_collection_config.yaml'),
+                        help='采集配置文件路径')
+    parser.add_argument('--corpus', type=str, required=True,
+                        help='带标注的区域裁切图像语料目录(包含labels.json)')
+    parser.add_argument('--search', type=str, required=True,
+                        help='搜索空间YAML文件')
+    parser.add_argument('--regions', type=str, nargs='*', default=None,
+                        help='只调优指定区域')
+    parser.add_argument('--warmup', type=int, default=1,
+                        help='每组参数的预热次数')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='每个样本的重复次数')
+    parser.add_argument('--overlay', type=str, default=str(project_root / 'config/env/ocr_tuned_overlay.yaml'),
+                        help='生成的覆盖配置文件路径')
+    parser.add_argument('--report', type=str, default='benchmark_results',
+                        help='调优报告输出目录')
+    return parser.parse_args()
+
+
+def main():
+    """
+    主函数
+
+    功能:
+    1. 加载配置、语料和搜索空间
+    2. 按区域搜索参数
+    3. 写出覆盖配置与调优报告
+    """
+    args = parse_args()
+
+    # 以当前生效的配置(含已有覆盖配置)作为基线
+    config_manager = ConfigManager(args.config)
+    logger_config = config_manager.get_logger_config()
+    logger = LoggerManager(name=OCRAutotuner.MODULE_NAME, **logger_config).get_logger()
+
+    with open(args.search, 'r', encoding='utf-8') as f:
+        search_config = yaml.safe_load(f) or {}
+
+    samples = load_corpus(Path(args.corpus), regions=args.regions)
+    logger.info(f"已加载 {len(samples)} 个样本")
+
+    benchmark = OCRBenchmark(
+        basic_config=config_manager.basic_config,
+        area_config=config_manager.area_config,
+        logger=logger,
+        logger_config=logger_config
+    )
+    autotuner = OCRAutotuner(benchmark, search_config, logger)
+    results = autotuner.tune(samples, warmup=args.warmup, repeat=args.repeat)
+    autotuner.save(results, Path(args.overlay), Path(args.report))
+
+
+if __name__ == "__main__":
+    main()
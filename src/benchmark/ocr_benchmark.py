@@ -0,0 +1,517 @@
+# -*- coding: utf-8 -*-
+"""
+OCR基准测试模块
+
+该模块负责:
+1. 加载带标注的区域裁切图像语料
+2. 按参数矩阵(OCR参数、预处理放大倍数)运行预处理与文字识别
+3. 统计每个区域的延迟分位数(p50/p95/p99)、吞吐量、完全匹配率和字符错误率
+4. 输出机器可读的JSON结果,用于不同运行之间的对比
+
+语料目录结构:
+    corpus_dir/
+    ├── labels.json            # 标注列表
+    └── target_name/001.png    # 区域裁切图像(screen_split的输出)
+
+labels.json 格式:
+    [
+        {"region": "target_name", "image": "target_name/001.png", "text": "期望文本"},
+        {"region": "char_coordinates", "image": "char_coordinates/001.png", "text": "87:84", "preprocessed": false},
+        ...
+    ]
+
+参数矩阵文件(YAML)格式:
+    param_sets:                 # 显式列出的参数组
+      baseline: {}
+      small_det:
+        ocr_params: {det_limit_side_len: 320}
+        scale_factor: 2         # 预处理放大倍数
+        regions:                # 可选,针对单个区域的覆盖
+          target_name: {ocr_params: {drop_score: 0.3}}
+    grid:                       # 笛卡尔积展开的参数网格
+      det_limit_side_len: [320, 640, 1040]
+      rec_batch_num: [1, 6]
+      scale_factor: [2, 4]
+
+主要类:
+- OCRBenchmark: OCR基准测试主类
+"""
+
+import sys
+import copy
+import json
+import time
+import argparse
+import itertools
+import platform
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Union
+
+import cv2
+import numpy as np
+import yaml
+
+# 获取项目根目录并添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logger_manager import LoggerManager
+from src.environment.image_preprocessor import ImagePreprocessor
+from src.environment.text_recognizer import TextRecognizer
+from src.environment.ocr_result import OCRResult
+
+# 结果文件格式版本
+SCHEMA_VERSION = 1
+
+
+# 读取图像(兼容中文路径)
+def read_image(path: Path) -> Optional[np.ndarray]:
+    """读取图像文件,使用imdecode以兼容Windows下的中文路径"""
+    data = np.fromfile(str(path), dtype=np.uint8)
+    if data.size == 0:
+        return None
+    return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+
+# 加载标注语料
+def load_corpus(corpus_dir: Path, regions: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """加载带标注的区域裁切图像语料
+
+    Args:
+        corpus_dir: 语料目录,包含 labels.json
+        regions: 只加载指定区域,为None时加载全部
+
+    Returns:
+        List[Dict]: 样本列表,每个样本包含 region/image_path/image/text/preprocessed
+
+    Raises:
+        FileNotFoundError: 找不到标注文件时抛出
+    """
+    corpus_dir = Path(corpus_dir)
+    labels_file = corpus_dir / 'labels.json'
+    if not labels_file.exists():
+        raise FileNotFoundError(f"找不到标注文件: {labels_file}")
+
+    with open(labels_file, 'r', encoding='utf-8') as f:
+        labels = json.load(f)
+
+    samples = []
+    for label in labels:
+        region_name = label['region']
+        if regions and region_name not in regions:
+            continue
+        image_path = corpus_dir / label['image']
+        image = read_image(image_path)
+        if image is None:
+            continue
+        samples.append({
+            'region': region_name,
+            'image_path': str(image_path),
+            'image': image,
+            'text': label.get('text', ''),
+            'preprocessed': label.get('preprocessed', False)
+        })
+    return samples
+
+
+# 展开参数矩阵
+def expand_param_matrix(matrix: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """将参数矩阵展开为命名的参数组
+
+    Args:
+        matrix: 参数矩阵,支持 param_sets(显式参数组) 与 grid(笛卡尔积网格)
+
+    Returns:
+        Dict[str, Dict]: {参数组名: {'ocr_params': {...}, 'scale_factor': x, 'regions': {...}}}
+    """
+    param_sets = {}
+    for name, param_set in (matrix.get('param_sets') or {}).items():
+        param_sets[name] = param_set or {}
+
+    grid = matrix.get('grid') or {}
+    if grid:
+        keys = list(grid.keys())
+        for values in itertools.product(*(grid[key] for key in keys)):
+            param_set = {'ocr_params': {}}
+            for key, value in zip(keys, values):
+                if key == 'scale_factor':
+                    param_set['scale_factor'] = value
+                else:
+                    param_set['ocr_params'][key] = value
+            name = ','.join(f"{key}={value}" for key, value in zip(keys, values))
+            param_sets[name] = param_set
+
+    if not param_sets:
+        param_sets['baseline'] = {}
+    return param_sets
+
+
+# 将参数组应用到区域配置
+def apply_param_set(area_config: Dict[str, Any],
+                    param_set: Dict[str, Any],
+                    regions: List[str]) -> Dict[str, Any]:
+    """将参数组应用到区域配置的副本上
+
+    全局 ocr_params/scale_factor 作用于所有区域,regions 中的配置覆盖单个区域
+
+    Args:
+        area_config: 原始区域配置
+        param_set: 参数组
+        regions: 需要应用参数的区域列表
+
+    Returns:
+        Dict: 应用参数后的区域配置副本
+    """
+    config = copy.deepcopy(area_config)
+    region_overrides = param_set.get('regions') or {}
+
+    for region_name in regions:
+        region_config = config.setdefault(region_name, {})
+        override = region_overrides.get(region_name, {})
+
+        ocr_params = dict(region_config.get('text_recognizer', {}).get('ocr_params') or {})
+        ocr_params.update(param_set.get('ocr_params') or {})
+        ocr_params.update(override.get('ocr_params') or {})
+        if ocr_params:
+            region_config.setdefault('text_recognizer', {})['ocr_params'] = ocr_params
+
+        scale_factor = override.get('scale_factor', param_set.get('scale_factor'))
+        if scale_factor is not None:
+            region_config.setdefault('image_preprocess', {})['scale_factor'] = scale_factor
+    return config
+
+
+# 计算编辑距离
+def edit_distance(source: str, target: str) -> int:
+    """计算两个字符串之间的Levenshtein编辑距离"""
+    if len(source) < len(target):
+        source, target = target, source
+    previous = list(range(len(target) + 1))
+    for i, source_char in enumerate(source, 1):
+        current = [i]
+        for j, target_char in enumerate(target, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (source_char != target_char)
+            ))
+        previous = current
+    return previous[-1]
+
+
+# 规范化文本
+def normalize_text(text: str) -> str:
+    """去除所有空白字符,避免OCR断词方式影响匹配"""
+    return ''.join(text.split())
+
+
+# 合并OCR结果文本
+def join_ocr_text(ocr_result: Union[OCRResult, Dict]) -> str:
+    """按从上到下、从左到右的顺序合并OCR识别出的所有文本"""
+    if isinstance(ocr_result, dict):
+        ocr_result = OCRResult.from_dict(ocr_result)
+    if not isinstance(ocr_result, OCRResult) or not ocr_result.count:
+        return ''
+    # 先按y再按x排序
+    order = np.lexsort((ocr_result.centers[:, 0], ocr_result.centers[:, 1]))
+    return ''.join(ocr_result.texts[i] for i in order.tolist())
+
+
+# 统计延迟分布
+def latency_stats(latencies_ms: List[float]) -> Dict[str, float]:
+    """计算延迟分布统计(毫秒)"""
+    if not latencies_ms:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'mean': 0.0, 'max': 0.0}
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        'p50': round(float(p50), 3),
+        'p95': round(float(p95), 3),
+        'p99': round(float(p99), 3),
+        'mean': round(float(values.mean()), 3),
+        'max': round(float(values.max()), 3)
+    }
+
+
+class OCRBenchmark:
+    """
+    OCR基准测试主类
+
+    对每个参数组分别创建图像预处理器和文字识别器,在语料上逐区域运行,
+    统计延迟与准确率指标。
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        basic_config (dict): 基础配置
+        area_config (dict): 区域配置
+        logger_config (dict): 为内部组件创建logger使用的配置
+    """
+
+    MODULE_NAME = 'OCRBenchmark'
+
+    def __init__(self, basic_config: dict, area_config: dict, logger: logging.Logger,
+                 logger_config: Optional[dict] = None):
+        """初始化OCR基准测试
+
+        Args:
+            basic_config: 基础配置字典
+            area_config: 区域配置字典
+            logger: 日志实例
+            logger_config: 内部组件的日志配置,为None时内部组件共用logger
+        """
+        self.logger = logger
+        self.basic_config = basic_config
+        self.area_config = area_config
+        self.logger_config = logger_config
+
+    def _component_logger(self, name: str) -> logging.Logger:
+        """为内部组件获取logger"""
+        if self.logger_config is None:
+            return self.logger
+        return LoggerManager(name=name, **self.logger_config).get_logger()
+
+    def build_components(self, area_config: dict) -> Dict[str, Any]:
+        """按区域配置创建图像预处理器与文字识别器
+
+        Args:
+            area_config: 已应用参数组的区域配置
+
+        Returns:
+            Dict: {'image_preprocessor': ..., 'text_recognizer': ...}
+        """
+        return {
+            'image_preprocessor': ImagePreprocessor(
+                basic_config=self.basic_config,
+                area_config=area_config,
+                logger=self._component_logger('image_preprocessor')
+            ),
+            'text_recognizer': TextRecognizer(
+                basic_config=self.basic_config,
+                area_config=area_config,
+                logger=self._component_logger('text_recognizer')
+            )
+        }
+
+    def run_sample(self, components: Dict[str, Any], area_config: dict, sample: Dict[str, Any]) -> Dict[str, Any]:
+        """运行单个样本并计时
+
+        Args:
+            components: build_components 创建的组件
+            area_config: 已应用参数组的区域配置
+            sample: 语料样本
+
+        Returns:
+            Dict: {'text': 识别文本, 'preprocess_ms': 预处理耗时, 'ocr_ms': OCR耗时}
+        """
+        region_name = sample['region']
+        image = sample['image'].copy()  # 部分预处理方法会原地修改图像
+
+        start = time.perf_counter()
+        preprocess_enabled = area_config.get(region_name, {}).get('image_preprocess', {}).get('Enabled', False)
+        if preprocess_enabled and not sample['preprocessed']:
+            image = components['image_preprocessor'].process_images(
+                {region_name: image}, regions_to_process=[region_name]
+            ).get(region_name, image)
+        preprocessed_at = time.perf_counter()
+
+        ocr_result = components['text_recognizer'].process_and_recognize(image, region_name=region_name)
+        finished_at = time.perf_counter()
+
+        return {
+            'text': join_ocr_text(ocr_result),
+            'preprocess_ms': (preprocessed_at - start) * 1000,
+            'ocr_ms': (finished_at - preprocessed_at) * 1000
+        }
+
+    def evaluate_region(self,
+                        components: Dict[str, Any],
+                        area_config: dict,
+                        samples: List[Dict[str, Any]],
+                        warmup: int = 1,
+                        repeat: int = 1) -> Dict[str, Any]:
+        """在单个区域的样本上运行并统计指标
+
+        Args:
+            components: build_components 创建的组件
+            area_config: 已应用参数组的区域配置
+            samples: 该区域的样本列表
+            warmup: 预热次数(不计时)
+            repeat: 每个样本重复次数
+
+        Returns:
+            Dict: 区域指标,包含延迟分布、吞吐量、完全匹配率、字符错误率
+        """
+        for sample in samples[:warmup]:
+            self.run_sample(components, area_config, sample)
+
+        latencies, ocr_latencies = [], []
+        exact_matches, total_distance, total_chars = 0, 0, 0
+        mismatches = []
+
+        for sample in samples:
+            expected = normalize_text(sample['text'])
+            for _ in range(max(1, repeat)):
+                result = self.run_sample(components, area_config, sample)
+                latencies.append(result['preprocess_ms'] + result['ocr_ms'])
+                ocr_latencies.append(result['ocr_ms'])
+
+            # 准确率只按最后一次结果统计
+            recognized = normalize_text(result['text'])
+            distance = edit_distance(recognized, expected)
+            total_distance += distance
+            total_chars += max(1, len(expected))
+            if distance == 0:
+                exact_matches += 1
+            elif len(mismatches) < 10:
+                mismatches.append({
+                    'image': sample['image_path'],
+                    'expected': expected,
+                    'recognized': recognized
+                })
+
+        total_seconds = sum(latencies) / 1000
+        return {
+            'count': len(samples),
+            'latency_ms': latency_stats(latencies),
+            'ocr_ms': latency_stats(ocr_latencies),
+            'throughput': round(len(latencies) / total_seconds, 3) if total_seconds > 0 else 0.0,
+            'exact_match': round(exact_matches / len(samples), 4) if samples else 0.0,
+            'cer': round(total_distance / total_chars, 4) if total_chars else 0.0,
+            'mismatches': mismatches
+        }
+
+    def run(self,
+            samples: List[Dict[str, Any]],
+            param_sets: Dict[str, Dict[str, Any]],
+            warmup: int = 1,
+            repeat: int = 1) -> Dict[str, Any]:
+        """在所有参数组上运行基准测试
+
+        Args:
+            samples: load_corpus 加载的样本
+            param_sets: expand_param_matrix 展开的参数组
+            warmup: 每个区域的预热次数
+            repeat: 每个样本重复次数
+
+        Returns:
+            Dict: {参数组名: {'regions': {区域名: 指标}}}
+        """
+        samples_by_region = {}
+        for sample in samples:
+            samples_by_region.setdefault(sample['region'], []).append(sample)
+        regions = list(samples_by_region.keys())
+
+        results = {}
+        for name, param_set in param_sets.items():
+            self.logger.info(f"运行参数组: {name}")
+            area_config = apply_param_set(self.area_config, param_set, regions)
+            components = self.build_components(area_config)
+
+            region_results = {}
+            for region_name, region_samples in samples_by_region.items():
+                region_results[region_name] = self.evaluate_region(
+                    components, area_config, region_samples, warmup=warmup, repeat=repeat
+                )
+                metrics = region_results[region_name]
+                self.logger.info(
+                    f"[{name}] {region_name}: "
+                    f"p50={metrics['latency_ms']['p50']}ms p95={metrics['latency_ms']['p95']}ms "
+                    f"p99={metrics['latency_ms']['p99']}ms 吞吐={metrics['throughput']}/s "
+                    f"完全匹配={metrics['exact_match']} CER={metrics['cer']}"
+                )
+            results[name] = {'param_set': param_set, 'regions': region_results}
+        return results
+
+    def save_results(self, results: Dict[str, Any], output_dir: Path, corpus_dir: Path) -> Path:
+        """保存测试结果为JSON文件
+
+        Args:
+            results: run 返回的结果
+            output_dir: 输出目录
+            corpus_dir: 语料目录,记录在结果中
+
+        Returns:
+            Path: 结果文件路径
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        created = datetime.now()
+        output_file = output_dir / f"ocr_benchmark_{created.strftime('%Y%m%d_%H%M%S')}.json"
+
+        report = {
+            'schema_version': SCHEMA_VERSION,
+            'created': created.isoformat(timespec='seconds'),
+            'corpus': str(corpus_dir),
+            'host': {
+                'node': platform.node(),
+                'platform': platform.platform(),
+                'python': platform.python_version()
+            },
+            'results': results
+        }
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.logger.info(f"已保存基准测试结果: {output_file}")
+        return output_file
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='OCR延迟/准确率基准测试')
+    parser.add_argument('--config', type=str, default=str(project_root / 'config/env/status_collection_config.yaml'),
+                        help='采集配置文件路径')
+    parser.add_argument('--corpus', type=str, required=True,
+                        help='带标注的区域裁切图像语料目录(包含labels.json)')
+    parser.add_argument('--matrix', type=str, default=None,
+                        help='参数矩阵YAML文件,为空时只运行当前配置')
+    parser.add_argument('--regions', type=str, nargs='*', default=None,
+                        help='只测试指定区域')
+    parser.add_argument('--warmup', type=int, default=1,
+                        help='每个区域的预热次数')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='每个样本的重复次数')
+    parser.add_argument('--output', type=str, default='benchmark_results',
+                        help='结果输出目录')
+    return parser.parse_args()
+
+
+def main():
+    """
+    主函数
+
+    功能:
+    1. 加载配置、语料和参数矩阵
+    2. 按参数组运行基准测试
+    3. 保存JSON结果
+    """
+    args = parse_args()
+
+    config_manager = ConfigManager(args.config)
+    logger_config = config_manager.get_logger_config()
+    logger = LoggerManager(name=OCRBenchmark.MODULE_NAME, **logger_config).get_logger()
+
+    matrix = {}
+    if args.matrix:
+        with open(args.matrix, 'r', encoding='utf-8') as f:
+            matrix = yaml.safe_load(f) or {}
+    param_sets = expand_param_matrix(matrix)
+
+    samples = load_corpus(Path(args.corpus), regions=args.regions)
+    logger.info(f"已加载 {len(samples)} 个样本, {len(param_sets)} 个参数组")
+
+    benchmark = OCRBenchmark(
+        basic_config=config_manager.basic_config,
+        area_config=config_manager.area_config,
+        logger=logger,
+        logger_config=logger_config
+    )
+    results = benchmark.run(samples, param_sets, warmup=args.warmup, repeat=args.repeat)
+    benchmark.save_results(results, Path(args.output), Path(args.corpus))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+# -*- coding: utf-8 -*-
+"""
+端到端采集流程基准测试模块
+
+该模块负责:
+1. 用录制的整窗口截图回放驱动 DataCollector.process_frame,不需要游戏窗口与Windows API
+2. OCR可选回放录制结果(stub,可模拟识别耗时)或真实的 PaddleOCR(real)
+3. 按场景统计吞吐量(帧/秒)、整帧与各阶段/区域的延迟分布、峰值内存(RSS)
+4. 结果写入带版本信息(格式版本、git提交与分支)的JSON文件,可与其他分支的结果对比
+
+默认场景:
+    all_regions         全部启用的区域
+    hud_only            除 game_area 外的HUD区域
+    crowded_game_area   人物密集画面中的 game_area(使用录制目录下的 crowded 子目录)
+
+场景文件(YAML)格式:
+    scenarios:
+      hud_batched:
+        description: "HUD区域,按阶段批量处理"
+        exclude: [game_area]        # 排除的区域
+        regions: [target_hp, ...]   # 或只处理指定区域
+        recording: crowded          # 可选,使用录制目录下的子目录
+        basic_config:               # 可选,覆盖基础配置
+          stage_batching: True
+
+录制目录格式见 src/environment/replay.py。每个场景默认在独立的子进程中运行,峰值内存互不影响。
+
+主要类与函数:
+- PipelineBenchmark: 端到端基准测试主类
+- compare_results: 与基线结果对比
+"""
+
+import sys
+import copy
+import json
+import time
+import argparse
+import platform
+import subprocess
+import multiprocessing
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import yaml
+
+# 获取项目根目录并添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logger_manager import LoggerManager
+from src.benchmark.ocr_benchmark import latency_stats
+
+# 结果文件格式版本
+SCHEMA_VERSION = 1
+
+# 默认场景
+DEFAULT_SCENARIOS = {
+    'all_regions': {
+        'description': '全部启用的区域'
+    },
+    'hud_only': {
+        'description': '除 game_area 外的HUD区域',
+        'exclude': ['game_area']
+    },
+    'crowded_game_area': {
+        'description': '人物密集画面中的 game_area',
+        'regions': ['game_area'],
+        'recording': 'crowded'
+    }
+}
+
+# OCR模式
+OCR_MODES = ('stub', 'real')
+
+
+# 获取git版本信息
+def git_revision() -> Dict[str, Any]:
+    """当前代码的git提交、分支与是否有未提交的修改,不是git仓库时各项为None"""
+    def git(*args) -> Optional[str]:
+        try:
+            return subprocess.run(['git', *args], cwd=project_root, capture_output=True, text=True,
+                                  check=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return None
+    status = git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': git('rev-parse', '--short', 'HEAD'),
+        'branch': git('rev-parse', '--abbrev-ref', 'HEAD'),
+        'dirty': None if status is None else bool(status)
+    }
+
+
+# 获取峰值内存
+def peak_rss_mb() -> Optional[float]:
+    """本进程的峰值常驻内存(MB),平台不支持时为None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为KB, macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class PipelineBenchmark:
+    """
+    端到端采集流程基准测试主类
+
+    每个场景按配置创建一个使用回放截图源的 DataCollector,预热后连续处理N帧,
+    用 MetricsRegistry 统计各阶段/区域的延迟
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        config_path (Path): 采集配置文件路径
+        recording_dir (Path): 录制目录
+        ocr (str): OCR模式 stub / real
+        work_dir (Path): 场景运行时的输出根目录(状态文件、日志等)
+    """
+
+    MODULE_NAME = 'PipelineBenchmark'
+
+    def __init__(self,
+                 config_path: Union[str, Path],
+                 recording_dir: Union[str, Path],
+                 ocr: str = 'stub',
+                 ocr_latency_ms: float = 0.0,
+                 frames: int = 100,
+                 warmup: int = 5,
+                 work_dir: Union[str, Path] = 'benchmark_results/work',
+                 log_level: str = 'WARNING',
+                 logger: Optional[logging.Logger] = None):
+        """初始化基准测试
+
+        Args:
+            config_path: 采集配置文件路径
+            recording_dir: 录制目录
+            ocr: OCR模式 stub(回放录制结果) / real(PaddleOCR)
+            ocr_latency_ms: stub 模式下模拟的每次识别耗时(毫秒)
+            frames: 每个场景计时的帧数
+            warmup: 每个场景的预热帧数(不计时)
+            work_dir: 场景运行时的输出根目录
+            log_level: 采集器各模块的日志级别
+            logger: 日志实例,默认只输出到控制台
+
+        Raises:
+            ValueError: OCR模式无效时抛出
+        """
+        if ocr not in OCR_MODES:
+            raise ValueError(f"无效的OCR模式: {ocr},可选 {OCR_MODES}")
+        self.config_path = Path(config_path)
+        self.recording_dir = Path(recording_dir)
+        self.ocr = ocr
+        self.ocr_latency_ms = float(ocr_latency_ms)
+        self.frames = int(frames)
+        self.warmup = int(warmup)
+        self.work_dir = Path(work_dir)
+        self.log_level = log_level
+        self.logger = logger or logging.getLogger(self.MODULE_NAME)
+
+    def _settings(self) -> Dict[str, Any]:
+        """构造参数,用于在子进程中重建基准测试"""
+        return {
+            'config_path': str(self.config_path),
+            'recording_dir': str(self.recording_dir),
+            'ocr': self.ocr,
+            'ocr_latency_ms': self.ocr_latency_ms,
+            'frames': self.frames,
+            'warmup': self.warmup,
+            'work_dir': str(self.work_dir),
+            'log_level': self.log_level
+        }
+
+    def load_config(self, name: str, scenario: Dict[str, Any]) -> ConfigManager:
+        """加载配置并应用场景的覆盖: 输出目录、日志级别、指标开关与场景自定义的基础配置"""
+        config_manager = ConfigManager(self.config_path)
+        overrides = {
+            'base_output_dir': str(self.work_dir / name),
+            'log_level': self.log_level,
+            'console_log_level': self.log_level,
+            'file_log_level': self.log_level,
+            'metrics': {'Enabled': True, 'report_interval': 0, 'dump_file': None},
+            'tracing': {'Enabled': False}
+        }
+        basic_config = ConfigManager._merge_config(
+            ConfigManager._merge_config(copy.deepcopy(config_manager.basic_config), scenario.get('basic_config') or {}),
+            overrides
+        )
+        config_manager.config['basic_config'] = basic_config
+        config_manager.basic_config = basic_config
+        return config_manager
+
+    @staticmethod
+    def scenario_regions(config_manager: ConfigManager, scenario: Dict[str, Any]) -> List[str]:
+        """场景处理的区域: 指定的 regions,或全部区域去掉 exclude"""
+        regions = scenario.get('regions') or list(config_manager.area_config.keys())
+        exclude = set(scenario.get('exclude') or [])
+        return [
+            region_name for region_name in regions
+            if region_name not in exclude and isinstance(config_manager.area_config.get(region_name), dict)
+        ]
+
+    def recording_for(self, scenario: Dict[str, Any]) -> Path:
+        """场景使用的录制目录,子目录不存在时使用整个录制目录"""
+        subdir = scenario.get('recording')
+        if subdir and (self.recording_dir / subdir).is_dir():
+            return self.recording_dir / subdir
+        if subdir:
+            self.logger.warning(f"录制目录中没有 {subdir},使用 {self.recording_dir}")
+        return self.recording_dir
+
+    def build_collector(self, config_manager: ConfigManager, recording_dir: Path):
+        """创建使用回放截图源(与回放OCR)的 DataCollector"""
+        from src.data.collector import DataCollector
+        from src.environment.replay import (load_recording, ReplayCapture, HeadlessWindowManager,
+                                            ReplayTextRecognizer)
+
+        logger_config = config_manager.get_logger_config()
+        basic_config = config_manager.basic_config
+        names, frames, ocr_results = load_recording(recording_dir)
+        capture = ReplayCapture(basic_config, LoggerManager(name='screen_capture', **logger_config).get_logger(),
+                                frames, names)
+        processors = {
+            'window_manager': HeadlessWindowManager(basic_config),
+            'screen_capture': capture
+        }
+        if self.ocr == 'stub':
+            if not ocr_results:
+                self.logger.warning(f"{recording_dir} 中没有录制的OCR结果,回放OCR返回空结果")
+            processors['text_recognizer'] = ReplayTextRecognizer(
+                basic_config, config_manager.area_config,
+                LoggerManager(name='text_recognizer', **logger_config).get_logger(),
+                capture=capture, results=ocr_results, latency_ms=self.ocr_latency_ms
+            )
+        logger = LoggerManager(name=self.MODULE_NAME, **logger_config).get_logger()
+        return DataCollector(logger=logger, config_manager=config_manager, processors=processors)
+
+    def run_scenario(self, name: str, scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """运行一个场景
+
+        Args:
+            name: 场景名称
+            scenario: 场景定义
+
+        Returns:
+            Dict: 场景结果,包含帧数、吞吐量、整帧延迟、各阶段/区域延迟、计数与峰值内存
+        """
+        config_manager = self.load_config(name, scenario)
+        regions = self.scenario_regions(config_manager, scenario)
+        recording_dir = self.recording_for(scenario)
+        collector = self.build_collector(config_manager, recording_dir)
+        try:
+            if not collector.wait_until_ready():
+                raise RuntimeError("OCR模型加载失败")
+
+            for _ in range(self.warmup):
+                collector.process_frame(regions)
+            collector.metrics.reset()
+
+            frame_latencies = []
+            started = time.perf_counter()
+            for _ in range(self.frames):
+                frame_start = time.perf_counter()
+                collector.process_frame(regions)
+                frame_latencies.append((time.perf_counter() - frame_start) * 1000)
+            elapsed = time.perf_counter() - started
+        finally:
+            collector.close()
+
+        snapshot = collector.metrics.snapshot()
+        return {
+            'description': scenario.get('description', ''),
+            'regions': regions,
+            'recording': str(recording_dir),
+            'frames': self.frames,
+            'elapsed_s': round(elapsed, 3),
+            'fps': round(self.frames / elapsed, 3) if elapsed > 0 else 0.0,
+            'frame_ms': latency_stats(frame_latencies),
+            'stages': snapshot['latency'],
+            'counters': snapshot['counters'],
+            'peak_rss_mb': peak_rss_mb()
+        }
+
+    def run(self, scenarios: Dict[str, Dict[str, Any]], isolate: bool = True) -> Dict[str, Any]:
+        """运行全部场景
+
+        Args:
+            scenarios: {场景名: 场景定义}
+            isolate: 是否每个场景在独立的子进程中运行(峰值内存互不影响)
+
+        Returns:
+            Dict: {场景名: 场景结果}
+        """
+        results = {}
+        for name, scenario in scenarios.items():
+            self.logger.info(f"运行场景: {name}")
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                    result = executor.submit(_run_scenario, self._settings(), name, scenario).result()
+            else:
+                result = self.run_scenario(name, scenario)
+            result['isolated'] = isolate
+            results[name] = result
+            self.logger.info(
+                f"[{name}] {result['fps']} 帧/秒, 整帧 p50={result['frame_ms']['p50']}ms "
+                f"p95={result['frame_ms']['p95']}ms, 峰值内存 {result['peak_rss_mb']}MB"
+            )
+        return results
+
+    def save_results(self, results: Dict[str, Any], output_dir: Union[str, Path]) -> Path:
+        """保存测试结果为JSON文件,文件名包含分支与提交
+
+        Args:
+            results: run 返回的结果
+            output_dir: 输出目录
+
+        Returns:
+            Path: 结果文件路径
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        created = datetime.now()
+        revision = git_revision()
+        tag = '_'.join(str(part).replace('/', '-') for part in (revision['branch'], revision['commit']) if part)
+        output_file = output_dir / f"pipeline_benchmark_{tag + '_' if tag else ''}{created.strftime('%Y%m%d_%H%M%S')}.json"
+
+        report = {
+            'schema_version': SCHEMA_VERSION,
+            'created': created.isoformat(timespec='seconds'),
+            'git': revision,
+            'host': {
+                'node': platform.node(),
+                'platform': platform.platform(),
+                'python': platform.python_version(),
+                'cpu_count': multiprocessing.cpu_count()
+            },
+            'settings': self._settings(),
+            'results': results
+        }
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.logger.info(f"已保存基准测试结果: {output_file}")
+        return output_file
+
+
+# 子进程中运行一个场景
+def _run_scenario(settings: Dict[str, Any], name: str, scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """在子进程中重建基准测试并运行一个场景"""
+    return PipelineBenchmark(**settings).run_scenario(name, scenario)
+
+
+# 与基线结果对比
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """对比两次结果的吞吐量、整帧延迟与各阶段延迟
+
+    Args:
+        current: 本次结果文件内容
+        baseline: 基线结果文件内容
+
+    Returns:
+        List[str]: 对比文本,每个场景/阶段一行,变化为相对基线的百分比
+    """
+    def change(new: float, old: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else 'n/a'
+
+    lines = [f"基线: {baseline.get('git', {}).get('branch')}@{baseline.get('git', {}).get('commit')} "
+             f"本次: {current.get('git', {}).get('branch')}@{current.get('git', {}).get('commit')}"]
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            lines.append(f"[{name}] 基线中没有该场景")
+            continue
+        lines.append(
+            f"[{name}] fps {base['fps']} -> {result['fps']} ({change(result['fps'], base['fps'])}), "
+            f"整帧 p95 {base['frame_ms']['p95']} -> {result['frame_ms']['p95']}ms "
+            f"({change(result['frame_ms']['p95'], base['frame_ms']['p95'])}), "
+            f"峰值内存 {base.get('peak_rss_mb')} -> {result.get('peak_rss_mb')}MB"
+        )
+        for stage, regions in result['stages'].items():
+            for region, stats in regions.items():
+                base_stats = base['stages'].get(stage, {}).get(region)
+                if base_stats:
+                    lines.append(f"    {stage:<16} {region:<24} p95 {base_stats['p95']} -> {stats['p95']}ms "
+                                 f"({change(stats['p95'], base_stats['p95'])})")
+    return lines
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='端到端采集流程基准测试(回放录制截图,无需游戏窗口)')
+    parser.add_argument('--config', type=str, default=str(project_root / 'config/env/status_collection_config.yaml'),
+                        help='采集配置文件路径')
+    parser.add_argument('--recording', type=str, required=True,
+                        help='录制目录(frames/ 截图与可选的 ocr_results.json)')
+    parser.add_argument('--scenarios', type=str, default=None,
+                        help='场景YAML文件,为空时使用默认场景')
+    parser.add_argument('--only', type=str, nargs='*', default=None,
+                        help='只运行指定场景')
+    parser.add_argument('--ocr', type=str, default='stub', choices=OCR_MODES,
+                        help='OCR模式: stub(回放录制结果) / real(PaddleOCR)')
+    parser.add_argument('--ocr_latency_ms', type=float, default=0.0,
+                        help='stub 模式下模拟的每次识别耗时(毫秒)')
+    parser.add_argument('--frames', type=int, default=100,
+                        help='每个场景计时的帧数')
+    parser.add_argument('--warmup', type=int, default=5,
+                        help='每个场景的预热帧数')
+    parser.add_argument('--in_process', action='store_true',
+                        help='在当前进程中依次运行场景(峰值内存为累计值)')
+    parser.add_argument('--log_level', type=str, default='WARNING',
+                        help='采集器各模块的日志级别')
+    parser.add_argument('--output', type=str, default='benchmark_results',
+                        help='结果输出目录')
+    parser.add_argument('--compare', type=str, default=None,
+                        help='对比的基线结果文件')
+    return parser.parse_args()
+
+
+def main():
+    """
+    主函数
+
+    功能:
+    1. 加载场景
+    2. 逐场景运行基准测试
+    3. 保存JSON结果,指定基线时输出对比
+    """
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(PipelineBenchmark.MODULE_NAME)
+
+    scenarios = DEFAULT_SCENARIOS
+    if args.scenarios:
+        with open(args.scenarios, 'r', encoding='utf-8') as f:
+            scenarios = (yaml.safe_load(f) or {}).get('scenarios') or {}
+    if args.only:
+        scenarios = {name: scenario for name, scenario in scenarios.items() if name in args.only}
+
+    benchmark = PipelineBenchmark(
+        config_path=args.config,
+        recording_dir=args.recording,
+        ocr=args.ocr,
+        ocr_latency_ms=args.ocr_latency_ms,
+        frames=args.frames,
+        warmup=args.warmup,
+        work_dir=Path(args.output) / 'work',
+        log_level=args.log_level,
+        logger=logger
+    )
+    results = benchmark.run(scenarios, isolate=not args.in_process)
+    output_file = benchmark.save_results(results, args.output)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(output_file, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+        for line in compare_results(current, baseline):
+            logger.info(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+"""
+长时间运行(浸泡)测试模块
+
+采集需要连续运行数小时,无界增长的列表、重复添加的日志处理器、不断累积的状态键、
+按区域创建的OCR实例等问题在短时间的基准测试中看不出来。该模块:
+1. 用录制截图回放(与 pipeline_benchmark 相同的回放采集器)连续处理指定时长
+2. 按固定间隔采样: 常驻内存(RSS)、文件描述符/句柄数、线程数、
+   本项目各类(及 PaddleOCR、日志处理器等)的对象数、采集器各模块上列表/字典等容器的长度、
+   以及可选的 tracemalloc 已跟踪内存
+3. 预热后对每个指标的采样序列判断是否仍在增长: 总增长超过阈值,且后半段的增长速度没有明显放缓
+   (缓存填满后趋于平稳的指标不会被标记)
+4. 结束时输出 tracemalloc 相对预热结束时增长最多的代码行,报告写入JSON,发现持续增长时退出码为1
+
+用法:
+    python src/benchmark/soak_test.py --recording <录制目录> --duration 3600
+    python src/benchmark/soak_test.py --recording <录制目录> --duration 600 --sample_interval 5 --tracemalloc
+
+主要类与函数:
+- SoakTest: 长时间运行测试主类
+- ResourceSampler: 资源采样
+- detect_growth: 判断采样序列是否持续增长
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import tracemalloc
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+# 获取项目根目录并添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.benchmark.ocr_benchmark import latency_stats
+from src.benchmark.pipeline_benchmark import OCR_MODES, PipelineBenchmark, git_revision
+
+# 报告文件格式版本
+SCHEMA_VERSION = 1
+
+# 统计对象数的模块前缀(本项目)
+TRACKED_MODULE_PREFIX = 'src.'
+
+# 另外统计对象数的第三方类型名
+TRACKED_TYPE_NAMES = ('PaddleOCR', 'FileHandler', 'StreamHandler', 'RotatingFileHandler', 'Thread', 'Logger')
+
+# 统计长度的容器类型
+CONTAINER_TYPES = (list, dict, set, deque)
+
+# 各类指标判定为持续增长的最小总增长量
+DEFAULT_THRESHOLDS = {
+    'rss_mb': 20.0,
+    'traced_mb': 10.0,
+    'fds': 5,
+    'threads': 2,
+    'objects': 100,
+    'containers': 100
+}
+
+# 后半段增长速度不低于整体速度的该比例时视为仍在增长
+TAIL_RATIO = 0.5
+
+# 报告中输出的 tracemalloc 增长代码行数
+DEFAULT_TOP = 15
+
+
+def current_rss_mb() -> Optional[float]:
+    """本进程当前的常驻内存(MB),优先使用 psutil,Linux 下读取 /proc,都不可用时为None"""
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / (1024 * 1024), 1)
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def open_fds() -> Optional[int]:
+    """本进程打开的文件描述符数(Windows 下为句柄数),不支持时为None"""
+    try:
+        import psutil
+        process = psutil.Process()
+        return process.num_handles() if sys.platform == 'win32' else process.num_fds()
+    except ImportError:
+        pass
+    try:
+        return len(os.listdir('/proc/self/fd'))
+    except OSError:
+        return None
+
+
+def detect_growth(times: Sequence[float], values: Sequence[float], min_growth: float) -> Optional[Dict[str, Any]]:
+    """判断采样序列是否持续增长
+
+    总增长(末值减首值)不低于 min_growth,且后半段的线性增长速度不低于整体速度的 TAIL_RATIO 时判定为持续增长;
+    增长后趋于平稳(缓存、对象池填满)的序列后半段速度接近0,不会被标记
+
+    Args:
+        times: 采样时间(秒)
+        values: 采样值
+        min_growth: 最小总增长量
+
+    Returns:
+        Optional[Dict]: 持续增长时返回 {'start', 'end', 'growth', 'per_hour'},否则为None
+    """
+    if len(values) < 4 or any(value is None for value in values):
+        return None
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    growth = values[-1] - values[0]
+    if growth < min_growth or times[-1] <= times[0]:
+        return None
+    slope = np.polyfit(times, values, 1)[0]
+    half = len(values) // 2
+    tail_slope = np.polyfit(times[half:], values[half:], 1)[0]
+    if slope <= 0 or tail_slope < slope * TAIL_RATIO:
+        return None
+    return {
+        'start': round(float(values[0]), 3),
+        'end': round(float(values[-1]), 3),
+        'growth': round(float(growth), 3),
+        'per_hour': round(float(tail_slope * 3600), 3)
+    }
+
+
+class ResourceSampler:
+    """
+    资源采样
+
+    属性:
+        collector: 被测的 DataCollector
+        use_tracemalloc (bool): 是否记录 tracemalloc 已跟踪内存
+    """
+
+    def __init__(self, collector, use_tracemalloc: bool = False):
+        """初始化资源采样
+
+        Args:
+            collector: 被测的 DataCollector
+            use_tracemalloc: 是否记录 tracemalloc 已跟踪内存(需已调用 tracemalloc.start)
+        """
+        self.collector = collector
+        self.use_tracemalloc = use_tracemalloc
+
+    @staticmethod
+    def object_counts() -> Dict[str, int]:
+        """本项目各类与 TRACKED_TYPE_NAMES 中第三方类型的存活对象数(只统计垃圾回收器跟踪的对象)"""
+        counts = Counter()
+        for obj in gc.get_objects():
+            cls = type(obj)
+            module = cls.__module__ if isinstance(cls.__module__, str) else ''
+            if module.startswith(TRACKED_MODULE_PREFIX) or cls.__name__ in TRACKED_TYPE_NAMES:
+                counts[f"{module}.{cls.__qualname__}"] += 1
+        return dict(counts)
+
+    def container_sizes(self) -> Dict[str, int]:
+        """采集器及其各模块实例上容器属性的长度,以及日志处理器总数"""
+        sizes = {}
+        owners = [('collector', self.collector)]
+        for name, value in vars(self.collector).items():
+            if type(value).__module__.startswith(TRACKED_MODULE_PREFIX) and hasattr(value, '__dict__'):
+                owners.append((name, value))
+        for owner_name, owner in owners:
+            for name, value in list(vars(owner).items()):
+                if isinstance(value, CONTAINER_TYPES):
+                    sizes[f"{owner_name}.{name}"] = len(value)
+
+        from src.utils.logger_manager import LoggerManager
+        loggers = [logging.getLogger()] + [
+            logger for logger in list(logging.root.manager.loggerDict.values()) if isinstance(logger, logging.Logger)
+        ]
+        sizes['logging.handlers'] = sum(len(logger.handlers) for logger in loggers)
+        sizes['LoggerManager._loggers'] = len(LoggerManager._loggers)
+        return sizes
+
+    def sample(self) -> Dict[str, Any]:
+        """采样一次"""
+        sample = {
+            'rss_mb': current_rss_mb(),
+            'fds': open_fds(),
+            'threads': threading.active_count(),
+            'objects': self.object_counts(),
+            'containers': self.container_sizes()
+        }
+        if self.use_tracemalloc:
+            sample['traced_mb'] = round(tracemalloc.get_traced_memory()[0] / (1024 * 1024), 3)
+        return sample
+
+
+class SoakTest:
+    """
+    长时间运行测试主类
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        benchmark (PipelineBenchmark): 用于加载配置与创建回放采集器
+        duration (float): 测试时长(秒)
+        sample_interval (float): 采样间隔(秒)
+        warmup (float): 预热时长(秒),预热期间的采样不参与增长判定
+        thresholds (Dict[str, float]): 各类指标的最小总增长量
+    """
+
+    MODULE_NAME = 'SoakTest'
+
+    def __init__(self, benchmark: PipelineBenchmark, duration: float = 3600, sample_interval: float = 10,
+                 warmup: float = 60, use_tracemalloc: bool = False, thresholds: Optional[Dict[str, float]] = None,
+                 logger: Optional[logging.Logger] = None):
+        """初始化长时间运行测试
+
+        Args:
+            benchmark: 用于加载配置与创建回放采集器的 PipelineBenchmark
+            duration: 测试时长(秒,包含预热)
+            sample_interval: 采样间隔(秒)
+            warmup: 预热时长(秒)
+            use_tracemalloc: 是否启用 tracemalloc(处理明显变慢)
+            thresholds: 各类指标的最小总增长量,默认 DEFAULT_THRESHOLDS
+            logger: 日志实例
+        """
+        self.benchmark = benchmark
+        self.duration = float(duration)
+        self.sample_interval = float(sample_interval)
+        self.warmup = float(warmup)
+        self.use_tracemalloc = use_tracemalloc
+        self.thresholds = dict(DEFAULT_THRESHOLDS)
+        self.thresholds.update(thresholds or {})
+        self.logger = logger or logging.getLogger(self.MODULE_NAME)
+
+    def run(self, regions: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """运行测试
+
+        Args:
+            regions: 处理的区域,默认全部区域
+
+        Returns:
+            Dict: 报告,包含采样序列、持续增长的指标与 tracemalloc 增长最多的代码行
+        """
+        scenario = {'regions': list(regions)} if regions else {}
+        config_manager = self.benchmark.load_config('soak', scenario)
+        regions = self.benchmark.scenario_regions(config_manager, scenario)
+        if self.use_tracemalloc:
+            tracemalloc.start()
+        collector = self.benchmark.build_collector(config_manager, self.benchmark.recording_dir)
+        if not collector.wait_until_ready():
+            raise RuntimeError("OCR模型加载失败")
+        sampler = ResourceSampler(collector, self.use_tracemalloc)
+
+        samples: List[Dict[str, Any]] = []
+        baseline_snapshot = None
+        frames = 0
+        window_latencies: List[float] = []
+        started = time.perf_counter()
+        next_sample = started
+        try:
+            while True:
+                now = time.perf_counter()
+                if now >= next_sample:
+                    sample = sampler.sample()
+                    sample['elapsed_s'] = round(now - started, 3)
+                    sample['frames'] = frames
+                    sample['frame_ms'] = latency_stats(window_latencies) if window_latencies else None
+                    samples.append(sample)
+                    window_latencies = []
+                    self.logger.info(
+                        f"[{sample['elapsed_s']:.0f}s] {frames} 帧, RSS {sample['rss_mb']}MB, "
+                        f"文件描述符 {sample['fds']}, 线程 {sample['threads']}"
+                        + (f", tracemalloc {sample['traced_mb']}MB" if self.use_tracemalloc else '')
+                    )
+                    if self.use_tracemalloc and baseline_snapshot is None and now - started >= self.warmup:
+                        baseline_snapshot = tracemalloc.take_snapshot()
+                    next_sample += self.sample_interval
+                    if now - started >= self.duration:
+                        break
+                frame_start = time.perf_counter()
+                collector.process_frame(regions)
+                window_latencies.append((time.perf_counter() - frame_start) * 1000)
+                frames += 1
+
+            top_growth = []
+            if self.use_tracemalloc and baseline_snapshot is not None:
+                top_growth = self._top_growth(tracemalloc.take_snapshot(), baseline_snapshot)
+        finally:
+            if self.use_tracemalloc:
+                tracemalloc.stop()
+            collector.close()
+
+        return {
+            'regions': regions,
+            'duration_s': self.duration,
+            'warmup_s': self.warmup,
+            'sample_interval_s': self.sample_interval,
+            'frames': frames,
+            'thresholds': self.thresholds,
+            'growth': self.find_growth(samples),
+            'tracemalloc_top': top_growth,
+            'samples': samples
+        }
+
+    def find_growth(self, samples: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """对预热后的采样序列判断各指标是否持续增长
+
+        Returns:
+            Dict: {指标名: detect_growth 的结果},只包含持续增长的指标
+        """
+        samples = [sample for sample in samples if sample['elapsed_s'] >= self.warmup]
+        times = [sample['elapsed_s'] for sample in samples]
+        series: Dict[str, tuple] = {}
+        for key in ('rss_mb', 'traced_mb', 'fds', 'threads'):
+            if samples and key in samples[0]:
+                series[key] = ([sample[key] for sample in samples], self.thresholds[key])
+        for group in ('objects', 'containers'):
+            names = set().union(*(sample[group] for sample in samples)) if samples else set()
+            for name in names:
+                series[f"{group}:{name}"] = ([sample[group].get(name, 0) for sample in samples], self.thresholds[group])
+
+        growth = {}
+        for name, (values, min_growth) in sorted(series.items()):
+            result = detect_growth(times, values, min_growth)
+            if result:
+                growth[name] = result
+        return growth
+
+    @staticmethod
+    def _top_growth(snapshot, baseline, top: int = DEFAULT_TOP) -> List[Dict[str, Any]]:
+        """tracemalloc 相对预热结束时增长最多的代码行"""
+        # 排除 tracemalloc 与本模块自身(采样记录)的分配
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        stats = snapshot.filter_traces(filters).compare_to(baseline.filter_traces(filters), 'lineno')
+        return [
+            {
+                'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                'size_diff_kb': round(stat.size_diff / 1024, 1),
+                'count_diff': stat.count_diff,
+                'size_kb': round(stat.size / 1024, 1)
+            }
+            for stat in stats[:top] if stat.size_diff > 0
+        ]
+
+    def save_report(self, report: Dict[str, Any], output_dir: Union[str, Path]) -> Path:
+        """保存报告为JSON文件
+
+        Args:
+            report: run 返回的报告
+            output_dir: 输出目录
+
+        Returns:
+            Path: 报告文件路径
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        created = datetime.now()
+        output_file = output_dir / f"soak_{created.strftime('%Y%m%d_%H%M%S')}.json"
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'schema_version': SCHEMA_VERSION,
+                'created': created.isoformat(timespec='seconds'),
+                'git': git_revision(),
+                'settings': self.benchmark._settings(),
+                **report
+            }, f, ensure_ascii=False, indent=2)
+        self.logger.info(f"已保存长时间运行测试报告: {output_file}")
+        return output_file
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='长时间运行(浸泡)测试: 回放录制截图连续采集,检测内存与资源的持续增长')
+    parser.add_argument('--config', type=str, default=str(project_root / 'config/env/status_collection_config.yaml'),
+                        help='采集配置文件路径')
+    parser.add_argument('--recording', type=str, required=True,
+                        help='录制目录(frames/ 截图与可选的 ocr_results.json),循环回放')
+    parser.add_argument('--regions', type=str, nargs='*', default=None,
+                        help='只处理指定区域')
+    parser.add_argument('--ocr', type=str, default='stub', choices=OCR_MODES,
+                        help='OCR模式: stub(回放录制结果) / real(PaddleOCR)')
+    parser.add_argument('--duration', type=float, default=3600,
+                        help='测试时长(秒,包含预热)')
+    parser.add_argument('--warmup', type=float, default=60,
+                        help='预热时长(秒),预热期间的采样不参与增长判定')
+    parser.add_argument('--sample_interval', type=float, default=10,
+                        help='采样间隔(秒)')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='启用 tracemalloc,报告增长最多的代码行(处理明显变慢)')
+    parser.add_argument('--threshold', type=str, nargs='*', default=[],
+                        help=f"最小总增长量 指标=数值,指标可选 {', '.join(DEFAULT_THRESHOLDS)}")
+    parser.add_argument('--log_level', type=str, default='WARNING',
+                        help='采集器各模块的日志级别')
+    parser.add_argument('--output', type=str, default='benchmark_results',
+                        help='报告输出目录')
+    return parser.parse_args()
+
+
+def main():
+    """
+    主函数
+
+    功能:
+    1. 创建回放采集器并连续处理指定时长,按间隔采样资源
+    2. 输出持续增长的指标与 tracemalloc 增长最多的代码行
+    3. 保存JSON报告,发现持续增长时退出码为1
+    """
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(SoakTest.MODULE_NAME)
+
+    thresholds = {}
+    for item in args.threshold:
+        key, _, value = item.partition('=')
+        if key not in DEFAULT_THRESHOLDS or not value:
+            raise ValueError(f"阈值格式应为 指标=数值,指标可选 {list(DEFAULT_THRESHOLDS)}: {item}")
+        thresholds[key] = float(value)
+
+    benchmark = PipelineBenchmark(
+        config_path=args.config,
+        recording_dir=args.recording,
+        ocr=args.ocr,
+        work_dir=Path(args.output) / 'work',
+        log_level=args.log_level,
+        logger=logger
+    )
+    soak = SoakTest(benchmark, duration=args.duration, sample_interval=args.sample_interval, warmup=args.warmup,
+                    use_tracemalloc=args.tracemalloc, thresholds=thresholds, logger=logger)
+    report = soak.run(args.regions)
+    soak.save_report(report, args.output)
+
+    for line in report['tracemalloc_top']:
+        logger.info(f"    {line['location']:<60} +{line['size_diff_kb']}KB ({line['count_diff']:+d} 个)")
+    if report['growth']:
+        for name, result in report['growth'].items():
+            logger.warning(f"持续增长: {name:<48} {result['start']} -> {result['end']} "
+                           f"(+{result['growth']}, 约 {result['per_hour']}/小时)")
+        sys.exit(1)
+    logger.info(f"共处理 {report['frames']} 帧,未发现持续增长的指标")
+
+
+if __name__ == "__main__":
+    main()
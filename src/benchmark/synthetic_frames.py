@@ -0,0 +1,730 @@
+# -*- coding: utf-8 -*-
+"""
+合成HUD画面生成模块
+
+按 status_collection_config.yaml 中各区域的坐标渲染 1040x807 的合成整窗口截图,
+用于无法共享真实截图、或需要按需构造边界情况(空血条、满屏怪物名、聊天刷屏)的吞吐与准确率测试:
+1. 量条区域(活力/内功/防御/元气/技能经验/被攻击/目标血量)按指定比例填充
+2. 文本区域(标题/聊天/激活技能/坐标/复活/吃药/掉血/目标名字)使用可配置的字体渲染
+3. game_area 中按游戏的名字行位置绘制彩色名字标签,同时出现在近身寻怪名区域中
+4. 每帧同时输出:
+   - 与渲染内容一致的OCR结果(完美OCR),可由 ReplayTextRecognizer 回放
+   - 真值: 渲染参数(state)与各区域按 DataProcessor 输出格式给出的期望结果(expected)
+
+输出目录即回放录制目录(见 src/environment/replay.py),可直接用于 pipeline_benchmark 与 handler_benchmark:
+    output_dir/
+    ├── frames/000000.png
+    ├── ocr_results.json       # {帧名称: {区域名: OCRResult.to_dict()}}
+    └── ground_truth.json      # {'frames': {帧名称: {'preset', 'state', 'expected'}}}
+
+字体: 指定 --font(TrueType/TrueColor字体文件,需要 Pillow)时按该字体渲染;
+未指定时依次尝试常见中文字体,都不可用时回退到 OpenCV Hershey 字体,中文字符以方框字形代替
+(像素分布与文本框尺寸接近,适用于吞吐测试,不适用于真实OCR的准确率测试)。
+
+期望结果表示正确的采集流程应输出的值(如空量条为0),check_accuracy 在期望结果上
+运行真实的分割/预处理/数据处理,报告各区域的准确率。
+
+用法:
+    python src/benchmark/synthetic_frames.py --output data/synthetic --count 200 --preset random crowded chat_flood
+    python src/benchmark/synthetic_frames.py --output data/synthetic --verify
+
+主要类与函数:
+- TextRenderer: 文本渲染(Pillow字体或Hershey回退)
+- SyntheticFrameGenerator: 合成画面生成器
+- check_accuracy: 在合成画面上检查各区域的处理结果
+"""
+
+import sys
+import json
+import zlib
+import argparse
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+# 获取项目根目录并添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.config_manager import ConfigManager
+from src.utils.output_diff import diff_outputs
+from src.environment.ocr_result import OCRResult
+
+# 真值文件格式版本
+SCHEMA_VERSION = 1
+
+# 常见的中文字体(未指定 --font 时依次尝试)
+DEFAULT_FONTS = (
+    'C:/Windows/Fonts/simsun.ttc',
+    'C:/Windows/Fonts/msyh.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/System/Library/Fonts/PingFang.ttc'
+)
+
+# 量条区域: 区域名 -> (输出字段, 填充颜色BGR)
+# 颜色需通过对应预处理的阈值(对比度x2后灰度>100,内功/活力>76);被攻击状态为预处理匹配的固定颜色
+GAUGE_REGIONS = {
+    'char_vitality': ('hp', (40, 40, 220)),
+    'char_neigong': ('mp', (220, 90, 40)),
+    'char_head': ('head', (170, 170, 170)),
+    'char_hand': ('hand', (170, 170, 170)),
+    'char_foot': ('foot', (170, 170, 170)),
+    'char_qigong': ('char_qigong', (60, 200, 230)),
+    'skill_exp_min': ('skill_exp_min', (200, 200, 80)),
+    'skill_exp_max': ('skill_exp_max', (200, 200, 80)),
+    'char_be_attack': ('screen_hp', (40, 40, 176))
+}
+GAUGE_EMPTY_COLOR = (25, 25, 25)
+TARGET_HP_COLOR = (40, 40, 200)
+
+# 文本颜色(BGR),与对应预处理的颜色筛选一致
+TEXT_COLOR = (255, 255, 255)
+REVIVAL_COLOR = (0, 200, 255)
+BLOOD_LOSS_COLOR = (0, 0, 255)
+CHAT_COLORS = ((255, 255, 255), (120, 220, 255), (140, 255, 140), (255, 200, 120))
+# 名字标签颜色: 预处理反色后白色/青色/绿色文字变为黑色
+NAME_COLORS = {'player': (255, 255, 255), 'monster': (255, 255, 0), 'npc': (0, 255, 0)}
+
+# 背景
+HUD_BACKGROUND = 20
+GAME_BACKGROUND = (40, 110)
+
+# 文本行距(像素),需大于 assemble_line_texts 的同行阈值
+LINE_SPACING = 17
+
+# game_area 名字行: 预处理从裁切图顶部起每36行遮罩20行,名字位于剩余的16行内;顶部127行被遮罩
+NAME_ROW_PERIOD = 36
+NAME_ROW_OFFSET = 22
+NAME_ROW_TOP = 127
+# 近身寻怪名区域中心遮罩(角色自身名字)的半宽/半高
+NEARBY_CENTER_MASK = (21, 8)
+# 名字标签可以出现的区域(其余区域视为HUD,名字不与之重叠)
+NAME_REGIONS = ('game_area', 'char_area', 'nearby_monster_name_1', 'nearby_monster_name_2', 'nearby_monster_img_1')
+NEARBY_REGIONS = ('nearby_monster_name_1', 'nearby_monster_name_2')
+
+# 预处理放大的区域: OCR结果坐标位于放大后的图像中(默认值与 ImagePreprocessor 一致)
+OCR_SCALE_DEFAULTS = {'target_name': 4, 'char_blood_loss': 4.0}
+
+# 文本素材
+MONSTER_NAMES = ['野狼', '骷髅', '山贼', '黑熊', '狐狸', '毒蛇', '老虎', '僵尸', '鬼火', '牛魔王']
+PLAYER_NAMES = ['张三', '李四', '王五', '赵六', '孙七', '周八']
+NPC_NAMES = ['药店老板', '铁匠', '钱庄老板', '驿站']
+FOOD_NAMES = ['生药', '熟药', '人参', '馒头']
+SKILL_NAMES = ['无名剑法', '无名拳法', '无名刀法', '回避', '太极拳', '风灵步']
+CHAT_CHANNELS = ['[世界]', '[门派]', '[队伍]', '[系统]']
+CHAT_PHRASES = ['有人组队吗', '收到', '获得经验 120', '出售生药 50两', '集合了', '谁有人参', '北门见',
+                '招收门徒', '打怪去', '刷新了']
+
+# 预设: 在随机状态上覆盖的参数
+PRESETS = {
+    'random': {},
+    'empty_gauges': {'gauge_fill': 0.0},
+    'full_gauges': {'gauge_fill': 1.0},
+    'crowded': {'names': 30},
+    'chat_flood': {'chat_lines': 'max', 'chat_long': True},
+    'dead': {'revival': True},
+    'no_target': {'target': False}
+}
+
+# 期望结果比较的数值容差: 量条按真实比例给出期望值,容差覆盖1像素的取整误差
+# (量条宽56~77像素,1像素不超过2%;被攻击血条只有32像素宽,1像素约3%;大经验值以十分之一格计)
+ACCURACY_TOLERANCES = {
+    **{field: 2 for field, _ in GAUGE_REGIONS.values()},
+    'screen_hp': 4,
+    'skill_exp_max': 1,
+    'target_hp': 1,
+    'center_x': 3,
+    'center_y': 3,
+    'rate': 0.1
+}
+
+
+def _is_cjk(char: str) -> bool:
+    return '\u2e80' <= char <= '\u9fff' or '\u3000' <= char <= '\u303f' or '\uff00' <= char <= '\uffef'
+
+
+class TextRenderer:
+    """
+    文本渲染
+
+    有 Pillow 与中文字体时使用该字体渲染(关闭抗锯齿,像素颜色与指定颜色一致);
+    否则使用 OpenCV Hershey 字体,中文字符以方框字形代替
+
+    属性:
+        font_size (int): 字号(像素)
+        font_path (Optional[str]): 使用的字体文件,Hershey回退时为None
+    """
+
+    def __init__(self, font_path: Optional[str] = None, font_size: int = 12):
+        """初始化文本渲染
+
+        Args:
+            font_path: 字体文件,为空时依次尝试 DEFAULT_FONTS
+            font_size: 字号(像素)
+
+        Raises:
+            ImportError: 指定了字体但未安装 Pillow 时抛出
+            FileNotFoundError: 指定的字体文件不存在时抛出
+        """
+        self.font_size = font_size
+        self.font_path = None
+        self._font = None
+        if font_path and not Path(font_path).exists():
+            raise FileNotFoundError(f"字体文件不存在: {font_path}")
+        candidates = [font_path] if font_path else [path for path in DEFAULT_FONTS if Path(path).exists()]
+        if not candidates:
+            return
+        try:
+            from PIL import ImageFont
+        except ImportError:
+            if font_path:
+                raise
+            return
+        self.font_path = candidates[0]
+        self._font = ImageFont.truetype(self.font_path, font_size)
+
+    def measure(self, text: str) -> Tuple[int, int]:
+        """文本渲染后的宽高"""
+        if self._font is not None:
+            return int(self._font.getlength(text)), self.font_size
+        return sum(self._char_width(char) for char in text), self.font_size
+
+    def _char_width(self, char: str) -> int:
+        if _is_cjk(char) or ord(char) > 0x7f:
+            return self.font_size
+        return cv2.getTextSize(char, cv2.FONT_HERSHEY_PLAIN, self.font_size / 14, 1)[0][0] + 1
+
+    def render(self, frame: np.ndarray, items: Sequence[Tuple[str, Tuple[int, int], Tuple[int, int, int]]]) -> np.ndarray:
+        """在画面上绘制全部文本
+
+        Args:
+            frame: BGR画面(Hershey回退时原地绘制)
+            items: [(文本, 左上角(x, y), 颜色BGR), ...]
+
+        Returns:
+            np.ndarray: 绘制后的画面
+        """
+        if self._font is not None:
+            from PIL import Image, ImageDraw
+            # 颜色按BGR顺序直接写入通道,无需转换颜色空间
+            canvas = Image.fromarray(frame)
+            draw = ImageDraw.Draw(canvas)
+            draw.fontmode = '1'
+            for text, (x, y), color in items:
+                draw.text((x, y), text, font=self._font, fill=tuple(color))
+            return np.array(canvas)
+
+        size = self.font_size
+        for text, (x, y), color in items:
+            for char in text:
+                width = self._char_width(char)
+                if width == size:
+                    cv2.rectangle(frame, (x + 1, y + 1), (x + size - 2, y + size - 2), color, 1, cv2.LINE_8)
+                    cv2.line(frame, (x + 3, y + size // 2), (x + size - 4, y + size // 2), color, 1, cv2.LINE_8)
+                else:
+                    cv2.putText(frame, char, (x, y + size - 2), cv2.FONT_HERSHEY_PLAIN, size / 14, color, 1, cv2.LINE_8)
+                x += width
+        return frame
+
+
+class SyntheticFrameGenerator:
+    """
+    合成画面生成器
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        area_config (dict): 区域配置
+        width / height (int): 画面尺寸
+        renderer (TextRenderer): 文本渲染
+    """
+
+    MODULE_NAME = 'SyntheticFrameGenerator'
+
+    def __init__(self, basic_config: dict, area_config: dict, logger: logging.Logger,
+                 renderer: Optional[TextRenderer] = None, seed: int = 0):
+        """初始化合成画面生成器
+
+        Args:
+            basic_config: 基础配置字典(画面尺寸取自 screen_capture.width/height)
+            area_config: 区域配置字典
+            logger: 日志实例
+            renderer: 文本渲染,默认使用12像素字号与自动查找的字体
+            seed: 随机种子,每帧使用 (seed, 帧序号) 派生的随机数生成器
+        """
+        self.logger = logger
+        self.logger.info("<<<<<<<<<<<<<<<<<<合成画面生成器初始化开始...>>>>>>>>>>>>>>>>>>")
+        self.basic_config = basic_config
+        self.area_config = area_config
+        capture_config = basic_config.get('screen_capture', {})
+        self.width = capture_config.get('width', 1040)
+        self.height = capture_config.get('height', 807)
+        self.renderer = renderer or TextRenderer()
+        self.seed = seed
+        self.regions = {
+            name: list(config['screen_split']['coordinates'])
+            for name, config in area_config.items()
+            if isinstance(config, dict) and (config.get('screen_split') or {}).get('coordinates')
+        }
+        self.target_template = self._load_target_template()
+        self.logger.info(f"画面尺寸: {self.width}x{self.height}, 区域数: {len(self.regions)}")
+        self.logger.info(f"字体: {self.renderer.font_path or 'Hershey(中文以方框代替)'}, 字号: {self.renderer.font_size}")
+        self.logger.info("=========================合成画面生成器初始化完成=========================")
+
+    def _load_target_template(self) -> Optional[np.ndarray]:
+        """读取目标面板模板(与 DataProcessor 使用同一文件)"""
+        template_path = Path(
+            self.area_config.get('target_panel', {}).get('data_processor', {}).get('template_path')
+            or 'data/image/target_panel.png'
+        )
+        if not template_path.is_absolute():
+            template_path = project_root / template_path
+        if not template_path.exists():
+            return None
+        data = np.fromfile(str(template_path), dtype=np.uint8)
+        return cv2.imdecode(data, cv2.IMREAD_COLOR) if data.size else None
+
+    def _ocr_scale(self, region_name: str) -> float:
+        default = OCR_SCALE_DEFAULTS.get(region_name, 1)
+        return self.area_config.get(region_name, {}).get('image_preprocess', {}).get('scale_factor', default)
+
+    # 状态
+    def sample_state(self, rng: np.random.Generator, preset: str = 'random', index: int = 0) -> Dict[str, Any]:
+        """随机生成一帧的渲染参数,再按预设覆盖
+
+        Args:
+            rng: 随机数生成器
+            preset: 预设名称,见 PRESETS
+            index: 帧序号(决定标题时间)
+
+        Returns:
+            Dict: 渲染参数(可JSON序列化)
+        """
+        overrides = PRESETS[preset]
+        gauge_fill = overrides.get('gauge_fill')
+        gauges = {}
+        for region_name in GAUGE_REGIONS:
+            if gauge_fill is not None:
+                gauges[region_name] = gauge_fill
+            elif region_name.startswith('skill_exp'):
+                # 经验条满时会归零,随机值不取满
+                gauges[region_name] = round(float(rng.uniform(0, 0.99)), 3)
+            else:
+                gauges[region_name] = round(float(rng.choice([rng.uniform(0, 1), 1.0], p=[0.8, 0.2])), 3)
+
+        has_target = overrides.get('target', bool(rng.random() < 0.7))
+        target = {
+            'name': str(rng.choice(MONSTER_NAMES)),
+            'hp': gauge_fill if gauge_fill is not None else round(float(rng.uniform(0.05, 1)), 3)
+        } if has_target else None
+
+        chat_lines = overrides.get('chat_lines', int(rng.integers(0, 5)))
+        if chat_lines == 'max':
+            chat_lines = self._max_lines('chat_messages')
+        chat = []
+        for _ in range(chat_lines):
+            phrases = rng.choice(CHAT_PHRASES, size=6 if overrides.get('chat_long') else 1).tolist()
+            chat.append(f"{rng.choice(CHAT_CHANNELS)}{rng.choice(PLAYER_NAMES)}: {' '.join(phrases)}")
+
+        skills = [f"{name} {int(rng.integers(1, 100))}"
+                  for name in rng.choice(SKILL_NAMES, size=int(rng.integers(0, 5)), replace=False).tolist()]
+
+        food = rng.choice(['none', 'use', 'cannot'], p=[0.6, 0.3, 0.1])
+        start = datetime(2025, 1, 15, 12, 0, 0)
+        return {
+            'gauges': gauges,
+            'target': target,
+            'title': (start + timedelta(milliseconds=100 * index)).strftime('%Y/%m/%d %H:%M:%S') + f"({int(rng.integers(10, 999))}ms)",
+            'coordinates': [int(rng.integers(0, 1000)), int(rng.integers(0, 1000))],
+            'chat': chat,
+            'skills': skills,
+            'revival': int(rng.integers(0, 31)) if overrides.get('revival', rng.random() < 0.05) else None,
+            'eat_food': str(rng.choice(FOOD_NAMES)) if food == 'use' else ('' if food == 'cannot' else None),
+            'blood_loss': int(rng.integers(1, 999)) if rng.random() < 0.3 else None,
+            'names': self._sample_names(rng, overrides.get('names', int(rng.integers(0, 10))))
+        }
+
+    def _max_lines(self, region_name: str) -> int:
+        x1, y1, x2, y2 = self.regions[region_name]
+        return max(1, (y2 - y1 - self.renderer.font_size) // LINE_SPACING + 1)
+
+    def _sample_names(self, rng: np.random.Generator, count: int) -> List[Dict[str, Any]]:
+        """在 game_area 的名字行上放置不重叠的名字标签(整窗口坐标,左上角)"""
+        if 'game_area' not in self.regions or count <= 0:
+            return []
+        gx1, gy1, gx2, gy2 = self.regions['game_area']
+        rows = [gy1 + top for top in range(NAME_ROW_OFFSET, gy2 - gy1 - self.renderer.font_size, NAME_ROW_PERIOD)
+                if top >= NAME_ROW_TOP]
+        # 不可放置的矩形: HUD区域与近身寻怪名区域的中心遮罩
+        blocked = [coords for name, coords in self.regions.items() if name not in NAME_REGIONS]
+        half_w, half_h = NEARBY_CENTER_MASK
+        for name in NEARBY_REGIONS:
+            if name in self.regions:
+                x1, y1, x2, y2 = self.regions[name]
+                cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
+                blocked.append([cx - half_w, cy - half_h, cx + half_w, cy + half_h])
+
+        names, placed = [], []
+        kinds = list(NAME_COLORS)
+        pools = {'player': PLAYER_NAMES, 'monster': MONSTER_NAMES, 'npc': NPC_NAMES}
+        for _ in range(count * 20):
+            if len(names) >= count or not rows:
+                break
+            kind = kinds[int(rng.choice(len(kinds), p=[0.2, 0.7, 0.1]))]
+            text = str(rng.choice(pools[kind]))
+            width, height = self.renderer.measure(text)
+            x = int(rng.integers(gx1 + 2, gx2 - width - 2))
+            y = int(rng.choice(rows))
+            box = [x - 4, y, x + width + 4, y + height]
+            if any(box[0] < b[2] and b[0] < box[2] and box[1] < b[3] and b[1] < box[3] for b in blocked + placed):
+                continue
+            placed.append(box)
+            names.append({'text': text, 'kind': kind, 'x': x, 'y': y})
+        return names
+
+    # 渲染
+    def render(self, state: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, OCRResult], Dict[str, Dict[str, Any]]]:
+        """按渲染参数生成一帧
+
+        Args:
+            state: sample_state 返回的渲染参数
+
+        Returns:
+            Tuple: (画面, {区域名: 完美OCR结果}, {区域名: 期望的处理结果})
+        """
+        # 背景纹理由标题派生,同一渲染参数总是得到同一画面
+        rng = np.random.default_rng(zlib.crc32(state['title'].encode('utf-8')))
+        frame = np.full((self.height, self.width, 3), HUD_BACKGROUND, dtype=np.uint8)
+        if 'game_area' in self.regions:
+            x1, y1, x2, y2 = self.regions['game_area']
+            low, high = GAME_BACKGROUND
+            frame[y1:y2, x1:x2] = rng.integers(low, high, (y2 - y1, x2 - x1, 1), dtype=np.uint8)
+
+        texts: List[Tuple[str, Tuple[int, int], Tuple[int, int, int]]] = []
+        ocr_boxes: Dict[str, List[Tuple[str, List[int]]]] = {}
+        expected: Dict[str, Dict[str, Any]] = {}
+
+        def put_text(region_name: str, text: str, origin: Tuple[int, int], color: Tuple[int, int, int]) -> Optional[List[int]]:
+            """绘制文本(超出区域时截断),记录区域内的OCR框,返回整窗口坐标的文本框"""
+            x1, y1, x2, y2 = self.regions[region_name]
+            while text and origin[0] + self.renderer.measure(text)[0] > x2:
+                text = text[:-1]
+            text = text.rstrip()
+            if not text.strip():
+                return None
+            width, height = self.renderer.measure(text)
+            box = [origin[0], origin[1], origin[0] + width, origin[1] + height]
+            texts.append((text, origin, color))
+            # 区域内的文本框(超出区域的部分在分割时被裁掉)
+            ocr_boxes.setdefault(region_name, []).append((text, [
+                max(box[0], x1) - x1, max(box[1], y1) - y1, min(box[2], x2) - x1, min(box[3], y2) - y1
+            ]))
+            return box
+
+        def put_lines(region_name: str, lines: Sequence[str], color: Optional[Tuple[int, int, int]],
+                      wrap: bool = False) -> List[str]:
+            """从区域左上角起逐行绘制(color为None时各行轮流使用聊天颜色),返回实际绘制的行"""
+            x1, y1, x2, y2 = self.regions[region_name]
+            drawn = []
+            pending = list(lines)
+            while pending:
+                line = pending.pop(0)
+                y = y1 + 1 + LINE_SPACING * len(drawn)
+                if y + self.renderer.font_size > y2:
+                    if drawn:
+                        break
+                    # 区域低于字号时只绘制一行,垂直居中
+                    y = y1 + (y2 - y1 - self.renderer.font_size) // 2
+                if wrap:
+                    cut = len(line)
+                    while cut > 1 and x1 + 2 + self.renderer.measure(line[:cut])[0] > x2:
+                        cut -= 1
+                    line, rest = line[:cut], line[cut:]
+                    if rest:
+                        pending.insert(0, rest)
+                line_color = CHAT_COLORS[len(drawn) % len(CHAT_COLORS)] if color is None else color
+                if put_text(region_name, line, (x1 + 2, y), line_color):
+                    drawn.append(ocr_boxes[region_name][-1][0])
+            return drawn
+
+        # 量条: 期望值按真实填充比例计算(像素取整的误差在 ACCURACY_TOLERANCES 内)
+        for region_name, (field, color) in GAUGE_REGIONS.items():
+            if region_name not in self.regions:
+                continue
+            fill = min(max(state['gauges'].get(region_name, 0), 0.0), 1.0)
+            self._draw_gauge(frame, region_name, fill, color)
+            if region_name == 'skill_exp_min':
+                # 满格时归零
+                value = round(fill * 100) % 100
+            elif region_name == 'skill_exp_max':
+                # 已填满的十分之一格数,满格时归零
+                value = int(fill * 10) % 10
+            else:
+                value = round(fill * 100)
+            if region_name == 'char_be_attack':
+                expected[region_name] = {'status': fill > 0, 'screen_hp': value}
+            else:
+                expected[region_name] = {field: value}
+
+        # 目标面板
+        target = state['target']
+        if 'target_hp' in self.regions:
+            x1, y1, x2, y2 = self.regions['target_hp']
+            frame[y1:y2, x1:x2] = GAUGE_EMPTY_COLOR
+            if target:
+                fill_px = int(round(target['hp'] * (x2 - x1)))
+                frame[y1:y2, x1:x1 + fill_px] = TARGET_HP_COLOR
+                expected['target_hp'] = {'target_hp': round(target['hp'] * 100)}
+            else:
+                expected['target_hp'] = {'target_hp': 0}
+        if 'target_name' in self.regions:
+            x1, y1, x2, y2 = self.regions['target_name']
+            if target:
+                width, height = self.renderer.measure(target['name'])
+                put_text('target_name', target['name'], ((x1 + x2 - width) // 2, (y1 + y2 - height) // 2), TEXT_COLOR)
+                expected['target_name'] = {'target_name': target['name']}
+            else:
+                expected['target_name'] = {'target_name': '无目标'}
+        if 'target_panel' in self.regions and self.target_template is not None:
+            x1, y1, x2, y2 = self.regions['target_panel']
+            if target:
+                template = self.target_template[:y2 - y1, :x2 - x1]
+                frame[y1:y1 + template.shape[0], x1:x1 + template.shape[1]] = template
+                expected['target_panel'] = {'status': True, 'rate': 1.0}
+            else:
+                expected['target_panel'] = {'status': False}
+
+        # 名字标签
+        name_groups = []
+        nearby_groups = {name: [] for name in NEARBY_REGIONS if name in self.regions}
+        for item in state['names']:
+            box = put_text('game_area', item['text'], (item['x'], item['y']), NAME_COLORS[item['kind']])
+            if box is None:
+                continue
+            center = {'text': item['text'], 'center_x': (box[0] + box[2]) // 2, 'center_y': (box[1] + box[3]) // 2}
+            name_groups.append(center)
+            for region_name in nearby_groups:
+                x1, y1, x2, y2 = self.regions[region_name]
+                if x1 <= box[0] and box[2] <= x2 and y1 <= box[1] and box[3] <= y2:
+                    ocr_boxes.setdefault(region_name, []).append((item['text'], [box[0] - x1, box[1] - y1, box[2] - x1, box[3] - y1]))
+                    nearby_groups[region_name].append(dict(center))
+        if 'game_area' in self.regions:
+            expected['game_area'] = {'name_groups': name_groups}
+        for region_name, groups in nearby_groups.items():
+            expected[region_name] = {'name_groups': groups}
+
+        # 文本区域
+        if 'title_area' in self.regions:
+            x1, y1, x2, y2 = self.regions['title_area']
+            put_text('title_area', state['title'], (x1 + 2, y1 + max(0, (y2 - y1 - self.renderer.font_size) // 2)), TEXT_COLOR)
+            date, rest = state['title'].split(' ', 1)
+            clock, ms = rest.rstrip(')').split('(')
+            expected['title_area'] = {'date': date, 'time': clock, 'ms': int(ms.rstrip('ms'))}
+        if 'chat_messages' in self.regions:
+            lines = put_lines('chat_messages', state['chat'], None)
+            expected['chat_messages'] = {'row_num': len(lines), 'messages': lines, 'combined_text': '\n'.join(lines)}
+        if 'active_skills' in self.regions:
+            lines = put_lines('active_skills', state['skills'], TEXT_COLOR)
+            expected['active_skills'] = {'row_num': len(lines), 'active_skills': lines, 'all_active_skills': '|'.join(lines)}
+        if 'char_coordinates' in self.regions:
+            x, y = state['coordinates']
+            put_lines('char_coordinates', [f"{x}:{y}"], TEXT_COLOR)
+            expected['char_coordinates'] = {'x': x, 'y': y}
+        if 'char_revival' in self.regions:
+            if state['revival'] is not None:
+                put_lines('char_revival', [f"剩下{state['revival']}秒重新站立"], REVIVAL_COLOR, wrap=True)
+                expected['char_revival'] = {'status': False, 'time': state['revival']}
+            else:
+                expected['char_revival'] = {'status': True}
+        if 'char_eat_food' in self.regions:
+            if state['eat_food']:
+                put_lines('char_eat_food', [f"服用了{state['eat_food']}。"], TEXT_COLOR)
+                expected['char_eat_food'] = {'status': True, 'is_use': 'open', 'count': 1, 'item_name': [state['eat_food']]}
+            elif state['eat_food'] == '':
+                put_lines('char_eat_food', ['无法服用。'], TEXT_COLOR)
+                expected['char_eat_food'] = {'status': True, 'is_use': 'close', 'count': 0, 'item_name': []}
+            else:
+                expected['char_eat_food'] = {'status': False}
+        if 'char_blood_loss' in self.regions:
+            lines = put_lines('char_blood_loss', [f"-{state['blood_loss']}"], BLOOD_LOSS_COLOR) if state['blood_loss'] is not None else []
+            digits = ''.join(char for char in ''.join(lines) if char.isdigit())
+            if digits:
+                # 数字超出区域宽度时按实际绘制的部分计算
+                expected['char_blood_loss'] = {'status': True, 'blood_loss': int(digits)}
+            else:
+                expected['char_blood_loss'] = {'status': False, 'blood_loss': 0}
+
+        frame = self.renderer.render(frame, texts)
+
+        ocr_results = {}
+        for region_name, items in ocr_boxes.items():
+            scale = self._ocr_scale(region_name)
+            boxes = [[[x1 * scale, y1 * scale], [x2 * scale, y1 * scale], [x2 * scale, y2 * scale], [x1 * scale, y2 * scale]]
+                     for _, (x1, y1, x2, y2) in items]
+            ocr_results[region_name] = OCRResult(boxes, [1.0] * len(items), [text for text, _ in items])
+        return frame, ocr_results, expected
+
+    def _draw_gauge(self, frame: np.ndarray, region_name: str, fill: float, color: Tuple[int, int, int]) -> int:
+        """按比例填充量条(非空时至少填充1列),返回填充的像素列数"""
+        x1, y1, x2, y2 = self.regions[region_name]
+        fill_px = int(round(min(max(fill, 0.0), 1.0) * (x2 - x1)))
+        if fill > 0:
+            fill_px = max(fill_px, 1)
+        frame[y1:y2, x1:x2] = GAUGE_EMPTY_COLOR
+        frame[y1:y2, x1:x1 + fill_px] = color
+        return fill_px
+
+    def generate(self, output_dir: Union[str, Path], count: int,
+                 presets: Sequence[str] = ('random',)) -> Path:
+        """生成合成录制目录
+
+        Args:
+            output_dir: 输出目录
+            count: 帧数
+            presets: 预设列表,按帧轮流使用
+
+        Returns:
+            Path: 输出目录
+        """
+        output_dir = Path(output_dir)
+        frames_dir = output_dir / 'frames'
+        frames_dir.mkdir(parents=True, exist_ok=True)
+        ocr_results, truth = {}, {}
+        for index in range(count):
+            preset = presets[index % len(presets)]
+            rng = np.random.default_rng([self.seed, index])
+            state = self.sample_state(rng, preset, index)
+            frame, frame_ocr, expected = self.render(state)
+            name = f"{index:06d}"
+            # 使用imencode以兼容Windows下的中文路径
+            cv2.imencode('.png', frame)[1].tofile(str(frames_dir / f"{name}.png"))
+            ocr_results[name] = {region: result.to_dict() for region, result in frame_ocr.items()}
+            truth[name] = {'preset': preset, 'state': state, 'expected': expected}
+
+        with open(output_dir / 'ocr_results.json', 'w', encoding='utf-8') as f:
+            json.dump(ocr_results, f, ensure_ascii=False)
+        with open(output_dir / 'ground_truth.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'schema_version': SCHEMA_VERSION,
+                'size': [self.width, self.height],
+                'font': self.renderer.font_path,
+                'font_size': self.renderer.font_size,
+                'seed': self.seed,
+                'frames': truth
+            }, f, ensure_ascii=False)
+        self.logger.info(f"已生成 {count} 帧合成画面: {output_dir}")
+        return output_dir
+
+
+def check_accuracy(basic_config: dict, area_config: dict, recording_dir: Union[str, Path],
+                   logger: logging.Logger, regions: Optional[Sequence[str]] = None,
+                   tolerances: Optional[Dict[str, float]] = None) -> Dict[str, Dict[str, Any]]:
+    """在合成画面上运行分割/预处理/数据处理,与真值比较
+
+    使用录制目录中的OCR结果(完美OCR或真实OCR的录制),只比较期望结果中列出的字段
+
+    Args:
+        basic_config: 基础配置字典
+        area_config: 区域配置字典
+        recording_dir: generate 生成的目录
+        logger: 日志实例
+        regions: 只检查指定区域
+        tolerances: 数值容差,默认 ACCURACY_TOLERANCES
+
+    Returns:
+        Dict: {区域名: {'frames', 'matched', 'accuracy', 'examples': [差异示例]}}
+    """
+    from src.environment.replay import load_recording
+    from src.environment.screen_splitter import ScreenSplitter
+    from src.environment.image_preprocessor import ImagePreprocessor
+    from src.environment.data_processor import DataProcessor
+
+    handler_logger = logging.getLogger(f"{SyntheticFrameGenerator.MODULE_NAME}.handlers")
+    handler_logger.propagate = False
+    handler_logger.addHandler(logging.NullHandler())
+    splitter = ScreenSplitter(basic_config, area_config, handler_logger)
+    preprocessor = ImagePreprocessor(basic_config, area_config, handler_logger)
+    processor = DataProcessor(basic_config, area_config, handler_logger)
+
+    recording_dir = Path(recording_dir)
+    with open(recording_dir / 'ground_truth.json', 'r', encoding='utf-8') as f:
+        truth = json.load(f)['frames']
+    names, frames, ocr_results = load_recording(recording_dir)
+
+    report: Dict[str, Dict[str, Any]] = {}
+    for name, frame in zip(names, frames):
+        for region_name, expected in truth.get(name, {}).get('expected', {}).items():
+            if regions and region_name not in regions:
+                continue
+            if region_name not in processor.region_process_mapping:
+                continue
+            crop = splitter.split_region(frame, region_name)
+            preprocess = preprocessor.region_specific_methods.get(region_name)
+            image = preprocess(crop.copy()) if preprocess is not None else crop
+            data = ocr_results.get(name, {}).get(region_name)
+            ocr_result = OCRResult.from_dict(data) if data else OCRResult.empty()
+            actual = processor.process_region(region_name, ocr_result, image, area_config.get(region_name, {}))
+            diffs = diff_outputs(expected, actual, tolerances or ACCURACY_TOLERANCES, strict=False)
+
+            entry = report.setdefault(region_name, {'frames': 0, 'matched': 0, 'examples': []})
+            entry['frames'] += 1
+            if diffs:
+                if len(entry['examples']) < 3:
+                    entry['examples'].append(f"{name}: {'; '.join(diffs[:3])}")
+            else:
+                entry['matched'] += 1
+
+    for region_name, entry in sorted(report.items()):
+        entry['accuracy'] = round(entry['matched'] / entry['frames'], 4)
+        logger.info(f"{region_name:<24} {entry['matched']}/{entry['frames']} ({entry['accuracy']:.1%})")
+        for example in entry['examples']:
+            logger.info(f"    {example}")
+    return dict(sorted(report.items()))
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='合成HUD画面生成')
+    parser.add_argument('--config', type=str, default=str(project_root / 'config/env/status_collection_config.yaml'),
+                        help='采集配置文件路径(区域坐标)')
+    parser.add_argument('--output', type=str, default='data/synthetic',
+                        help='输出目录')
+    parser.add_argument('--count', type=int, default=100,
+                        help='生成的帧数')
+    parser.add_argument('--preset', type=str, nargs='*', default=['random'], choices=list(PRESETS),
+                        help='预设,多个时按帧轮流使用')
+    parser.add_argument('--font', type=str, default=None,
+                        help='字体文件(需要Pillow),为空时自动查找常见中文字体')
+    parser.add_argument('--font_size', type=int, default=12,
+                        help='字号(像素)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='随机种子')
+    parser.add_argument('--verify', action='store_true',
+                        help='生成后(或对已有目录,配合 --count 0)检查各区域处理结果与真值是否一致')
+    return parser.parse_args()
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(SyntheticFrameGenerator.MODULE_NAME)
+    config_manager = ConfigManager(args.config)
+
+    if args.count > 0:
+        generator = SyntheticFrameGenerator(
+            config_manager.basic_config, config_manager.area_config, logger,
+            renderer=TextRenderer(args.font, args.font_size), seed=args.seed
+        )
+        generator.generate(args.output, args.count, args.preset)
+    if args.verify:
+        check_accuracy(config_manager.basic_config, config_manager.area_config, args.output, logger)
+
+
+if __name__ == "__main__":
+    main()
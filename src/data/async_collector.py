@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+异步采集运行时模块
+
+collector.py 的主循环与 GUI 中 QTimer 驱动的 update_status 都直接调用阻塞的 process_frame。
+该模块为 DataCollector 提供基于 asyncio 的运行时:
+1. async process_frame: 与 DataCollector.process_frame 的处理流程一致,
+   截图、分割、预处理、OCR、数据处理与状态写入由异步阶段适配器放到线程池执行
+2. 同一波次的区域作为并发任务处理,每个阶段有独立的超时,超时的区域本帧不输出数据;
+   各阶段只返回结果,未超时时才在事件循环中写入本帧结果字典
+3. 截图节奏、状态发布、动作执行与按键监听均为同一事件循环中的协作任务,
+   状态写入等I/O与下一帧的计算重叠进行
+4. stop() 或按下退出键时取消所有任务
+
+超时后线程池中的任务无法被强制中断,只是结果被丢弃,不会写入之后帧的结果字典。
+OCR识别由 TextRecognizer.ocr_lock 串行执行,超时的识别仍在运行(持有锁)时,
+后续帧的OCR阶段直接按超时处理,不在线程池中排队等锁。
+
+basic_config.async_runtime:
+    Enabled: 是否使用异步运行时(collector.py 的 main 中生效)
+    max_workers: 阶段线程池的最大线程数
+    frame_interval: 两帧之间的最小间隔(秒)
+    stage_timeouts: {阶段名: 超时秒数},阶段名为 capture/split/preprocess/ocr/process/state/action,为空表示不限
+    quit_key: 退出按键,为空时不监听按键
+    input_poll_interval: 按键轮询间隔(秒)
+
+主要类:
+- AsyncDataCollector: DataCollector 的异步运行时
+"""
+
+import time
+import asyncio
+import logging
+from functools import partial
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 默认异步运行时配置
+DEFAULT_ASYNC_CONFIG = {
+    'Enabled': False,
+    'max_workers': 4,
+    'frame_interval': 1.0,
+    'stage_timeouts': {},
+    'quit_key': 'q',
+    'input_poll_interval': 0.1
+}
+
+
+class AsyncDataCollector:
+    """
+    DataCollector 的异步运行时
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        collector (DataCollector): 提供处理模块与帧处理公共步骤的数据采集器
+        stage_timeouts (Dict[str, float]): 各阶段的超时时间(秒)
+        subscribers (List[Callable]): 状态订阅者,每帧状态写入后调用
+    """
+
+    MODULE_NAME = 'AsyncDataCollector'
+
+    def __init__(self, collector, logger: Optional[logging.Logger] = None):
+        """初始化异步运行时
+
+        Args:
+            collector: 已初始化的 DataCollector
+            logger: 日志实例,默认使用采集器的日志
+        """
+        self.collector = collector
+        self.logger = logger or collector.logger
+        config = dict(DEFAULT_ASYNC_CONFIG)
+        config.update(collector.basic_config.get('async_runtime') or {})
+        self.frame_interval = float(config['frame_interval'])
+        self.stage_timeouts = {
+            name: float(timeout) for name, timeout in (config.get('stage_timeouts') or {}).items() if timeout
+        }
+        self.quit_key = config.get('quit_key')
+        self.input_poll_interval = float(config['input_poll_interval'])
+        self.executor = ThreadPoolExecutor(max_workers=max(1, int(config['max_workers'])),
+                                           thread_name_prefix='async-stage')
+        self.subscribers: List[Callable[[str, dict, Optional[dict]], Any]] = []
+        # 超时后仍在线程池中运行的OCR任务
+        self._abandoned_ocr: List[Future] = []
+        self._stop_event = None
+        self._state_queue = None
+        self._action_queue = None
+
+    # 异步阶段适配器
+    async def _stage(self, name: str, func: Callable, *args):
+        """在线程池中执行一个阶段,超过该阶段的超时时间时抛出 asyncio.TimeoutError
+
+        阶段函数只返回结果,超时后线程中的任务继续运行但结果被丢弃
+        """
+        future = self.executor.submit(partial(func, *args))
+        try:
+            # 超时时尚未开始的任务被取消,已在运行的任务继续运行直到结束
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.stage_timeouts.get(name))
+        except asyncio.TimeoutError:
+            if name == 'ocr':
+                self._abandoned_ocr.append(future)
+            raise
+
+    def ocr_busy(self) -> bool:
+        """是否有超时后仍在运行(持有 ocr_lock)的OCR任务"""
+        self._abandoned_ocr = [future for future in self._abandoned_ocr if not future.done()]
+        return bool(self._abandoned_ocr)
+
+    def _ocr_enabled(self, region_name: str) -> bool:
+        """区域是否启用OCR"""
+        return bool(self.collector.area_config[region_name].get('text_recognizer', {}).get('Enabled'))
+
+    async def capture(self, wave: List[str]):
+        """截图阶段,返回截图(截图被禁用时为None)"""
+        return await self._stage('capture', self.collector._capture_for_wave, wave)
+
+    async def split(self, region_name: str, screen, timestamp: str):
+        """分割阶段,返回区域图像"""
+        return await self._stage('split', self.collector._split_region, region_name, screen, timestamp)
+
+    async def preprocess(self, region_name: str, image, timestamp: str):
+        """预处理阶段,返回预处理后的图像"""
+        return await self._stage('preprocess', self.collector._preprocess_region, region_name, image, timestamp)
+
+    async def recognize(self, region_name: str, image, timestamp: str):
+        """OCR阶段,返回OCR结果;上一次超时的OCR仍在运行时直接按超时处理"""
+        if self._ocr_enabled(region_name) and image is not None and self.ocr_busy():
+            self.logger.warning(f"超时的OCR识别仍在运行,区域 {region_name} 本帧跳过识别")
+            raise asyncio.TimeoutError()
+        return await self._stage('ocr', self.collector._recognize_region, region_name, image, timestamp)
+
+    async def postprocess(self, region_name: str, data, image):
+        """数据处理阶段,返回处理后的数据"""
+        return await self._stage('process', self.collector._postprocess_region, region_name, data, image)
+
+    async def process_region(self, region_name: str, screen, timestamp: str) -> Tuple[Any, float]:
+        """异步处理单个区域
+
+        所有阶段完成后才将中间结果写入本帧结果字典,任一阶段超时时本帧不写入该区域的任何结果
+
+        Args:
+            region_name: 区域名称
+            screen: 本帧截图
+            timestamp: 时间戳
+
+        Returns:
+            Tuple[Any, float]: (处理后的数据, 处理耗时毫秒),阶段超时时数据为None
+        """
+        region_start = time.perf_counter()
+        try:
+            image = await self.split(region_name, screen, timestamp)
+            preprocessed = await self.preprocess(region_name, image, timestamp)
+            ocr_result = await self.recognize(region_name, preprocessed, timestamp)
+            data = await self.postprocess(region_name, ocr_result, preprocessed)
+            self.collector._store_region(region_name, image, preprocessed, ocr_result)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"区域 {region_name} 处理超时,本帧不输出数据")
+            data = None
+        return data, (time.perf_counter() - region_start) * 1000
+
+    async def _process_frame(self, regions_list: List[str]) -> Tuple[str, float, dict]:
+        """处理一帧但不写入状态
+
+        Returns:
+            Tuple[str, float, dict]: (时间戳, 帧时间, 启用状态管理的区域数据)
+        """
+        collector = self.collector
+        frame_time = time.time()
+        timestamp = f"{frame_time:.7f}".replace('.', '_')
+        collector.timestamp = timestamp
+        processed_data = {}
+
+        enabled_regions = collector._begin_frame(regions_list, frame_time, processed_data)
+        self.logger.info(f"开始处理区域: {enabled_regions}")
+
+        captured = False
+        for wave in collector.region_graph.waves(enabled_regions):
+            if not captured:
+                captured = True
+                try:
+                    screen = await self.capture(wave)
+                except asyncio.TimeoutError:
+                    # 没有本帧截图时不处理任何区域,避免用上一帧的截图冒充本帧测量
+                    self.logger.warning("截图超时,本帧不处理区域")
+                    break
+                if screen is not None:
+                    collector.current_screen = screen
+            wave = collector._admit_wave(wave, frame_time, processed_data)
+            if not wave:
+                continue
+            # 同一波次的区域并发处理
+            screen = collector.current_screen
+            results = await asyncio.gather(*(self.process_region(region_name, screen, timestamp) for region_name in wave))
+            for region_name, (data, duration_ms) in zip(wave, results):
+                collector._finish_region(region_name, data, duration_ms, frame_time, processed_data)
+
+        return timestamp, frame_time, collector._end_frame(processed_data)
+
+    async def process_frame(self, regions_list: List[str]) -> dict:
+        """异步处理一帧画面,与 DataCollector.process_frame 的输出一致
+
+        Args:
+            regions_list: 需要处理的区域名称列表
+
+        Returns:
+            dict: 处理后的数据,格式为 {区域名: 处理结果}
+        """
+        try:
+            timestamp, frame_time, enabled_states = await self._process_frame(regions_list)
+            if enabled_states:
+                await self._stage('state', self.collector.update_state, enabled_states, timestamp)
+            self.collector._update_freshness(regions_list, frame_time)
+            self.logger.info("帧处理完成")
+            return enabled_states
+        except Exception as e:
+            self.logger.error(f"处理帧时出错: {e}", exc_info=True)
+            raise
+
+    # 协作任务
+    def subscribe(self, callback: Callable[[str, dict, Optional[dict]], Any]):
+        """订阅状态发布,回调参数为 (时间戳, 区域数据, 新鲜度);回调可以是协程函数"""
+        self.subscribers.append(callback)
+
+    def submit_actions(self, actions: List[Dict]) -> bool:
+        """提交动作序列,由动作执行任务按顺序执行
+
+        Returns:
+            bool: 运行时是否在运行
+        """
+        if self._action_queue is None:
+            return False
+        self._action_queue.put_nowait(actions)
+        return True
+
+    def stop(self):
+        """请求停止运行时"""
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    async def _frame_loop(self, regions_list: List[str], max_frames: Optional[int]):
+        """截图节奏: 按 frame_interval 处理帧,结果交给状态发布任务"""
+        frames = 0
+        while not self._stop_event.is_set() and (max_frames is None or frames < max_frames):
+            loop_start = time.monotonic()
+            timestamp, frame_time, enabled_states = await self._process_frame(regions_list)
+            freshness = self.collector._update_freshness(regions_list, frame_time)
+            await self._state_queue.put((timestamp, enabled_states, freshness))
+            frames += 1
+            remaining = self.frame_interval - (time.monotonic() - loop_start)
+            if remaining > 0:
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        # 等待最后的状态写入完成
+        await self._state_queue.join()
+        self._stop_event.set()
+
+    async def _publisher(self):
+        """状态发布: 写入状态管理器并通知订阅者,与下一帧的处理重叠进行"""
+        while True:
+            timestamp, enabled_states, freshness = await self._state_queue.get()
+            try:
+                if enabled_states:
+                    await self._stage('state', self.collector.update_state, enabled_states, timestamp)
+                for callback in self.subscribers:
+                    result = callback(timestamp, enabled_states, freshness)
+                    if asyncio.iscoroutine(result):
+                        await result
+            except asyncio.TimeoutError:
+                self.logger.warning(f"状态写入超时: {timestamp}")
+            except Exception as e:
+                self.logger.error(f"状态发布失败: {e}", exc_info=True)
+            finally:
+                self._state_queue.task_done()
+
+    async def _action_worker(self):
+        """动作执行: 按提交顺序执行动作序列"""
+        while True:
+            actions = await self._action_queue.get()
+            try:
+                await self._stage('action', self.collector.execute_actions, actions)
+            except asyncio.TimeoutError:
+                self.logger.warning("动作序列执行超时")
+            except Exception as e:
+                self.logger.error(f"动作执行失败: {e}")
+
+    async def _input_monitor(self):
+        """按键监听: 按下退出键时停止运行时"""
+        try:
+            import keyboard
+        except ImportError as e:
+            self.logger.warning(f"无法监听按键: {e}")
+            return
+        while not self._stop_event.is_set():
+            if keyboard.is_pressed(self.quit_key):
+                self.logger.info("程序退出")
+                self._stop_event.set()
+                return
+            await asyncio.sleep(self.input_poll_interval)
+
+    async def run(self, regions_list: List[str], max_frames: Optional[int] = None):
+        """运行异步采集,直到 stop()、按下退出键或处理完 max_frames 帧
+
+        Args:
+            regions_list: 需要处理的区域名称列表
+            max_frames: 最多处理的帧数
+        """
+        self._stop_event = asyncio.Event()
+        self._state_queue = asyncio.Queue(maxsize=1)
+        self._action_queue = asyncio.Queue()
+        frame_task = asyncio.create_task(self._frame_loop(regions_list, max_frames), name='frame-loop')
+        background = [
+            asyncio.create_task(self._publisher(), name='state-publisher'),
+            asyncio.create_task(self._action_worker(), name='action-worker')
+        ]
+        if self.quit_key:
+            background.append(asyncio.create_task(self._input_monitor(), name='input-monitor'))
+        try:
+            stop_task = asyncio.create_task(self._stop_event.wait())
+            await asyncio.wait([frame_task, stop_task], return_when=asyncio.FIRST_COMPLETED)
+            if frame_task.done():
+                frame_task.result()
+            stop_task.cancel()
+        finally:
+            for task in [frame_task, *background]:
+                task.cancel()
+            await asyncio.gather(frame_task, *background, return_exceptions=True)
+            self._action_queue = None
+
+    def close(self):
+        """关闭阶段线程池"""
+        self.executor.shutdown(wait=False)
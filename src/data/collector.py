@@ -18,9 +18,9 @@
 """
 
 import sys
+import importlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import cv2
-import keyboard
 import time
 import numpy as np
 from typing import Dict, Optional, List, Union
@@ -32,16 +32,11 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 # 导入项目内部模块
+# 处理模块(cv2/paddleocr/win32api等重量级依赖)在实际创建时才导入,见 PROCESSORS
 from src.utils.config_manager import ConfigManager
 from src.utils.logger_manager import LoggerManager
-from src.environment.screen_capture import ScreenCapture
-from src.environment.screen_splitter import ScreenSplitter
-from src.environment.window_manager import WindowManager
-from src.environment.text_recognizer import TextRecognizer
-from src.environment.image_preprocessor import ImagePreprocessor
-from src.environment.data_processor import DataProcessor
-from src.environment.state_manager import StateManager
-from src.environment.action_executor import ActionExecutor
+from src.utils.metrics import get_metrics
+from src.utils.tracing import get_tracer
 
 
 class DataCollector:
@@ -71,17 +66,42 @@ class DataCollector:
         text_recognizer: 文字识别器
         data_processor: 数据处理器
         state_manager: 状态管理器
+        state_estimator: 状态估计器
+        region_scheduler: 区域调度器
+        region_graph: 区域依赖图
+        frame_deadline: 帧截止时间
+        golden_recorder: 黄金输出语料记录器
     """
     
     MODULE_NAME = 'DataCollector'
     
-    def __init__(self, logger: logging.Logger, config_manager: ConfigManager):
+    # 处理模块定义: 名称 -> (模块路径, 类名, 构造参数, 是否可并行初始化)
+    # 窗口管理与屏幕捕获持有系统句柄,在主线程中创建
+    PROCESSORS = {
+        'window_manager': ('src.environment.window_manager', 'WindowManager', ['basic_config'], False),
+        'screen_capture': ('src.environment.screen_capture', 'ScreenCapture', ['basic_config'], False),
+        'screen_splitter': ('src.environment.screen_splitter', 'ScreenSplitter', ['basic_config', 'area_config'], True),
+        'image_preprocessor': ('src.environment.image_preprocessor', 'ImagePreprocessor', ['basic_config', 'area_config'], True),
+        'text_recognizer': ('src.environment.text_recognizer', 'TextRecognizer', ['basic_config', 'area_config'], True),
+        'data_processor': ('src.environment.data_processor', 'DataProcessor', ['basic_config', 'area_config'], True),
+        'state_manager': ('src.environment.state_manager', 'StateManager', ['basic_config', 'area_config'], True),
+        'state_estimator': ('src.environment.state_estimator', 'StateEstimator', ['basic_config', 'area_config'], True),
+        'region_scheduler': ('src.data.region_scheduler', 'RegionScheduler', ['basic_config', 'area_config'], True),
+        'region_graph': ('src.data.region_graph', 'RegionGraph', ['basic_config', 'area_config'], True),
+        'frame_deadline': ('src.data.frame_deadline', 'FrameDeadline', ['basic_config'], True),
+        'golden_recorder': ('src.data.golden_corpus', 'GoldenRecorder', ['basic_config', 'area_config'], True),
+    }
+    
+    def __init__(self, logger: logging.Logger, config_manager: ConfigManager,
+                 processors: Optional[Dict[str, object]] = None):
         """
         初始化数据采集器
         
         Args:
             logger: 日志记录器
             config_manager: 配置管理器
+            processors: 预先创建的处理模块实例 {名称: 实例},替换 PROCESSORS 中对应的默认实现
+                        (如 src/environment/replay.py 中的回放截图源与回放OCR,用于无窗口的基准测试)
             
         初始化步骤:
         1. 设置配置和日志
@@ -91,6 +111,7 @@ class DataCollector:
         """
         self.config_manager = config_manager
         self.logger_config = config_manager.get_logger_config()
+        self._processor_overrides = dict(processors or {})
         
         # 初始化日志
         self._init_logger()
@@ -101,6 +122,12 @@ class DataCollector:
         # 初始化目录
         self._init_directories()
         
+        # 初始化性能指标(各阶段/区域耗时直方图与事件计数)
+        self.metrics = get_metrics().configure(self.basic_config.get('metrics'), self.base_output_dir)
+        
+        # 初始化帧级追踪(Chrome trace-event 格式,慢帧自动输出)
+        self.tracer = get_tracer().configure(self.basic_config.get('tracing'), self.base_output_dir)
+        
         # 初始化处理模块
         self._init_processors()
         
@@ -175,37 +202,80 @@ class DataCollector:
         - text_recognizer: 文字识别
         - data_processor: 数据处理
         - state_manager: 状态管理
+        - state_estimator: 状态估计
+        - region_scheduler: 区域调度
+        - region_graph: 区域依赖图
+        - frame_deadline: 帧截止时间
+        - golden_recorder: 黄金输出语料记录器
         
-        每个模块都配置独立的logger实例
-        """
-        # 创建处理模块实例
-        processors = {
-            'window_manager': (WindowManager, ['basic_config']),
-            'screen_capture': (ScreenCapture, ['basic_config']),
-            'screen_splitter': (ScreenSplitter, ['basic_config', 'area_config']),
-            'image_preprocessor': (ImagePreprocessor, ['basic_config', 'area_config']),
-            'text_recognizer': (TextRecognizer, ['basic_config', 'area_config']),
-            'data_processor': (DataProcessor, ['basic_config', 'area_config']),
-            'state_manager': (StateManager, ['basic_config', 'area_config']),
-            # 'action_executor': (ActionExecutor, ['basic_config'])
+        每个模块都配置独立的logger实例。
+        模块在创建时才导入,互不依赖的模块并行初始化(basic_config.parallel_init,默认开启);
+        OCR模型由 TextRecognizer 在后台预热,可通过 wait_until_ready 等待就绪。
+        构造时传入的 processors 直接使用,不再创建。
+        """
+        # 先在主线程中创建logger, LoggerManager 的类级缓存不是线程安全的
+        processor_loggers = {
+            name: LoggerManager(name=name, **self.logger_config).get_logger()
+            for name in self.PROCESSORS
         }
         
-        for name, (processor_class, config_args) in processors.items():
-            # 为每个处理器创建独立的logger
-            processor_logger = LoggerManager(
-                name=name,
-                **self.logger_config
-            ).get_logger()
-            
+        def create_processor(name: str):
+            module_path, class_name, config_args, _ = self.PROCESSORS[name]
+            processor_class = getattr(importlib.import_module(module_path), class_name)
             # 构造配置参数
             config_dict = {
                 arg: getattr(self, arg) 
                 for arg in config_args
             }
-            config_dict['logger'] = processor_logger
+            config_dict['logger'] = processor_loggers[name]
+            return processor_class(**config_dict)
+        
+        for name, processor in self._processor_overrides.items():
+            setattr(self, name, processor)
+        
+        parallel_names = [
+            name for name, spec in self.PROCESSORS.items()
+            if spec[3] and name not in self._processor_overrides
+        ]
+        if not self.basic_config.get('parallel_init', True):
+            parallel_names = []
+        
+        with ThreadPoolExecutor(max_workers=max(1, len(parallel_names)),
+                                thread_name_prefix='processor-init') as executor:
+            # 并行创建互不依赖的处理器实例
+            futures = {name: executor.submit(create_processor, name) for name in parallel_names}
+            # 主线程中创建持有系统句柄的处理器实例
+            for name in self.PROCESSORS:
+                if name not in futures and name not in self._processor_overrides:
+                    setattr(self, name, create_processor(name))
+            for name, future in futures.items():
+                setattr(self, name, future.result())
+        
+        # 动作执行器在首次使用时创建,见 action_executor 属性
+        self._action_executor = None
+        
+        # 同一波次区域的并行处理线程池,首次使用时创建
+        self._region_executor = None
+    
+    @property
+    def action_executor(self):
+        """动作执行器,首次访问时才导入并创建(依赖 keyboard/win32api)"""
+        if self._action_executor is None:
+            from src.environment.action_executor import ActionExecutor
+            self._action_executor = ActionExecutor(config_manager=self.config_manager)
+        return self._action_executor
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待OCR等后台预热的模型就绪
+        
+        Args:
+            timeout: 超时时间(秒),为None时一直等待
             
-            # 创建处理器实例
-            setattr(self, name, processor_class(**config_dict))
+        Returns:
+            bool: 是否已就绪
+        """
+        return self.text_recognizer.wait_until_ready(timeout)
     # 初始化状态变量
     def _init_variables(self):
         """
@@ -221,6 +291,9 @@ class DataCollector:
         - ocr_results: OCR识别结果
         - ocr_image_path: OCR结果图像路径
         - timestamp: 当前时间戳
+        - frame_id: 当前帧ID(追踪使用)
+        - frame_outputs: 本帧实际测量的区域处理结果(黄金输出语料使用)
+        - freshness: 截止时间模式下最近一帧各区域数据的新鲜度,未启用时为None
         """
         self.current_screen = None
         self.capture_image_path = None
@@ -231,6 +304,9 @@ class DataCollector:
         self.ocr_results = {}
         self.ocr_image_path = None
         self.timestamp = None
+        self.frame_id = 0
+        self.frame_outputs = {}
+        self.freshness = None
     # 3. 捕获屏幕画面
     def capture_screen(self, save_capture: bool = False) -> np.ndarray:
         """
@@ -245,19 +321,26 @@ class DataCollector:
         Raises:
             Exception: 截图失败时抛出异常
         """
+        self.current_screen = self._grab_screen(save_capture)
+        return self.current_screen
+    
+    def _grab_screen(self, save_capture: bool = False) -> np.ndarray:
+        """捕获屏幕并返回截图,不写入 current_screen(异步运行时在阶段未超时时才写入)"""
         try:
             # 捕获屏幕
-            self.current_screen = self.screen_capture.capture()
+            with self.metrics.timer('capture'):
+                screen = self.screen_capture.capture()
             # 如果开启了截屏保存图片原始模式，保存截图
             if save_capture:
+                import cv2
                 # 保存截图
                 filename = f"original_{self.timestamp}.png"
                 save_path = self.screenshots_dir / filename
-                cv2.imwrite(str(save_path), self.current_screen)
+                cv2.imwrite(str(save_path), screen)
                 self.capture_image_path = save_path
                 self.logger.debug(f"已保存原始截图: {save_path}") 
                  
-            return self.current_screen 
+            return screen 
             
         except Exception as e:
             self.logger.error(f"截图失败: {e}")
@@ -371,10 +454,8 @@ class DataCollector:
         """
         处理区域之间的依赖关系
         
-        处理逻辑:
-        1. 检查区域是否有依赖配置
-        2. 根据控制类型处理依赖
-        3. 根据状态启用/禁用相关区域
+        依赖关系在启动时由 RegionGraph 编译为依赖图,门控状态保存在图中,
+        不再修改 area_config 中依赖区域的 Enabled
         
         Args:
             region_name: 当前处理的区域名称
@@ -385,30 +466,9 @@ class DataCollector:
         - 其他控制类型可扩展...
         
         示例:
-        如果 target_panel 未识别到,则禁用其依赖的 target_info 区域
+        如果 target_panel 未识别到,则在后续波次中剪除其依赖的 target_hp/target_name 区域
         """
-        # 检查区域是否有依赖配置
-        if not self.area_config[region_name].get('dependencies'):
-            return
-        
-        dependencies = self.area_config[region_name].get('dependencies', [])
-        control_type = self.area_config[region_name].get('control_type')
-        
-        # 根据不同的控制类型处理依赖
-        if control_type == "disable_when_false":
-            status_key = f"status"  # 例如: target_panel_status
-            if processed_data[region_name].get(status_key) == False:
-                # 关闭相关检测
-                for dep in dependencies:
-                    if dep in self.area_config:
-                        self.area_config[dep]['Enabled'] = False
-                self.logger.info(f"{region_name}未识别到,已关闭相关检测: {dependencies}")
-            else:
-                # 重新开启相关检测
-                for dep in dependencies:
-                    if dep in self.area_config:
-                        self.area_config[dep]['Enabled'] = True
-                self.logger.info(f"{region_name}已识别到,重新开启相关检测: {dependencies}")
+        self.region_graph.evaluate(region_name, processed_data.get(region_name))
     # 9. 更新状态
     def update_state(self, processed_data: dict, timestamp: str):
         """
@@ -435,7 +495,8 @@ class DataCollector:
 
             # # 只有当有可序列化的数据时才更新状态
             # if serializable_data:
-                self.state_manager.update(processed_data, timestamp)
+                with self.metrics.timer('state_manager'):
+                    self.state_manager.update(processed_data, timestamp)
             
         except Exception as e:
             self.logger.error(f"更新状态失败: {e}")
@@ -453,6 +514,463 @@ class DataCollector:
             - 任务状态等
         """
         return self.state_manager.get_current_state()
+    # 单个区域的处理阶段(逐区域处理、并行波次与异步运行时共用)
+    def _debug_flags(self, region_name: str) -> tuple:
+        """区域的调试开关 (debug_mode, save_debug)"""
+        region_config = self.area_config[region_name]
+        return (bool(region_config.get('debug_mode').get('Enabled')),
+                bool(region_config.get('save_debug').get('Enabled')))
+    
+    # 以下阶段只读取参数并返回结果,不修改本帧结果字典,由调用方决定是否写入
+    def _split_region(self, region_name: str, screen: np.ndarray, timestamp: str) -> Optional[np.ndarray]:
+        """
+        4. 区域分割: 根据配置的坐标从屏幕图像中分割出区域图像
+        
+        Returns:
+            区域图像;分割被禁用或失败时为None
+        """
+        split_config = self.area_config[region_name].get('screen_split')
+        if not split_config.get('Enabled'):
+            return None
+        self.logger.info(f"分割区域: {region_name}")
+        with self.metrics.timer('split', region_name):
+            split = self.screen_splitter.process_image(
+                screen,
+                [region_name],
+                save_split=split_config.get('save_split'),
+                debug_mode=self._debug_flags(region_name)[0],
+                timestamp=timestamp
+            )
+        return split.get(region_name)
+    
+    def _preprocess_region(self, region_name: str, image: Optional[np.ndarray], timestamp: str) -> Optional[np.ndarray]:
+        """
+        5. 图像预处理: 对分割后的区域图像进行预处理（如二值化、降噪等）
+        
+        Returns:
+            预处理后的图像;预处理被禁用时为分割后的原始图像;没有区域图像时为None
+        """
+        if image is None:
+            return None
+        if not self.area_config[region_name].get('image_preprocess', {}).get('Enabled'):
+            # 当预处理被禁用时，直接使用分割后的原始图像
+            return image
+        self.logger.info(f"预处理图像: {region_name}")
+        debug_mode, save_debug = self._debug_flags(region_name)
+        with self.metrics.timer('preprocess', region_name):
+            preprocessed = self.image_preprocessor.process_images(
+                {region_name: image},
+                regions_to_process=[region_name],
+                save_debug=save_debug,
+                debug_mode=debug_mode,
+                timestamp=timestamp
+            )
+        return preprocessed.get(region_name)
+    
+    def _recognize_region(self, region_name: str, image: Optional[np.ndarray], timestamp: str):
+        """
+        6. OCR文字识别: 对预处理后的图像进行OCR识别
+        
+        Returns:
+            OCR结果;OCR被禁用时为预处理后的图像;没有可识别的图像时为None
+        """
+        if not self.area_config[region_name].get('text_recognizer', {}).get('Enabled'):
+            # 如果OCR被禁用，则直接使用预处理后的图像
+            return image if image is not None else {}
+        self.logger.info(f"文字识别: {region_name}")
+        if image is None:
+            return None
+        debug_mode, save_debug = self._debug_flags(region_name)
+        with self.metrics.timer('ocr', region_name):
+            ocr_results = self.text_recognizer.process_regions(
+                regions={region_name: image},
+                save_debug=save_debug,
+                debug_mode=debug_mode,
+                timestamp=timestamp
+            )
+        return ocr_results.get(region_name, {})
+    
+    def _postprocess_region(self, region_name: str, data, image: Optional[np.ndarray] = None):
+        """7. 数据处理: 对OCR结果进行后处理（如数据提取、格式化等）"""
+        region_config = self.area_config[region_name]
+        if not region_config.get('data_processor', {}).get('Enabled') or data is None:
+            return data
+        self.logger.info(f"数据处理: {region_name}")
+        with self.metrics.timer('data_processor', region_name):
+            return self.data_processor.process_region(
+                region_name,
+                data,  # OCR结果
+                image,  # 预处理后的图像
+                region_config  # 区域配置
+            )
+    
+    def _store_region(self, region_name: str, image: Optional[np.ndarray],
+                      preprocessed: Optional[np.ndarray], ocr_result):
+        """将区域的中间结果写入本帧结果字典(每个区域只写自己的键)"""
+        if image is not None:
+            self.current_regions[region_name] = image
+        if preprocessed is not None:
+            self.preprocessed_images[region_name] = preprocessed
+        if ocr_result is not None and self.area_config[region_name].get('text_recognizer', {}).get('Enabled'):
+            self.ocr_results[region_name] = ocr_result
+    
+    # 处理单个区域
+    def _process_region(self, region_name: str, timestamp: str):
+        """
+        对单个区域执行分割、预处理、文字识别与数据处理
+        
+        只读取本帧共享的屏幕图像,中间结果写入本帧结果字典中该区域自己的键,
+        同一波次的区域可以在不同线程中同时处理
+        
+        Args:
+            region_name: 区域名称
+            timestamp: 时间戳
+            
+        Returns:
+            tuple: (处理后的数据, 处理耗时毫秒),没有数据时数据为None
+        """
+        region_start = time.perf_counter()
+        self.logger.debug(f"处理区域 {region_name} - debug_mode/save_debug: {self._debug_flags(region_name)}")
+        image = self._split_region(region_name, self.current_screen, timestamp)
+        preprocessed = self._preprocess_region(region_name, image, timestamp)
+        data = self._recognize_region(region_name, preprocessed, timestamp)
+        self._store_region(region_name, image, preprocessed, data)
+        data = self._postprocess_region(region_name, data, preprocessed)
+        return data, (time.perf_counter() - region_start) * 1000
+    # 处理一个波次的区域
+    def _run_wave(self, wave: List[str], timestamp: str) -> Dict[str, tuple]:
+        """
+        处理依赖图中的一个波次
+        
+        波次内的区域互不依赖; basic_config.region_graph.parallel 开启时并行处理,
+        调试模式的区域需要弹出窗口,始终在主线程中处理
+        
+        Args:
+            wave: 区域名称列表
+            timestamp: 时间戳
+            
+        Returns:
+            Dict[str, tuple]: {区域名: (处理后的数据, 处理耗时毫秒)}
+        """
+        if self.basic_config.get('stage_batching', False):
+            return self._run_wave_batched(wave, timestamp)
+        
+        parallel = [
+            region_name for region_name in wave
+            if not self.area_config[region_name].get('debug_mode', {}).get('Enabled')
+        ] if self.region_graph.parallel and len(wave) > 1 else []
+        
+        futures = {}
+        if len(parallel) > 1:
+            if self._region_executor is None:
+                self._region_executor = ThreadPoolExecutor(max_workers=self.region_graph.max_workers,
+                                                           thread_name_prefix='region')
+            futures = {
+                region_name: self._region_executor.submit(self._process_region, region_name, timestamp)
+                for region_name in parallel
+            }
+        
+        results = {}
+        for region_name in wave:
+            if region_name not in futures:
+                results[region_name] = self._process_region(region_name, timestamp)
+        for region_name, future in futures.items():
+            results[region_name] = future.result()
+        return {region_name: results[region_name] for region_name in wave}
+    # 按阶段批量处理一个波次的区域
+    def _run_wave_batched(self, wave: List[str], timestamp: str) -> Dict[str, tuple]:
+        """
+        按阶段批量处理依赖图中的一个波次(basic_config.stage_batching)
+        
+        先一次分割全部区域,再一次预处理全部区域,再一次识别全部区域,最后逐区域数据处理,
+        输出与逐区域处理一致。调试开关不同的区域分组调用,各阶段耗时按组内区域数平摊
+        
+        Args:
+            wave: 区域名称列表
+            timestamp: 时间戳
+            
+        Returns:
+            Dict[str, tuple]: {区域名: (处理后的数据, 处理耗时毫秒)}
+        """
+        durations = dict.fromkeys(wave, 0.0)
+        debug_flags = self._debug_flags
+        
+        def run_stage(stage: str, regions: List[str], key, call) -> dict:
+            """按 key 分组执行一个阶段,返回合并后的结果"""
+            groups = {}
+            for region_name in regions:
+                groups.setdefault(key(region_name), []).append(region_name)
+            results = {}
+            for group_key, group in groups.items():
+                stage_start = time.perf_counter()
+                results.update(call(group, *group_key))
+                share = (time.perf_counter() - stage_start) * 1000 / len(group)
+                for region_name in group:
+                    durations[region_name] += share
+                    self.metrics.observe(stage, region_name, share)
+            return results
+        
+        # 4. 区域分割: 一次分割本波次的全部区域
+        split_list = [r for r in wave if self.area_config[r].get('screen_split').get('Enabled')]
+        if split_list:
+            self.logger.info(f"分割区域: {split_list}")
+            self.current_regions.update(run_stage(
+                'split',
+                split_list,
+                lambda r: (bool(self.area_config[r].get('screen_split').get('save_split')), debug_flags(r)[0]),
+                lambda group, save_split, debug_mode: self.screen_splitter.process_image(
+                    self.current_screen, group, save_split=save_split, debug_mode=debug_mode, timestamp=timestamp)
+            ))
+        
+        # 5. 图像预处理: 一次预处理全部区域，未启用预处理的区域直接使用分割后的原始图像
+        preprocess_list = [
+            r for r in wave
+            if self.area_config[r].get('image_preprocess', {}).get('Enabled') and r in self.current_regions
+        ]
+        for region_name in wave:
+            if region_name not in preprocess_list and region_name in self.current_regions:
+                self.preprocessed_images[region_name] = self.current_regions[region_name]
+        if preprocess_list:
+            self.logger.info(f"预处理图像: {preprocess_list}")
+            self.preprocessed_images.update(run_stage(
+                'preprocess',
+                preprocess_list,
+                debug_flags,
+                lambda group, debug_mode, save_debug: self.image_preprocessor.process_images(
+                    {r: self.current_regions[r] for r in group}, regions_to_process=group,
+                    save_debug=save_debug, debug_mode=debug_mode, timestamp=timestamp)
+            ))
+        
+        # 6. OCR文字识别: 一次识别全部区域
+        ocr_list = [r for r in wave if self.area_config[r].get('text_recognizer', {}).get('Enabled')]
+        recognize_list = [r for r in ocr_list if r in self.preprocessed_images]
+        if recognize_list:
+            self.logger.info(f"文字识别: {recognize_list}")
+            self.ocr_results.update(run_stage(
+                'ocr',
+                recognize_list,
+                debug_flags,
+                lambda group, debug_mode, save_debug: self.text_recognizer.process_regions(
+                    regions={r: self.preprocessed_images[r] for r in group},
+                    save_debug=save_debug, debug_mode=debug_mode, timestamp=timestamp)
+            ))
+        
+        # 7. 数据处理: 逐区域处理
+        results = {}
+        for region_name in wave:
+            region_config = self.area_config[region_name]
+            if region_name in ocr_list:
+                data = self.ocr_results.get(region_name, {}) if region_name in recognize_list else None
+            else:
+                data = self.preprocessed_images.get(region_name, {})
+            if region_config.get('data_processor', {}).get('Enabled') and data is not None:
+                self.logger.info(f"数据处理: {region_name}")
+                process_start = time.perf_counter()
+                data = self.data_processor.process_region(
+                    region_name, data, self.preprocessed_images.get(region_name), region_config)
+                process_ms = (time.perf_counter() - process_start) * 1000
+                durations[region_name] += process_ms
+                self.metrics.observe('data_processor', region_name, process_ms)
+            results[region_name] = (data, durations[region_name])
+        return results
+    # 帧处理的公共步骤(同步与异步运行时共用,区域选择与结果记录也用于流水线)
+    def _begin_frame(self, regions_list: List[str], frame_time: float, processed_data: dict) -> List[str]:
+        """
+        开始一帧: 启动截止时间计时与帧追踪,选择本帧实际处理的区域并重置本帧的中间结果
+        
+        Args:
+            regions_list: 需要处理的区域名称列表
+            frame_time: 帧时间
+            processed_data: 本帧处理结果字典
+            
+        Returns:
+            List[str]: 本帧处理的区域
+        """
+        self.frame_deadline.start_frame(frame_time)
+        self.frame_id += 1
+        self.tracer.begin_frame(self.frame_id)
+        
+        enabled_regions = self._select_regions(regions_list, frame_time, processed_data)
+        
+        # 本帧的中间结果 {区域名: 图像/OCR结果}
+        self.current_regions = {}
+        self.preprocessed_images = {}
+        self.ocr_results = {}
+        self.frame_outputs = {}
+        return enabled_regions
+    
+    def _select_regions(self, regions_list: List[str], frame_time: float, processed_data: dict) -> List[str]:
+        """
+        选择本帧实际处理的区域
+        
+        依次筛选: 已启用 -> 上游门控开启 -> OCR已就绪 -> 需要测量(状态估计) -> 被调度 -> 配置存在;
+        使用估计值或被推迟的区域的预测值直接写入 processed_data
+        
+        Args:
+            regions_list: 需要处理的区域名称列表
+            frame_time: 帧时间
+            processed_data: 本帧处理结果字典
+            
+        Returns:
+            List[str]: 本帧处理的区域
+        """
+        # 1. 从配置中筛选出已启用的区域
+        enabled_regions = [
+            region_name for region_name in regions_list
+            if self.area_config.get(region_name, {}).get('Enabled', False)
+        ]
+        
+        # 上游门控区域已关闭的区域本帧不处理(同一帧内的门控变化在分波次处理时生效)
+        for region_name in enabled_regions:
+            if not self.region_graph.is_active(region_name):
+                self.metrics.increment('pruned', region_name)
+        enabled_regions = [r for r in enabled_regions if self.region_graph.is_active(r)]
+        
+        # OCR模型后台预热期间跳过需要OCR的区域,避免首帧被模型加载阻塞
+        if not self.text_recognizer.is_ready():
+            warming_regions = [
+                region_name for region_name in enabled_regions
+                if self.area_config[region_name].get('text_recognizer', {}).get('Enabled')
+            ]
+            if warming_regions:
+                self.logger.info(f"OCR模型预热中,本帧跳过区域: {warming_regions}")
+                for region_name in warming_regions:
+                    self.metrics.increment('skipped_warming', region_name)
+                enabled_regions = [r for r in enabled_regions if r not in warming_regions]
+        
+        # 状态估计: 不确定度仍在容差内的区域本帧不测量，直接使用预测值
+        estimated_regions = [
+            region_name for region_name in enabled_regions
+            if not self.state_estimator.needs_measurement(region_name, frame_time)
+        ]
+        if estimated_regions:
+            for region_name in estimated_regions:
+                processed_data[region_name] = self.state_estimator.predict(region_name, frame_time)
+                self.metrics.increment('estimated', region_name)
+            self.logger.debug(f"本帧使用状态估计值的区域: {estimated_regions}")
+            enabled_regions = [r for r in enabled_regions if r not in estimated_regions]
+        
+        # 区域调度: 按刷新间隔、优先级与每帧预算选择本帧处理的区域
+        scheduled_regions = self.region_scheduler.select(enabled_regions, frame_time)
+        deferred_regions = [r for r in enabled_regions if r not in scheduled_regions]
+        if deferred_regions:
+            # 推迟的区域有估计值时发布预测值，否则保留状态管理器中的上次结果
+            self._publish_predictions(deferred_regions, frame_time, processed_data)
+            for region_name in deferred_regions:
+                self.metrics.increment('deferred', region_name)
+            self.logger.debug(f"本帧推迟处理的区域: {deferred_regions}")
+            enabled_regions = scheduled_regions
+        
+        # 区域配置缺失的区域无法处理
+        missing_regions = [r for r in enabled_regions if not self.area_config.get(r)]
+        for region_name in missing_regions:
+            self.logger.warning(f"找不到区域配置: {region_name}")
+        return [r for r in enabled_regions if r not in missing_regions]
+    
+    def _publish_predictions(self, regions: List[str], frame_time: float, processed_data: dict):
+        """本帧不处理的区域有状态估计值时发布预测值"""
+        for region_name in regions:
+            prediction = self.state_estimator.predict(region_name, frame_time)
+            if prediction:
+                processed_data[region_name] = prediction
+    
+    def _capture_for_wave(self, wave: List[str]) -> Optional[np.ndarray]:
+        """
+        3. 屏幕捕获: 按波次中第一个区域的截图配置捕获一次屏幕
+        
+        Returns:
+            截图,由调用方写入 current_screen;截图被禁用时为None(沿用上一次的截图)
+        """
+        capture_config = self.area_config[wave[0]].get('screen_capture')
+        if not capture_config.get('Enabled', True):
+            return None
+        self.logger.info(f"捕获屏幕区域: {wave[0]}")
+        return self._grab_screen(save_capture=capture_config.get('save_capture'))
+    
+    def _admit_wave(self, wave: List[str], frame_time: float, processed_data: dict) -> List[str]:
+        """截止时间: 剩余预算不足时推迟低优先级区域，有估计值时发布预测值"""
+        wave, shed_regions = self.frame_deadline.admit(wave, self.region_scheduler)
+        self._publish_predictions(shed_regions, frame_time, processed_data)
+        for region_name in shed_regions:
+            self.metrics.increment('shed', region_name)
+        return wave
+    
+    def _finish_region(self, region_name: str, data, duration_ms: float, frame_time: float, processed_data: dict,
+                       frame_outputs: Optional[dict] = None):
+        """
+        记录一个区域的处理结果
+        
+        写入处理结果,记录测量时间与状态估计观测,更新门控状态,记录调度耗时;
+        没有产生结果(无可识别图像、异步阶段超时)时不算作一次测量,新鲜度保持上次测量的年龄
+        
+        frame_outputs 为本帧实际测量的结果,默认为 self.frame_outputs(流水线中按帧传入)
+        """
+        if data is not None:
+            processed_data[region_name] = data
+            (self.frame_outputs if frame_outputs is None else frame_outputs)[region_name] = data
+            self.frame_deadline.measured(region_name, frame_time)
+            
+            # 记录测量结果，供状态估计在后续帧中预测
+            if self.state_estimator.is_enabled(region_name):
+                self.state_estimator.observe(region_name, data, frame_time)
+        
+        # 8. 处理区域依赖关系: 更新门控状态，决定后续波次剪除的区域
+        self.handle_region_dependencies(region_name, processed_data)
+        
+        # 区域处理耗时(不含整屏捕获)，供调度器估算开销
+        self.region_scheduler.record(region_name, duration_ms, frame_time)
+    
+    def _state_regions(self, regions_list: List[str]) -> List[str]:
+        """启用了状态管理的区域"""
+        return [
+            region_name for region_name in regions_list
+            if self.area_config.get(region_name, {}).get('state_manager', {}).get('Enabled', False)
+        ]
+    
+    def _state_data(self, processed_data: dict) -> dict:
+        """9. 过滤返回数据: 只保留启用状态管理的区域"""
+        state_regions = set(self._state_regions(list(processed_data)))
+        return {
+            region_name: data
+            for region_name, data in processed_data.items()
+            if region_name in state_regions
+        }
+    
+    def _end_frame(self, processed_data: dict) -> dict:
+        """
+        结束一帧: 记录整帧耗时与追踪、黄金输出语料,过滤返回数据
+        
+        Returns:
+            dict: 需要写入状态管理器并返回给调用方的数据
+        """
+        # 整帧耗时(不含状态写入)
+        self.metrics.observe('frame', None, self.frame_deadline.elapsed_ms())
+        trace_path = self.tracer.end_frame(self.frame_id)
+        if trace_path:
+            self.logger.warning(f"第 {self.frame_id} 帧耗时超过阈值,已输出追踪文件: {trace_path}")
+        # 按间隔记录 (截图, OCR结果, 处理结果) 到黄金输出语料
+        self.golden_recorder.record(self.frame_id, self.timestamp, self.current_screen,
+                                    self.ocr_results, self.frame_outputs)
+        return self._close_frame(processed_data)
+    
+    def _close_frame(self, processed_data: dict) -> dict:
+        """
+        帧结束的公共步骤: 定期输出调度报告与性能指标摘要,过滤返回数据
+        
+        Returns:
+            dict: 需要写入状态管理器并返回给调用方的数据
+        """
+        self.region_scheduler.maybe_log_report()
+        self.metrics.maybe_log_summary(self.logger)
+        return self._state_data(processed_data)
+    
+    def _update_freshness(self, regions_list: List[str], frame_time: float) -> Optional[dict]:
+        """截止时间模式下记录各区域数据是否为本帧测量及其年龄,未启用时为None"""
+        self.freshness = None
+        if self.frame_deadline.enabled:
+            self.freshness = self.frame_deadline.freshness(self._state_regions(regions_list), frame_time)
+        return self.freshness
+    
     # 1.处理一帧画面
     def process_frame(self, regions_list: List[str]) -> dict:
         """
@@ -473,114 +991,54 @@ class DataCollector:
             regions_list: 需要处理的区域名称列表
             
         Returns:
-            dict: 处理后的数据,格式为 {区域名: 处理结果}
+            dict: 处理后的数据,格式为 {区域名: 处理结果};
+            启用截止时间模式(basic_config.deadline)时,本帧的新鲜度 {区域名: {'fresh', 'age'}} 保存在
+            self.freshness 中,覆盖全部启用状态管理的请求区域(包括本帧没有结果的区域),不写入状态管理器
             
         Raises:
             Exception: 处理过程中的错误
         """
         # 生成时间戳，用于调试图片的保存等
         # 确保时间戳小数点后有7位数字
-        timestamp = f"{time.time():.7f}".replace('.', '_')
+        frame_time = time.time()
+        timestamp = f"{frame_time:.7f}".replace('.', '_')
             
         self.timestamp = timestamp
         # 初始化处理结果字典
         processed_data = {}
         
         try:
-            # 1. 从配置中筛选出已启用的区域
-            enabled_regions = [
-                region_name for region_name in regions_list
-                if self.area_config.get(region_name, {}).get('Enabled', False)
-            ]
-            
+            enabled_regions = self._begin_frame(regions_list, frame_time, processed_data)
             self.logger.info(f"开始处理区域: {enabled_regions}")
             
-            # 2. 逐个处理每个启用的区域
-            for region_name in enabled_regions:
-                # 获取当前区域的配置信息
-                region_config = self.area_config.get(region_name)
-                if not region_config:
-                    self.logger.warning(f"找不到区域配置: {region_name}")
-                    continue
-                    
-                # 获取调试相关配置
-                debug_mode = region_config.get('debug_mode').get('Enabled')
-                save_debug = region_config.get('save_debug').get('Enabled')
-                
-                self.logger.debug(f"处理区域 {region_name} - debug_mode: {debug_mode}, save_debug: {save_debug}")
-                    
-                # 3. 屏幕捕获 (只在处理第一个区域时执行一次)
-                if region_name == enabled_regions[0]:
-                    if region_config.get('screen_capture').get('Enabled',True):
-                        self.logger.info(f"捕获屏幕区域: {region_name}")
-                        save_capture = region_config.get('screen_capture').get('save_capture')
-                        self.capture_screen(save_capture = save_capture)
-                
-                # 4. 区域分割
-                # 根据配置的坐标将完整屏幕图像分割成各个区域
-                if region_config.get('screen_split').get('Enabled'):
-                    self.logger.info(f"分割区域: {region_name}")
-                    save_split = region_config.get('screen_split').get('save_split')
-                    self.split_regions([region_name], 
-                                     save_split=save_split,
-                                     debug_mode=debug_mode,
-                                     timestamp=timestamp,
-                                     )
+            # 2. 按依赖图分波次处理区域: 门控区域先处理，门控关闭的子树在截图与分割前剪除
+            captured = False
+            for wave in self.region_graph.waves(enabled_regions):
+                # 3. 屏幕捕获 (只在处理第一个波次前执行一次)
+                if not captured:
+                    captured = True
+                    screen = self._capture_for_wave(wave)
+                    if screen is not None:
+                        self.current_screen = screen
                 
-                # 5. 图像预处理
-                # 对分割后的区域图像进行预处理（如二值化、降噪等）
-                if region_config.get('image_preprocess', {}).get('Enabled'):
-                    self.logger.info(f"预处理图像: {region_name}")
-                    self.preprocess_images([region_name], 
-                                        save_debug=save_debug,
-                                        debug_mode=debug_mode,
-                                        timestamp=timestamp)
-                else:
-                    # 当预处理被禁用时，直接使用分割后的原始图像
-                    self.preprocessed_images = self.current_regions
+                wave = self._admit_wave(wave, frame_time, processed_data)
+                if not wave:
+                    continue
                 
-                # 6. OCR文字识别
-                # 对预处理后的图像进行OCR识别
-                if region_config.get('text_recognizer', {}).get('Enabled'):
-                    self.logger.info(f"文字识别: {region_name}")
-                    ocr_results = self.recognize_text([region_name],
-                                                        debug_mode=debug_mode,
-                                                        save_debug=save_debug,  
-                                                   timestamp=timestamp)
-                    # 如果有识别结果，保存到处理结果字典中
-                    if ocr_results:
-                        processed_data[region_name] = ocr_results.get(region_name, {})
-                else:   
-                    # 如果OCR被禁用，则直接使用预处理后的图像
-                    processed_data[region_name] = self.preprocessed_images.get(region_name, {})
-
-                # 7. 数据处理       
-                # 对OCR结果进行后处理（如数据提取、格式化等）
-                if region_config.get('data_processor', {}).get('Enabled'):
-                    self.logger.info(f"数据处理: {region_name}")
-                    if region_name in processed_data:  
-                        processed_data[region_name] = self.data_processor.process_region(
-                            region_name,
-                            processed_data[region_name],  # OCR结果
-                            self.preprocessed_images.get(region_name),  # 预处理后的图像
-                            region_config  # 区域配置
-                        )
-                        
-                # 8. 处理区域依赖关系
-                self.handle_region_dependencies(region_name, processed_data)
-
+                # 4~8. 分割、预处理、文字识别、数据处理、区域依赖
+                for region_name, (data, duration_ms) in self._run_wave(wave, timestamp).items():
+                    self._finish_region(region_name, data, duration_ms, frame_time, processed_data)
+            
             # 9. 状态更新 (移到循环外)
             # 在所有区域处理完成后，先过滤掉未启用状态管理的区域数据
-            enabled_states = {
-                region_name: data 
-                for region_name, data in processed_data.items()
-                if self.area_config.get(region_name, {}).get('state_manager', {}).get('Enabled', False)
-            }
+            enabled_states = self._end_frame(processed_data)
             
             # 更新状态管理器中的数据
             if enabled_states:
                 self.update_state(enabled_states, timestamp)
             
+            self._update_freshness(regions_list, frame_time)
+            
             self.logger.info("帧处理完成")
             
             return enabled_states  # 返回所有处理数据，而不是只返回 enabled_states
@@ -589,6 +1047,30 @@ class DataCollector:
             self.logger.error(f"处理帧时出错: {e}", exc_info=True)
             raise
 
+    def dump_trace(self, path: Optional[Union[str, Path]] = None) -> Path:
+        """
+        输出环形缓冲区中的追踪区间(Chrome/Perfetto trace-event JSON)
+        
+        Args:
+            path: 输出文件,默认写入 basic_config.tracing.output_dir
+            
+        Returns:
+            Path: 输出文件路径
+        """
+        return self.tracer.dump(path)
+
+    def close(self):
+        """
+        结束采集: 写出状态日志与黄金输出语料中尚未保存的数据,关闭区域线程池
+        
+        采集循环(逐帧、流水线、异步运行时)结束后调用,可重复调用
+        """
+        self.state_manager.close()
+        self.golden_recorder.close()
+        if self._region_executor is not None:
+            self._region_executor.shutdown(wait=True)
+            self._region_executor = None
+
     # 11. 执行动作  
     def execute_action(self, action_type: str, **params):
         """
@@ -623,6 +1105,21 @@ class DataCollector:
         self.action_executor.execute_action_sequence(actions)
 
     
+def parse_args():
+    """解析命令行参数"""
+    import argparse
+    parser = argparse.ArgumentParser(description='游戏状态数据采集')
+    parser.add_argument('--profile', type=str, default=None,
+                        choices=['cprofile', 'sampling', 'tracemalloc'],
+                        help='性能剖析模式: 处理 --profile_frames 帧后输出按阶段/区域分组的报告并退出')
+    parser.add_argument('--profile_frames', type=int, default=50,
+                        help='性能剖析的帧数')
+    parser.add_argument('--profile_warmup', type=int, default=1,
+                        help='性能剖析前的预热帧数(不计入剖析)')
+    parser.add_argument('--profile_output', type=str, default=None,
+                        help='性能剖析输出目录,默认为 base_output_dir/profiles')
+    return parser.parse_args()
+
 def main():
     """
     主函数
@@ -631,9 +1128,11 @@ def main():
     1. 初始化配置和日志
     2. 创建数据采集器
     3. 打印区域配置信息
-    4. 进入主循环处理画面
+    4. 进入主循环处理画面(或 --profile 时剖析N帧)
     5. 处理退出和异常
     """
+    args = parse_args()
+    
     # 配置文件路径
     basic_config_path = project_root / "config/env/status_collection_config.yaml"
 
@@ -681,7 +1180,43 @@ def main():
         if name != 'basic_config' and isinstance(config_manager.config[name], dict)
     ]
     
+    # 性能剖析: 处理N帧并输出报告
+    if args.profile:
+        from src.utils.profiling import FrameProfiler
+        try:
+            FrameProfiler(processor, mode=args.profile, output_dir=args.profile_output, logger=logger).run(
+                regions_to_process, frames=args.profile_frames, warmup=args.profile_warmup)
+        finally:
+            processor.close()
+        return
+    
+    import keyboard
+    
     try:
+        # 流水线采集: 各阶段由独立的工作者执行，截图与识别重叠进行
+        if config_manager.basic_config.get('pipeline', {}).get('Enabled'):
+            from src.data.pipeline import PipelinedCollector
+            PipelinedCollector(processor).run(
+                regions_to_process,
+                on_result=lambda frame_id, result: logger.info(
+                    f"第 {frame_id} 帧处理结果: {result['data']}, 延迟: {result['latency_ms']:.1f}ms"),
+                should_stop=lambda: keyboard.is_pressed('q')
+            )
+            logger.info("程序退出")
+            return
+        
+        # 异步运行时: 截图节奏、状态发布、动作执行与按键监听在同一事件循环中协作运行
+        if config_manager.basic_config.get('async_runtime', {}).get('Enabled'):
+            import asyncio
+            from src.data.async_collector import AsyncDataCollector
+            runtime = AsyncDataCollector(processor)
+            runtime.subscribe(lambda timestamp, data, freshness: logger.info(f"处理结果: {data}"))
+            try:
+                asyncio.run(runtime.run(regions_to_process))
+            finally:
+                runtime.close()
+            return
+        
         while True:
             # 记录循环开始时间
             loop_start_time = time.time()
@@ -706,6 +1241,9 @@ def main():
         logger.warning("程序被用户中断")
     except Exception as e:
         logger.error(f"发生错误: {e}")
+    finally:
+        # 写出尚未保存的状态
+        processor.close()
 
 if __name__ == "__main__":
     main()
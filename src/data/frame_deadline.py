@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+帧截止时间模块
+
+OCR变慢时(如 game_area 中人物很多) process_frame 会随之变慢,下游看到的状态全部过期。
+该模块为每一帧设置延迟预算并在预算接近用完时卸载负载:
+1. 每个波次开始前,按区域优先级从高到低、以调度器统计的区域耗时估算开销
+2. 关键区域(优先级不低于 critical_priority)总是处理
+3. 其余区域在剩余预算不足时推迟到后续帧;推迟超过 max_stale_age 的区域视为关键区域
+4. 记录每个区域最近一次实际产生结果的时间,随返回数据(DataCollector.freshness)提供各区域是本帧测量(fresh)还是沿用旧值(stale)及其年龄
+
+basic_config.deadline:
+    Enabled: 是否启用
+    frame_budget_ms: 每帧延迟预算(毫秒),包含截图时间
+    critical_priority: 关键区域的最低优先级
+    max_stale_age: 非关键区域最多推迟多久(秒)
+
+主要类:
+- FrameDeadline: 帧截止时间与负载卸载
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+# 默认截止时间配置
+DEFAULT_DEADLINE_CONFIG = {
+    'Enabled': False,
+    'frame_budget_ms': 200.0,
+    'critical_priority': 10,
+    'max_stale_age': 5.0
+}
+
+
+class FrameDeadline:
+    """
+    帧截止时间与负载卸载
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        enabled (bool): 是否启用
+        frame_budget_ms (float): 每帧延迟预算
+        last_measured (Dict[str, float]): 区域最近一次实际测量的时间
+        shed_counts (Dict[str, int]): 区域被卸载的次数
+    """
+
+    MODULE_NAME = 'FrameDeadline'
+
+    def __init__(self, basic_config: dict, logger: logging.Logger):
+        """初始化帧截止时间
+
+        Args:
+            basic_config: 基础配置字典
+            logger: 日志实例
+        """
+        self.logger = logger
+        self.logger.info("<<<<<<<<<<<<<<<<<<帧截止时间初始化开始...>>>>>>>>>>>>>>>>>>")
+        config = dict(DEFAULT_DEADLINE_CONFIG)
+        config.update(basic_config.get('deadline') or {})
+        self.enabled = bool(config['Enabled'])
+        self.frame_budget_ms = float(config['frame_budget_ms'])
+        self.critical_priority = float(config['critical_priority'])
+        self.max_stale_age = float(config['max_stale_age'])
+
+        self.frame_start = None
+        self.frame_time = None
+        self.last_measured: Dict[str, float] = {}
+        self.shed_counts: Dict[str, int] = {}
+        self.logger.info(f"帧截止时间: {'启用' if self.enabled else '关闭'}, 每帧预算 {self.frame_budget_ms}ms")
+        self.logger.info("=========================帧截止时间初始化完成=========================")
+
+    def start_frame(self, frame_time: Optional[float] = None):
+        """开始计时一帧
+
+        Args:
+            frame_time: 帧时间,默认为 time.time()
+        """
+        self.frame_start = time.perf_counter()
+        self.frame_time = time.time() if frame_time is None else frame_time
+
+    def elapsed_ms(self) -> float:
+        """本帧已用时间(毫秒)"""
+        return 0.0 if self.frame_start is None else (time.perf_counter() - self.frame_start) * 1000
+
+    def remaining_ms(self) -> float:
+        """本帧剩余预算(毫秒)"""
+        return self.frame_budget_ms - self.elapsed_ms()
+
+    def age(self, region_name: str, now: Optional[float] = None) -> float:
+        """距区域上次实际测量的时间(秒),未测量过时为无穷大"""
+        if region_name not in self.last_measured:
+            return float('inf')
+        now = time.time() if now is None else now
+        return max(now - self.last_measured[region_name], 0.0)
+
+    def is_critical(self, region_name: str, scheduler, now: Optional[float] = None) -> bool:
+        """区域是否必须在本帧处理: 优先级达到关键级别,或推迟时间超过 max_stale_age"""
+        if scheduler.priority(region_name) >= self.critical_priority:
+            return True
+        return self.age(region_name, now) >= self.max_stale_age
+
+    def admit(self, wave: List[str], scheduler) -> Tuple[List[str], List[str]]:
+        """按剩余预算选择波次中本帧处理的区域
+
+        Args:
+            wave: 依赖图输出的一个波次
+            scheduler: RegionScheduler,提供区域优先级与耗时估计
+
+        Returns:
+            Tuple[List[str], List[str]]: (本帧处理的区域, 卸载的区域),均保持波次中的原有顺序
+        """
+        if not self.enabled:
+            return list(wave), []
+        remaining = self.remaining_ms()
+        ranked = sorted(wave, key=scheduler.priority, reverse=True)
+        admitted = set()
+        spent_ms = 0.0
+        for region_name in ranked:
+            cost = scheduler.costs.get(region_name, 0.0)
+            if self.is_critical(region_name, scheduler, self.frame_time) or spent_ms + cost <= remaining:
+                admitted.add(region_name)
+                spent_ms += cost
+        shed = [region_name for region_name in wave if region_name not in admitted]
+        for region_name in shed:
+            self.shed_counts[region_name] = self.shed_counts.get(region_name, 0) + 1
+        if shed:
+            self.logger.debug(f"本帧剩余预算 {remaining:.1f}ms,卸载区域: {shed}")
+        return [region_name for region_name in wave if region_name in admitted], shed
+
+    def measured(self, region_name: str, now: Optional[float] = None):
+        """记录区域完成了一次实际测量"""
+        self.last_measured[region_name] = time.time() if now is None else now
+
+    def freshness(self, regions: List[str], now: Optional[float] = None) -> Dict[str, Dict[str, object]]:
+        """区域数据的新鲜度
+
+        Args:
+            regions: 区域名称列表
+            now: 当前时间,默认为帧时间
+
+        Returns:
+            Dict[str, Dict]: {区域名: {'fresh': 是否为本帧测量, 'age': 距上次测量的秒数(未测量过为None)}}
+        """
+        now = (self.frame_time if self.frame_time is not None else time.time()) if now is None else now
+        result = {}
+        for region_name in regions:
+            age = self.age(region_name, now)
+            result[region_name] = {
+                'fresh': self.last_measured.get(region_name) == now,
+                'age': None if age == float('inf') else round(age, 3)
+            }
+        return result
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+黄金输出语料模块
+
+采集时按间隔记录 (整屏截图, 各区域OCR结果, 各区域处理结果) 三元组,形成紧凑的回归语料;
+对增益测量、文本行合并、颜色分割、OCR批处理等的优化都可能悄悄改变 DataProcessor.process_region 的输出,
+src/benchmark/golden_check.py 用当前代码回放语料并按区域报告差异。
+
+1. 只记录本帧实际测量且启用了数据处理的区域(状态估计值/推迟区域的预测值不记录)
+2. 每 interval 帧记录一帧,处理结果与上次记录完全相同时跳过(skip_unchanged),最多记录 max_frames 帧
+3. 截图以PNG保存,OCR结果与处理结果各保存为一个JSON文件,定期写入(先写临时文件再替换),进程退出时再写一次
+4. 语料目录即回放录制目录(见 src/environment/replay.py),也可用于 pipeline_benchmark
+5. 逐区域处理与异步运行时均会记录;流水线采集(basic_config.pipeline)不记录
+
+语料目录结构:
+    output_dir/<会话时间>/
+    ├── frames/000000.png
+    ├── ocr_results.json       # {帧名称: {区域名: OCRResult.to_dict()}}
+    └── golden.json            # {'regions': {区域名: 坐标}, 'frames': {帧名称: {'frame_id', 'timestamp', 'outputs'}}}
+
+basic_config.golden_corpus:
+    Enabled: 是否启用
+    output_dir: 语料目录(相对 base_output_dir)
+    interval: 每N帧记录一帧
+    max_frames: 最多记录的帧数
+    skip_unchanged: 处理结果与上次记录相同时不记录
+    flush_every: 每记录N帧写入一次JSON文件
+
+主要类与函数:
+- GoldenRecorder: 采集时记录语料
+- to_jsonable: 将处理结果转换为可JSON序列化的值
+- load_golden: 加载语料
+"""
+
+import os
+import json
+import atexit
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from src.environment.ocr_result import OCRResult
+
+# 语料文件格式版本
+SCHEMA_VERSION = 1
+
+# 默认语料配置
+DEFAULT_GOLDEN_CONFIG = {
+    'Enabled': False,
+    'output_dir': 'golden',
+    'interval': 10,
+    'max_frames': 500,
+    'skip_unchanged': True,
+    'flush_every': 20
+}
+
+
+def to_jsonable(value: Any) -> Any:
+    """将处理结果转换为可JSON序列化的值(OCRResult、NumPy标量与数组、元组)"""
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, OCRResult):
+        return to_jsonable(value.to_dict())
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def write_json(path: Path, data: Any):
+    """先写临时文件再替换,中途退出不会留下不完整的文件"""
+    temp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def load_golden(corpus_dir: Union[str, Path]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """加载语料的处理结果
+
+    Args:
+        corpus_dir: 语料目录
+
+    Returns:
+        Tuple: (记录时的区域坐标 {区域名: 坐标}, {帧名称: {'frame_id', 'timestamp', 'outputs'}})
+
+    Raises:
+        FileNotFoundError: 目录中没有 golden.json 时抛出
+    """
+    golden_file = Path(corpus_dir) / 'golden.json'
+    if not golden_file.exists():
+        raise FileNotFoundError(f"语料目录中没有 golden.json: {corpus_dir}")
+    with open(golden_file, 'r', encoding='utf-8') as f:
+        golden = json.load(f)
+    return golden.get('regions', {}), golden.get('frames', {})
+
+
+class GoldenRecorder:
+    """
+    黄金输出语料记录器
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        enabled (bool): 是否启用
+        corpus_dir (Path): 本次会话的语料目录
+        recorded (int): 已记录的帧数
+    """
+
+    MODULE_NAME = 'GoldenRecorder'
+
+    def __init__(self, basic_config: dict, area_config: dict, logger: logging.Logger):
+        """初始化语料记录器
+
+        Args:
+            basic_config: 基础配置字典
+            area_config: 区域配置字典
+            logger: 日志实例
+        """
+        self.logger = logger
+        self.logger.info("<<<<<<<<<<<<<<<<<<黄金输出语料记录器初始化开始...>>>>>>>>>>>>>>>>>>")
+        self.area_config = area_config
+        config = dict(DEFAULT_GOLDEN_CONFIG)
+        config.update(basic_config.get('golden_corpus') or {})
+        self.enabled = bool(config['Enabled'])
+        self.interval = max(1, int(config['interval']))
+        self.max_frames = int(config['max_frames'])
+        self.skip_unchanged = bool(config['skip_unchanged'])
+        self.flush_every = max(1, int(config['flush_every']))
+        self.corpus_dir = (Path(basic_config.get('base_output_dir', 'output')) / config['output_dir']
+                           / datetime.now().strftime('%Y%m%d_%H%M%S'))
+
+        self.recorded = 0
+        self._frames_seen = 0
+        self._last_outputs = None
+        self._ocr_results: Dict[str, Dict[str, Any]] = {}
+        self._golden: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if self.enabled:
+            atexit.register(self.close)
+            self.logger.info(f"语料目录: {self.corpus_dir}, 每 {self.interval} 帧记录一帧, 最多 {self.max_frames} 帧")
+        self.logger.info("=========================黄金输出语料记录器初始化完成=========================")
+
+    def record(self, frame_id: int, timestamp: Optional[str], screen: Optional[np.ndarray],
+               ocr_results: Dict[str, Any], outputs: Dict[str, Any]) -> bool:
+        """记录一帧
+
+        Args:
+            frame_id: 帧ID
+            timestamp: 帧时间戳
+            screen: 本帧整屏截图
+            ocr_results: 本帧各区域的OCR结果
+            outputs: 本帧实际测量的区域处理结果 {区域名: 处理结果}
+
+        Returns:
+            bool: 是否记录了该帧
+        """
+        if not self.enabled or screen is None or self.recorded >= self.max_frames:
+            return False
+        self._frames_seen += 1
+        if (self._frames_seen - 1) % self.interval:
+            return False
+
+        outputs = {
+            region_name: to_jsonable(data) for region_name, data in outputs.items()
+            if self.area_config.get(region_name, {}).get('data_processor', {}).get('Enabled')
+            and not isinstance(data, np.ndarray)
+        }
+        if not outputs or (self.skip_unchanged and outputs == self._last_outputs):
+            return False
+
+        with self._lock:
+            name = f"{self.recorded:06d}"
+            frames_dir = self.corpus_dir / 'frames'
+            frames_dir.mkdir(parents=True, exist_ok=True)
+            # 使用imencode以兼容Windows下的中文路径
+            ok, encoded = cv2.imencode('.png', screen, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+            if not ok:
+                self.logger.error(f"编码截图失败: 第 {frame_id} 帧")
+                return False
+            encoded.tofile(str(frames_dir / f"{name}.png"))
+
+            self._ocr_results[name] = {
+                region_name: to_jsonable(ocr_results[region_name])
+                for region_name in outputs if isinstance(ocr_results.get(region_name), (OCRResult, dict))
+            }
+            self._golden[name] = {'frame_id': frame_id, 'timestamp': timestamp, 'outputs': outputs}
+            self._last_outputs = outputs
+            self.recorded += 1
+            self._dirty = True
+            if self.recorded % self.flush_every == 0 or self.recorded >= self.max_frames:
+                self._flush()
+        if self.recorded >= self.max_frames:
+            self.logger.info(f"黄金输出语料已记录 {self.recorded} 帧,停止记录: {self.corpus_dir}")
+        return True
+
+    def _flush(self):
+        """写入OCR结果与处理结果文件"""
+        if not self._dirty:
+            return
+        regions = {
+            region_name: self.area_config[region_name].get('screen_split', {}).get('coordinates')
+            for region_name in sorted({region for frame in self._golden.values() for region in frame['outputs']})
+        }
+        write_json(self.corpus_dir / 'ocr_results.json', self._ocr_results)
+        write_json(self.corpus_dir / 'golden.json', {
+            'schema_version': SCHEMA_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'regions': regions,
+            'frames': self._golden
+        })
+        self._dirty = False
+
+    def close(self):
+        """写入尚未保存的记录"""
+        with self._lock:
+            try:
+                self._flush()
+            except Exception as e:
+                self.logger.error(f"保存黄金输出语料失败: {e}")
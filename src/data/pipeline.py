@@ -0,0 +1,589 @@
+# -*- coding: utf-8 -*-
+"""
+流水线采集模块
+
+DataCollector.process_frame 中截图、分割、预处理、OCR、数据处理与状态写入对每一帧严格串行执行。
+该模块把这些阶段拆成流水线:
+1. 每个阶段由独立的工作者(线程或进程,按阶段配置)执行,阶段之间以有界队列连接
+2. 每帧分配递增的帧ID,输出端按帧ID有序输出并丢弃过期帧
+3. 队列深度与丢帧策略可配置: drop_oldest 队列满时丢弃最旧的帧, block 队列满时阻塞上游
+4. 第 N 帧在OCR阶段时,第 N+1 帧已可截图与预处理,吞吐量接近最慢单个阶段的速度
+5. 停止前先排空: 等待已提交的帧全部输出或被丢弃(有总超时),再停止工作者
+
+区域选择(状态估计、调度、门控剪除与预测值发布)与结果记录(测量时间、状态估计观测、门控判定、调度耗时、
+新鲜度)复用 DataCollector 的帧处理步骤,且只在截图线程中执行: 工作者只处理帧数据,不修改采集器的共享状态,
+处理结果随输出返回后由截图线程写回。因此门控判定与状态估计从该帧输出之后截取的帧开始生效
+(逐帧处理时在同一帧内生效)。调试模式需要弹出窗口,流水线中不显示调试图像,也不记录黄金输出语料。
+
+basic_config.pipeline:
+    Enabled: 是否使用流水线采集(collector.py 的 main 中生效)
+    queue_size: 阶段输入队列的默认深度
+    drop_policy: 默认丢帧策略(drop_oldest/block)
+    capture_interval: 两次截图的最小间隔(秒)
+    drain_timeout: 停止前等待已提交帧处理完成的最长时间(秒)
+    stages: {阶段名: {worker: thread/process, queue_size, drop_policy}},
+            阶段名为 split/preprocess/ocr/process/state;
+            进程工作者要求阶段处理器可序列化,只适用于 split/preprocess
+
+主要类:
+- Stage: 流水线阶段定义
+- Pipeline: 通用的多阶段流水线
+- PipelinedCollector: 基于 DataCollector 处理模块的流水线采集器
+"""
+
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.utils.metrics import get_metrics
+from src.utils.tracing import get_tracer
+
+# 默认流水线配置
+DEFAULT_PIPELINE_CONFIG = {
+    'Enabled': False,
+    'queue_size': 2,
+    'drop_policy': 'drop_oldest',
+    'capture_interval': 0.0,
+    'drain_timeout': 5.0,
+    'stages': {}
+}
+
+# 丢帧策略
+DROP_POLICIES = ('drop_oldest', 'block')
+
+# 工作者类型
+WORKER_TYPES = ('thread', 'process')
+
+# 工作者退出信号
+STOP = None
+
+
+class Stage:
+    """
+    流水线阶段定义
+
+    属性:
+        name (str): 阶段名称
+        func (Callable): 处理函数,输入上一阶段的输出,返回本阶段的输出;返回None表示丢弃该帧
+        worker (str): 工作者类型 thread/process,进程工作者要求 func 可序列化
+        queue_size (int): 输入队列深度
+        drop_policy (str): 输入队列满时的策略 drop_oldest/block
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], worker: str = 'thread',
+                 queue_size: int = 2, drop_policy: str = 'drop_oldest'):
+        if worker not in WORKER_TYPES:
+            raise ValueError(f"阶段 {name} 的工作者类型无效: {worker}")
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"阶段 {name} 的丢帧策略无效: {drop_policy}")
+        self.name = name
+        self.func = func
+        self.worker = worker
+        self.queue_size = max(1, int(queue_size))
+        self.drop_policy = drop_policy
+
+
+def _run_process_stage(func: Callable[[Any], Any], input_queue, output_queue):
+    """进程工作者入口: 处理输入队列中的 (帧ID, 数据),异常时输出 (帧ID, None, 错误信息)"""
+    while True:
+        item = input_queue.get()
+        if item is STOP:
+            break
+        frame_id, payload = item
+        start = time.perf_counter()
+        try:
+            output_queue.put((frame_id, func(payload), None, (time.perf_counter() - start) * 1000))
+        except Exception as e:
+            output_queue.put((frame_id, None, repr(e), (time.perf_counter() - start) * 1000))
+
+
+class Pipeline:
+    """
+    通用的多阶段流水线
+
+    阶段之间以有界队列连接,每个阶段只有一个工作者,帧在各阶段中按进入顺序流动;
+    输出端按帧ID检查顺序,晚于已输出帧的结果会被丢弃
+
+    属性:
+        stages (List[Stage]): 阶段列表
+        stats (Dict[str, Dict]): 各阶段的处理数、丢帧数、错误数与累计耗时
+        in_flight (int): 已提交但尚未输出或丢弃的帧数
+    """
+
+    def __init__(self, stages: List[Stage], logger: logging.Logger, output_size: int = 8):
+        """初始化流水线
+
+        Args:
+            stages: 阶段列表,按执行顺序排列
+            logger: 日志实例
+            output_size: 输出队列深度,满时丢弃最旧的结果
+        """
+        if not stages:
+            raise ValueError("流水线至少需要一个阶段")
+        self.stages = stages
+        self.logger = logger
+        self.output_size = max(1, int(output_size))
+        self.stats = {
+            stage.name: {'processed': 0, 'dropped': 0, 'errors': 0, 'total_ms': 0.0}
+            for stage in stages
+        }
+        self._stats_lock = threading.Lock()
+        self.metrics = get_metrics()
+        self.tracer = get_tracer()
+        self._queues = []
+        self._workers = []
+        self._running = False
+        self._next_frame_id = 0
+        self._last_output_id = -1
+        self.in_flight = 0
+
+    def _make_queue(self, stage: Stage):
+        """创建阶段的输入队列,进程工作者使用进程间队列"""
+        if stage.worker == 'process':
+            return multiprocessing.Queue(maxsize=stage.queue_size)
+        return queue.Queue(maxsize=stage.queue_size)
+
+    def start(self):
+        """启动所有阶段的工作者"""
+        if self._running:
+            return
+        self._running = True
+        self.in_flight = 0
+        self._queues = [self._make_queue(stage) for stage in self.stages]
+        self._output = queue.Queue(maxsize=self.output_size)
+        self._workers = []
+        for index, stage in enumerate(self.stages):
+            if stage.worker == 'process':
+                # 进程工作者的结果先进入中转队列,由转发线程按下一阶段的丢帧策略放入下游
+                results = multiprocessing.Queue(maxsize=stage.queue_size)
+                process = multiprocessing.Process(
+                    target=_run_process_stage, args=(stage.func, self._queues[index], results),
+                    name=f'pipeline-{stage.name}', daemon=True
+                )
+                process.start()
+                forwarder = threading.Thread(target=self._forward_process_results, args=(index, results, process.pid),
+                                             name=f'pipeline-{stage.name}-forward', daemon=True)
+                forwarder.start()
+                self._workers.append((process, forwarder))
+            else:
+                thread = threading.Thread(target=self._run_thread_stage, args=(index,),
+                                          name=f'pipeline-{stage.name}', daemon=True)
+                thread.start()
+                self._workers.append((thread,))
+        self.logger.info(
+            f"流水线已启动: {[(stage.name, stage.worker, stage.queue_size, stage.drop_policy) for stage in self.stages]}"
+        )
+
+    def stop(self, timeout: float = 5.0):
+        """停止所有工作者,未处理完的帧被丢弃(需要保留结果时先调用 drain)"""
+        if not self._running:
+            return
+        self._running = False
+        for stage_queue in self._queues:
+            self._clear(stage_queue)
+            try:
+                stage_queue.put_nowait(STOP)
+            except queue.Full:
+                pass
+        for workers in self._workers:
+            for worker in workers:
+                worker.join(timeout)
+        self.logger.info(f"流水线已停止, 统计: {self.report()}")
+
+    @staticmethod
+    def _clear(stage_queue):
+        """清空队列"""
+        while True:
+            try:
+                stage_queue.get_nowait()
+            except (queue.Empty, EOFError, OSError):
+                return
+
+    def _offer(self, index: int, item: Tuple[int, Any]) -> bool:
+        """按第 index 个阶段的丢帧策略放入其输入队列(index 等于阶段数时放入输出队列)
+
+        Returns:
+            bool: 是否未丢弃任何帧
+        """
+        if index == len(self.stages):
+            target, policy, name = self._output, 'drop_oldest', None
+        else:
+            stage = self.stages[index]
+            target, policy, name = self._queues[index], stage.drop_policy, stage.name
+        if name is not None:
+            self._record_depth(name, target)
+        while self._running:
+            try:
+                if policy == 'block':
+                    target.put(item, timeout=0.1)
+                    return True
+                target.put_nowait(item)
+                return True
+            except queue.Full:
+                if policy == 'block':
+                    continue
+                try:
+                    target.get_nowait()
+                except queue.Empty:
+                    continue
+                self._retire()
+                if name is not None:
+                    self._count(name, 'dropped')
+                # 丢弃最旧的帧后重新放入
+                try:
+                    target.put_nowait(item)
+                except queue.Full:
+                    continue
+                return False
+        # 已停止,该帧不再进入下游
+        self._retire()
+        return False
+
+    def _retire(self):
+        """一帧离开流水线(输出、丢弃、出错或被阶段过滤)"""
+        with self._stats_lock:
+            self.in_flight -= 1
+
+    def _count(self, name: str, key: str, elapsed_ms: float = 0.0):
+        """更新阶段统计,同时记录到性能指标"""
+        with self._stats_lock:
+            self.stats[name][key] += 1
+            self.stats[name]['total_ms'] += elapsed_ms
+        if key == 'processed':
+            self.metrics.observe(f'pipeline.{name}', None, elapsed_ms)
+        else:
+            self.metrics.increment(key, f'pipeline.{name}')
+
+    def _record_depth(self, name: str, stage_queue):
+        """记录队列深度(部分平台的进程间队列不支持 qsize)"""
+        try:
+            self.metrics.set_gauge(f'queue.{name}', stage_queue.qsize())
+        except NotImplementedError:
+            pass
+
+    def _run_thread_stage(self, index: int):
+        """线程工作者: 处理输入队列中的帧并放入下一阶段"""
+        stage = self.stages[index]
+        input_queue = self._queues[index]
+        while True:
+            item = input_queue.get()
+            if item is STOP or not self._running:
+                break
+            frame_id, payload = item
+            start = time.perf_counter()
+            start_ns = time.perf_counter_ns()
+            self.tracer.set_thread_frame(frame_id)
+            try:
+                result = stage.func(payload)
+            except Exception as e:
+                self._count(stage.name, 'errors', (time.perf_counter() - start) * 1000)
+                self.logger.error(f"流水线阶段 {stage.name} 处理第 {frame_id} 帧出错: {e}", exc_info=True)
+                self._retire()
+                continue
+            self._count(stage.name, 'processed', (time.perf_counter() - start) * 1000)
+            self.tracer.add_span(f'pipeline.{stage.name}', start_ns, time.perf_counter_ns(), frame_id=frame_id)
+            if result is not None:
+                self._offer(index + 1, (frame_id, result))
+            else:
+                self._retire()
+
+    def _forward_process_results(self, index: int, results, pid: int):
+        """将进程工作者的结果转发到下一阶段"""
+        stage = self.stages[index]
+        while self._running:
+            try:
+                frame_id, result, error, elapsed_ms = results.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            if error is not None:
+                self._count(stage.name, 'errors', elapsed_ms)
+                self.logger.error(f"流水线阶段 {stage.name} 处理第 {frame_id} 帧出错: {error}")
+                self._retire()
+                continue
+            self._count(stage.name, 'processed', elapsed_ms)
+            # 进程工作者的区间按结果到达时间回推,记录在工作进程的进程ID下
+            end_ns = time.perf_counter_ns()
+            self.tracer.add_span(f'pipeline.{stage.name}', end_ns - int(elapsed_ms * 1e6), end_ns,
+                                 frame_id=frame_id, pid=pid, tid=0)
+            if result is not None:
+                self._offer(index + 1, (frame_id, result))
+            else:
+                self._retire()
+
+    def submit(self, payload: Any) -> int:
+        """提交一帧到第一个阶段
+
+        Returns:
+            int: 分配的帧ID
+        """
+        frame_id = self._next_frame_id
+        self._next_frame_id += 1
+        with self._stats_lock:
+            self.in_flight += 1
+        self._offer(0, (frame_id, payload))
+        return frame_id
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[int, Any]]:
+        """按帧ID顺序取出一帧的最终结果,超时返回None"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            try:
+                frame_id, result = self._output.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            self._retire()
+            if frame_id > self._last_output_id:
+                self._last_output_id = frame_id
+                return frame_id, result
+            self.logger.debug(f"丢弃过期的第 {frame_id} 帧结果")
+
+    def drain(self, timeout: float) -> Iterator[Tuple[int, Any]]:
+        """按帧ID顺序取出剩余结果,直到已提交的帧全部输出或被丢弃
+
+        Args:
+            timeout: 总超时时间(秒),超时后仍未完成的帧在 stop 时被丢弃
+
+        Yields:
+            Tuple[int, Any]: (帧ID, 最终结果)
+        """
+        deadline = time.monotonic() + timeout
+        while self.in_flight > 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.logger.warning(f"流水线排空超时,丢弃 {self.in_flight} 帧未完成的结果")
+                return
+            output = self.get(timeout=min(remaining, 0.1))
+            if output is not None:
+                yield output
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """各阶段统计: 处理数、丢帧数、错误数与平均耗时"""
+        with self._stats_lock:
+            return {
+                name: {
+                    'processed': stats['processed'],
+                    'dropped': stats['dropped'],
+                    'errors': stats['errors'],
+                    'avg_ms': round(stats['total_ms'] / max(stats['processed'] + stats['errors'], 1), 2)
+                }
+                for name, stats in self.stats.items()
+            }
+
+
+def split_stage(screen_splitter, frame: dict) -> dict:
+    """分割阶段: 一次分割本帧的全部区域"""
+    regions = [r for r in frame['regions'] if frame['area_config'][r].get('screen_split', {}).get('Enabled')]
+    screen = frame.pop('screen')
+    frame['images'] = screen_splitter.process_image(screen, regions, timestamp=frame['timestamp']) if regions else {}
+    return frame
+
+
+def preprocess_stage(image_preprocessor, frame: dict) -> dict:
+    """预处理阶段: 一次预处理本帧的全部区域,未启用预处理的区域直接使用分割后的原始图像"""
+    area_config = frame['area_config']
+    images = frame['images']
+    regions = [r for r in frame['regions']
+               if area_config[r].get('image_preprocess', {}).get('Enabled') and r in images]
+    preprocessed = dict(images)
+    if regions:
+        preprocessed.update(image_preprocessor.process_images(
+            images, regions_to_process=regions, timestamp=frame['timestamp']
+        ))
+    frame['images'] = preprocessed
+    return frame
+
+
+class PipelinedCollector:
+    """
+    基于 DataCollector 处理模块的流水线采集器
+
+    截图在调用线程中按 capture_interval 进行,其余阶段为 split/preprocess/ocr/process/state
+
+    属性:
+        collector (DataCollector): 提供处理模块与配置的数据采集器
+        pipeline (Pipeline): 流水线
+    """
+
+    STAGE_NAMES = ('split', 'preprocess', 'ocr', 'process', 'state')
+
+    def __init__(self, collector, logger: Optional[logging.Logger] = None):
+        """初始化流水线采集器
+
+        Args:
+            collector: 已初始化的 DataCollector
+            logger: 日志实例,默认使用采集器的日志
+        """
+        self.collector = collector
+        self.logger = logger or collector.logger
+        self.area_config = collector.area_config
+        self.config = dict(DEFAULT_PIPELINE_CONFIG)
+        self.config.update(collector.basic_config.get('pipeline') or {})
+        self.capture_interval = float(self.config['capture_interval'])
+        self.drain_timeout = float(self.config['drain_timeout'])
+        self.pipeline = Pipeline(self._build_stages(), self.logger)
+
+    def _build_stages(self) -> List[Stage]:
+        """按配置创建各阶段"""
+        funcs = {
+            'split': partial(split_stage, self.collector.screen_splitter),
+            'preprocess': partial(preprocess_stage, self.collector.image_preprocessor),
+            'ocr': self._ocr_stage,
+            'process': self._process_stage,
+            'state': self._state_stage
+        }
+        stage_configs = self.config.get('stages') or {}
+        stages = []
+        for name in self.STAGE_NAMES:
+            stage_config = stage_configs.get(name) or {}
+            worker = stage_config.get('worker', 'thread')
+            if worker == 'process' and name not in ('split', 'preprocess'):
+                self.logger.warning(f"流水线阶段 {name} 持有模型或状态,只能使用线程工作者")
+                worker = 'thread'
+            stages.append(Stage(
+                name, funcs[name], worker=worker,
+                queue_size=stage_config.get('queue_size', self.config['queue_size']),
+                drop_policy=stage_config.get('drop_policy', self.config['drop_policy'])
+            ))
+        return stages
+
+    def capture(self, regions_list: List[str]) -> Optional[dict]:
+        """选择本帧处理的区域并截图,生成一帧的流水线数据
+
+        区域选择与 DataCollector.process_frame 一致,使用估计值或被推迟的区域的预测值写入帧数据;
+        本帧既没有需要处理的区域也没有预测值时返回None
+        """
+        collector = self.collector
+        frame_time = time.time()
+        processed_data = {}
+        regions = collector._select_regions(regions_list, frame_time, processed_data)
+        if not regions and not processed_data:
+            return None
+        # 按依赖图的拓扑顺序处理,门控区域在前
+        rank = collector.region_graph.rank
+        regions = sorted(regions, key=lambda name: rank.get(name, len(rank)))
+        return {
+            'timestamp': f"{frame_time:.7f}".replace('.', '_'),
+            'frame_time': frame_time,
+            'regions': regions,
+            'area_config': {name: self.area_config[name] for name in regions},
+            'data': processed_data,
+            'capture_start': time.perf_counter(),
+            'capture_start_ns': time.perf_counter_ns(),
+            'screen': collector._grab_screen() if regions else None
+        }
+
+    def _ocr_stage(self, frame: dict) -> dict:
+        """OCR阶段: 一次识别本帧的全部区域"""
+        images = frame['images']
+        regions = [r for r in frame['regions']
+                   if self.area_config[r].get('text_recognizer', {}).get('Enabled') and r in images]
+        frame['ocr'] = self.collector.text_recognizer.process_regions(
+            {r: images[r] for r in regions}, timestamp=frame['timestamp']
+        ) if regions else {}
+        return frame
+
+    def _process_stage(self, frame: dict) -> dict:
+        """数据处理阶段: 逐区域数据处理,没有产生结果的区域记为None"""
+        collector = self.collector
+        images = frame['images']
+        results = {}
+        for region_name in frame['regions']:
+            region_config = self.area_config[region_name]
+            if region_config.get('text_recognizer', {}).get('Enabled'):
+                data = frame['ocr'].get(region_name)
+            else:
+                data = images.get(region_name, {})
+            if region_config.get('data_processor', {}).get('Enabled') and data is not None:
+                data = collector.data_processor.process_region(region_name, data, images.get(region_name), region_config)
+            results[region_name] = data
+        frame['results'] = results
+        return frame
+
+    def _state_stage(self, frame: dict) -> dict:
+        """状态写入阶段: 合并本帧结果与预测值并更新状态管理器"""
+        collector = self.collector
+        processed_data = frame['data']
+        processed_data.update((region_name, data) for region_name, data in frame['results'].items() if data is not None)
+        enabled_states = collector._state_data(processed_data)
+        if enabled_states:
+            collector.update_state(enabled_states, frame['timestamp'])
+        frame['latency_ms'] = (time.perf_counter() - frame['capture_start']) * 1000
+        tracer = get_tracer()
+        tracer.record_frame(tracer.frame_id(), frame['capture_start_ns'], time.perf_counter_ns())
+        # 图像与OCR结果不再需要,不随输出保留
+        frame.pop('images', None)
+        frame.pop('ocr', None)
+        return frame
+
+    def _finish_frame(self, frame: dict, regions_list: List[str]) -> dict:
+        """在截图线程中写回一帧的结果: 测量时间、状态估计观测、门控判定、调度耗时与新鲜度
+
+        Returns:
+            dict: {'timestamp', 'latency_ms', 'data': 启用状态管理的区域数据, 'freshness': 新鲜度或None}
+        """
+        collector = self.collector
+        frame_time = frame['frame_time']
+        # 流水线中各区域的耗时无法单独统计,按帧延迟平摊给调度器
+        duration_ms = frame['latency_ms'] / max(len(frame['regions']), 1)
+        processed_data = frame['data']
+        frame_outputs = {}
+        for region_name in frame['regions']:
+            collector._finish_region(region_name, frame['results'].get(region_name), duration_ms, frame_time,
+                                     processed_data, frame_outputs)
+        collector.metrics.observe('frame', None, frame['latency_ms'])
+        return {
+            'timestamp': frame['timestamp'],
+            'latency_ms': frame['latency_ms'],
+            'data': collector._close_frame(processed_data),
+            'freshness': collector._update_freshness(regions_list, frame_time)
+        }
+
+    def run(self, regions_list: List[str], on_result: Optional[Callable[[int, dict], None]] = None,
+            should_stop: Optional[Callable[[], bool]] = None, max_frames: Optional[int] = None):
+        """运行流水线采集,直到 should_stop 返回True或已提交 max_frames 帧
+
+        停止提交后先排空流水线(最长 drain_timeout 秒),已提交的帧照常输出,再停止工作者
+
+        Args:
+            regions_list: 需要处理的区域名称列表
+            on_result: 结果回调,参数为帧ID与 {'timestamp', 'latency_ms', 'data', 'freshness'}
+            should_stop: 停止条件
+            max_frames: 最多提交的帧数
+        """
+        submitted = 0
+        self.pipeline.start()
+        try:
+            while not (should_stop and should_stop()) and (max_frames is None or submitted < max_frames):
+                loop_start = time.time()
+                frame = self.capture(regions_list)
+                if frame is not None:
+                    self.pipeline.submit(frame)
+                    submitted += 1
+                # 取出已完成的结果,不阻塞截图
+                while True:
+                    output = self.pipeline.get(timeout=0)
+                    if output is None:
+                        break
+                    self._emit(output, regions_list, on_result)
+                remaining = self.capture_interval - (time.time() - loop_start)
+                if remaining > 0:
+                    time.sleep(remaining)
+            for output in self.pipeline.drain(self.drain_timeout):
+                self._emit(output, regions_list, on_result)
+        finally:
+            self.pipeline.stop()
+
+    def _emit(self, output: Tuple[int, dict], regions_list: List[str],
+              on_result: Optional[Callable[[int, dict], None]]):
+        """写回一帧的结果并调用结果回调"""
+        frame_id, frame = output
+        result = self._finish_frame(frame, regions_list)
+        if on_result:
+            on_result(frame_id, result)
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+区域依赖图模块
+
+启动时将区域配置中的 dependencies/control_type 编译为有向无环图:
+1. 门控区域(声明了 dependencies 的区域)指向其依赖区域,启动时检查环与未知区域
+2. 拓扑排序时门控区域优先,保证同一帧中门控区域先于其依赖区域处理
+3. 门控状态保存在图中,不再在运行时修改 area_config 的 Enabled
+4. 按波次输出待处理区域: 门控关闭的整个子树在截图与分割之前被剪除,
+   同一波次内的区域互不依赖,可以并行处理
+
+控制类型:
+    disable_when_false: 门控区域处理结果的 status 为 False 时关闭其依赖区域
+
+basic_config.region_graph:
+    parallel: 同一波次内的区域是否并行处理
+    max_workers: 并行处理的最大线程数
+
+主要类:
+- RegionGraph: 区域依赖图
+"""
+
+import heapq
+import logging
+from typing import Any, Dict, Iterator, List, Set
+
+# 默认依赖图配置
+DEFAULT_GRAPH_CONFIG = {
+    'parallel': False,
+    'max_workers': 4
+}
+
+# 支持的控制类型
+CONTROL_TYPES = ('disable_when_false',)
+
+
+class RegionGraph:
+    """
+    区域依赖图
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        gates (Dict[str, List[str]]): 门控区域 -> 依赖区域
+        parents (Dict[str, List[str]]): 区域 -> 直接控制它的门控区域
+        ancestors (Dict[str, Set[str]]): 区域 -> 所有上游门控区域
+        order (List[str]): 拓扑顺序(门控区域优先,其余保持配置顺序)
+        gate_open (Dict[str, bool]): 门控区域最近一次的判定结果
+    """
+
+    MODULE_NAME = 'RegionGraph'
+
+    def __init__(self, basic_config: dict, area_config: dict, logger: logging.Logger):
+        """初始化区域依赖图
+
+        Args:
+            basic_config: 基础配置字典
+            area_config: 区域配置字典
+            logger: 日志实例
+
+        Raises:
+            ValueError: 区域依赖存在环
+        """
+        self.logger = logger
+        self.logger.info("<<<<<<<<<<<<<<<<<<区域依赖图初始化开始...>>>>>>>>>>>>>>>>>>")
+        config = dict(DEFAULT_GRAPH_CONFIG)
+        config.update(basic_config.get('region_graph') or {})
+        self.parallel = bool(config['parallel'])
+        self.max_workers = max(1, int(config['max_workers']))
+
+        self.regions = [name for name, value in area_config.items() if isinstance(value, dict)]
+        self.gates: Dict[str, List[str]] = {}
+        self.parents: Dict[str, List[str]] = {name: [] for name in self.regions}
+        self._compile(area_config)
+        self.order = self._topological_order()
+        self.rank = {name: index for index, name in enumerate(self.order)}
+        self.ancestors: Dict[str, Set[str]] = {}
+        for name in self.order:
+            ancestors = set(self.parents[name])
+            for parent in self.parents[name]:
+                ancestors |= self.ancestors[parent]
+            self.ancestors[name] = ancestors
+
+        # 门控区域尚未处理过时视为开启
+        self.gate_open: Dict[str, bool] = {gate: True for gate in self.gates}
+        self.logger.info(f"门控区域: {self.gates}")
+        self.logger.info(f"区域处理顺序: {self.order}, 并行处理: {'启用' if self.parallel else '关闭'}")
+        self.logger.info("=========================区域依赖图初始化完成=========================")
+
+    def _compile(self, area_config: dict):
+        """读取各区域的 dependencies/control_type 建立边"""
+        for region_name in self.regions:
+            region_config = area_config[region_name]
+            dependencies = region_config.get('dependencies') or []
+            if not dependencies:
+                continue
+            control_type = region_config.get('control_type')
+            if control_type not in CONTROL_TYPES:
+                self.logger.warning(f"区域 {region_name} 的控制类型 {control_type} 不受支持,忽略其依赖配置")
+                continue
+            unknown = [dep for dep in dependencies if dep not in self.parents]
+            if unknown:
+                self.logger.warning(f"区域 {region_name} 的依赖区域不存在,已忽略: {unknown}")
+            known = [dep for dep in dependencies if dep in self.parents and dep != region_name]
+            if not known:
+                continue
+            self.gates[region_name] = known
+            for dep in known:
+                self.parents[dep].append(region_name)
+
+    def _topological_order(self) -> List[str]:
+        """门控区域优先的拓扑排序,同类区域保持配置中的顺序
+
+        Raises:
+            ValueError: 区域依赖存在环
+        """
+        position = {name: index for index, name in enumerate(self.regions)}
+        in_degree = {name: len(parents) for name, parents in self.parents.items()}
+        heap = [(name not in self.gates, position[name], name) for name, degree in in_degree.items() if degree == 0]
+        heapq.heapify(heap)
+        order = []
+        while heap:
+            _, _, name = heapq.heappop(heap)
+            order.append(name)
+            for dep in self.gates.get(name, []):
+                in_degree[dep] -= 1
+                if in_degree[dep] == 0:
+                    heapq.heappush(heap, (dep not in self.gates, position[dep], dep))
+        if len(order) != len(self.regions):
+            cycle = [name for name in self.regions if in_degree[name] > 0]
+            raise ValueError(f"区域依赖存在环: {cycle}")
+        return order
+
+    def is_gate(self, region_name: str) -> bool:
+        """区域是否为门控区域"""
+        return region_name in self.gates
+
+    def is_active(self, region_name: str) -> bool:
+        """区域的所有上游门控是否均为开启状态"""
+        return all(self.gate_open[gate] for gate in self.ancestors.get(region_name, ()))
+
+    def evaluate(self, region_name: str, data: Any):
+        """根据门控区域的处理结果更新门控状态
+
+        Args:
+            region_name: 区域名称,非门控区域直接忽略
+            data: DataProcessor 处理后的区域数据
+        """
+        if region_name not in self.gates:
+            return
+        is_open = not (isinstance(data, dict) and data.get('status') is False)
+        if is_open == self.gate_open[region_name]:
+            return
+        self.gate_open[region_name] = is_open
+        if is_open:
+            self.logger.info(f"{region_name}已识别到,重新开启相关检测: {self.gates[region_name]}")
+        else:
+            self.logger.info(f"{region_name}未识别到,已关闭相关检测: {self.gates[region_name]}")
+
+    def waves(self, regions: List[str]) -> Iterator[List[str]]:
+        """按依赖关系分波次输出待处理区域
+
+        每次输出前按当前门控状态剪除关闭的子树,调用方应在处理完一个波次并
+        调用 evaluate 后再取下一个波次
+
+        Args:
+            regions: 本帧候选区域
+
+        Yields:
+            List[str]: 互不依赖、可以并行处理的区域,按拓扑顺序排列
+        """
+        pending = sorted(regions, key=lambda name: self.rank.get(name, len(self.rank)))
+        while pending:
+            pruned = [name for name in pending if not self.is_active(name)]
+            if pruned:
+                self.logger.debug(f"门控关闭,本帧剪除区域: {pruned}")
+                pending = [name for name in pending if name not in pruned]
+            pending_set = set(pending)
+            wave = [name for name in pending if not (self.ancestors.get(name, set()) & pending_set)]
+            if not wave:
+                return
+            yield wave
+            pending = [name for name in pending if name not in wave]
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+区域调度模块
+
+按区域的刷新间隔与优先级决定每一帧处理哪些区域:
+1. 区域配置 refresh_interval(秒,0表示每帧)与 priority(越大越优先)
+2. 每帧有固定的计算预算(毫秒),按各区域实测耗时的滑动平均估算开销
+3. 超过刷新间隔 starvation_factor 倍仍未运行的区域视为饥饿,不受预算限制优先运行;
+   刷新间隔按 max(refresh_interval, 实际帧间隔) 计算,每帧运行的区域(refresh_interval 为0)
+   连续 starvation_factor 帧未运行同样视为饥饿,不会被高优先级区域长期挤占
+4. 统计每个区域的目标频率与实际达到的频率
+
+basic_config.scheduler:
+    Enabled: 是否启用(关闭时每帧处理所有启用的区域)
+    frame_budget_ms: 每帧计算预算(毫秒)
+    starvation_factor: 饥饿判定倍数
+    report_interval: 频率统计日志输出间隔(秒)
+
+主要类:
+- RegionScheduler: 多速率区域调度器
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional
+
+# 默认调度配置
+DEFAULT_SCHEDULER_CONFIG = {
+    'Enabled': False,
+    'frame_budget_ms': 150.0,
+    'starvation_factor': 3.0,
+    'report_interval': 30.0
+}
+
+# 区域默认优先级与刷新间隔
+DEFAULT_PRIORITY = 5
+DEFAULT_REFRESH_INTERVAL = 0.0
+
+# 区域耗时滑动平均系数
+COST_SMOOTHING = 0.2
+
+# 帧间隔滑动平均系数
+FRAME_PERIOD_SMOOTHING = 0.2
+
+
+class RegionScheduler:
+    """
+    多速率区域调度器
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        enabled (bool): 是否启用调度
+        frame_budget_ms (float): 每帧计算预算
+        costs (Dict[str, float]): 区域耗时滑动平均(毫秒)
+        last_run (Dict[str, float]): 区域上次运行时间
+        frame_period (Optional[float]): 相邻两次调度的间隔滑动平均(秒)
+    """
+
+    MODULE_NAME = 'RegionScheduler'
+
+    def __init__(self, basic_config: dict, area_config: dict, logger: logging.Logger):
+        """初始化区域调度器
+
+        Args:
+            basic_config: 基础配置字典
+            area_config: 区域配置字典
+            logger: 日志实例
+        """
+        self.logger = logger
+        self.logger.info("<<<<<<<<<<<<<<<<<<区域调度器初始化开始...>>>>>>>>>>>>>>>>>>")
+        self.basic_config = basic_config
+        self.area_config = area_config
+
+        config = dict(DEFAULT_SCHEDULER_CONFIG)
+        config.update(basic_config.get('scheduler') or {})
+        self.enabled = bool(config['Enabled'])
+        self.frame_budget_ms = float(config['frame_budget_ms'])
+        self.starvation_factor = float(config['starvation_factor'])
+        self.report_interval = float(config['report_interval'])
+
+        self.costs: Dict[str, float] = {}
+        self.last_run: Dict[str, float] = {}
+        self.run_counts: Dict[str, int] = {}
+        self.skip_counts: Dict[str, int] = {}
+        self.stats_started = None  # 首次调度时开始统计
+        self.last_report = None
+        self.frame_period = None
+        self._last_select = None
+        self.logger.info(f"区域调度: {'启用' if self.enabled else '关闭'}, 每帧预算 {self.frame_budget_ms}ms")
+        self.logger.info("=========================区域调度器初始化完成=========================")
+
+    def refresh_interval(self, region_name: str) -> float:
+        """区域刷新间隔(秒)"""
+        return float(self.area_config.get(region_name, {}).get('refresh_interval', DEFAULT_REFRESH_INTERVAL) or 0.0)
+
+    def priority(self, region_name: str) -> float:
+        """区域优先级"""
+        return float(self.area_config.get(region_name, {}).get('priority', DEFAULT_PRIORITY))
+
+    def select(self, regions: List[str], now: Optional[float] = None) -> List[str]:
+        """选择本帧需要处理的区域
+
+        Args:
+            regions: 候选区域(已启用的区域)
+            now: 当前时间,默认为 time.time()
+
+        Returns:
+            List[str]: 本帧处理的区域,保持候选列表中的原有顺序
+        """
+        if not self.enabled:
+            return list(regions)
+        now = time.time() if now is None else now
+        if self.stats_started is None:
+            self.stats_started = self.last_report = now
+        if self._last_select is not None and now > self._last_select:
+            period = now - self._last_select
+            self.frame_period = period if self.frame_period is None else (
+                FRAME_PERIOD_SMOOTHING * period + (1 - FRAME_PERIOD_SMOOTHING) * self.frame_period
+            )
+        self._last_select = now
+
+        candidates = []
+        for region_name in regions:
+            interval = self.refresh_interval(region_name)
+            last_run = self.last_run.get(region_name)
+            # 按实际帧间隔计算逾期程度,每帧运行的区域同样可能饥饿
+            effective_interval = max(interval, self.frame_period or 0.0)
+            if last_run is None:
+                # 从未运行过的区域立即运行
+                overdue = float('inf')
+            else:
+                elapsed = now - last_run
+                if elapsed < interval:
+                    self.skip_counts[region_name] = self.skip_counts.get(region_name, 0) + 1
+                    continue
+                overdue = elapsed / effective_interval if effective_interval > 0 else 1.0
+            starved = effective_interval > 0 and overdue >= self.starvation_factor
+            candidates.append((region_name, starved, self.priority(region_name), overdue))
+
+        # 饥饿区域优先,其次按优先级,最后按逾期程度
+        candidates.sort(key=lambda item: (item[1], item[2], item[3]), reverse=True)
+
+        selected = set()
+        spent_ms = 0.0
+        for region_name, starved, _, _ in candidates:
+            cost = self.costs.get(region_name, 0.0)
+            if starved:
+                # 饥饿区域在预算之外运行,不挤占其他区域的预算
+                selected.add(region_name)
+            elif not selected or spent_ms + cost <= self.frame_budget_ms:
+                selected.add(region_name)
+                spent_ms += cost
+            else:
+                self.skip_counts[region_name] = self.skip_counts.get(region_name, 0) + 1
+
+        return [region_name for region_name in regions if region_name in selected]
+
+    def record(self, region_name: str, duration_ms: float, now: Optional[float] = None):
+        """记录区域本次运行的耗时
+
+        Args:
+            region_name: 区域名称
+            duration_ms: 处理耗时(毫秒)
+            now: 运行时间,默认为 time.time()
+        """
+        now = time.time() if now is None else now
+        self.last_run[region_name] = now
+        self.run_counts[region_name] = self.run_counts.get(region_name, 0) + 1
+        previous = self.costs.get(region_name)
+        self.costs[region_name] = duration_ms if previous is None else (
+            COST_SMOOTHING * duration_ms + (1 - COST_SMOOTHING) * previous
+        )
+
+    def report(self, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """统计各区域的目标频率与实际频率
+
+        Returns:
+            Dict[str, Dict]: {区域名: {'target_hz', 'achieved_hz', 'runs', 'skipped', 'avg_cost_ms'}}
+        """
+        now = time.time() if now is None else now
+        elapsed = max(now - (self.stats_started if self.stats_started is not None else now), 1e-6)
+        report = {}
+        for region_name in sorted(set(self.run_counts) | set(self.skip_counts)):
+            interval = self.refresh_interval(region_name)
+            runs = self.run_counts.get(region_name, 0)
+            report[region_name] = {
+                'target_hz': round(1.0 / interval, 3) if interval > 0 else None,
+                'achieved_hz': round(runs / elapsed, 3),
+                'runs': runs,
+                'skipped': self.skip_counts.get(region_name, 0),
+                'avg_cost_ms': round(self.costs.get(region_name, 0.0), 2)
+            }
+        return report
+
+    def maybe_log_report(self, now: Optional[float] = None):
+        """到达统计间隔时输出频率统计日志"""
+        now = time.time() if now is None else now
+        if not self.enabled or self.last_report is None or now - self.last_report < self.report_interval:
+            return
+        self.last_report = now
+        for region_name, stats in self.report(now).items():
+            self.logger.info(
+                f"区域 {region_name}: 目标 {stats['target_hz'] or '每帧'}Hz, 实际 {stats['achieved_hz']}Hz, "
+                f"运行 {stats['runs']} 次, 跳过 {stats['skipped']} 次, 平均耗时 {stats['avg_cost_ms']}ms"
+            )
+
+    def reset_stats(self):
+        """清空频率统计"""
+        self.run_counts.clear()
+        self.skip_counts.clear()
+        self.stats_started = None
+        self.last_report = None
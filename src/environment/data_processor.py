@@ -5,6 +5,13 @@ import re
 from pathlib import Path
 import logging
 
+from src.environment.ocr_result import OCRResult
+from src.environment.text_lines import assemble_line_texts
+from src.utils.tracing import traced
+
+# 项目根目录,模板图片等数据文件的相对路径基于此目录
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
 class DataProcessor:
     """数据处理类"""
     MODULE_NAME = 'DataProcessor'
@@ -20,8 +27,8 @@ class DataProcessor:
         self.logger.info("<<<<<<<<<<<<<<<<<<数据处理器初始化开始...>>>>>>>>>>>>>>>>>>")
         self.basic_config = basic_config
         self.area_config = area_config
-        self.current_region_name = None  # 添加属性来存储当前区域名称
-        self.current_region_config = None
+        # 模板图片缓存 {路径: 图像}，避免每帧重复读取
+        self.templates = {}
  
         # 区域名称到处理方法的映射
         self.region_process_mapping = {
@@ -42,7 +49,7 @@ class DataProcessor:
             'target_hp': self._preprocess_target_hp,  # 目标血量
             'target_name': self._preprocess_target_name,  # 目标名字
             'nearby_monster_name_1': self._preprocess_nearby_monster_name_1,  # 近身寻怪名区域-1
-            'nearby_monster_name_2': self._preprocess_nearby_monster_name_1,  # 近身寻怪名区域-2
+            'nearby_monster_name_2': self._preprocess_nearby_monster_name_2,  # 近身寻怪名区域-2
             'char_revival': self._preprocess_char_revival,  # 角色复活信息
             'char_eat_food': self._preprocess_char_eat_food,  # 角色食物状态
             'char_be_attack': self._preprocess_char_be_attack,  # 角色被攻击状态
@@ -51,6 +58,22 @@ class DataProcessor:
         }   
         self.logger.info("=========================数据处理器初始化完成=========================")
 
+    # 读取模板图片
+    def _load_template(self, region_name: str, default_path: str) -> Optional[np.ndarray]:
+        """读取区域的模板图片(data_processor.template_path,相对路径基于项目根目录)，读取后缓存"""
+        template_path = Path(
+            self.area_config.get(region_name, {}).get('data_processor', {}).get('template_path') or default_path
+        )
+        if not template_path.is_absolute():
+            template_path = PROJECT_ROOT / template_path
+        if template_path not in self.templates:
+            # 使用imdecode以兼容Windows下的中文路径
+            data = np.fromfile(str(template_path), dtype=np.uint8) if template_path.exists() else None
+            self.templates[template_path] = cv2.imdecode(data, cv2.IMREAD_COLOR) if data is not None and data.size else None
+            if self.templates[template_path] is None:
+                self.logger.error(f"无法读取模板图片: {template_path}")
+        return self.templates[template_path]
+
     # 角色被攻击状态
     def _preprocess_char_be_attack(self, ocr_result: Dict, image: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """角色被攻击状态数据处理"""
@@ -93,82 +116,18 @@ class DataProcessor:
         返回格式：{'status': True, 'blood_loss': 123} 或 {'status': False, 'blood_loss': 0}
         """
         try:
-            if not ocr_result or not isinstance(ocr_result, dict) or 'details' not in ocr_result:
+            if not ocr_result or not isinstance(ocr_result, (dict, OCRResult)) or 'details' not in ocr_result:
                 return {'status': False, 'blood_loss': 0}
             
             self.logger.debug("=== 掉血值OCR结果 ===")
             self.logger.debug(f"角色掉血值原始OCR结果: {repr(ocr_result)}")
             
-            # 存储每行文本及其y坐标
-            text_boxes = []
+            # 组装文本行,数字之间的间隔超过阈值时视为不同的文本
+            merged_lines = assemble_line_texts(ocr_result, x_gap=15, joiner='')
             
-            # 同一行文本的y坐标差异阈值
-            Y_THRESHOLD = 10
-            X_GAP_THRESHOLD = 15  # 数字之间的间隔阈值
-            
-            # 收集所有文本框
-            for detail in ocr_result['details']:
-                text = detail['text'].strip()
-                if text:
-                    box = detail['box']
-                    center_y = sum(point[1] for point in box) / 4
-                    left_x = min(point[0] for point in box)
-                    right_x = max(point[0] for point in box)
-                    text_boxes.append({
-                        'text': text,
-                        'center_y': center_y,
-                        'left_x': left_x,
-                        'right_x': right_x
-                    })
-            
-            if not text_boxes:
+            if not merged_lines:
                 return {'status': False, 'blood_loss': 0}
             
-            # 按y坐标排序
-            text_boxes.sort(key=lambda x: x['center_y'])
-            
-            # 合并同一行的文本
-            merged_lines = []
-            current_line = []
-            current_y = None
-            
-            for box in text_boxes:
-                if current_y is None:
-                    current_y = box['center_y']
-                    current_line.append(box)
-                else:
-                    if abs(box['center_y'] - current_y) <= Y_THRESHOLD:
-                        # 检查x方向上的间隔
-                        if current_line:
-                            last_box = current_line[-1]
-                            if box['left_x'] - last_box['right_x'] <= X_GAP_THRESHOLD:
-                                current_line.append(box)
-                            else:
-                                # 处理当前行
-                                if current_line:
-                                    current_line.sort(key=lambda x: x['left_x'])
-                                    line_text = ''.join(item['text'] for item in current_line)
-                                    merged_lines.append(line_text)
-                                # 开始新的一行
-                                current_line = [box]
-                        else:
-                            current_line.append(box)
-                    else:
-                        # 处理当前行
-                        if current_line:
-                            current_line.sort(key=lambda x: x['left_x'])
-                            line_text = ''.join(item['text'] for item in current_line)
-                            merged_lines.append(line_text)
-                        # 开始新的一行
-                        current_line = [box]
-                        current_y = box['center_y']
-            
-            # 处理最后一行
-            if current_line:
-                current_line.sort(key=lambda x: x['left_x'])
-                line_text = ''.join(item['text'] for item in current_line)
-                merged_lines.append(line_text)
-            
             # 处理合并后的文本
             for line in merged_lines:
                 # 移除所有非数字和负号的字符
@@ -200,80 +159,14 @@ class DataProcessor:
         3. 未检测到任何文字 - 返回 {'status': False, 'item_name': ''}
         """
         try:
-            if not ocr_result or not isinstance(ocr_result, dict) or 'details' not in ocr_result:
+            if not ocr_result or not isinstance(ocr_result, (dict, OCRResult)) or 'details' not in ocr_result:
                 return {'status': False}
             
             self.logger.debug("=== 食物状态OCR结果 ===")
             self.logger.debug(f"原始OCR结果: {repr(ocr_result)}")
             
-            # 存储每行文本及其y坐标
-            text_boxes = []
-            
-            # 同一行文本的y坐标差异阈值
-            Y_THRESHOLD = 10
-            X_GAP_THRESHOLD = 30  # 水平方向上允许的最大间隔
-            
-            # 收集所有文本框
-            for detail in ocr_result['details']:
-                text = detail['text'].strip()
-                if text:
-                    box = detail['box']
-                    center_y = sum(point[1] for point in box) / 4
-                    left_x = min(point[0] for point in box)
-                    right_x = max(point[0] for point in box)
-                    text_boxes.append({
-                        'text': text,
-                        'center_y': center_y,
-                        'left_x': left_x,
-                        'right_x': right_x,
-                        'box': box
-                    })
-            
-            # 按y坐标排序
-            text_boxes.sort(key=lambda x: x['center_y'])
-            
-            # 合并同一行的文本
-            merged_lines = []
-            current_line = []
-            current_y = None
-            
-            for i, box in enumerate(text_boxes):
-                if current_y is None:
-                    current_y = box['center_y']
-                    current_line.append(box)
-                else:
-                    # 检查y坐标是否在阈值范围内
-                    if abs(box['center_y'] - current_y) <= Y_THRESHOLD:
-                        # 检查x方向上的间隔
-                        if current_line:
-                            last_box = current_line[-1]
-                            if box['left_x'] - last_box['right_x'] <= X_GAP_THRESHOLD:
-                                current_line.append(box)
-                            else:
-                                # 处理当前行
-                                if current_line:
-                                    current_line.sort(key=lambda x: x['left_x'])
-                                    line_text = ''.join(item['text'] for item in current_line)
-                                    merged_lines.append(line_text)
-                                # 开始新的一行
-                                current_line = [box]
-                        else:
-                            current_line.append(box)
-                    else:
-                        # 处理当前行
-                        if current_line:
-                            current_line.sort(key=lambda x: x['left_x'])
-                            line_text = ''.join(item['text'] for item in current_line)
-                            merged_lines.append(line_text)
-                        # 开始新的一行
-                        current_line = [box]
-                        current_y = box['center_y']
-            
-            # 处理最后一行
-            if current_line:
-                current_line.sort(key=lambda x: x['left_x'])
-                line_text = ''.join(item['text'] for item in current_line)
-                merged_lines.append(line_text)
+            # 组装文本行,水平间隔超过阈值时视为不同的文本
+            merged_lines = assemble_line_texts(ocr_result, x_gap=30, joiner='')
             
             # 服用药品的模式匹配
             use_patterns = [
@@ -345,56 +238,9 @@ class DataProcessor:
             self.logger.debug("=== 复活信息OCR结果 ===")
             self.logger.debug(f"原始OCR结果: {repr(ocr_result)}")
             
-            # 存储每行文本及其y坐标
-            text_boxes = []
-            
-            # 同一行文本的y坐标差异阈值
-            Y_THRESHOLD = 10
-            
-            if isinstance(ocr_result, dict) and 'details' in ocr_result:
-                # 收集所有文本框
-                for detail in ocr_result['details']:
-                    text = detail['text'].strip()
-                    if text:
-                        box = detail['box']
-                        center_y = sum(point[1] for point in box) / 4
-                        left_x = min(point[0] for point in box)
-                        text_boxes.append({
-                            'text': text,
-                            'center_y': center_y,
-                            'left_x': left_x
-                        })
-                
-                # 按y坐标排序
-                text_boxes.sort(key=lambda x: x['center_y'])
-                
-                # 合并同一行的文本
-                merged_lines = []
-                current_line = []
-                current_y = None
-                
-                for box in text_boxes:
-                    if current_y is None:
-                        current_y = box['center_y']
-                        current_line.append(box)
-                    else:
-                        if abs(box['center_y'] - current_y) <= Y_THRESHOLD:
-                            current_line.append(box)
-                        else:
-                            # 处理当前行
-                            if current_line:
-                                current_line.sort(key=lambda x: x['left_x'])
-                                line_text = ' '.join(item['text'] for item in current_line)
-                                merged_lines.append(line_text)
-                            # 开始新的一行
-                            current_line = [box]
-                            current_y = box['center_y']
-                
-                # 处理最后一行
-                if current_line:
-                    current_line.sort(key=lambda x: x['left_x'])
-                    line_text = ' '.join(item['text'] for item in current_line)
-                    merged_lines.append(line_text)
+            if isinstance(ocr_result, (dict, OCRResult)) and 'details' in ocr_result:
+                # 组装文本行
+                merged_lines = assemble_line_texts(ocr_result, joiner=' ')
                 
                 # 对每一行进行模式匹配
                 min_time = 999
@@ -429,8 +275,13 @@ class DataProcessor:
             return {'status': True}
     
     # 近身寻怪名区域-1
-    def _preprocess_nearby_monster_name_1(self, ocr_result: Dict, image: Optional[np.ndarray] = None) -> Dict[str, Any]:
-        """近身寻怪名区域-1"""
+    def _preprocess_nearby_monster_name_1(self, ocr_result: Dict, image: Optional[np.ndarray] = None,
+                                          region_name: str = 'nearby_monster_name_1') -> Dict[str, Any]:
+        """近身寻怪名区域-1
+
+        region_name 指定使用哪个区域的裁切坐标(两个近身寻怪名区域共用该处理方法)。
+        不使用实例上的当前区域状态,同一波次的区域并行处理时互不影响
+        """
         try:
             if not ocr_result or image is None:
                 return {}
@@ -441,23 +292,19 @@ class DataProcessor:
             name_groups = []
             
             if isinstance(ocr_result, dict) and 'details' in ocr_result:
-                for detail in ocr_result['details']:
+                ocr_result = OCRResult.from_details(ocr_result['details'])
+            
+            if isinstance(ocr_result, OCRResult) and ocr_result.count:
+                # 从配置中获取裁切区域坐标
+                x_offset, y_offset, width, height = self.area_config[region_name]['screen_split']['coordinates']
+                # 一次性将所有中心点转换为原图中的真实坐标
+                real_centers = (ocr_result.centers + np.array([x_offset, y_offset], dtype=np.int32)).tolist()
+                
+                for text, (center_x, center_y) in zip(ocr_result.texts, real_centers):
                     # 清理文本：去除全角和半角符号，只保留中文字符
-                    cleaned_text = re.sub(r'[^\u4e00-\u9fff]|[\u3000-\u303F\uFF00-\uFFEF]', '', detail['text'])
+                    cleaned_text = re.sub(r'[^\u4e00-\u9fff]|[\u3000-\u303F\uFF00-\uFFEF]', '', text)
                     
                     if cleaned_text:
-                        # 使用OCR返回的中心点坐标
-                        center_x, center_y = detail['center']
-                        # 从配置中获取裁切区域坐标
-                        x_offset, y_offset, width, height = self.area_config[self.current_region_name]['screen_split']['coordinates']
-                        
-                        # 计算在原图中的真实坐标
-                        real_center_x = center_x + x_offset
-                        real_center_y = center_y + y_offset
-                        
-                        # 更新中心点坐标为原图坐标
-                        center_x, center_y = real_center_x, real_center_y
-                        
                         self.logger.debug(f"裁切图中坐标: {cleaned_text}-({center_x-x_offset}, {center_y-y_offset})")
                         self.logger.debug(f"原图真实坐标: {cleaned_text}-({center_x}, {center_y})")
 
@@ -473,6 +320,11 @@ class DataProcessor:
             self.logger.error(f"处理游戏区域数据出错: {str(e)}")
             return {'name_groups': ''}
         
+    # 近身寻怪名区域-2
+    def _preprocess_nearby_monster_name_2(self, ocr_result: Dict, image: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """近身寻怪名区域-2,与区域-1处理方式相同,使用区域-2的裁切坐标"""
+        return self._preprocess_nearby_monster_name_1(ocr_result, image, region_name='nearby_monster_name_2')
+        
     # 目标名字处理
     def _preprocess_target_name(self, ocr_result: Dict, image: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """目标名字处理"""
@@ -480,7 +332,7 @@ class DataProcessor:
             self.logger.debug(f"OCR结果: {ocr_result}")
             # 获取OCR结果中的第一行文本
             texts = []
-            if isinstance(ocr_result, dict) and 'details' in ocr_result:
+            if isinstance(ocr_result, (dict, OCRResult)) and 'details' in ocr_result:
                 for detail in ocr_result['details']:
                     if 'text' in detail:
                         text = detail['text'].strip()
@@ -540,12 +392,10 @@ class DataProcessor:
 
         try:
             # 读取目标图片（小图）和源图片（大图）
-            template_path = "F:/2025Projects/1000Y//data/image/target_panel.png"
-            template = cv2.imread(template_path)
+            template = self._load_template('target_panel', 'data/image/target_panel.png')
 
             if template is None or image is None:
-                print("无法读取图片，请检查路径")
-                exit()
+                return {'status': False}
 
             # 执行模板匹配
             result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
@@ -572,9 +422,9 @@ class DataProcessor:
             center_y = image.shape[0] // 2
             center_row = image[center_y]
 
-            # 从右向左查找第一个黑色像素点
+            # 从右向左查找第一个黑色像素点(空量条没有黑色像素,结果为0)
             width = image.shape[1]
-            first_black_x = width - 1
+            first_black_x = -1
             for x in range(width-1, -1, -1):
                 if center_row[x] == 0:  # 0表示黑色
                     first_black_x = x
@@ -598,16 +448,15 @@ class DataProcessor:
             center_y = image.shape[0] // 2
             center_row = image[center_y]
 
-            # 从右向左查找第一个黑色像素点
+            # 从右向左查找第一个黑色像素点(空量条没有黑色像素,结果为0)
             width = image.shape[1]
-            first_black_x = width - 1
+            first_black_x = -1
             for x in range(width-1, -1, -1):
                 if center_row[x] == 0:  # 0表示黑色
                     first_black_x = x
                     break
-            # 计算大经验百分比
-            skill_exp_max = round((first_black_x + 1) / width * 100, 4)  # 保留2位小数
-            skill_exp_max = round(skill_exp_max/10)
+            # 计算大经验值: 已填满的十分之一格数(95%为9),满格时归零
+            skill_exp_max = int((first_black_x + 1) * 10 // width)
             self.logger.debug(f"技能大经验值: {skill_exp_max}")
             if skill_exp_max >= 10:
                 skill_exp_max =0
@@ -625,9 +474,9 @@ class DataProcessor:
             center_y = image.shape[0] // 2
             center_row = image[center_y]
 
-            # 从右向左查找第一个黑色像素点
+            # 从右向左查找第一个黑色像素点(空量条没有黑色像素,结果为0)
             width = image.shape[1]
-            first_black_x = width - 1
+            first_black_x = -1
             for x in range(width-1, -1, -1):
                 if center_row[x] == 0:  # 0表示黑色
                     first_black_x = x
@@ -651,9 +500,9 @@ class DataProcessor:
             center_y = image.shape[0] // 2
             center_row = image[center_y]
 
-            # 从右向左查找第一个黑色像素点
+            # 从右向左查找第一个黑色像素点(空量条没有黑色像素,结果为0)
             width = image.shape[1]
-            first_black_x = width - 1
+            first_black_x = -1
             for x in range(width-1, -1, -1):
                 if center_row[x] == 0:  # 0表示黑色
                     first_black_x = x
@@ -678,9 +527,9 @@ class DataProcessor:
             center_y = image.shape[0] // 2
             center_row = image[center_y]
 
-            # 从右向左查找第一个黑色像素点
+            # 从右向左查找第一个黑色像素点(空量条没有黑色像素,结果为0)
             width = image.shape[1]
-            first_black_x = width - 1
+            first_black_x = -1
             for x in range(width-1, -1, -1):
                 if center_row[x] == 0:  # 0表示黑色
                     first_black_x = x
@@ -702,9 +551,9 @@ class DataProcessor:
             center_y = image.shape[0] // 2
             center_row = image[center_y]
 
-            # 从右向左查找第一个黑色像素点
+            # 从右向左查找第一个黑色像素点(空量条没有黑色像素,结果为0)
             width = image.shape[1]
-            first_black_x = width - 1
+            first_black_x = -1
             for x in range(width-1, -1, -1):
                 if center_row[x] == 0:  # 0表示黑色
                     first_black_x = x
@@ -726,9 +575,9 @@ class DataProcessor:
             center_y = image.shape[0] // 2
             center_row = image[center_y]
 
-            # 从右向左查找第一个黑色像素点
+            # 从右向左查找第一个黑色像素点(空量条没有黑色像素,结果为0)
             width = image.shape[1]
-            first_black_x = width - 1
+            first_black_x = -1
             for x in range(width-1, -1, -1):
                 if center_row[x] == 0:  # 0表示黑色
                     first_black_x = x
@@ -750,9 +599,9 @@ class DataProcessor:
             center_y = image.shape[0] // 2
             center_row = image[center_y]
 
-            # 从右向左查找第一个黑色像素点
+            # 从右向左查找第一个黑色像素点(空量条没有黑色像素,结果为0)
             width = image.shape[1]
-            first_black_x = width - 1
+            first_black_x = -1
             for x in range(width-1, -1, -1):
                 if center_row[x] == 0:  # 0表示黑色
                     first_black_x = x
@@ -783,7 +632,7 @@ class DataProcessor:
             
             # 存储所有识别到的文本
             texts = []
-            if isinstance(ocr_result, dict) and 'details' in ocr_result:
+            if isinstance(ocr_result, (dict, OCRResult)) and 'details' in ocr_result:
                 for detail in ocr_result['details']:
                     if 'text' in detail:
                         text = detail['text'].strip()
@@ -849,60 +698,8 @@ class DataProcessor:
             self.logger.debug("=== 激活技能OCR结果 ===")
             self.logger.debug(f"原始OCR结果: {repr(ocr_result)}")
             
-            # 存储每行文本及其y坐标
-            text_lines = []
-            
-            # 判断同一行的阈值（y坐标差异在这个范围内认为是同一行）
-            Y_THRESHOLD = 10
-            
-            if isinstance(ocr_result, dict) and 'details' in ocr_result:
-                # 先收集所有文本框及其位置信息
-                text_boxes = []
-                for detail in ocr_result['details']:
-                    text = detail['text'].strip()
-                    if text:
-                        # 使用OCR返回的box信息
-                        box = detail['box']
-                        # 计算中心y坐标
-                        center_y = sum(point[1] for point in box) / 4
-                        # 获取左边界x坐标
-                        left_x = min(point[0] for point in box)
-                        text_boxes.append({
-                            'text': text,
-                            'center_y': center_y,
-                            'left_x': left_x
-                        })
-                
-                # 按y坐标排序
-                text_boxes.sort(key=lambda x: x['center_y'])
-                
-                # 合并同一行的文本
-                current_line = []
-                current_y = None
-                
-                for box in text_boxes:
-                    if current_y is None:
-                        current_y = box['center_y']
-                        current_line.append(box)
-                    else:
-                        # 判断是否属于同一行
-                        if abs(box['center_y'] - current_y) <= Y_THRESHOLD:
-                            current_line.append(box)
-                        else:
-                            # 当前文本框属于新的一行，处理之前的行
-                            # 按x坐标排序并合并文本
-                            current_line.sort(key=lambda x: x['left_x'])
-                            line_text = ' '.join(item['text'] for item in current_line)
-                            text_lines.append(line_text)
-                            # 开始新的一行
-                            current_line = [box]
-                            current_y = box['center_y']
-                
-                # 处理最后一行
-                if current_line:
-                    current_line.sort(key=lambda x: x['left_x'])
-                    line_text = ' '.join(item['text'] for item in current_line)
-                    text_lines.append(line_text)
+            # 组装文本行,每行为一个技能
+            text_lines = assemble_line_texts(ocr_result, joiner=' ')
             
             # 合并所有行
             combined_text = '|'.join(text_lines)
@@ -941,60 +738,8 @@ class DataProcessor:
             self.logger.debug("=== 聊天区域OCR结果 ===")
             self.logger.debug(f"原始OCR结果: {repr(ocr_result)}")
             
-            # 存储每行文本及其y坐标
-            text_lines = []
-            
-            # 判断同一行的阈值（y坐标差异在这个范围内认为是同一行）
-            Y_THRESHOLD = 10
-            
-            if isinstance(ocr_result, dict) and 'details' in ocr_result:
-                # 先收集所有文本框及其位置信息
-                text_boxes = []
-                for detail in ocr_result['details']:
-                    text = detail['text'].strip()
-                    if text:
-                        # 使用OCR返回的box信息
-                        box = detail['box']
-                        # 计算中心y坐标
-                        center_y = sum(point[1] for point in box) / 4
-                        # 获取左边界x坐标
-                        left_x = min(point[0] for point in box)
-                        text_boxes.append({
-                            'text': text,
-                            'center_y': center_y,
-                            'left_x': left_x
-                        })
-                
-                # 按y坐标排序
-                text_boxes.sort(key=lambda x: x['center_y'])
-                
-                # 合并同一行的文本
-                current_line = []
-                current_y = None
-                
-                for box in text_boxes:
-                    if current_y is None:
-                        current_y = box['center_y']
-                        current_line.append(box)
-                    else:
-                        # 判断是否属于同一行
-                        if abs(box['center_y'] - current_y) <= Y_THRESHOLD:
-                            current_line.append(box)
-                        else:
-                            # 当前文本框属于新的一行，处理之前的行
-                            # 按x坐标排序并合并文本
-                            current_line.sort(key=lambda x: x['left_x'])
-                            line_text = ' '.join(item['text'] for item in current_line)
-                            text_lines.append(line_text)
-                            # 开始新的一行
-                            current_line = [box]
-                            current_y = box['center_y']
-                
-                # 处理最后一行
-                if current_line:
-                    current_line.sort(key=lambda x: x['left_x'])
-                    line_text = ' '.join(item['text'] for item in current_line)
-                    text_lines.append(line_text)
+            # 组装文本行,每行为一条消息
+            text_lines = assemble_line_texts(ocr_result, joiner=' ')
             
             # 合并所有行
             combined_text = '\n'.join(text_lines)
@@ -1028,31 +773,32 @@ class DataProcessor:
             name_groups = []
             
             if isinstance(ocr_result, dict) and 'details' in ocr_result:
-                for detail in ocr_result['details']:
+                ocr_result = OCRResult.from_details(ocr_result['details'])
+            
+            if isinstance(ocr_result, OCRResult) and ocr_result.count:
+                # 从配置中获取裁切区域坐标
+                x_offset, y_offset, width, height = self.area_config['game_area']['screen_split']['coordinates']
+                # 一次性将所有中心点转换为原图中的真实坐标
+                real_centers = (ocr_result.centers + np.array([x_offset, y_offset], dtype=np.int32)).tolist()
+                # 启用名字标签跟踪时附带稳定的轨迹ID
+                track_ids = ocr_result.track_ids.tolist() if ocr_result.track_ids is not None else [None] * ocr_result.count
+                
+                for text, (center_x, center_y), track_id in zip(ocr_result.texts, real_centers, track_ids):
                     # 清理文本：去除全角和半角符号，只保留中文字符
-                    cleaned_text = re.sub(r'[^\u4e00-\u9fff]|[\u3000-\u303F\uFF00-\uFFEF]', '', detail['text'])
+                    cleaned_text = re.sub(r'[^\u4e00-\u9fff]|[\u3000-\u303F\uFF00-\uFFEF]', '', text)
                     
                     if cleaned_text:
-                        # 使用OCR返回的中心点坐标
-                        center_x, center_y = detail['center']
-                        # 从配置中获取裁切区域坐标
-                        x_offset, y_offset, width, height = self.area_config['game_area']['screen_split']['coordinates']
-                        
-                        # 计算在原图中的真实坐标
-                        real_center_x = center_x + x_offset
-                        real_center_y = center_y + y_offset
-                        
-                        # 更新中心点坐标为原图坐标
-                        center_x, center_y = real_center_x, real_center_y
-                        
                         self.logger.debug(f"裁切图中坐标: {cleaned_text}-({center_x-x_offset}, {center_y-y_offset})")
                         self.logger.debug(f"原图真实坐标: {cleaned_text}-({center_x}, {center_y})")
 
-                        name_groups.append({
+                        name_group = {
                             'text': cleaned_text,
                             'center_x': center_x,
                             'center_y': center_y
-                        })
+                        }
+                        if track_id is not None:
+                            name_group['track_id'] = track_id
+                        name_groups.append(name_group)
             
             self.logger.debug(f"最终结果: {name_groups}")
             return {'name_groups': name_groups}
@@ -1066,7 +812,7 @@ class DataProcessor:
         """处理面板区域数据"""
         try:
             # 检查OCR结果格式并获取文本
-            if (isinstance(ocr_result, dict) and 
+            if (isinstance(ocr_result, (dict, OCRResult)) and 
                 'details' in ocr_result and 
                 len(ocr_result['details']) > 0):
                 # 获取第一个检测到的文本（面板区域通常只有一行时间文本）
@@ -1091,6 +837,7 @@ class DataProcessor:
         return {'date': 0, 'time': 0, 'ms': 0}
                     
     # 处理单个区域的数据
+    @traced('DataProcessor.process_region', region_arg='region_name')
     def process_region(self, region_name: str, ocr_result: Dict, image: np.ndarray, region_config: Dict) -> Dict[str, Any]:
         """处理单个区域的数据
         
@@ -1102,23 +849,20 @@ class DataProcessor:
             
         Returns:
             Dict: 处理后的数据
+            
+        注意: 同一波次的区域可能在多个线程中并行调用(region_graph.parallel、异步运行时),
+        处理方法不能在实例上保存当前区域等逐次调用的状态
         """
-        self.current_region_name = region_name
-        self.current_region_config = region_config
-        
-        try:
-            # 首先检查是否有针对区域名称的特定处理方法
-            if region_name in self.region_process_mapping:
-                process_method = self.region_process_mapping[region_name]
-                return_data = process_method(ocr_result, image)
-                # self.logger.debug(f"区域 {region_name} 处理结果: {return_data}")
-                return return_data
-            # 如果没有特定的处理方法，返回原始OCR结果
-            self.logger.warning(f"区域 {region_name} 无特定处理方法，返回原始结果")
-            return ocr_result if isinstance(ocr_result, dict) else {'text': str(ocr_result)} if ocr_result else {}
-                
-        finally:
-            self.current_region_name = None
-            self.current_region_config = None 
+        # 首先检查是否有针对区域名称的特定处理方法
+        if region_name in self.region_process_mapping:
+            process_method = self.region_process_mapping[region_name]
+            return_data = process_method(ocr_result, image)
+            # self.logger.debug(f"区域 {region_name} 处理结果: {return_data}")
+            return return_data
+        # 如果没有特定的处理方法，返回原始OCR结果
+        self.logger.warning(f"区域 {region_name} 无特定处理方法，返回原始结果")
+        if isinstance(ocr_result, OCRResult):
+            return ocr_result.to_dict()
+        return ocr_result if isinstance(ocr_result, dict) else {'text': str(ocr_result)} if ocr_result else {}
 
 
@@ -4,6 +4,8 @@ from pathlib import Path
 from typing import Dict, List, Optional
 import logging
 
+from src.utils.tracing import traced
+
 
 class ImagePreprocessor:
     """图像预处理类"""
@@ -46,6 +48,14 @@ class ImagePreprocessor:
         }
         self.logger.info("=========================图像预处理器初始化完成=========================    ")
 
+    # 获取区域放大倍数
+    def _get_scale_factor(self, region_name: str, default: float) -> float:
+        """获取区域预处理的放大倍数
+        
+        可在区域配置 image_preprocess.scale_factor 中覆盖默认值
+        """
+        return self.area_config.get(region_name, {}).get('image_preprocess', {}).get('scale_factor', default)
+
     # 目标名称预处理
     def _preprocess_target_name(self, image: np.ndarray) -> np.ndarray:
         """目标名称预处理"""
@@ -74,9 +84,10 @@ class ImagePreprocessor:
             # 图像反转
             inverted = cv2.bitwise_not(binary)
             
-            # 放大4倍
+            # 放大(默认4倍，可通过 image_preprocess.scale_factor 配置)
+            scale_factor = self._get_scale_factor('target_name', 4)
             height, width = inverted.shape[:2]
-            enlarged = cv2.resize(inverted, (width * 4, height * 4), interpolation=cv2.INTER_LINEAR)
+            enlarged = cv2.resize(inverted, (int(width * scale_factor), int(height * scale_factor)), interpolation=cv2.INTER_LINEAR)
             
             return enlarged
             
@@ -114,7 +125,7 @@ class ImagePreprocessor:
             original_height, original_width = binary.shape[:2]
 
             # 定义放大比例
-            scale_factor = 4.0  # 例如，放大2倍
+            scale_factor = self._get_scale_factor('char_blood_loss', 4.0)
 
             # 计算新的尺寸
             new_width = int(original_width * scale_factor)
@@ -512,6 +523,7 @@ class ImagePreprocessor:
         if cv2.waitKey(1) & 0xFF == ord('q'):
             cv2.destroyAllWindows()
     # 处理多个区域的图像
+    @traced('ImagePreprocessor.process_images', region_arg='regions_to_process')
     def process_images(self,
                       images: Dict[str, np.ndarray],
                       regions_to_process: Optional[List[str]] = None,
@@ -569,4 +581,8 @@ class ImagePreprocessor:
 
     def __del__(self):
         """析构函数：清理所有窗口"""
-        cv2.destroyAllWindows() 
\ No newline at end of file
+        try:
+            cv2.destroyAllWindows()
+        except cv2.error:
+            # 无GUI支持的OpenCV(如headless版本)没有窗口可清理
+            pass
\ No newline at end of file
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+名字标签跟踪模块
+
+game_area 中的人物/怪物名字标签大多会在连续多帧中持续出现,该模块在帧间跟踪这些标签:
+1. 每帧只运行文本检测,按预测位置与外观将检测框关联到已有轨迹,分配稳定的轨迹ID
+2. 轨迹采用匀速运动模型预测下一帧位置
+3. 只对新轨迹、外观发生变化的轨迹以及到达确认间隔的轨迹重新识别文字
+4. 其余轨迹直接复用上次识别的文本
+
+配置位于区域配置 text_recognizer.tracker:
+    Enabled: 是否启用
+    max_distance: 预测位置与检测框中心的最大关联距离(像素)
+    appearance_threshold: 外观相似度低于该值时认为标签内容变化,需要重新识别
+    confirm_interval: 稳定轨迹每隔多少帧重新识别一次以确认文本
+    max_missed: 轨迹连续丢失多少帧后删除
+    velocity_smoothing: 速度平滑系数(0~1,越大越跟随最新位移)
+
+主要类:
+- NameTagTracker: 名字标签跟踪器
+"""
+
+import logging
+from typing import Callable, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from src.environment.ocr_result import OCRResult
+
+# 默认跟踪配置
+DEFAULT_TRACKER_CONFIG = {
+    'Enabled': False,
+    'max_distance': 40,
+    'appearance_threshold': 0.85,
+    'confirm_interval': 30,
+    'max_missed': 5,
+    'velocity_smoothing': 0.5
+}
+
+# 外观签名的缩略图尺寸(宽, 高)
+SIGNATURE_SIZE = (48, 12)
+
+
+def get_tracker_config(region_config: dict) -> dict:
+    """读取区域的跟踪配置,缺省项使用默认值"""
+    config = dict(DEFAULT_TRACKER_CONFIG)
+    config.update((region_config or {}).get('text_recognizer', {}).get('tracker') or {})
+    return config
+
+
+def appearance_signature(image: np.ndarray, box: np.ndarray) -> np.ndarray:
+    """计算文本框的外观签名
+
+    取外接矩形的灰度缩略图并归一化为零均值单位方差,可直接用点积计算相关系数
+
+    Args:
+        image: 区域图像
+        box: (4, 2) 四点坐标
+
+    Returns:
+        np.ndarray: 长度为 SIGNATURE_SIZE 面积的 float32 向量
+    """
+    height, width = image.shape[:2]
+    x_min, y_min = np.maximum(box.min(axis=0).astype(int), 0)
+    x_max, y_max = np.minimum(box.max(axis=0).astype(int) + 1, [width, height])
+    patch = image[y_min:y_max, x_min:x_max]
+    if patch.size == 0:
+        return np.zeros(SIGNATURE_SIZE[0] * SIGNATURE_SIZE[1], dtype=np.float32)
+    if patch.ndim == 3:
+        patch = cv2.cvtColor(patch, cv2.COLOR_BGR2GRAY)
+    thumb = cv2.resize(patch, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+    thumb -= thumb.mean()
+    norm = np.linalg.norm(thumb)
+    return thumb / norm if norm > 0 else thumb
+
+
+class NameTagTracker:
+    """
+    名字标签跟踪器
+
+    轨迹状态以列式数组保存,关联与预测均为向量化计算
+
+    属性:
+        frame_index (int): 已处理的帧数
+        stats (Dict[str, int]): 累计检测数与重新识别数
+    """
+
+    def __init__(self, config: dict, logger: logging.Logger):
+        """初始化跟踪器
+
+        Args:
+            config: 跟踪配置(见 DEFAULT_TRACKER_CONFIG)
+            logger: 日志实例
+        """
+        self.logger = logger
+        self.max_distance = float(config.get('max_distance', DEFAULT_TRACKER_CONFIG['max_distance']))
+        self.appearance_threshold = float(config.get('appearance_threshold', DEFAULT_TRACKER_CONFIG['appearance_threshold']))
+        self.confirm_interval = int(config.get('confirm_interval', DEFAULT_TRACKER_CONFIG['confirm_interval']))
+        self.max_missed = int(config.get('max_missed', DEFAULT_TRACKER_CONFIG['max_missed']))
+        self.velocity_smoothing = float(config.get('velocity_smoothing', DEFAULT_TRACKER_CONFIG['velocity_smoothing']))
+
+        self.frame_index = 0
+        self.next_id = 1
+        self.stats = {'detections': 0, 'recognized': 0}
+        self.reset()
+
+    def reset(self):
+        """清空所有轨迹"""
+        signature_length = SIGNATURE_SIZE[0] * SIGNATURE_SIZE[1]
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.centers = np.zeros((0, 2), dtype=np.float64)
+        self.velocities = np.zeros((0, 2), dtype=np.float64)
+        self.signatures = np.zeros((0, signature_length), dtype=np.float32)
+        self.last_ocr_frame = np.zeros(0, dtype=np.int64)
+        self.missed = np.zeros(0, dtype=np.int64)
+        self.texts: List[str] = []
+        self.confidences = np.zeros(0, dtype=np.float64)
+
+    @property
+    def track_count(self) -> int:
+        """当前轨迹数量"""
+        return len(self.ids)
+
+    def _associate(self, centers: np.ndarray, signatures: np.ndarray) -> np.ndarray:
+        """将检测框关联到已有轨迹
+
+        代价为归一化距离与外观差异之和,按代价从小到大贪心匹配
+
+        Args:
+            centers: (D, 2) 检测框中心
+            signatures: (D, S) 检测框外观签名
+
+        Returns:
+            np.ndarray: (D,) 每个检测框对应的轨迹下标,未匹配为 -1
+        """
+        matches = np.full(len(centers), -1, dtype=np.int64)
+        if self.track_count == 0 or len(centers) == 0:
+            return matches
+
+        predicted = self.centers + self.velocities
+        distances = np.linalg.norm(centers[:, None, :] - predicted[None, :, :], axis=2)
+        similarity = signatures @ self.signatures.T
+        cost = distances / self.max_distance + (1.0 - similarity)
+        cost[distances > self.max_distance] = np.inf
+
+        used_tracks = np.zeros(self.track_count, dtype=bool)
+        for flat_index in np.argsort(cost, axis=None):
+            det_index, track_index = divmod(int(flat_index), self.track_count)
+            if not np.isfinite(cost[det_index, track_index]):
+                break
+            if matches[det_index] >= 0 or used_tracks[track_index]:
+                continue
+            matches[det_index] = track_index
+            used_tracks[track_index] = True
+        return matches
+
+    def update(self, image: np.ndarray, boxes: np.ndarray,
+               recognize: Callable[[List[int]], Sequence[Tuple[str, float]]]) -> OCRResult:
+        """处理一帧检测结果
+
+        Args:
+            image: 区域图像(与检测使用的图像一致)
+            boxes: (N, 4, 2) 本帧检测到的文本框
+            recognize: 识别回调,参数为需要识别的检测框下标列表,返回对应的 (文本, 置信度)
+
+        Returns:
+            OCRResult: 本帧所有检测框的识别结果,track_ids 为对应的轨迹ID
+        """
+        self.frame_index += 1
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4, 2)
+        count = len(boxes)
+        self.stats['detections'] += count
+
+        centers = boxes.mean(axis=1)
+        signatures = (np.stack([appearance_signature(image, box) for box in boxes])
+                      if count else np.zeros((0, self.signatures.shape[1]), dtype=np.float32))
+        matches = self._associate(centers, signatures)
+
+        # 需要重新识别: 新轨迹、外观变化、到达确认间隔
+        need_ocr = matches < 0
+        matched = np.flatnonzero(~need_ocr)
+        if len(matched):
+            track_indices = matches[matched]
+            similarity = np.einsum('ij,ij->i', signatures[matched], self.signatures[track_indices])
+            stale = self.frame_index - self.last_ocr_frame[track_indices] >= self.confirm_interval
+            need_ocr[matched] = (similarity < self.appearance_threshold) | stale
+
+        ocr_indices = np.flatnonzero(need_ocr).tolist()
+        recognized = dict(zip(ocr_indices, recognize(ocr_indices))) if ocr_indices else {}
+        self.stats['recognized'] += len(recognized)
+
+        # 更新已匹配轨迹
+        alpha = self.velocity_smoothing
+        track_ids = np.zeros(count, dtype=np.int64)
+        for det_index in matched.tolist():
+            track_index = int(matches[det_index])
+            displacement = centers[det_index] - self.centers[track_index]
+            self.velocities[track_index] = alpha * displacement + (1 - alpha) * self.velocities[track_index]
+            self.centers[track_index] = centers[det_index]
+            self.missed[track_index] = 0
+            track_ids[det_index] = self.ids[track_index]
+            if det_index in recognized:
+                text, confidence = recognized[det_index]
+                self.texts[track_index] = text
+                self.confidences[track_index] = confidence
+                self.signatures[track_index] = signatures[det_index]
+                self.last_ocr_frame[track_index] = self.frame_index
+
+        # 未匹配的轨迹计为丢失一帧,超出上限的删除
+        unmatched_tracks = np.ones(self.track_count, dtype=bool)
+        unmatched_tracks[matches[matched]] = False
+        self.missed[unmatched_tracks] += 1
+        self._remove(self.missed > self.max_missed)
+
+        # 为未匹配的检测框建立新轨迹
+        for det_index in np.flatnonzero(matches < 0).tolist():
+            text, confidence = recognized[det_index]
+            track_ids[det_index] = self._add(centers[det_index], signatures[det_index], text, confidence)
+
+        # 按轨迹ID取出每个检测框的文本
+        id_to_index = {track_id: index for index, track_id in enumerate(self.ids.tolist())}
+        track_indices = [id_to_index[track_id] for track_id in track_ids.tolist()]
+        texts = [self.texts[index] for index in track_indices]
+        confidences = self.confidences[track_indices]
+
+        self.logger.debug(
+            f"名字标签跟踪: 检测 {count} 个, 重新识别 {len(recognized)} 个, 轨迹 {self.track_count} 条"
+        )
+        return OCRResult(boxes, confidences, texts, track_ids=track_ids)
+
+    def _remove(self, mask: np.ndarray):
+        """删除掩码为True的轨迹"""
+        if not mask.any():
+            return
+        keep = ~mask
+        self.ids = self.ids[keep]
+        self.centers = self.centers[keep]
+        self.velocities = self.velocities[keep]
+        self.signatures = self.signatures[keep]
+        self.last_ocr_frame = self.last_ocr_frame[keep]
+        self.missed = self.missed[keep]
+        self.texts = [text for text, flag in zip(self.texts, keep.tolist()) if flag]
+        self.confidences = self.confidences[keep]
+
+    def _add(self, center: np.ndarray, signature: np.ndarray, text: str, confidence: float) -> int:
+        """新建轨迹并返回轨迹ID"""
+        track_id = self.next_id
+        self.next_id += 1
+        self.ids = np.append(self.ids, track_id)
+        self.centers = np.vstack([self.centers, center])
+        self.velocities = np.vstack([self.velocities, np.zeros(2)])
+        self.signatures = np.vstack([self.signatures, signature[None, :]])
+        self.last_ocr_frame = np.append(self.last_ocr_frame, self.frame_index)
+        self.missed = np.append(self.missed, 0)
+        self.texts.append(text)
+        self.confidences = np.append(self.confidences, confidence)
+        return track_id
@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+"""
+OCR守护进程模块
+
+该模块负责:
+1. 常驻加载PP-OCRv4检测/识别模型,避免每次启动采集程序都重新加载
+2. 通过Unix域套接字(不支持时回退到本机TCP)提供识别服务
+3. 提供客户端供 TextRecognizer 自动检测并使用守护进程
+
+二进制协议(小端序):
+    请求头  <4sBBHHHB  magic(b'OCRD') 版本 操作码 区域名长度 图像高 图像宽 通道数
+            后接 区域名(utf-8) 与 图像数据(uint8, 高*宽*通道)
+    响应头  <4sBBI     magic(b'OCRD') 状态(0成功/1失败) 保留 长度
+            成功时后接 OCRResult.to_bytes() 编码的识别结果(含中心点与轨迹ID,与进程内识别结果一致)
+            失败时后接错误信息(utf-8)
+
+启动方式:
+    python -m src.environment.ocr_daemon --config config/env/status_collection_config.yaml
+
+主要类:
+- OCRDaemon: OCR守护进程服务端
+- OCRDaemonClient: OCR守护进程客户端
+"""
+
+import os
+import sys
+import socket
+import struct
+import argparse
+import threading
+import socketserver
+import logging
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+# 获取项目根目录并添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.environment.ocr_result import OCRResult
+
+# 协议常量
+MAGIC = b'OCRD'
+PROTOCOL_VERSION = 2
+OP_OCR = 1
+OP_PING = 2
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+REQUEST_HEADER = struct.Struct('<4sBBHHHB')
+RESPONSE_HEADER = struct.Struct('<4sBBI')
+
+# 默认守护进程配置
+DEFAULT_DAEMON_CONFIG = {
+    'Enabled': False,
+    'socket_path': '/tmp/1000y_ocr.sock',
+    'host': '127.0.0.1',
+    'port': 47001,
+    'timeout': 5.0,
+    'retry_interval': 1.0,
+    'max_retry_interval': 30.0
+}
+
+
+# 读取守护进程配置
+def get_daemon_config(basic_config: dict) -> dict:
+    """合并 basic_config.ocr_daemon 与默认配置"""
+    config = dict(DEFAULT_DAEMON_CONFIG)
+    config.update(basic_config.get('ocr_daemon') or {})
+    return config
+
+
+# 是否使用Unix域套接字
+def use_unix_socket() -> bool:
+    """当前平台是否支持Unix域套接字"""
+    return hasattr(socket, 'AF_UNIX')
+
+
+# 从套接字读取指定长度的数据
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    """从套接字读取恰好 size 字节
+
+    Raises:
+        ConnectionError: 连接在读取完成前关闭时抛出
+    """
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            raise ConnectionError("连接已关闭")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+# 编码请求
+def encode_request(op: int, region_name: str = '', image: Optional[np.ndarray] = None) -> bytes:
+    """编码识别请求"""
+    name = (region_name or '').encode('utf-8')
+    if image is None:
+        return REQUEST_HEADER.pack(MAGIC, PROTOCOL_VERSION, op, len(name), 0, 0, 0) + name
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape[:2]
+    channels = 1 if image.ndim == 2 else image.shape[2]
+    return REQUEST_HEADER.pack(MAGIC, PROTOCOL_VERSION, op, len(name), height, width, channels) + name + image.tobytes()
+
+
+# 解码请求
+def decode_request(sock: socket.socket) -> Tuple[int, str, Optional[np.ndarray]]:
+    """从套接字读取并解码一个请求
+
+    Returns:
+        Tuple[int, str, Optional[np.ndarray]]: (操作码, 区域名, 图像)
+
+    Raises:
+        ValueError: 协议头不合法时抛出
+    """
+    magic, version, op, name_len, height, width, channels = REQUEST_HEADER.unpack(
+        recv_exact(sock, REQUEST_HEADER.size))
+    if magic != MAGIC or version != PROTOCOL_VERSION:
+        raise ValueError(f"不支持的协议: {magic!r} v{version}")
+    region_name = recv_exact(sock, name_len).decode('utf-8') if name_len else ''
+    image = None
+    if height and width and channels:
+        data = recv_exact(sock, height * width * channels)
+        shape = (height, width) if channels == 1 else (height, width, channels)
+        image = np.frombuffer(data, dtype=np.uint8).reshape(shape)
+    return op, region_name, image
+
+
+# 编码响应
+def encode_response(result: OCRResult) -> bytes:
+    """将识别结果编码为响应"""
+    data = result.to_bytes()
+    return RESPONSE_HEADER.pack(MAGIC, STATUS_OK, 0, len(data)) + data
+
+
+# 编码错误响应
+def encode_error(message: str) -> bytes:
+    """将错误信息编码为响应"""
+    data = message.encode('utf-8')
+    return RESPONSE_HEADER.pack(MAGIC, STATUS_ERROR, 0, len(data)) + data
+
+
+# 解码响应
+def decode_response(sock: socket.socket) -> OCRResult:
+    """从套接字读取并解码响应,格式与 TextRecognizer 的识别结果一致
+
+    Raises:
+        RuntimeError: 守护进程返回错误时抛出
+    """
+    magic, status, _, length = RESPONSE_HEADER.unpack(recv_exact(sock, RESPONSE_HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"不支持的协议: {magic!r}")
+    data = recv_exact(sock, length)
+    if status != STATUS_OK:
+        raise RuntimeError(data.decode('utf-8'))
+    return OCRResult.from_bytes(data)
+
+
+class OCRDaemonClient:
+    """
+    OCR守护进程客户端
+
+    维持一个长连接,连接断开时自动重连一次。线程安全。
+    """
+
+    MODULE_NAME = 'OCRDaemonClient'
+
+    def __init__(self, basic_config: dict, logger: logging.Logger):
+        """初始化客户端
+
+        Args:
+            basic_config: 基础配置字典,读取 ocr_daemon 配置
+            logger: 日志实例
+        """
+        self.logger = logger
+        self.config = get_daemon_config(basic_config)
+        self.timeout = float(self.config['timeout'])
+        self._sock = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        """建立到守护进程的连接"""
+        if use_unix_socket():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            address = self.config['socket_path']
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            address = (self.config['host'], int(self.config['port']))
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _request(self, payload: bytes) -> OCRResult:
+        """发送请求并读取响应,连接失效时重连一次"""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._sock = self._connect()
+                    self._sock.sendall(payload)
+                    return decode_response(self._sock)
+                except (OSError, ConnectionError):
+                    self.close_locked()
+                    if attempt == 1:
+                        raise
+
+    def close_locked(self):
+        """关闭连接(调用方需持有锁)"""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def close(self):
+        """关闭连接"""
+        with self._lock:
+            self.close_locked()
+
+    def ping(self) -> bool:
+        """检测守护进程是否可用"""
+        try:
+            self._request(encode_request(OP_PING))
+            return True
+        except Exception as e:
+            self.logger.debug(f"OCR守护进程不可用: {e}")
+            return False
+
+    def recognize(self, image: np.ndarray, region_name: str = None) -> OCRResult:
+        """请求守护进程识别图像
+
+        Args:
+            image: 图像(灰度或BGR)
+            region_name: 区域名称,守护进程据此使用区域特定OCR参数
+
+        Returns:
+            OCRResult: 识别结果
+        """
+        return self._request(encode_request(OP_OCR, region_name or '', image))
+
+
+class OCRDaemon:
+    """
+    OCR守护进程服务端
+
+    内部持有一个不使用守护进程的 TextRecognizer,所有请求共享常驻的模型。
+    Paddle预测器不是线程安全的,识别调用串行执行。
+    名字标签跟踪器按客户端连接分别保存,多个采集程序的轨迹互不影响,连接断开后丢弃。
+    """
+
+    MODULE_NAME = 'OCRDaemon'
+
+    def __init__(self, basic_config: dict, area_config: dict, logger: logging.Logger):
+        """初始化OCR守护进程
+
+        Args:
+            basic_config: 基础配置字典
+            area_config: 区域配置字典,用于区域特定OCR参数
+            logger: 日志实例
+        """
+        from src.environment.text_recognizer import TextRecognizer
+
+        self.logger = logger
+        self.logger.info("<<<<<<<<<<<<<<<<<<OCR守护进程初始化开始...>>>>>>>>>>>>>>>>>>")
+        self.config = get_daemon_config(basic_config)
+        self.recognizer = TextRecognizer(basic_config, area_config, logger, use_daemon=False)
+        self.recognizer.wait_until_ready()
+        self._ocr_lock = threading.Lock()
+        self.server = None
+        self.logger.info("=========================OCR守护进程初始化完成=========================")
+
+    def handle(self, op: int, region_name: str, image: Optional[np.ndarray], trackers: Optional[dict] = None) -> bytes:
+        """处理单个请求并返回编码后的响应
+
+        Args:
+            op: 操作码
+            region_name: 区域名称
+            image: 图像
+            trackers: 该客户端连接的名字标签跟踪器缓存 {区域名: NameTagTracker}
+        """
+        if op == OP_PING:
+            return encode_response(OCRResult.empty())
+        if op != OP_OCR or image is None:
+            return encode_error(f"不支持的请求: op={op}")
+        with self._ocr_lock:
+            result = self.recognizer.process_and_recognize(image, region_name=region_name or None,
+                                                           trackers={} if trackers is None else trackers)
+        return encode_response(result)
+
+    def _create_server(self) -> socketserver.BaseServer:
+        """创建套接字服务"""
+        daemon = self
+
+        class RequestHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                # 长连接: 循环处理同一客户端的多个请求,跟踪器只属于该连接
+                trackers = {}
+                while True:
+                    try:
+                        op, region_name, image = decode_request(self.request)
+                    except (ConnectionError, OSError):
+                        return
+                    except Exception as e:
+                        self.request.sendall(encode_error(str(e)))
+                        return
+                    try:
+                        response = daemon.handle(op, region_name, image, trackers)
+                    except Exception as e:
+                        daemon.logger.error(f"处理识别请求出错: {e}")
+                        response = encode_error(str(e))
+                    self.request.sendall(response)
+
+        if use_unix_socket():
+            socket_path = Path(self.config['socket_path'])
+            if socket_path.exists():
+                socket_path.unlink()  # 清理上次异常退出残留的套接字文件
+            server = socketserver.ThreadingUnixStreamServer(str(socket_path), RequestHandler)
+            self.logger.info(f"OCR守护进程监听: {socket_path}")
+        else:
+            socketserver.ThreadingTCPServer.allow_reuse_address = True
+            address = (self.config['host'], int(self.config['port']))
+            server = socketserver.ThreadingTCPServer(address, RequestHandler)
+            self.logger.info(f"OCR守护进程监听: {address[0]}:{address[1]}")
+        server.daemon_threads = True
+        return server
+
+    def serve_forever(self):
+        """启动服务,阻塞直到 shutdown"""
+        self.server = self._create_server()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if use_unix_socket():
+                try:
+                    os.unlink(self.config['socket_path'])
+                except OSError:
+                    pass
+
+    def shutdown(self):
+        """停止服务"""
+        if self.server is not None:
+            self.server.shutdown()
+
+
+def main():
+    """
+    主函数
+
+    启动常驻的OCR守护进程,按 Ctrl+C 退出
+    """
+    from src.utils.config_manager import ConfigManager
+    from src.utils.logger_manager import LoggerManager
+
+    parser = argparse.ArgumentParser(description='OCR守护进程')
+    parser.add_argument('--config', type=str, default=str(project_root / 'config/env/status_collection_config.yaml'),
+                        help='采集配置文件路径')
+    args = parser.parse_args()
+
+    config_manager = ConfigManager(args.config)
+    logger = LoggerManager(name=OCRDaemon.MODULE_NAME, **config_manager.get_logger_config()).get_logger()
+
+    daemon = OCRDaemon(config_manager.basic_config, config_manager.area_config, logger)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("OCR守护进程退出")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+OCR识别结果模块
+
+以列式数组保存一次识别的全部文本框,替代逐条的 dict 列表:
+1. boxes (N, 4, 2) int32、centers (N, 2) int32、confidences (N,) float64、texts 列表
+2. 筛选、平移等几何操作直接作用于数组
+3. 提供紧凑的二进制序列化与 JSON 友好的 to_dict
+4. 保留兼容视图: result['details'] / result.get('details') 仍返回原有的 dict 列表
+
+主要类:
+- OCRResult: 列式OCR识别结果
+"""
+
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+# 二进制格式: 头部 <IB 数量与是否含轨迹ID, 后接 boxes(int32) centers(int32) confidences(float64)
+# [track_ids(int64)] 文本长度(uint32) 文本(utf-8)
+COUNT_HEADER = struct.Struct('<IB')
+
+
+class OCRResult:
+    """
+    列式OCR识别结果
+
+    属性:
+        boxes (np.ndarray): (N, 4, 2) int32 四点坐标
+        centers (np.ndarray): (N, 2) int32 中心点坐标
+        confidences (np.ndarray): (N,) float64 置信度
+        texts (List[str]): 识别文本
+        track_ids (Optional[np.ndarray]): (N,) int64 名字标签跟踪的轨迹ID,未跟踪时为None
+    """
+
+    __slots__ = ('boxes', 'centers', 'confidences', 'texts', 'track_ids', '_details')
+
+    def __init__(self, boxes: Optional[np.ndarray] = None, confidences: Optional[Sequence[float]] = None,
+                 texts: Optional[Sequence[str]] = None, centers: Optional[np.ndarray] = None,
+                 track_ids: Optional[Sequence[int]] = None):
+        """初始化识别结果
+
+        Args:
+            boxes: 四点坐标,可转换为 (N, 4, 2) 的数组
+            confidences: 置信度
+            texts: 识别文本
+            centers: 中心点坐标,为None时由 boxes 计算
+            track_ids: 轨迹ID
+        """
+        self.texts = list(texts) if texts is not None else []
+        count = len(self.texts)
+        if boxes is None or count == 0:
+            self.boxes = np.zeros((count, 4, 2), dtype=np.int32)
+        else:
+            # 与原格式一致,坐标截断取整
+            self.boxes = np.asarray(boxes).reshape(count, 4, 2).astype(np.int32)
+        if confidences is None:
+            self.confidences = np.zeros(count, dtype=np.float64)
+        else:
+            self.confidences = np.asarray(confidences, dtype=np.float64).reshape(count)
+        if centers is None:
+            # 中心点基于原始(未取整)坐标计算,再截断取整
+            source = np.asarray(boxes, dtype=np.float64).reshape(count, 4, 2) if boxes is not None and count else self.boxes
+            self.centers = source.mean(axis=1).astype(np.int32)
+        else:
+            self.centers = np.asarray(centers).reshape(count, 2).astype(np.int32)
+        self.track_ids = None if track_ids is None else np.asarray(track_ids, dtype=np.int64).reshape(count)
+        self._details = None
+
+    @classmethod
+    def empty(cls) -> 'OCRResult':
+        """空结果"""
+        return cls()
+
+    @classmethod
+    def from_paddle(cls, lines: Optional[Iterable]) -> 'OCRResult':
+        """由 PaddleOCR.ocr 返回的单张图像结果构造
+
+        Args:
+            lines: result[0],每项为 [box, (text, confidence)]
+        """
+        if not lines:
+            return cls()
+        boxes = []
+        texts = []
+        confidences = []
+        for line in lines:
+            if len(line) == 2:  # 确保结果包含坐标和文本信息
+                box, (text, confidence) = line
+                boxes.append(box)
+                texts.append(text)
+                confidences.append(confidence)
+        return cls(boxes, confidences, texts)
+
+    @classmethod
+    def from_details(cls, details: Sequence[Dict[str, Any]]) -> 'OCRResult':
+        """由 details 列表构造"""
+        if not details:
+            return cls()
+        return cls(
+            [detail['box'] for detail in details],
+            [detail.get('confidence', 0.0) for detail in details],
+            [detail['text'] for detail in details],
+            [detail['center'] for detail in details] if all('center' in detail for detail in details) else None,
+            [detail['track_id'] for detail in details] if all('track_id' in detail for detail in details) else None
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'OCRResult':
+        """由 to_dict 的输出(或原有的 {'details': [...]} 格式)构造"""
+        return cls.from_details(data.get('details', []))
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, memoryview]) -> 'OCRResult':
+        """由 to_bytes 的输出构造"""
+        view = memoryview(data)
+        count, has_track_ids = COUNT_HEADER.unpack_from(view, 0)
+        offset = COUNT_HEADER.size
+        boxes = np.frombuffer(view, dtype='<i4', count=count * 8, offset=offset).reshape(count, 4, 2)
+        offset += count * 32
+        centers = np.frombuffer(view, dtype='<i4', count=count * 2, offset=offset).reshape(count, 2)
+        offset += count * 8
+        confidences = np.frombuffer(view, dtype='<f8', count=count, offset=offset)
+        offset += count * 8
+        track_ids = None
+        if has_track_ids:
+            track_ids = np.frombuffer(view, dtype='<i8', count=count, offset=offset)
+            offset += count * 8
+        lengths = np.frombuffer(view, dtype='<u4', count=count, offset=offset)
+        offset += count * 4
+        texts = []
+        for length in lengths.tolist():
+            texts.append(bytes(view[offset:offset + length]).decode('utf-8'))
+            offset += length
+        return cls(boxes, confidences, texts, centers, track_ids)
+
+    @property
+    def count(self) -> int:
+        """文本框数量"""
+        return len(self.texts)
+
+    @property
+    def details(self) -> List[Dict[str, Any]]:
+        """兼容视图: 原有的 details 列表格式,首次访问时生成并缓存"""
+        if self._details is None:
+            self._details = [
+                {
+                    'text': text,
+                    'confidence': confidence,
+                    'box': box,
+                    'center': center
+                }
+                for text, confidence, box, center in zip(
+                    self.texts, self.confidences.tolist(), self.boxes.tolist(), self.centers.tolist()
+                )
+            ]
+            if self.track_ids is not None:
+                for detail, track_id in zip(self._details, self.track_ids.tolist()):
+                    detail['track_id'] = track_id
+        return self._details
+
+    # 兼容原有的 dict 访问方式
+    def __getitem__(self, key: str) -> Any:
+        if key == 'details':
+            return self.details
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key == 'details'
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.details if key == 'details' else default
+
+    def __repr__(self) -> str:
+        return f"OCRResult(texts={self.texts!r}, centers={self.centers.tolist()!r})"
+
+    def filter(self, mask: Union[np.ndarray, Sequence[int], Sequence[bool]]) -> 'OCRResult':
+        """按布尔掩码或索引筛选文本框
+
+        Returns:
+            OCRResult: 新的识别结果
+        """
+        indices = np.asarray(mask)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        else:
+            indices = indices.astype(np.intp)
+        return OCRResult(
+            self.boxes[indices],
+            self.confidences[indices],
+            [self.texts[i] for i in indices.tolist()],
+            self.centers[indices],
+            None if self.track_ids is None else self.track_ids[indices]
+        )
+
+    def non_empty(self) -> 'OCRResult':
+        """去除空白文本的文本框"""
+        return self.filter([i for i, text in enumerate(self.texts) if text.strip()])
+
+    def offset(self, dx: int, dy: int) -> 'OCRResult':
+        """平移全部坐标,如将区域内坐标转换为整屏坐标
+
+        Returns:
+            OCRResult: 新的识别结果
+        """
+        shift = np.array([dx, dy], dtype=np.int32)
+        return OCRResult(self.boxes + shift, self.confidences, self.texts, self.centers + shift, self.track_ids)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为原有的 {'details': [...]} 格式,可直接JSON序列化"""
+        return {'details': self.details}
+
+    def to_bytes(self) -> bytes:
+        """紧凑的二进制序列化,各字段与原结果完全一致"""
+        encoded = [text.encode('utf-8') for text in self.texts]
+        return b''.join([
+            COUNT_HEADER.pack(self.count, self.track_ids is not None),
+            self.boxes.astype('<i4').tobytes(),
+            self.centers.astype('<i4').tobytes(),
+            self.confidences.astype('<f8').tobytes(),
+            b'' if self.track_ids is None else self.track_ids.astype('<i8').tobytes(),
+            np.array([len(item) for item in encoded], dtype='<u4').tobytes(),
+            *encoded
+        ])
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+"""
+Paddle推理运行时模块
+
+直接以 paddle.inference 预测器加载项目自带的PP-OCRv4模型,绕过通用的 PaddleOCR 封装:
+1. 每个模型只创建一个预测器(输入为动态形状),按输入尺寸缓存预分配的输入缓冲区
+2. 归一化结果原地写入缓冲区,同一尺寸的输入不再重复分配
+3. CTC解码使用NumPy向量化实现
+4. ocr() 的输入输出与 PaddleOCR.ocr 保持一致,TextRecognizer 的 details 格式不变
+
+在 basic_config 中设置 ocr_backend: "paddle_inference" 启用,模型路径见 ocr_runtime 配置。
+
+主要类:
+- PaddleInferenceOCR: 兼容 PaddleOCR.ocr 接口的精简推理运行时
+"""
+
+import math
+import threading
+import importlib.util
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+# 项目根目录,用于定位 models/ 下的自带模型
+project_root = Path(__file__).parent.parent.parent
+
+# 默认运行时配置
+DEFAULT_RUNTIME_CONFIG = {
+    'det_model_dir': str(project_root / 'models/ch_PP-OCRv4_det'),
+    'rec_model_dir': str(project_root / 'models/ch_PP-OCRv4_rec_infer'),
+    'rec_char_dict_path': None,  # 为空时使用 paddleocr 包自带的 ppocr_keys_v1.txt
+    'max_buffers': 16  # 按输入尺寸缓存的输入缓冲区数量上限
+}
+
+# 检测模型归一化参数(与PaddleOCR一致,直接作用于BGR通道)
+DET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32).reshape(3, 1, 1)
+DET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32).reshape(3, 1, 1)
+
+
+# 查找默认字符字典
+def find_default_char_dict() -> Optional[Path]:
+    """查找 paddleocr 包自带的中文字符字典"""
+    spec = importlib.util.find_spec('paddleocr')
+    if spec is None or spec.origin is None:
+        return None
+    path = Path(spec.origin).parent / 'ppocr' / 'utils' / 'ppocr_keys_v1.txt'
+    return path if path.exists() else None
+
+
+# 透视裁切文本区域
+def get_rotate_crop_image(image: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """按四点框裁切文本区域,与PaddleOCR的处理方式一致"""
+    points = points.astype(np.float32)
+    crop_width = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+    crop_height = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+    crop_width, crop_height = max(crop_width, 1), max(crop_height, 1)
+
+    # 轴对齐的框(界面文字的常见情况)直接切片,避免透视变换
+    xs, ys = points[:, 0], points[:, 1]
+    if xs[0] == xs[3] and xs[1] == xs[2] and ys[0] == ys[1] and ys[2] == ys[3]:
+        x1, y1 = max(int(xs.min()), 0), max(int(ys.min()), 0)
+        return image[y1:y1 + crop_height, x1:x1 + crop_width]
+
+    target = np.array([[0, 0], [crop_width, 0], [crop_width, crop_height], [0, crop_height]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(points, target)
+    crop = cv2.warpPerspective(image, matrix, (crop_width, crop_height),
+                               borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC)
+    if crop.shape[0] / crop.shape[1] >= 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+
+# 四点框排序
+def order_points(points: np.ndarray) -> np.ndarray:
+    """将minAreaRect的四个角点排序为 左上、右上、右下、左下"""
+    points = points[np.argsort(points[:, 0])]
+    left, right = points[:2], points[2:]
+    top_left, bottom_left = left[np.argsort(left[:, 1])]
+    top_right, bottom_right = right[np.argsort(right[:, 1])]
+    return np.array([top_left, top_right, bottom_right, bottom_left], dtype=np.float32)
+
+
+# CTC解码
+def ctc_decode(probs: np.ndarray, characters: np.ndarray) -> List[Tuple[str, float]]:
+    """向量化的CTC贪心解码
+
+    Args:
+        probs: 识别模型输出 (N, T, C)
+        characters: 字符表,下标0为blank
+
+    Returns:
+        List[Tuple[str, float]]: 每条文本及其平均置信度
+    """
+    indices = probs.argmax(axis=2)
+    scores = probs.max(axis=2)
+    # 去掉blank与连续重复字符
+    keep = indices != 0
+    keep[:, 1:] &= indices[:, 1:] != indices[:, :-1]
+
+    results = []
+    for row_indices, row_scores, row_keep in zip(indices, scores, keep):
+        if not row_keep.any():
+            results.append(('', 0.0))
+            continue
+        text = ''.join(characters[row_indices[row_keep]])
+        results.append((text, float(row_scores[row_keep].mean())))
+    return results
+
+
+class PaddleInferenceOCR:
+    """
+    兼容 PaddleOCR.ocr 接口的精简推理运行时
+
+    只实现项目用到的DB检测 + SVTR_LCNet识别流程,不含方向分类。
+    """
+
+    MODULE_NAME = 'PaddleInferenceOCR'
+
+    def __init__(self, params: dict, logger: logging.Logger):
+        """初始化推理运行时
+
+        Args:
+            params: OCR参数,与 TextRecognizer 的默认OCR配置同名的键
+                    (det_limit_side_len/det_db_thresh/drop_score等)加上 ocr_runtime 配置
+            logger: 日志实例
+        """
+        self.logger = logger
+        self.params = dict(DEFAULT_RUNTIME_CONFIG)
+        self.params.update({key: value for key, value in params.items() if value is not None})
+
+        self.det_limit_side_len = int(self.params.get('det_limit_side_len', 960))
+        self.det_limit_type = self.params.get('det_limit_type', 'max')
+        self.det_db_thresh = float(self.params.get('det_db_thresh', 0.3))
+        self.det_db_box_thresh = float(self.params.get('det_db_box_thresh', 0.6))
+        self.det_db_unclip_ratio = float(self.params.get('det_db_unclip_ratio', 1.5))
+        self.drop_score = float(self.params.get('drop_score', 0.5))
+        self.rec_image_height = 48
+        self.rec_batch_num = max(1, int(self.params.get('rec_batch_num', 6)))
+        self.max_buffers = int(self.params.get('max_buffers', 16))
+
+        self.det_model_dir = Path(self.params['det_model_dir'])
+        self.rec_model_dir = Path(self.params['rec_model_dir'])
+        self.characters = self._load_characters()
+
+        # 预测器: 模型类型 -> (predictor, input_handle, output_handle)
+        self._predictors = {}
+        # 输入缓冲区: (模型类型, 输入形状) -> buffer,按最近使用淘汰
+        self._buffers = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.logger.info(f"Paddle推理运行时已加载: det={self.det_model_dir}, rec={self.rec_model_dir}")
+
+    def _load_characters(self) -> np.ndarray:
+        """加载识别字符表,下标0为CTC blank"""
+        dict_path = self.params.get('rec_char_dict_path') or find_default_char_dict()
+        if dict_path is None:
+            raise FileNotFoundError("找不到识别字符字典,请配置 ocr_runtime.rec_char_dict_path")
+        with open(dict_path, 'r', encoding='utf-8') as f:
+            characters = [line.rstrip('\r\n') for line in f]
+        if self.params.get('use_space_char', True):
+            characters.append(' ')
+        return np.array(['blank'] + characters, dtype=object)
+
+    def _create_predictor(self, model_dir: Path):
+        """创建 paddle.inference 预测器"""
+        from paddle import inference
+
+        config = inference.Config(str(model_dir / 'inference.pdmodel'), str(model_dir / 'inference.pdiparams'))
+        if self.params.get('use_gpu', False):
+            config.enable_use_gpu(500, 0)
+        else:
+            config.disable_gpu()
+            config.set_cpu_math_library_num_threads(int(self.params.get('cpu_threads', 4)))
+            if self.params.get('enable_mkldnn', False):
+                config.enable_mkldnn()
+        config.switch_ir_optim(True)
+        config.enable_memory_optim()
+        config.disable_glog_info()
+        config.switch_use_feed_fetch_ops(False)
+        return inference.create_predictor(config)
+
+    def _get_predictor(self, kind: str, shape: Tuple[int, ...]):
+        """获取模型的预测器(每个模型只创建一次)与该输入形状的预分配缓冲区
+
+        Returns:
+            tuple: (predictor, input_handle, output_handle, buffer)
+        """
+        entry = self._predictors.get(kind)
+        if entry is None:
+            model_dir = self.det_model_dir if kind == 'det' else self.rec_model_dir
+            predictor = self._create_predictor(model_dir)
+            entry = (predictor,
+                     predictor.get_input_handle(predictor.get_input_names()[0]),
+                     predictor.get_output_handle(predictor.get_output_names()[0]))
+            self._predictors[kind] = entry
+            self.logger.debug(f"创建{kind}预测器: {model_dir}")
+        return (*entry, self._get_buffer(kind, shape))
+
+    def _get_buffer(self, kind: str, shape: Tuple[int, ...]) -> np.ndarray:
+        """按模型类型和输入形状获取(或创建)输入缓冲区"""
+        key = (kind, shape)
+        buffer = self._buffers.get(key)
+        if buffer is not None:
+            self._buffers.move_to_end(key)
+            return buffer
+        buffer = np.zeros(shape, dtype=np.float32)
+        self._buffers[key] = buffer
+        # 超出上限时淘汰最久未使用的缓冲区
+        while len(self._buffers) > self.max_buffers:
+            self._buffers.popitem(last=False)
+        return buffer
+
+    @staticmethod
+    def _run(entry) -> np.ndarray:
+        """执行一次推理(预测器输入为动态形状,按缓冲区形状设置)"""
+        predictor, input_handle, output_handle, buffer = entry
+        input_handle.reshape(list(buffer.shape))
+        input_handle.copy_from_cpu(buffer)
+        predictor.run()
+        return output_handle.copy_to_cpu()
+
+    def _det_input_size(self, height: int, width: int) -> Tuple[int, int]:
+        """计算检测输入尺寸(32的倍数),规则与PaddleOCR的DetResizeForTest一致"""
+        limit = self.det_limit_side_len
+        if self.det_limit_type == 'max':
+            ratio = float(limit) / max(height, width) if max(height, width) > limit else 1.0
+        else:
+            ratio = float(limit) / min(height, width) if min(height, width) < limit else 1.0
+        resize_h = max(int(round(height * ratio / 32) * 32), 32)
+        resize_w = max(int(round(width * ratio / 32) * 32), 32)
+        return resize_h, resize_w
+
+    def detect(self, image: np.ndarray) -> np.ndarray:
+        """DB文本检测
+
+        Args:
+            image: BGR图像
+
+        Returns:
+            np.ndarray: 文本框 (N, 4, 2),按从上到下、从左到右排序
+        """
+        height, width = image.shape[:2]
+        resize_h, resize_w = self._det_input_size(height, width)
+        entry = self._get_predictor('det', (1, 3, resize_h, resize_w))
+        buffer = entry[3]
+
+        # 归一化结果原地写入预分配的输入缓冲区
+        resized = cv2.resize(image, (resize_w, resize_h)) if (resize_h, resize_w) != (height, width) else image
+        np.multiply(resized.transpose(2, 0, 1), 1.0 / 255.0, out=buffer[0], casting='unsafe')
+        buffer[0] -= DET_MEAN
+        buffer[0] /= DET_STD
+
+        prob_map = self._run(entry)[0, 0]
+        return self._db_postprocess(prob_map, height / resize_h, width / resize_w, height, width)
+
+    def _db_postprocess(self, prob_map: np.ndarray, scale_y: float, scale_x: float,
+                        height: int, width: int) -> np.ndarray:
+        """DB后处理: 二值化 -> 轮廓 -> 最小外接矩形 -> 打分 -> 外扩"""
+        bitmap = (prob_map > self.det_db_thresh).astype(np.uint8)
+        contours, _ = cv2.findContours(bitmap, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+        boxes = []
+        for contour in contours[:1000]:
+            (cx, cy), (rect_w, rect_h), angle = cv2.minAreaRect(contour)
+            if min(rect_w, rect_h) < 3:
+                continue
+
+            # 框内平均概率(快速模式: 轮廓外接矩形内的多边形掩码)
+            x, y, w, h = cv2.boundingRect(contour)
+            mask = np.zeros((h, w), dtype=np.uint8)
+            cv2.fillPoly(mask, [contour.reshape(-1, 2) - (x, y)], 1)
+            score = cv2.mean(prob_map[y:y + h, x:x + w], mask)[0]
+            if score < self.det_db_box_thresh:
+                continue
+
+            # 外扩: 对矩形而言等价于各边外扩 area * ratio / perimeter
+            distance = rect_w * rect_h * self.det_db_unclip_ratio / (2 * (rect_w + rect_h))
+            expanded = ((cx, cy), (rect_w + 2 * distance, rect_h + 2 * distance), angle)
+            if min(expanded[1]) < 5:
+                continue
+            boxes.append(order_points(cv2.boxPoints(expanded)))
+
+        if not boxes:
+            return np.zeros((0, 4, 2), dtype=np.float32)
+
+        boxes = np.stack(boxes)
+        boxes[:, :, 0] = np.clip(np.round(boxes[:, :, 0] * scale_x), 0, width)
+        boxes[:, :, 1] = np.clip(np.round(boxes[:, :, 1] * scale_y), 0, height)
+        # 从上到下、从左到右排序
+        order = np.lexsort((boxes[:, 0, 0], boxes[:, 0, 1]))
+        return boxes[order]
+
+    def recognize(self, crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """SVTR_LCNet文本识别
+
+        Args:
+            crops: 文本行图像列表(BGR)
+
+        Returns:
+            List[Tuple[str, float]]: 每条文本及其置信度,顺序与输入一致
+        """
+        if not crops:
+            return []
+
+        ratios = np.array([crop.shape[1] / max(crop.shape[0], 1) for crop in crops])
+        order = np.argsort(ratios)
+        results = [('', 0.0)] * len(crops)
+
+        for start in range(0, len(crops), self.rec_batch_num):
+            batch_indices = order[start:start + self.rec_batch_num]
+            # 以批次内最大宽高比确定输入宽度,并向上取整到8的倍数以复用缓冲区
+            max_ratio = max(ratios[batch_indices].max(), 320 / self.rec_image_height)
+            batch_width = int(math.ceil(self.rec_image_height * max_ratio / 8) * 8)
+            entry = self._get_predictor('rec', (len(batch_indices), 3, self.rec_image_height, batch_width))
+            buffer = entry[3]
+            buffer.fill(0)
+
+            for slot, index in enumerate(batch_indices):
+                crop = crops[index]
+                resized_w = min(batch_width, int(math.ceil(self.rec_image_height * ratios[index])))
+                resized = cv2.resize(crop, (max(resized_w, 1), self.rec_image_height))
+                target = buffer[slot, :, :, :resized.shape[1]]
+                np.multiply(resized.transpose(2, 0, 1), 2.0 / 255.0, out=target, casting='unsafe')
+                target -= 1.0
+
+            decoded = ctc_decode(self._run(entry), self.characters)
+            for index, item in zip(batch_indices, decoded):
+                results[index] = item
+        return results
+
+    def ocr(self, img: Union[np.ndarray, List[np.ndarray]], det: bool = True, rec: bool = True,
+            cls: bool = False) -> list:
+        """与 PaddleOCR.ocr 兼容的识别接口
+
+        Args:
+            img: 图像;det=False 时可以是文本行图像列表
+            det: 是否执行检测
+            rec: 是否执行识别
+            cls: 忽略(不支持方向分类)
+
+        Returns:
+            list: 与 PaddleOCR.ocr 相同的嵌套结构
+                  det+rec: [[[box, (text, score)], ...]]
+                  仅det:   [[box, ...]]
+                  仅rec:   [[(text, score), ...]]
+        """
+        with self._lock:
+            if not det:
+                crops = img if isinstance(img, list) else [img]
+                return [self.recognize([self._to_bgr(crop) for crop in crops])]
+
+            image = self._to_bgr(img)
+            boxes = self.detect(image)
+            if len(boxes) == 0:
+                return [None]
+            if not rec:
+                return [[box.tolist() for box in boxes]]
+
+            crops = [get_rotate_crop_image(image, box) for box in boxes]
+            rec_results = self.recognize(crops)
+            lines = [
+                [box.tolist(), (text, score)]
+                for box, (text, score) in zip(boxes, rec_results)
+                if score >= self.drop_score
+            ]
+            return [lines or None]
+
+    @staticmethod
+    def _to_bgr(image: np.ndarray) -> np.ndarray:
+        """灰度/BGRA图像统一转换为BGR"""
+        if image.ndim == 2:
+            return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        if image.shape[2] == 4:
+            return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+        return image
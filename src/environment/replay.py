@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+回放输入模块
+
+在没有游戏窗口、没有Windows API的环境(如仅CPU的Linux机器)中运行采集流程,
+通过 DataCollector(processors=...) 替换对应的处理模块:
+1. ReplayCapture: 按顺序循环返回录制的整窗口截图,替换 screen_capture
+2. HeadlessWindowManager: 不操作任何窗口,替换 window_manager
+3. ReplayTextRecognizer: 返回录制的OCR结果(或空结果),可模拟识别耗时,替换 text_recognizer;
+   分割、预处理、数据处理与状态管理仍使用真实实现
+
+录制目录结构:
+    recording_dir/
+    ├── frames/000001.png      # 整窗口截图(save_capture 保存的 original_*.png 也可直接使用)
+    └── ocr_results.json       # 可选,录制的OCR结果 {帧文件名(不含扩展名): {区域名: OCRResult.to_dict()}}
+没有 frames 子目录时直接读取 recording_dir 下的图像。
+
+主要类与函数:
+- load_recording: 加载录制目录
+- ReplayCapture: 回放截图源
+- HeadlessWindowManager: 无窗口的窗口管理器
+- ReplayTextRecognizer: 回放OCR
+"""
+
+import json
+import time
+import threading
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from src.environment.ocr_result import OCRResult
+from src.environment.text_recognizer import TextRecognizer
+from src.utils.tracing import traced
+
+# 支持的截图格式
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def load_recording(recording_dir: Union[str, Path],
+                   limit: Optional[int] = None) -> Tuple[List[str], List[np.ndarray], Dict[str, Dict[str, Any]]]:
+    """加载录制目录
+
+    Args:
+        recording_dir: 录制目录
+        limit: 最多加载的帧数
+
+    Returns:
+        Tuple: (帧名称列表, 截图列表, 录制的OCR结果 {帧名称: {区域名: dict}})
+
+    Raises:
+        FileNotFoundError: 目录中没有截图时抛出
+    """
+    recording_dir = Path(recording_dir)
+    frames_dir = recording_dir / 'frames' if (recording_dir / 'frames').is_dir() else recording_dir
+    paths = sorted(path for path in frames_dir.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+    if limit:
+        paths = paths[:limit]
+
+    names, frames = [], []
+    for path in paths:
+        # 使用imdecode以兼容Windows下的中文路径
+        data = np.fromfile(str(path), dtype=np.uint8)
+        image = cv2.imdecode(data, cv2.IMREAD_COLOR) if data.size else None
+        if image is None:
+            continue
+        names.append(path.stem)
+        frames.append(image)
+    if not frames:
+        raise FileNotFoundError(f"录制目录中没有截图: {frames_dir}")
+
+    ocr_results = {}
+    ocr_file = recording_dir / 'ocr_results.json'
+    if ocr_file.exists():
+        with open(ocr_file, 'r', encoding='utf-8') as f:
+            ocr_results = json.load(f)
+    return names, frames, ocr_results
+
+
+class ReplayCapture:
+    """
+    回放截图源
+
+    与 ScreenCapture 接口一致,每次 capture 按顺序返回下一帧录制截图,到末尾后从头循环
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        frames (List[np.ndarray]): 录制的截图
+        names (List[str]): 帧名称
+        current_name (Optional[str]): 最近一次返回的帧名称
+        captured (int): 已返回的帧数
+    """
+
+    MODULE_NAME = 'ReplayCapture'
+
+    def __init__(self, basic_config: dict, logger: logging.Logger, frames: Sequence[np.ndarray],
+                 names: Optional[Sequence[str]] = None, loop: bool = True):
+        """初始化回放截图源
+
+        Args:
+            basic_config: 基础配置字典
+            logger: 日志实例
+            frames: 截图列表
+            names: 帧名称列表,默认为帧序号
+            loop: 到末尾后是否从头循环,否则抛出 StopIteration
+        """
+        self.logger = logger
+        self.logger.info("<<<<<<<<<<<<<<<<<<回放截图源初始化开始...>>>>>>>>>>>>>>>>>>")
+        self.basic_config = basic_config
+        self.frames = list(frames)
+        self.names = list(names) if names is not None else [f"{index:06d}" for index in range(len(self.frames))]
+        self.loop = loop
+        self.current_name = None
+        self.captured = 0
+        self._lock = threading.Lock()
+        self.logger.info(f"回放帧数: {len(self.frames)}")
+        self.logger.info("=========================回放截图源初始化完成=========================")
+
+    @traced('ScreenCapture.capture')
+    def capture(self) -> np.ndarray:
+        """返回下一帧录制截图(副本,处理流程中可能原地修改)"""
+        with self._lock:
+            index = self.captured
+            if index >= len(self.frames) and not self.loop:
+                raise StopIteration("录制截图已回放完毕")
+            index %= len(self.frames)
+            self.current_name = self.names[index]
+            self.captured += 1
+        return self.frames[index].copy()
+
+
+class HeadlessWindowManager:
+    """
+    无窗口的窗口管理器
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        window_title (str): 配置的窗口标题
+        hwnd: 窗口句柄,始终为None
+    """
+
+    MODULE_NAME = 'HeadlessWindowManager'
+
+    def __init__(self, basic_config: dict, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger(self.MODULE_NAME)
+        self.basic_config = basic_config
+        self.window_title = basic_config.get('window_name', '')
+        self.hwnd = None
+
+    def move_window(self, x: int, y: int) -> bool:
+        """无窗口可移动,直接返回"""
+        return False
+
+    def activate_window(self) -> bool:
+        """无窗口可激活,直接返回"""
+        return False
+
+
+class ReplayTextRecognizer(TextRecognizer):
+    """
+    回放OCR
+
+    沿用 TextRecognizer 的 process_regions / process_and_recognize 流程,
+    只将模型识别替换为查找录制结果;不加载OCR模型,不修改日志与标准错误输出
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        capture (ReplayCapture): 提供当前帧名称的回放截图源
+        results (Dict[str, Dict[str, Any]]): 录制的OCR结果 {帧名称: {区域名: dict}}
+        latency_ms (Union[float, Dict[str, float]]): 模拟的识别耗时,可按区域设置
+    """
+
+    MODULE_NAME = 'ReplayTextRecognizer'
+
+    def __init__(self, basic_config: dict, area_config: dict, logger: logging.Logger,
+                 capture: Optional[ReplayCapture] = None, results: Optional[Dict[str, Dict[str, Any]]] = None,
+                 latency_ms: Union[float, Dict[str, float]] = 0.0):
+        """初始化回放OCR
+
+        Args:
+            basic_config: 基础配置字典
+            area_config: 区域配置字典
+            logger: 日志实例
+            capture: 回放截图源,用于按当前帧查找录制结果
+            results: 录制的OCR结果,为空时总是返回空结果
+            latency_ms: 模拟的识别耗时(毫秒),可为 {区域名: 毫秒}
+        """
+        self.logger = logger
+        self.logger.info("<<<<<<<<<<<<<<<<<<回放OCR初始化开始...>>>>>>>>>>>>>>>>>>")
+        self.basic_config = basic_config
+        self.area_config = area_config
+        self.debug_image_dir = None
+        self.show_ocr_log = False
+        self.ocr = None
+        self.region_ocr = {}
+        self.trackers = {}
+        self.ocr_lock = threading.Lock()
+        self.ready = threading.Event()
+        self.ready.set()
+        self._warmup_error = None
+        self.daemon = None
+
+        self.capture = capture
+        self.results = results or {}
+        self.latency_ms = latency_ms
+        self.logger.info(f"录制的OCR结果: {len(self.results)} 帧")
+        self.logger.info("=========================回放OCR初始化完成=========================")
+
+    def _recognize(self, image: np.ndarray, region_name: str = None, trackers: Optional[dict] = None) -> OCRResult:
+        """返回当前帧该区域的录制结果,没有录制时返回空结果(录制结果已包含跟踪结果,不使用 trackers)"""
+        latency_ms = self.latency_ms.get(region_name, 0.0) if isinstance(self.latency_ms, dict) else self.latency_ms
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        frame_name = self.capture.current_name if self.capture is not None else None
+        data = self.results.get(frame_name, {}).get(region_name)
+        return OCRResult.from_dict(data) if data else OCRResult.empty()
@@ -4,6 +4,8 @@ import numpy as np
 from pathlib import Path
 import logging
 
+from src.utils.tracing import traced
+
 class ScreenCapture:
     """屏幕捕获类"""
     MODULE_NAME = 'ScreenCapture'
@@ -41,6 +43,7 @@ class ScreenCapture:
             self.logger.error(f"屏幕捕获器初始化失败: {e}")
             raise
         
+    @traced('ScreenCapture.capture')
     def capture(self):
         """捕获屏幕画面"""
         try:
@@ -4,6 +4,8 @@ from pathlib import Path
 from typing import Dict, Tuple, Optional, List
 import logging
 
+from src.utils.tracing import traced
+
 class ScreenSplitter:
     """游戏画面分割处理类
     
@@ -80,6 +82,7 @@ class ScreenSplitter:
             self.logger.error(f"分割区域 {region_name} 时出错: {str(e)}")
             return None
     
+    @traced('ScreenSplitter.process_image', region_arg='regions_to_process')
     def process_image(self,
                      screen_image: np.ndarray,
                      regions_to_process: List[str],
@@ -160,4 +163,8 @@ class ScreenSplitter:
     
     def __del__(self):
         """析构函数：确保清理所有OpenCV窗口"""
-        cv2.destroyAllWindows() 
\ No newline at end of file
+        try:
+            cv2.destroyAllWindows()
+        except cv2.error:
+            # 无GUI支持的OpenCV(如headless版本)没有窗口可清理
+            pass
\ No newline at end of file
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+状态估计模块
+
+角色坐标、游戏时钟、技能经验等数值变化平稳或可预测,无需每帧都做一次OCR。
+该模块在 StateManager 之上为每个区域的每个字段维护估计:
+1. 保存最近一次观测值与观测时间
+2. 按字段模型预测观测之间的值:
+   constant 保持不变; linear 按平滑后的变化速率外推; clock 按真实时间推进 HH:MM:SS 时钟;
+   hold 保持不变且不参与不确定度(如抖动的延迟值)
+3. 不确定度随距上次观测的时间增长,增长速率取配置值与实测预测误差中的较大者
+4. 不确定度超过容差或距上次观测超过 max_age 时要求重新测量
+
+区域配置 state_estimator:
+    Enabled: 是否启用
+    default_model: 未单独指定的数值字段使用的模型(constant/linear)
+    fields: {字段名: 模型},如 {x: linear, y: linear} 或 {time: clock}
+    tolerance: 不确定度容差,超过时需要重新测量
+    growth: 不确定度每秒的基础增长量
+    max_age: 两次测量的最大间隔(秒)
+
+主要类:
+- StateEstimator: 按区域/字段的状态估计器
+"""
+
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+# 默认估计配置
+DEFAULT_ESTIMATOR_CONFIG = {
+    'Enabled': False,
+    'default_model': 'constant',
+    'fields': {},
+    'tolerance': 1.0,
+    'growth': 0.5,
+    'max_age': 5.0
+}
+
+# 变化速率的平滑系数
+VELOCITY_SMOOTHING = 0.5
+
+
+def is_number(value: Any) -> bool:
+    """是否为数值(不含布尔值)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parse_clock(value: Any) -> Optional[int]:
+    """将 HH:MM:SS 解析为当天的秒数,无法解析时返回None"""
+    try:
+        hours, minutes, seconds = (int(part) for part in str(value).split(':'))
+        return hours * 3600 + minutes * 60 + seconds
+    except (TypeError, ValueError):
+        return None
+
+
+def format_clock(seconds: float) -> str:
+    """将当天的秒数格式化为 HH:MM:SS"""
+    seconds = int(seconds) % 86400
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class FieldEstimate:
+    """
+    单个字段的估计
+
+    属性:
+        model (str): 模型类型 constant/linear/clock/hold
+        value: 最近一次观测值(clock模型为当天秒数)
+        observed_at (float): 观测时间
+        velocity (float): 每秒变化量(linear模型)
+        error_rate (float): 实测预测误差的增长速率
+    """
+
+    __slots__ = ('model', 'value', 'observed_at', 'velocity', 'error_rate', 'is_int')
+
+    def __init__(self, model: str, value: Any, observed_at: float):
+        self.model = model
+        self.value = value
+        self.observed_at = observed_at
+        self.velocity = 0.0
+        self.error_rate = 0.0
+        self.is_int = isinstance(value, int) and not isinstance(value, bool)
+
+    def predict(self, now: float) -> Any:
+        """预测 now 时刻的值"""
+        value = self.predict_raw(max(now - self.observed_at, 0.0))
+        if self.model == 'clock':
+            return format_clock(value)
+        if self.model == 'linear' and self.is_int:
+            return int(round(value))
+        return value
+
+    def observe(self, value: Any, now: float):
+        """记录一次新的观测,并根据预测误差更新变化速率与误差速率"""
+        elapsed = now - self.observed_at
+        if elapsed > 0:
+            predicted = self.predict_raw(elapsed)
+            if is_number(value) and is_number(predicted):
+                self.error_rate = abs(value - predicted) / elapsed
+            else:
+                # 非数值字段发生变化时无法外推,要求尽快重新测量
+                self.error_rate = 0.0 if value == predicted else float('inf')
+            if self.model == 'linear':
+                rate = (value - self.value) / elapsed
+                self.velocity = VELOCITY_SMOOTHING * rate + (1 - VELOCITY_SMOOTHING) * self.velocity
+        self.value = value
+        self.observed_at = now
+        self.is_int = isinstance(value, int) and not isinstance(value, bool)
+
+    def predict_raw(self, elapsed: float) -> Any:
+        """按模型外推 elapsed 秒后的原始值(clock模型为秒数)"""
+        if self.model == 'clock':
+            return self.value + elapsed
+        if self.model == 'linear':
+            return self.value + self.velocity * elapsed
+        return self.value
+
+
+class StateEstimator:
+    """
+    按区域/字段的状态估计器
+
+    为未测量的区域提供连续的预测状态,并告知调度方哪些区域需要重新测量
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        configs (Dict[str, dict]): 已启用估计的区域配置
+        estimates (Dict[str, Dict[str, FieldEstimate]]): 区域 -> 字段 -> 估计
+    """
+
+    MODULE_NAME = 'StateEstimator'
+
+    def __init__(self, basic_config: dict, area_config: dict, logger: logging.Logger):
+        """初始化状态估计器
+
+        Args:
+            basic_config: 基础配置字典
+            area_config: 区域配置字典
+            logger: 日志实例
+        """
+        self.logger = logger
+        self.logger.info("<<<<<<<<<<<<<<<<<<状态估计器初始化开始...>>>>>>>>>>>>>>>>>>")
+        self.basic_config = basic_config
+        self.area_config = area_config
+        self.configs = {}
+        for region_name, region_config in area_config.items():
+            if not isinstance(region_config, dict):
+                continue
+            config = dict(DEFAULT_ESTIMATOR_CONFIG)
+            config.update(region_config.get('state_estimator') or {})
+            if config['Enabled']:
+                self.configs[region_name] = config
+        self.estimates: Dict[str, Dict[str, FieldEstimate]] = {}
+        self.last_measured: Dict[str, float] = {}
+        self.logger.info(f"启用状态估计的区域: {list(self.configs)}")
+        self.logger.info("=========================状态估计器初始化完成=========================")
+
+    def is_enabled(self, region_name: str) -> bool:
+        """区域是否启用了状态估计"""
+        return region_name in self.configs
+
+    def _field_model(self, region_name: str, field: str, value: Any) -> str:
+        """确定字段使用的模型,非数值字段只能保持不变"""
+        config = self.configs[region_name]
+        model = (config.get('fields') or {}).get(field)
+        if model in ('clock', 'hold'):
+            return model
+        if not is_number(value):
+            return 'constant'
+        return model or config.get('default_model', 'constant')
+
+    def observe(self, region_name: str, data: Dict[str, Any], now: Optional[float] = None):
+        """记录区域的一次测量结果
+
+        Args:
+            region_name: 区域名称
+            data: DataProcessor 处理后的区域数据
+            now: 测量时间,默认为当前时间
+        """
+        if region_name not in self.configs or not isinstance(data, dict):
+            return
+        now = time.time() if now is None else now
+        estimates = self.estimates.setdefault(region_name, {})
+        for field, value in data.items():
+            model = self._field_model(region_name, field, value)
+            if model == 'clock':
+                value = parse_clock(value)
+                if value is None:
+                    # 时钟识别失败,保留原有估计
+                    continue
+            estimate = estimates.get(field)
+            if estimate is None or estimate.model != model:
+                estimates[field] = FieldEstimate(model, value, now)
+            else:
+                estimate.observe(value, now)
+        self.last_measured[region_name] = now
+
+    def predict(self, region_name: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """预测区域在 now 时刻的数据
+
+        Returns:
+            Dict[str, Any]: 与 DataProcessor 输出格式一致的预测数据,未观测过时为空字典
+        """
+        now = time.time() if now is None else now
+        return {
+            field: estimate.predict(now)
+            for field, estimate in self.estimates.get(region_name, {}).items()
+        }
+
+    def uncertainty(self, region_name: str, now: Optional[float] = None) -> float:
+        """区域当前的不确定度(各字段中的最大值)"""
+        estimates = self.estimates.get(region_name)
+        if not estimates:
+            return float('inf')
+        now = time.time() if now is None else now
+        growth = self.configs[region_name]['growth']
+        uncertainty = 0.0
+        for estimate in estimates.values():
+            if estimate.model == 'hold':
+                continue
+            elapsed = now - estimate.observed_at
+            if elapsed > 0:
+                uncertainty = max(uncertainty, max(growth, estimate.error_rate) * elapsed)
+        return uncertainty
+
+    def age(self, region_name: str, now: Optional[float] = None) -> float:
+        """距区域上次测量的时间(秒),未测量过时为无穷大"""
+        if region_name not in self.last_measured:
+            return float('inf')
+        now = time.time() if now is None else now
+        return now - self.last_measured[region_name]
+
+    def needs_measurement(self, region_name: str, now: Optional[float] = None) -> bool:
+        """区域是否需要重新测量
+
+        未启用估计的区域总是需要测量
+        """
+        if region_name not in self.configs:
+            return True
+        now = time.time() if now is None else now
+        config = self.configs[region_name]
+        if self.age(region_name, now) >= config['max_age']:
+            return True
+        return self.uncertainty(region_name, now) >= config['tolerance']
+
+    def regions_to_measure(self, regions: List[str], now: Optional[float] = None) -> List[str]:
+        """从区域列表中筛选出需要重新测量的区域,保持原有顺序"""
+        now = time.time() if now is None else now
+        return [region_name for region_name in regions if self.needs_measurement(region_name, now)]
@@ -0,0 +1,552 @@
+# -*- coding: utf-8 -*-
+"""
+列式状态日志模块
+
+替代每帧一个缩进JSON文件的状态保存方式(一次会话数十万个小文件,写入在热路径上,回读分析很慢):
+1. 每帧的状态按 区域.字段 展开为列(如 char_be_attack.screen_hp、game_area.name_groups),追加到内存中的列缓冲
+2. 缓冲达到 segment_rows 行或距上次写入超过 flush_interval 秒时,交给后台写入线程写出一个段文件(不阻塞采集);
+   段文件先写临时文件并落盘,再原子替换为正式文件名,磁盘上的段总是完整的,进程崩溃最多丢失未写出的缓冲;
+   close()(进程正常退出时由 atexit 调用)在调用线程中同步写出剩余缓冲,不经过写入线程
+3. 段内每列按类型编码: bool/int/float 为定长数组,str 为偏移表+UTF-8数据,列表/字典等嵌套值编码为JSON文本;
+   每列另有一个存在标记(该帧没有该字段时为0),可选 zlib 压缩
+4. 段文件末尾是JSON格式的列索引,读取单个字段时只读取各段中该列的数据块,不需要解析整个会话
+
+会话目录结构:
+    state_dir/<会话时间>/
+    ├── seg_000000.stlog
+    ├── seg_000001.stlog
+    └── ...
+
+段文件格式:
+    MAGIC | 列数据块 ... | 列索引(JSON) | 列索引长度 <Q | END_MAGIC
+
+basic_config.state_log:
+    format: columnar(列式状态日志) / json(旧格式,每帧一个JSON文件)
+    segment_rows: 每段最多的行数
+    flush_interval: 距上次写入超过该秒数时写出当前缓冲,0表示只按行数写出
+    compression: zlib / none
+
+主要类与函数:
+- StateLogWriter: 列式状态日志写入
+- StateLogReader: 列式状态日志读取,按字段加载整个会话
+- flatten_state / unflatten_state: 状态字典与列的相互转换
+- convert_json_states: 将旧格式的状态JSON目录转换为列式状态日志
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import atexit
+import struct
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# 获取项目根目录并添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.environment.ocr_result import OCRResult
+
+# 段文件格式版本
+SCHEMA_VERSION = 1
+
+# 段文件头与文件尾标记
+MAGIC = b'STLOG001'
+END_MAGIC = b'STLOGEND'
+
+# 列索引长度
+FOOTER_LENGTH = struct.Struct('<Q')
+
+# 段文件扩展名
+SEGMENT_SUFFIX = '.stlog'
+
+# 列名中区域与字段的分隔符
+FIELD_SEPARATOR = '.'
+
+# 定长列类型 -> NumPy 类型
+FIXED_DTYPES = {
+    'bool': np.dtype('u1'),
+    'int': np.dtype('<i8'),
+    'float': np.dtype('<f8')
+}
+
+# 变长列类型: str 为原始文本, json 为嵌套值的JSON文本
+VARIABLE_TYPES = ('str', 'json')
+
+# 偏移表类型
+OFFSET_DTYPE = np.dtype('<i8')
+
+# 默认状态日志配置
+DEFAULT_STATE_LOG_CONFIG = {
+    'format': 'columnar',
+    'segment_rows': 1024,
+    'flush_interval': 5,
+    'compression': 'zlib'
+}
+
+# 压缩方式
+COMPRESSIONS = ('zlib', 'none')
+
+
+def _json_default(value: Any) -> Any:
+    """序列化 json 不支持的类型(OCR结果、NumPy标量与数组)"""
+    if isinstance(value, OCRResult):
+        return value.to_dict()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+def flatten_state(state: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+    """将状态字典展开为 {列名: 值}
+
+    非空的嵌套字典按 FIELD_SEPARATOR 连接键名展开,空字典、列表等其他值原样保留(写入时编码为JSON);
+    OCR结果展开为其 to_dict,NumPy标量转换为Python标量,图像数组不记录
+    """
+    columns = {}
+    for key, value in state.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, OCRResult):
+            value = value.to_dict()
+        if isinstance(value, dict) and value:
+            columns.update(flatten_state(value, name + FIELD_SEPARATOR))
+        elif isinstance(value, np.ndarray):
+            continue
+        elif isinstance(value, np.generic):
+            columns[name] = value.item()
+        else:
+            columns[name] = value
+    return columns
+
+
+def unflatten_state(columns: Dict[str, Any]) -> Dict[str, Any]:
+    """flatten_state 的逆变换"""
+    state: Dict[str, Any] = {}
+    for name, value in columns.items():
+        node = state
+        *parents, key = name.split(FIELD_SEPARATOR)
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = value
+    return state
+
+
+def _column_type(values: Sequence[Any]) -> str:
+    """按本段中出现的值确定列类型"""
+    kinds = {type(value) for value in values if value is not None}
+    if not kinds:
+        return 'bool'
+    if kinds == {bool}:
+        return 'bool'
+    if kinds <= {int}:
+        return 'int'
+    if kinds <= {int, float}:
+        return 'float'
+    if kinds == {str}:
+        return 'str'
+    return 'json'
+
+
+def _encode_column(values: Sequence[Any]) -> Tuple[str, bytes]:
+    """编码一列: 存在标记(每行1字节) + 数据
+
+    Returns:
+        Tuple[str, bytes]: (列类型, 数据块)
+    """
+    column_type = _column_type(values)
+    present = np.fromiter((value is not None for value in values), dtype=np.uint8, count=len(values))
+    if column_type in FIXED_DTYPES:
+        try:
+            data = np.array([0 if value is None else value for value in values], dtype=FIXED_DTYPES[column_type])
+            return column_type, present.tobytes() + data.tobytes()
+        except OverflowError:
+            column_type = 'json'
+
+    if column_type == 'str':
+        encoded = [b'' if value is None else value.encode('utf-8') for value in values]
+    else:
+        column_type = 'json'
+        encoded = [
+            b'' if value is None else json.dumps(value, ensure_ascii=False, default=_json_default).encode('utf-8')
+            for value in values
+        ]
+    offsets = np.zeros(len(encoded) + 1, dtype=OFFSET_DTYPE)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return column_type, present.tobytes() + offsets.tobytes() + b''.join(encoded)
+
+
+def _decode_column(column_type: str, block: bytes, rows: int) -> Tuple[Union[np.ndarray, List[Any]], np.ndarray]:
+    """解码一列
+
+    Returns:
+        Tuple: (定长列为NumPy数组/变长列为列表, 存在标记 bool 数组)
+    """
+    present = np.frombuffer(block, dtype=np.uint8, count=rows).astype(bool)
+    if column_type in FIXED_DTYPES:
+        values = np.frombuffer(block, dtype=FIXED_DTYPES[column_type], count=rows, offset=rows)
+        return (values.astype(bool) if column_type == 'bool' else values), present
+
+    offsets = np.frombuffer(block, dtype=OFFSET_DTYPE, count=rows + 1, offset=rows)
+    data = memoryview(block)[rows + OFFSET_DTYPE.itemsize * (rows + 1):]
+    values = []
+    for index in range(rows):
+        if not present[index]:
+            values.append(None)
+            continue
+        text = bytes(data[offsets[index]:offsets[index + 1]]).decode('utf-8')
+        values.append(text if column_type == 'str' else json.loads(text))
+    return values, present
+
+
+class StateLogWriter:
+    """
+    列式状态日志写入
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        session_dir (Path): 本次会话的日志目录
+        segment_rows (int): 每段最多的行数
+        flush_interval (float): 定时写出间隔(秒)
+        compression (str): 压缩方式
+        rows (int): 已追加的总行数
+        segments (int): 已提交写出的段数
+    """
+
+    MODULE_NAME = 'StateLogWriter'
+
+    def __init__(self, state_dir: Union[str, Path], logger: logging.Logger, segment_rows: int = 1024,
+                 flush_interval: float = 5, compression: str = 'zlib'):
+        """初始化状态日志写入
+
+        Args:
+            state_dir: 状态目录,会话日志写入其下的 <会话时间> 子目录
+            logger: 日志实例
+            segment_rows: 每段最多的行数
+            flush_interval: 距上次写入超过该秒数时写出当前缓冲,0表示只按行数写出
+            compression: 压缩方式,见 COMPRESSIONS
+
+        Raises:
+            ValueError: 压缩方式无效时抛出
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"无效的压缩方式: {compression},可选 {COMPRESSIONS}")
+        self.logger = logger
+        self.session_dir = Path(state_dir) / datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.segment_rows = max(1, int(segment_rows))
+        self.flush_interval = float(flush_interval or 0)
+        self.compression = compression
+        self.rows = 0
+        self.segments = 0
+
+        self._columns: Dict[str, List[Any]] = {}
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        self._closed = False
+        self._lock = threading.Lock()
+        # 单线程写出,段按提交顺序写入
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.MODULE_NAME)
+        atexit.register(self.close)
+
+    def append(self, state: Dict[str, Any]):
+        """追加一帧状态
+
+        Args:
+            state: 状态字典 {区域名: {字段: 值}, 'timestamp': ...}
+        """
+        row = flatten_state(state)
+        with self._lock:
+            if self._closed:
+                return
+            for name, values in self._columns.items():
+                values.append(row.pop(name, None))
+            # 本段中首次出现的列,之前的行补为缺失
+            for name, value in row.items():
+                self._columns[name] = [None] * self._buffered + [value]
+            self._buffered += 1
+            self.rows += 1
+            if (self._buffered >= self.segment_rows
+                    or (self.flush_interval and time.monotonic() - self._last_flush >= self.flush_interval)):
+                self._flush()
+
+    def _flush(self, sync: bool = False):
+        """将当前缓冲写出为一个段文件
+
+        Args:
+            sync: 是否在调用线程中同步写出,否则交给写入线程(写入线程已停止时也同步写出)
+        """
+        self._last_flush = time.monotonic()
+        if not self._buffered:
+            return
+        segment_file = self.session_dir / f"seg_{self.segments:06d}{SEGMENT_SUFFIX}"
+        args = (segment_file, self._columns, self._buffered, self.rows - self._buffered)
+        self._columns, self._buffered = {}, 0
+        self.segments += 1
+        if not sync:
+            try:
+                self._executor.submit(self._write_segment, *args)
+                return
+            except RuntimeError:
+                # 解释器退出时线程池不再接受任务
+                pass
+        self._write_segment(*args)
+
+    def _write_segment(self, segment_file: Path, columns: Dict[str, List[Any]], rows: int, start_row: int):
+        """写出一个段文件(先写临时文件并落盘,再原子替换)"""
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        temp_file = segment_file.with_suffix(SEGMENT_SUFFIX + '.tmp')
+        index = {}
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(MAGIC)
+                offset = len(MAGIC)
+                for name, values in columns.items():
+                    column_type, block = _encode_column(values)
+                    if self.compression == 'zlib':
+                        block = zlib.compress(block, 1)
+                    f.write(block)
+                    index[name] = {'type': column_type, 'offset': offset, 'length': len(block)}
+                    offset += len(block)
+                footer = json.dumps({
+                    'schema_version': SCHEMA_VERSION,
+                    'start_row': start_row,
+                    'rows': rows,
+                    'compression': self.compression,
+                    'columns': index
+                }, ensure_ascii=False).encode('utf-8')
+                f.write(footer)
+                f.write(FOOTER_LENGTH.pack(len(footer)))
+                f.write(END_MAGIC)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, segment_file)
+        except Exception as e:
+            self.logger.error(f"写入状态日志段失败: {segment_file}, {e}")
+
+    def flush(self, wait: bool = False):
+        """立即写出当前缓冲
+
+        Args:
+            wait: 是否等待已提交的段全部写完
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._flush()
+            future = self._executor.submit(lambda: None) if wait else None
+        if future is not None:
+            future.result()
+
+    def close(self):
+        """在调用线程中同步写出剩余缓冲,等待写入线程完成并停止写入"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._flush(sync=True)
+        self._executor.shutdown(wait=True)
+
+
+class StateLogReader:
+    """
+    列式状态日志读取
+
+    属性:
+        session_dir (Path): 会话日志目录
+        segments (List[Path]): 完整的段文件(按顺序)
+    """
+
+    def __init__(self, session_dir: Union[str, Path], logger: Optional[logging.Logger] = None):
+        """初始化状态日志读取
+
+        Args:
+            session_dir: 会话日志目录
+            logger: 日志实例
+
+        Raises:
+            FileNotFoundError: 目录不存在时抛出
+        """
+        self.session_dir = Path(session_dir)
+        if not self.session_dir.is_dir():
+            raise FileNotFoundError(f"状态日志目录不存在: {self.session_dir}")
+        self.logger = logger or logging.getLogger('StateLogReader')
+        self.segments: List[Path] = []
+        self._footers: Dict[Path, Dict[str, Any]] = {}
+        for path in sorted(self.session_dir.glob(f"*{SEGMENT_SUFFIX}")):
+            footer = self._read_footer(path)
+            if footer is not None:
+                self.segments.append(path)
+                self._footers[path] = footer
+
+    def _read_footer(self, path: Path) -> Optional[Dict[str, Any]]:
+        """读取段文件末尾的列索引,文件不完整时返回None"""
+        tail = len(END_MAGIC) + FOOTER_LENGTH.size
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError("文件头标记不正确")
+                f.seek(-tail, os.SEEK_END)
+                length_bytes = f.read(FOOTER_LENGTH.size)
+                if f.read(len(END_MAGIC)) != END_MAGIC:
+                    raise ValueError("文件尾标记不正确")
+                length = FOOTER_LENGTH.unpack(length_bytes)[0]
+                f.seek(-tail - length, os.SEEK_END)
+                return json.loads(f.read(length).decode('utf-8'))
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"跳过不完整的状态日志段 {path.name}: {e}")
+            return None
+
+    def __len__(self) -> int:
+        return sum(footer['rows'] for footer in self._footers.values())
+
+    def fields(self) -> List[str]:
+        """会话中出现过的全部列名"""
+        names = {}
+        for footer in self._footers.values():
+            names.update(dict.fromkeys(footer['columns']))
+        return list(names)
+
+    def _read_block(self, path: Path, name: str) -> Optional[Tuple[Union[np.ndarray, List[Any]], np.ndarray]]:
+        """读取一个段中的一列,该段没有该列时返回None"""
+        footer = self._footers[path]
+        column = footer['columns'].get(name)
+        if column is None:
+            return None
+        with open(path, 'rb') as f:
+            f.seek(column['offset'])
+            block = f.read(column['length'])
+        if footer.get('compression') == 'zlib':
+            block = zlib.decompress(block)
+        return _decode_column(column['type'], block, footer['rows'])
+
+    def read_field(self, name: str) -> Tuple[Union[np.ndarray, List[Any]], np.ndarray]:
+        """加载整个会话中的一个字段
+
+        Args:
+            name: 列名,如 'char_be_attack.screen_hp'
+
+        Returns:
+            Tuple: (值, 存在标记 bool 数组)。各段均为 bool/int/float 时值为NumPy数组(缺失处为0),
+                   否则为列表(缺失处为None)
+        """
+        parts = []
+        for path in self.segments:
+            rows = self._footers[path]['rows']
+            block = self._read_block(path, name)
+            parts.append(block if block is not None else (None, np.zeros(rows, dtype=bool)))
+        present = np.concatenate([mask for _, mask in parts]) if parts else np.zeros(0, dtype=bool)
+
+        arrays = [values for values, _ in parts if values is not None]
+        if all(isinstance(values, np.ndarray) for values in arrays):
+            dtype = np.result_type(*arrays) if arrays else np.dtype(bool)
+            return np.concatenate([
+                values if values is not None else np.zeros(len(mask), dtype=dtype) for values, mask in parts
+            ]).astype(dtype, copy=False) if parts else np.zeros(0, dtype=dtype), present
+
+        merged: List[Any] = []
+        for values, mask in parts:
+            if values is None:
+                merged.extend([None] * len(mask))
+            elif isinstance(values, np.ndarray):
+                merged.extend(value.item() if flag else None for value, flag in zip(values, mask))
+            else:
+                merged.extend(values)
+        return merged, present
+
+    def iter_states(self, fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """按帧还原状态字典(只包含该帧存在的字段)
+
+        Args:
+            fields: 只读取指定列,默认全部列
+        """
+        for path in self.segments:
+            footer = self._footers[path]
+            names = [name for name in (fields or footer['columns']) if name in footer['columns']]
+            columns = {name: self._read_block(path, name) for name in names}
+            for row in range(footer['rows']):
+                yield unflatten_state({
+                    name: (values[row].item() if isinstance(values, np.ndarray) else values[row])
+                    for name, (values, present) in columns.items() if present[row]
+                })
+
+
+def convert_json_states(json_dir: Union[str, Path], state_dir: Union[str, Path], logger: logging.Logger,
+                        **writer_config) -> Path:
+    """将旧格式的状态JSON目录(每帧一个文件)转换为列式状态日志
+
+    Args:
+        json_dir: 状态JSON目录
+        state_dir: 输出的状态目录
+        logger: 日志实例
+        **writer_config: StateLogWriter 的其他参数
+
+    Returns:
+        Path: 会话日志目录
+    """
+    writer = StateLogWriter(state_dir, logger, **writer_config)
+    for path in sorted(Path(json_dir).glob('*.json')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                writer.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"跳过无法读取的状态文件 {path.name}: {e}")
+    writer.close()
+    logger.info(f"已转换 {writer.rows} 帧状态: {writer.session_dir}")
+    return writer.session_dir
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='列式状态日志查看与转换')
+    parser.add_argument('session', type=str,
+                        help='会话日志目录(--convert 时为旧格式的状态JSON目录)')
+    parser.add_argument('--field', type=str, nargs='*', default=None,
+                        help='输出指定字段的统计与前几个值')
+    parser.add_argument('--convert', type=str, default=None,
+                        help='将旧格式的状态JSON目录转换为列式状态日志,写入该状态目录')
+    return parser.parse_args()
+
+
+def main():
+    """
+    主函数
+
+    功能:
+    1. 输出会话的段数、帧数与列名
+    2. 按字段输出统计
+    3. 转换旧格式的状态JSON目录
+    """
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger('StateLog')
+
+    if args.convert:
+        convert_json_states(args.session, args.convert, logger)
+        return
+
+    reader = StateLogReader(args.session, logger)
+    logger.info(f"{reader.session_dir}: {len(reader.segments)} 段, {len(reader)} 帧, {len(reader.fields())} 列")
+    for name in args.field if args.field is not None else reader.fields():
+        values, present = reader.read_field(name)
+        summary = f"{name:<40} 存在 {int(present.sum())}/{len(present)}"
+        if isinstance(values, np.ndarray) and present.any() and values.dtype != bool:
+            summary += f", 最小 {values[present].min()}, 最大 {values[present].max()}, 均值 {values[present].mean():.3f}"
+        if args.field is not None:
+            first = np.flatnonzero(present)[:5]
+            summary += f", 前几个值 {values[first].tolist() if isinstance(values, np.ndarray) else [values[i] for i in first]}"
+        logger.info(summary)
+
+
+if __name__ == "__main__":
+    main()
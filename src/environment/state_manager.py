@@ -4,6 +4,10 @@ import time
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from src.environment.ocr_result import OCRResult
+from src.environment.state_log import DEFAULT_STATE_LOG_CONFIG, StateLogWriter
+from src.utils.tracing import traced
+
 class StateManager:
     """状态管理类"""
     MODULE_NAME = 'StateManager'
@@ -24,8 +28,18 @@ class StateManager:
         self.state_dir = self.base_output_dir / basic_config.get('state_dir', 'states_json')
         self.current_state = {}
 
+        # 状态保存格式: columnar 追加到列式状态日志, json 每帧一个JSON文件(旧格式)
+        state_log_config = dict(DEFAULT_STATE_LOG_CONFIG)
+        state_log_config.update(basic_config.get('state_log') or {})
+        self.state_format = state_log_config.pop('format')
+        self.state_log = None
+        if self.state_format == 'columnar':
+            self.state_log = StateLogWriter(self.state_dir, self.logger, **state_log_config)
+            self.logger.info(f"状态日志目录: {self.state_log.session_dir}")
+
         self.logger.info("=========================状态管理器初始化完成=========================")
         
+    @traced('StateManager.update')
     def update(self, new_state: Dict[str, Any], timestamp: str = None):
         """
         更新状态
@@ -48,6 +62,13 @@ class StateManager:
         """获取当前状态"""
         return self.current_state
         
+    @staticmethod
+    def _json_default(value: Any) -> Any:
+        """序列化 json 不支持的类型(未经数据处理的OCR结果)"""
+        if isinstance(value, OCRResult):
+            return value.to_dict()
+        raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+        
     def _save_state(self, timestamp: str = None):
         """
         保存状态到文件
@@ -55,11 +76,20 @@ class StateManager:
         Args:
             timestamp: 时间戳，用于文件命名
         """
+        if self.state_log is not None:
+            self.state_log.append(self.current_state)
+            return
+
         if timestamp:
             state_file = self.state_dir / f"{timestamp}.json"
 
         try:
             with open(state_file, 'w', encoding='utf-8') as f:
-                json.dump(self.current_state, f, ensure_ascii=False, indent=2)
+                json.dump(self.current_state, f, ensure_ascii=False, indent=2, default=self._json_default)
         except Exception as e:
             print(f"保存状态文件失败: {str(e)}")
+
+    def close(self):
+        """写出列式状态日志中尚未保存的状态"""
+        if self.state_log is not None:
+            self.state_log.close()
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+文本行组装模块
+
+将OCR识别出的文本框合并为有序的文本行,供 DataProcessor 的各个文本区域处理方法共用:
+1. 文本框以 (N, 4, 2) 的NumPy数组表示,中心/边界一次性向量化计算
+2. 行聚类: 按中心y排序后以行首文本框为锚点,用 searchsorted 一次找出同行的全部文本框
+3. 列切分: 同行文本框按中心y的顺序与前一个文本框比较水平间隔,超过阈值处切分为独立的文本段,
+   各段内按左边界排序(与原 DataProcessor 各处理方法中逐个比较的规则一致)
+4. 输出从上到下排列的文本行(行内文本从左到右)及其几何信息
+
+主要函数:
+- boxes_from_result: 将OCR结果转换为文本列表与文本框数组
+- assemble_lines: 组装文本行
+- assemble_line_texts: 只返回文本行字符串的便捷函数
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.environment.ocr_result import OCRResult
+
+# 同一行文本的中心y坐标差异阈值
+DEFAULT_Y_THRESHOLD = 10
+
+
+def boxes_from_result(ocr_result: Any) -> Tuple[List[str], np.ndarray]:
+    """将OCR结果转换为文本列表与文本框数组
+
+    空白文本会被过滤
+
+    Args:
+        ocr_result: TextRecognizer 的识别结果(OCRResult 或 {'details': [{'text', 'box', ...}]})
+
+    Returns:
+        Tuple[List[str], np.ndarray]: (去除首尾空白的文本列表, (N, 4, 2) float32 文本框数组)
+    """
+    if isinstance(ocr_result, OCRResult):
+        # 列式结果直接取数组,无需逐条转换
+        keep = [i for i, text in enumerate(ocr_result.texts) if text.strip()]
+        texts = [ocr_result.texts[i].strip() for i in keep]
+        return texts, ocr_result.boxes[keep].astype(np.float32)
+
+    texts = []
+    boxes = []
+    if isinstance(ocr_result, dict) and 'details' in ocr_result:
+        for detail in ocr_result['details']:
+            text = detail['text'].strip()
+            if text:
+                texts.append(text)
+                boxes.append(detail['box'])
+
+    if not boxes:
+        return texts, np.empty((0, 4, 2), dtype=np.float32)
+    return texts, np.asarray(boxes, dtype=np.float32).reshape(-1, 4, 2)
+
+
+def group_rows(center_y: np.ndarray, y_threshold: float = DEFAULT_Y_THRESHOLD) -> List[np.ndarray]:
+    """按中心y坐标将文本框分组为行
+
+    以每行第一个(最靠上)文本框为锚点,中心y与锚点相差不超过阈值的文本框归入同一行
+
+    Args:
+        center_y: 各文本框的中心y坐标
+        y_threshold: 同行阈值
+
+    Returns:
+        List[np.ndarray]: 每行包含的文本框索引(从上到下)
+    """
+    order = np.argsort(center_y, kind='stable')
+    sorted_y = center_y[order]
+    rows = []
+    start = 0
+    count = len(sorted_y)
+    while start < count:
+        end = int(np.searchsorted(sorted_y, sorted_y[start] + y_threshold, side='right'))
+        rows.append(order[start:end])
+        start = end
+    return rows
+
+
+def split_columns(indices: np.ndarray, left_x: np.ndarray, right_x: np.ndarray,
+                  x_gap: Optional[float]) -> List[np.ndarray]:
+    """将同一行的文本框按水平间隔切分为文本段
+
+    按 indices 的顺序(group_rows 输出的中心y顺序)逐个比较: 文本框左边界与前一个文本框右边界的
+    间隔超过 x_gap 时开始新的文本段。交错或重叠的文本框也按此顺序比较,不按从左到右的顺序
+
+    Args:
+        indices: 同一行的文本框索引
+        left_x: 所有文本框的左边界
+        right_x: 所有文本框的右边界
+        x_gap: 允许的最大水平间隔,为None时不切分
+
+    Returns:
+        List[np.ndarray]: 按切分顺序排列的文本段,每段为按左边界排序的文本框索引
+    """
+    if x_gap is None or len(indices) < 2:
+        return [indices[np.argsort(left_x[indices], kind='stable')]]
+
+    gaps = left_x[indices[1:]] - right_x[indices[:-1]]
+    cut_points = np.flatnonzero(gaps > x_gap) + 1
+    return [segment[np.argsort(left_x[segment], kind='stable')] for segment in np.split(indices, cut_points)]
+
+
+def assemble_lines(texts: Sequence[str], boxes: np.ndarray, y_threshold: float = DEFAULT_Y_THRESHOLD,
+                   x_gap: Optional[float] = None, joiner: str = ' ') -> List[Dict[str, Any]]:
+    """组装文本行
+
+    Args:
+        texts: 文本列表
+        boxes: (N, 4, 2) 文本框数组,与 texts 一一对应
+        y_threshold: 同行阈值
+        x_gap: 同行文本框允许的最大水平间隔,超过时切分为独立的行,为None时不切分
+        joiner: 同行文本的连接符
+
+    Returns:
+        List[Dict]: 从上到下排列的文本行(行内文本从左到右),每行包含:
+            text: 合并后的文本
+            box: 外接矩形 [x_min, y_min, x_max, y_max]
+            center_y: 行内文本框中心y的平均值
+            indices: 组成该行的文本框索引
+    """
+    if len(texts) == 0:
+        return []
+
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4, 2)
+    xs = boxes[:, :, 0]
+    ys = boxes[:, :, 1]
+    left_x = xs.min(axis=1)
+    right_x = xs.max(axis=1)
+    top_y = ys.min(axis=1)
+    bottom_y = ys.max(axis=1)
+    center_y = ys.mean(axis=1)
+
+    lines = []
+    for row in group_rows(center_y, y_threshold):
+        for segment in split_columns(row, left_x, right_x, x_gap):
+            lines.append({
+                'text': joiner.join(texts[i] for i in segment),
+                'box': [float(left_x[segment].min()), float(top_y[segment].min()),
+                        float(right_x[segment].max()), float(bottom_y[segment].max())],
+                'center_y': float(center_y[segment].mean()),
+                'indices': segment.tolist()
+            })
+    return lines
+
+
+def assemble_line_texts(ocr_result: Any, y_threshold: float = DEFAULT_Y_THRESHOLD,
+                        x_gap: Optional[float] = None, joiner: str = ' ') -> List[str]:
+    """从OCR结果直接组装文本行字符串
+
+    Args:
+        ocr_result: TextRecognizer 的识别结果
+        y_threshold: 同行阈值
+        x_gap: 同行文本框允许的最大水平间隔
+        joiner: 同行文本的连接符
+
+    Returns:
+        List[str]: 从上到下排列的文本行(行内文本从左到右)
+    """
+    texts, boxes = boxes_from_result(ocr_result)
+    return [line['text'] for line in assemble_lines(texts, boxes, y_threshold, x_gap, joiner)]
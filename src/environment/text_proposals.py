@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+文本候选框模块
+
+game_area 经 ImagePreprocessor._preprocess_game_area 处理后为白底黑字的二值图,名字文本已被分离出来。
+该模块用连通域分析代替神经网络检测器生成文本行候选框:
+1. 横向闭运算把同一名字的字符连成一片
+2. connectedComponentsWithStats 一次得到所有连通域的外接矩形
+3. 按尺寸过滤噪点与大块区域,外扩少量像素后作为候选框
+
+配置位于区域配置 text_recognizer.proposals:
+    Enabled: 是否启用(启用后跳过神经网络检测器)
+    kernel: 闭运算核 [宽, 高],宽度决定字符间多大的间隔会被连接
+    min_width / max_width / min_height / max_height: 候选框尺寸范围(像素)
+    min_area: 连通域最小前景像素数
+    padding: 候选框外扩像素
+    text_dark: 文本是否为深色(白底黑字)
+
+主要函数:
+- propose_text_boxes: 生成候选框
+- crop_boxes: 按候选框裁切识别用图像
+"""
+
+from typing import List
+
+import cv2
+import numpy as np
+
+# 默认候选框配置
+DEFAULT_PROPOSAL_CONFIG = {
+    'Enabled': False,
+    'kernel': [9, 3],
+    'min_width': 8,
+    'max_width': 400,
+    'min_height': 8,
+    'max_height': 40,
+    'min_area': 20,
+    'padding': 2,
+    'text_dark': True
+}
+
+
+def get_proposal_config(region_config: dict) -> dict:
+    """读取区域的候选框配置,缺省项使用默认值"""
+    config = dict(DEFAULT_PROPOSAL_CONFIG)
+    config.update((region_config or {}).get('text_recognizer', {}).get('proposals') or {})
+    return config
+
+
+def propose_text_boxes(binary: np.ndarray, config: dict) -> np.ndarray:
+    """由二值图生成文本行候选框
+
+    Args:
+        binary: 预处理后的二值图(灰度或三通道)
+        config: 候选框配置(见 DEFAULT_PROPOSAL_CONFIG)
+
+    Returns:
+        np.ndarray: (N, 4, 2) float32 四点坐标(左上、右上、右下、左下),按从上到下、从左到右排列
+    """
+    if binary.ndim == 3:
+        binary = cv2.cvtColor(binary, cv2.COLOR_BGR2GRAY)
+    foreground = (binary < 128) if config.get('text_dark', True) else (binary >= 128)
+    foreground = foreground.astype(np.uint8)
+
+    kernel_w, kernel_h = config.get('kernel', DEFAULT_PROPOSAL_CONFIG['kernel'])
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (int(kernel_w), int(kernel_h)))
+    merged = cv2.morphologyEx(foreground, cv2.MORPH_CLOSE, kernel)
+
+    count, _, stats, _ = cv2.connectedComponentsWithStats(merged, connectivity=8)
+    stats = stats[1:]  # 去掉背景
+    if count <= 1:
+        return np.zeros((0, 4, 2), dtype=np.float32)
+
+    x, y, w, h, area = stats.T
+    keep = (
+        (w >= config['min_width']) & (w <= config['max_width']) &
+        (h >= config['min_height']) & (h <= config['max_height']) &
+        (area >= config['min_area'])
+    )
+    x, y, w, h = x[keep], y[keep], w[keep], h[keep]
+
+    height, width = binary.shape[:2]
+    padding = int(config.get('padding', 0))
+    x1 = np.clip(x - padding, 0, width - 1)
+    y1 = np.clip(y - padding, 0, height - 1)
+    x2 = np.clip(x + w - 1 + padding, 0, width - 1)
+    y2 = np.clip(y + h - 1 + padding, 0, height - 1)
+
+    order = np.lexsort((x1, y1))
+    x1, y1, x2, y2 = x1[order], y1[order], x2[order], y2[order]
+    return np.stack([
+        np.stack([x1, y1], axis=1),
+        np.stack([x2, y1], axis=1),
+        np.stack([x2, y2], axis=1),
+        np.stack([x1, y2], axis=1)
+    ], axis=1).astype(np.float32)
+
+
+def crop_boxes(image: np.ndarray, boxes: np.ndarray) -> List[np.ndarray]:
+    """按轴对齐的候选框裁切BGR图像
+
+    Args:
+        image: 区域图像(灰度会转换为BGR)
+        boxes: (N, 4, 2) 候选框
+
+    Returns:
+        List[np.ndarray]: 裁切后的图像列表,顺序与 boxes 一致
+    """
+    if image.ndim == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    crops = []
+    for box in np.asarray(boxes).astype(int):
+        (x1, y1), (x2, y2) = box[0], box[2]
+        crops.append(image[y1:y2 + 1, x1:x2 + 1])
+    return crops
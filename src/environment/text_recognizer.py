@@ -1,23 +1,33 @@
+import copy
 import logging
 import warnings
+import threading
+import time
 import cv2
 import numpy as np
 from pathlib import Path
-from typing import Optional, Dict
-from paddleocr import PaddleOCR
+from typing import Optional, Dict, TYPE_CHECKING
 import os
 import sys
 
+from src.environment.ocr_result import OCRResult
+from src.utils.metrics import get_metrics
+from src.utils.tracing import traced
+
+if TYPE_CHECKING:
+    from paddleocr import PaddleOCR
+
 class TextRecognizer:
     """文字识别处理类"""
     MODULE_NAME = 'TextRecognizer'
     
-    def __init__(self, basic_config: dict, area_config: dict, logger: logging.Logger):
+    def __init__(self, basic_config: dict, area_config: dict, logger: logging.Logger, use_daemon: bool = True):
         """初始化文字识别器
         
         Args:
             basic_config: 基础配置字典
             logger: 日志实例
+            use_daemon: 是否尝试使用OCR守护进程(basic_config.ocr_daemon.Enabled 开启时生效)
         """
         self.logger = logger
         self.logger.info("<<<<<<<<<<<<<<<<<<文字识别器初始化开始...>>>>>>>>>>>>>>>>>>")
@@ -78,10 +88,151 @@ class TextRecognizer:
             # 重定向标准错误输出
             sys.stderr = open(os.devnull, 'w')
         
-        # 初始化默认OCR实例
+        # 默认OCR实例与区域特定OCR实例缓存 {区域名: (创建时的OCR参数, OCR实例)}，避免每帧重复创建
+        self.ocr = None
+        self.region_ocr = {}
+        
+        # 区域名字标签跟踪器缓存 {区域名: NameTagTracker}，启用后只重新识别新出现或变化的文本框
+        self.trackers = {}
+        
+        # OCR预测器与守护进程连接都不是线程安全的，区域并行处理时串行执行识别
+        self.ocr_lock = threading.Lock()
+        
+        # 初始化OCR模型: 默认在后台线程中加载并预热, ready 为就绪信号
+        self.ready = threading.Event()
+        self._warmup_error = None
+        # 进程内模型是否已加载完成(守护进程失败时作为回退)
+        self._local_loaded = threading.Event()
+        self._fallback_thread = None
+        
+        # 优先使用常驻的OCR守护进程，可用时无需在本进程中加载模型;
+        # 请求失败后按退避间隔重试,期间使用在后台加载的进程内模型
+        self.daemon = self._connect_daemon() if use_daemon else None
+        self._daemon_backoff = 0.0
+        self._daemon_retry_at = 0.0
+        if self.daemon is not None:
+            self.ready.set()
+        elif self.basic_config.get('ocr_warmup', 'background') == 'background':
+            self._warmup_thread = threading.Thread(target=self._warmup, name='ocr-warmup', daemon=True)
+            self._warmup_thread.start()
+            self.logger.info("OCR模型后台预热中...")
+        else:
+            self._warmup()
+            if self._warmup_error:
+                raise self._warmup_error
+        
+    def _warmup(self):
+        """加载OCR模型并预热，完成(或失败)后设置 ready 信号"""
+        try:
+            self._load_local_models()
+        except Exception as e:
+            self.logger.error(f"OCR模型预热失败: {e}")
+            self._warmup_error = e
+        finally:
+            self.ready.set()
+    
+    def _load_local_models(self):
+        """加载进程内OCR模型并执行一次空推理预热
+        
+        除默认实例外，同时创建已启用区域的特定OCR实例，完成后设置 _local_loaded
+        """
+        start_time = time.time()
         self.ocr = self._create_ocr_instance()
         
-    def _create_ocr_instance(self, custom_params: dict = None) -> PaddleOCR:
+        warm_instances = [self.ocr]
+        for region_name, region_config in self.area_config.items():
+            if not isinstance(region_config, dict) or not region_config.get('Enabled'):
+                continue
+            text_config = region_config.get('text_recognizer') or {}
+            if text_config.get('Enabled') and text_config.get('ocr_params'):
+                warm_instances.append(self._get_region_ocr(region_name, text_config['ocr_params']))
+        
+        # 空推理触发预测器初始化
+        blank = np.full((32, 96, 3), 255, dtype=np.uint8)
+        for instance in {id(ocr): ocr for ocr in warm_instances}.values():
+            instance.ocr(blank, cls=False)
+        
+        self._local_loaded.set()
+        self.logger.info(f"OCR模型预热完成, 耗时: {time.time() - start_time:.2f}秒")
+    
+    def _warmup_fallback(self):
+        """后台加载回退用的进程内模型，失败时只记录日志，继续重试守护进程"""
+        try:
+            self._load_local_models()
+        except Exception as e:
+            self.logger.error(f"回退OCR模型加载失败: {e}")
+    
+    def _start_fallback_warmup(self):
+        """守护进程失败后在后台加载进程内模型(只加载一次)"""
+        if self._local_loaded.is_set() or (self._fallback_thread is not None and self._fallback_thread.is_alive()):
+            return
+        self._fallback_thread = threading.Thread(target=self._warmup_fallback, name='ocr-fallback-warmup', daemon=True)
+        self._fallback_thread.start()
+        self.logger.info("后台加载进程内OCR模型作为回退...")
+    
+    def _connect_daemon(self):
+        """检测并连接OCR守护进程
+        
+        Returns:
+            OCRDaemonClient: 守护进程可用时返回客户端，否则返回None
+        """
+        from src.environment.ocr_daemon import OCRDaemonClient, get_daemon_config
+        
+        if not get_daemon_config(self.basic_config).get('Enabled'):
+            return None
+        client = OCRDaemonClient(self.basic_config, self.logger)
+        if client.ping():
+            self.logger.info("已连接OCR守护进程，使用常驻模型识别")
+            return client
+        self.logger.info("OCR守护进程不可用，使用进程内OCR")
+        return None
+    
+    def _recognize_via_daemon(self, image: np.ndarray, region_name: str = None) -> Optional[OCRResult]:
+        """通过守护进程识别
+        
+        请求失败后在 retry_interval 起按倍数退避(最长 max_retry_interval)的间隔内不再请求守护进程，
+        同时在后台加载进程内模型作为回退；退避结束后重试，成功时恢复使用守护进程
+        
+        Returns:
+            Optional[OCRResult]: 识别结果，守护进程本次不可用时返回None
+        """
+        now = time.monotonic()
+        if now < self._daemon_retry_at:
+            return None
+        try:
+            result = self.daemon.recognize(image, region_name)
+        except Exception as e:
+            from src.environment.ocr_daemon import get_daemon_config
+            
+            config = get_daemon_config(self.basic_config)
+            self._daemon_backoff = min(max(self._daemon_backoff * 2, float(config['retry_interval'])),
+                                       float(config['max_retry_interval']))
+            self._daemon_retry_at = now + self._daemon_backoff
+            self.logger.warning(f"OCR守护进程请求失败: {e}，{self._daemon_backoff:.1f}秒后重试，期间使用进程内OCR")
+            self.daemon.close()
+            self._start_fallback_warmup()
+            return None
+        if self._daemon_backoff:
+            self.logger.info("已重新连接OCR守护进程")
+            self._daemon_backoff = 0.0
+        return result
+    
+    def is_ready(self) -> bool:
+        """OCR模型是否已就绪(预热失败也视为结束)"""
+        return self.ready.is_set()
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """等待OCR模型就绪
+        
+        Args:
+            timeout: 超时时间(秒)，为None时一直等待
+            
+        Returns:
+            bool: 是否已成功就绪
+        """
+        return self.ready.wait(timeout) and self._warmup_error is None
+        
+    def _create_ocr_instance(self, custom_params: dict = None) -> 'PaddleOCR':
         """创建OCR实例
         
         Args:
@@ -135,95 +286,236 @@ class TextRecognizer:
                 default_config.update(custom_params)
                 self.logger.debug(f"使用自定义OCR参数: {custom_params}")
             
-            # 创建并返回OCR实例
+            # 直接使用Paddle推理预测器加载自带模型，绕过PaddleOCR封装
+            if self.basic_config.get('ocr_backend', 'paddleocr') == 'paddle_inference':
+                from src.environment.paddle_runtime import PaddleInferenceOCR
+                # 模型路径取自 ocr_runtime 配置或区域自定义参数，不使用上面的默认路径
+                runtime_params = {
+                    key: value for key, value in default_config.items()
+                    if not key.endswith('_model_dir')
+                }
+                runtime_params.update(self.basic_config.get('ocr_runtime') or {})
+                runtime_params.update({
+                    key: value for key, value in (custom_params or {}).items()
+                    if key.endswith('_model_dir')
+                })
+                return PaddleInferenceOCR(runtime_params, self.logger)
+            
+            # 创建并返回OCR实例(延迟导入paddleocr，需在上面的环境变量设置之后)
+            from paddleocr import PaddleOCR
             return PaddleOCR(**default_config)
             
         except Exception as e:
             self.logger.error(f"创建OCR实例失败: {e}")
             raise
             
+    # 获取区域特定OCR实例
+    def _get_region_ocr(self, region_name: str, ocr_params: dict) -> 'PaddleOCR':
+        """获取区域特定的OCR实例，首次使用时创建并缓存
+        
+        区域的OCR参数发生变化(覆盖配置重新加载、基准测试/自动调参的不同参数组共用识别器)时重新创建
+        
+        Args:
+            region_name: 区域名称
+            ocr_params: 区域的OCR参数
+            
+        Returns:
+            PaddleOCR: 区域特定OCR实例，创建失败时返回默认OCR实例
+        """
+        cached = self.region_ocr.get(region_name)
+        if cached is not None and cached[0] == ocr_params:
+            return cached[1]
+        if cached is not None:
+            self.logger.info(f"区域 {region_name} 的OCR参数已变化，重新创建OCR实例")
+        try:
+            instance = self._create_ocr_instance(ocr_params)
+        except Exception as e:
+            self.logger.error(f"创建区域特定OCR实例失败: {e}, 使用默认OCR实例")
+            instance = self.ocr
+        self.region_ocr[region_name] = (copy.deepcopy(ocr_params), instance)
+        return instance
+            
+    # 获取区域名字标签跟踪器
+    def _get_tracker(self, region_name: str = None, trackers: Optional[dict] = None):
+        """获取区域的名字标签跟踪器，未启用跟踪时返回None
+        
+        跟踪需要单独调用检测与识别，在实际执行识别的进程中生效；
+        守护进程为每个客户端连接传入单独的 trackers，不同采集程序的轨迹互不影响
+        
+        Args:
+            region_name: 区域名称
+            trackers: 跟踪器缓存 {区域名: NameTagTracker}，默认为 self.trackers
+        """
+        if not region_name or region_name not in self.area_config:
+            return None
+        trackers = self.trackers if trackers is None else trackers
+        if region_name not in trackers:
+            from src.environment.name_tag_tracker import NameTagTracker, get_tracker_config
+            tracker_config = get_tracker_config(self.area_config[region_name])
+            trackers[region_name] = NameTagTracker(tracker_config, self.logger) if tracker_config['Enabled'] else None
+        return trackers[region_name]
+    
+    # 跟踪模式识别
+    def _recognize_tracked(self, current_ocr, tracker, image: np.ndarray, region_name: str) -> OCRResult:
+        """只运行文本检测，由跟踪器决定哪些文本框需要重新识别
+        
+        Args:
+            current_ocr: 区域使用的OCR实例
+            tracker: 区域的名字标签跟踪器
+            image: 区域图像
+            region_name: 区域名称
+            
+        Returns:
+            OCRResult: 识别结果，track_ids 为稳定的轨迹ID
+        """
+        from src.environment.paddle_runtime import get_rotate_crop_image
+        
+        boxes = self._detect_boxes(current_ocr, image, region_name)
+        bgr_image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if image.ndim == 2 else image
+        
+        def recognize(indices):
+            crops = [get_rotate_crop_image(bgr_image, boxes[i]) for i in indices]
+            return current_ocr.ocr(crops, det=False, rec=True, cls=False)[0]
+        
+        recognized_before = tracker.stats['recognized']
+        result = tracker.update(image, boxes, recognize)
+        # 复用上次识别文本的文本框计为缓存命中
+        get_metrics().increment('ocr_cache_hit', region_name,
+                                len(boxes) - (tracker.stats['recognized'] - recognized_before))
+        return self._drop_low_score(result, region_name)
+    
+    # 检测文本框
+    def _detect_boxes(self, current_ocr, image: np.ndarray, region_name: str) -> np.ndarray:
+        """检测文本框，启用候选框的区域使用连通域分析代替神经网络检测器
+        
+        Returns:
+            np.ndarray: (N, 4, 2) 文本框四点坐标
+        """
+        from src.environment.text_proposals import get_proposal_config, propose_text_boxes
+        
+        proposal_config = get_proposal_config(self.area_config.get(region_name))
+        if proposal_config['Enabled']:
+            return propose_text_boxes(image, proposal_config)
+        det_result = current_ocr.ocr(image, det=True, rec=False, cls=False)
+        return np.asarray(det_result[0] if det_result and det_result[0] else [], dtype=np.float32).reshape(-1, 4, 2)
+    
+    # 候选框模式识别
+    def _recognize_proposals(self, current_ocr, image: np.ndarray, region_name: str) -> OCRResult:
+        """由二值图的连通域生成候选框，裁切后一次批量识别，跳过神经网络检测器
+        
+        Returns:
+            OCRResult: 识别结果，坐标为区域内坐标
+        """
+        from src.environment.text_proposals import crop_boxes
+        
+        boxes = self._detect_boxes(current_ocr, image, region_name)
+        if len(boxes) == 0:
+            return OCRResult.empty()
+        rec_results = current_ocr.ocr(crop_boxes(image, boxes), det=False, rec=True, cls=False)[0]
+        texts = [text for text, _ in rec_results]
+        confidences = [score for _, score in rec_results]
+        return self._drop_low_score(OCRResult(boxes, confidences, texts), region_name)
+    
+    # 丢弃低置信度结果
+    def _drop_low_score(self, result: OCRResult, region_name: str) -> OCRResult:
+        """与完整识别一致，丢弃置信度低于 drop_score 的结果"""
+        ocr_params = self.area_config[region_name].get('text_recognizer', {}).get('ocr_params') or {}
+        return result.filter(result.confidences >= ocr_params.get('drop_score', 0.5))
+    
+    def _recognize(self, image: np.ndarray, region_name: str = None, trackers: Optional[dict] = None) -> OCRResult:
+        """按区域配置选择识别方式执行识别,调用方需持有 ocr_lock"""
+        # 优先使用守护进程识别
+        if self.daemon is not None:
+            daemon_result = self._recognize_via_daemon(image, region_name)
+            if daemon_result is not None:
+                return daemon_result
+            if not self._local_loaded.is_set():
+                # 回退模型仍在后台加载，本次不阻塞帧处理
+                self.logger.debug(f"回退OCR模型加载中，区域 {region_name} 本次返回空结果")
+                return OCRResult.empty()
+        
+        # 根据区域配置创建OCR实例
+        current_ocr = self.ocr  # 默认使用基础OCR实例
+        
+        if region_name and region_name in self.area_config:
+            region_config = self.area_config[region_name]
+            ocr_params = region_config.get('text_recognizer', {}).get('ocr_params', {})
+            
+            if ocr_params:
+                current_ocr = self._get_region_ocr(region_name, ocr_params)
+        
+        # 启用跟踪的区域只对新出现或变化的文本框执行识别
+        tracker = self._get_tracker(region_name, trackers)
+        if tracker is not None:
+            return self._recognize_tracked(current_ocr, tracker, image, region_name)
+        
+        # 启用候选框的区域跳过神经网络检测器
+        if region_name in self.area_config and \
+                self.area_config[region_name].get('text_recognizer', {}).get('proposals', {}).get('Enabled'):
+            return self._recognize_proposals(current_ocr, image, region_name)
+        
+        # 执行OCR识别
+        result = current_ocr.ocr(image, cls=False)
+        
+        if not result or not result[0]:
+            return OCRResult.empty()
+        
+        # 转换为列式结果，result[0]包含所有识别结果
+        return OCRResult.from_paddle(result[0])
+    
     # 处理图像并识别文字
+    @traced('TextRecognizer.process_and_recognize', region_arg='region_name')
     def process_and_recognize(self, 
                             image: np.ndarray,
                             save_debug: bool = False,
                             debug_mode: bool = False,
                             debug_path: Optional[Path] = None,
                             timestamp: str = None,
-                            region_name: str = None) -> Dict:
+                            region_name: str = None,
+                            trackers: Optional[dict] = None) -> OCRResult:
         """处理图像并识别文字
         
+        Args:
+            trackers: 名字标签跟踪器缓存，默认为 self.trackers(守护进程按客户端连接传入)
+        
         Returns:
-            Dict: 包含处理后的OCR结果，格式为：
-            {
-                'details': [
-                    {
-                        'text': '识别的文本',
-                        'confidence': 置信度,
-                        'box': [[x1,y1], [x2,y2], [x3,y3], [x4,y4]],
-                        'center': [center_x, center_y]  # 添加中心点坐标
-                    },
-                    ...
-                ]
-            }
+            OCRResult: 列式OCR结果(boxes/centers/confidences/texts)，
+            同时兼容原有的访问方式 result['details']：
+            [
+                {
+                    'text': '识别的文本',
+                    'confidence': 置信度,
+                    'box': [[x1,y1], [x2,y2], [x3,y3], [x4,y4]],
+                    'center': [center_x, center_y]
+                },
+                ...
+            ]
         """
         try:
-            # 根据区域配置创建OCR实例
-            current_ocr = self.ocr  # 默认使用基础OCR实例
-            
-            if region_name and region_name in self.area_config:
-                region_config = self.area_config[region_name]
-                ocr_params = region_config.get('text_recognizer', {}).get('ocr_params', {})
-                
-                if ocr_params:
-                    try:
-                        current_ocr = self._create_ocr_instance(ocr_params)
-                    except Exception as e:
-                        self.logger.error(f"创建区域特定OCR实例失败: {e}, 使用默认OCR实例")
-                        current_ocr = self.ocr
-
+            # 等待后台预热完成
+            if not self.wait_until_ready():
+                self.logger.error(f"OCR模型不可用: {self._warmup_error}")
+                return OCRResult.empty()
+            
             # 保存调试图像
             if save_debug and debug_mode and debug_path and timestamp:
                 debug_dir = Path(debug_path)
                 debug_dir.mkdir(parents=True, exist_ok=True)
                 cv2.imwrite(str(debug_dir / f'{timestamp}.png'), image)
             
-            # 执行OCR识别
-            result = current_ocr.ocr(image, cls=False)
-            
-            if not result or not result[0]:
-                return {'details': []}
-            
-            # 转换结果格式
-            formatted_results = []
-            for line in result[0]:  # result[0]包含所有识别结果
-                if len(line) == 2:  # 确保结果包含坐标和文本信息
-                    box, (text, confidence) = line
-                    
-                    # 计算中心点坐标
-                    center_x = sum(point[0] for point in box) / 4
-                    center_y = sum(point[1] for point in box) / 4
-                    
-                    # 格式化单个结果
-                    formatted_result = {
-                        'text': text,
-                        'confidence': float(confidence),
-                        'box': [[int(x), int(y)] for x, y in box],
-                        'center': [int(center_x), int(center_y)]
-                    }
-                    formatted_results.append(formatted_result)
-            
-            return {'details': formatted_results}
+            with self.ocr_lock:
+                return self._recognize(image, region_name, trackers)
             
         except Exception as e:
             self.logger.error(f"文字识别出错: {str(e)}")
-            return {'details': []}
+            return OCRResult.empty()
     
     # 处理多个区域的图像并识别文字
     def process_regions(self, 
                        regions: Dict[str, np.ndarray],
                        save_debug: bool = False,
                        debug_mode: bool = False,
-                       timestamp: str = None) -> Dict[str, str]:
+                       timestamp: str = None) -> Dict[str, OCRResult]:
         """处理多个区域的图像并识别文字"""
         results = {}
         
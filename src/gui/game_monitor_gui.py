@@ -175,6 +175,12 @@ class GameMonitorGUI(QMainWindow):
         """停止监控"""
         self.update_timer.stop()
         
+    def closeEvent(self, event):
+        """关闭窗口时停止监控并写出尚未保存的状态"""
+        self.stop_monitoring()
+        self.processor.close()
+        super().closeEvent(event)
+        
     def update_status(self):
         """更新状态显示"""
         try:
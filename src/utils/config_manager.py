@@ -3,14 +3,24 @@ from pathlib import Path
 from typing import Dict, Any
 
 class ConfigManager:
-    def __init__(self, config_path: Path, action_config_path: Path = None):
+    def __init__(self, config_path: Path, action_config_path: Path = None, overlay_path: Path = None):
         """初始化配置管理器
         
         Args:
             config_path: 配置文件路径
             action_config_path: 动作配置文件路径,可选
+            overlay_path: 覆盖配置文件路径(如OCR参数自动调优生成的配置),可选;
+                          为空时使用 basic_config.config_overlay(相对路径基于配置文件所在目录)
         """
         self.config = self._load_config(config_path)
+        
+        # 合并覆盖配置
+        if overlay_path is None:
+            overlay_name = (self.config.get('basic_config') or {}).get('config_overlay')
+            if overlay_name:
+                overlay_path = Path(config_path).parent / overlay_name
+        if overlay_path is not None and Path(overlay_path).exists():
+            self.config = self._merge_config(self.config, self._load_config(overlay_path) or {})
         self.basic_config = self.config.get('basic_config')
         self.area_config = {
             key: value for key, value in self.config.items()
@@ -41,6 +51,25 @@ class ConfigManager:
         except Exception as e:
             raise RuntimeError(f"加载配置文件失败: {e}")
         
+    @staticmethod
+    def _merge_config(base: Dict[str, Any], overlay: Dict[str, Any]) -> Dict[str, Any]:
+        """递归合并配置,overlay 中的值覆盖 base
+        
+        Args:
+            base: 基础配置
+            overlay: 覆盖配置
+            
+        Returns:
+            合并后的配置字典
+        """
+        merged = dict(base)
+        for key, value in overlay.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = ConfigManager._merge_config(merged[key], value)
+            else:
+                merged[key] = value
+        return merged
+        
     def get_logger_config(self) -> Dict[str, Any]:
         """获取日志配置
         
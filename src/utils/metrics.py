@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+性能指标模块
+
+为采集流程的每个阶段、每个区域记录耗时,回答"哪个区域/阶段占用了帧预算":
+1. 流式延迟直方图: 按几何间隔分桶(相邻桶边界相差5%),常数内存,可随时计算 p50/p95/p99
+2. 计数器: 缓存命中、跳过、丢帧等事件按区域计数
+3. 仪表: 队列深度等瞬时值
+4. 程序接口 snapshot() 与定期输出的摘要日志(可同时写入JSON文件)
+
+每次记录只做一次二分查找与几次整数加法,开销足够低,可以在生产环境中常开。
+
+basic_config.metrics:
+    Enabled: 是否启用
+    report_interval: 摘要日志输出间隔(秒),0表示不输出
+    dump_file: 摘要JSON文件路径(相对 base_output_dir),为空时不写文件
+
+主要类与函数:
+- LatencyHistogram: 流式延迟直方图
+- MetricsRegistry: 指标注册表
+- get_metrics: 获取进程内共享的指标注册表
+"""
+
+import json
+import math
+import time
+import bisect
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 默认指标配置
+DEFAULT_METRICS_CONFIG = {
+    'Enabled': True,
+    'report_interval': 60.0,
+    'dump_file': None
+}
+
+# 直方图分桶: 0.01ms ~ 100s,相邻边界相差5%
+BUCKET_MIN_MS = 0.01
+BUCKET_MAX_MS = 100000.0
+BUCKET_GROWTH = 1.05
+BUCKET_EDGES = [
+    BUCKET_MIN_MS * BUCKET_GROWTH ** i
+    for i in range(int(math.log(BUCKET_MAX_MS / BUCKET_MIN_MS) / math.log(BUCKET_GROWTH)) + 2)
+]
+
+# 不区分区域的指标使用的区域名
+ALL_REGIONS = '*'
+
+# 摘要中输出的分位数
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """
+    流式延迟直方图
+
+    属性:
+        counts (List[int]): 各桶计数,第 i 桶为 (BUCKET_EDGES[i-1], BUCKET_EDGES[i]]
+        count (int): 样本数
+        total (float): 耗时总和(毫秒)
+        min (float): 最小耗时
+        max (float): 最大耗时
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_EDGES) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, value_ms: float):
+        """记录一个样本(毫秒)"""
+        self.counts[bisect.bisect_left(BUCKET_EDGES, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms < self.min:
+            self.min = value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def percentile(self, quantile: float) -> float:
+        """估算分位数(毫秒),返回所在桶的上边界,不超过实际最大值"""
+        if self.count == 0:
+            return 0.0
+        target = max(1, math.ceil(quantile * self.count))
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                edge = BUCKET_EDGES[index] if index < len(BUCKET_EDGES) else self.max
+                return min(max(edge, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """平均耗时(毫秒)"""
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """样本数、均值、p50/p95/p99 与最大值"""
+        result = {'count': self.count, 'mean': round(self.mean, 3)}
+        for quantile in SUMMARY_QUANTILES:
+            result[f'p{int(quantile * 100)}'] = round(self.percentile(quantile), 3)
+        result['max'] = round(self.max, 3)
+        return result
+
+
+class _Timer:
+    """阶段计时上下文"""
+
+    __slots__ = ('registry', 'stage', 'region', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', stage: str, region: Optional[str]):
+        self.registry = registry
+        self.stage = stage
+        self.region = region
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.stage, self.region, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class _NullTimer:
+    """指标关闭时使用的空计时上下文"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+
+    属性:
+        enabled (bool): 是否启用
+        histograms (Dict[Tuple[str, str], LatencyHistogram]): (阶段, 区域) -> 延迟直方图
+        counters (Dict[Tuple[str, str], int]): (事件, 区域) -> 计数
+        gauges (Dict[str, float]): 仪表名 -> 最近的值
+    """
+
+    def __init__(self):
+        self.enabled = DEFAULT_METRICS_CONFIG['Enabled']
+        self.report_interval = DEFAULT_METRICS_CONFIG['report_interval']
+        self.dump_path: Optional[Path] = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def configure(self, config: Optional[dict], base_dir: Optional[Path] = None) -> 'MetricsRegistry':
+        """按配置设置开关与输出
+
+        Args:
+            config: basic_config.metrics
+            base_dir: dump_file 的相对根目录
+
+        Returns:
+            MetricsRegistry: 自身,便于链式调用
+        """
+        merged = dict(DEFAULT_METRICS_CONFIG)
+        merged.update(config or {})
+        self.enabled = bool(merged['Enabled'])
+        self.report_interval = float(merged['report_interval'] or 0)
+        dump_file = merged.get('dump_file')
+        self.dump_path = (Path(base_dir) / dump_file if base_dir else Path(dump_file)) if dump_file else None
+        return self
+
+    def reset(self):
+        """清空所有指标"""
+        with self._lock:
+            self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+            self.counters: Dict[Tuple[str, str], int] = {}
+            self.gauges: Dict[str, float] = {}
+            self.started = time.time()
+            self.last_report = self.started
+
+    def timer(self, stage: str, region: Optional[str] = None):
+        """阶段计时上下文: with metrics.timer('ocr', 'game_area'): ..."""
+        return _Timer(self, stage, region) if self.enabled else NULL_TIMER
+
+    def observe(self, stage: str, region: Optional[str], value_ms: float):
+        """记录一次阶段耗时(毫秒)"""
+        if not self.enabled:
+            return
+        key = (stage, region or ALL_REGIONS)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.observe(value_ms)
+
+    def increment(self, name: str, region: Optional[str] = None, count: int = 1):
+        """事件计数,如 cache_hit / skipped / dropped"""
+        if not self.enabled or not count:
+            return
+        key = (name, region or ALL_REGIONS)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + count
+
+    def set_gauge(self, name: str, value: float):
+        """设置仪表值,如队列深度"""
+        if self.enabled:
+            self.gauges[name] = value
+
+    def percentile(self, stage: str, region: Optional[str], quantile: float) -> float:
+        """阶段/区域耗时的分位数(毫秒),没有样本时为0"""
+        histogram = self.histograms.get((stage, region or ALL_REGIONS))
+        return histogram.percentile(quantile) if histogram else 0.0
+
+    def snapshot(self) -> Dict[str, dict]:
+        """当前指标快照
+
+        Returns:
+            Dict: {'uptime': 秒数,
+                   'latency': {阶段: {区域: {count, mean, p50, p95, p99, max}}},
+                   'counters': {事件: {区域: 计数}},
+                   'gauges': {仪表名: 值}}
+        """
+        with self._lock:
+            latency: Dict[str, Dict[str, dict]] = {}
+            for (stage, region), histogram in sorted(self.histograms.items()):
+                latency.setdefault(stage, {})[region] = histogram.summary()
+            counters: Dict[str, Dict[str, int]] = {}
+            for (name, region), count in sorted(self.counters.items()):
+                counters.setdefault(name, {})[region] = count
+            gauges = dict(self.gauges)
+        return {
+            'uptime': round(time.time() - self.started, 3),
+            'latency': latency,
+            'counters': counters,
+            'gauges': gauges
+        }
+
+    def summary_lines(self, snapshot: Optional[dict] = None) -> List[str]:
+        """摘要文本,每个阶段/区域一行,按 p95 从大到小排列"""
+        snapshot = snapshot or self.snapshot()
+        rows = [
+            (stats['p95'], stage, region, stats)
+            for stage, regions in snapshot['latency'].items()
+            for region, stats in regions.items()
+        ]
+        lines = [
+            f"{stage:<16} {region:<24} n={stats['count']:<6} mean={stats['mean']:.2f}ms "
+            f"p50={stats['p50']:.2f}ms p95={stats['p95']:.2f}ms p99={stats['p99']:.2f}ms max={stats['max']:.2f}ms"
+            for _, stage, region, stats in sorted(rows, key=lambda row: row[0], reverse=True)
+        ]
+        for name, regions in snapshot['counters'].items():
+            lines.append(f"计数 {name}: " + ', '.join(f"{region}={count}" for region, count in regions.items()))
+        if snapshot['gauges']:
+            lines.append("仪表: " + ', '.join(f"{name}={value}" for name, value in sorted(snapshot['gauges'].items())))
+        return lines
+
+    def dump(self, path: Optional[Path] = None) -> Optional[Path]:
+        """将快照写入JSON文件,未指定路径且未配置 dump_file 时不写"""
+        path = Path(path) if path else self.dump_path
+        if path is None:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def maybe_log_summary(self, logger: logging.Logger, now: Optional[float] = None) -> bool:
+        """到达摘要间隔时输出摘要日志(并写入 dump_file)
+
+        Returns:
+            bool: 本次是否输出了摘要
+        """
+        if not self.enabled or self.report_interval <= 0:
+            return False
+        now = time.time() if now is None else now
+        if now - self.last_report < self.report_interval:
+            return False
+        self.last_report = now
+        snapshot = self.snapshot()
+        logger.info(f"性能指标摘要(运行 {snapshot['uptime']:.0f}秒):")
+        for line in self.summary_lines(snapshot):
+            logger.info(line)
+        try:
+            self.dump()
+        except OSError as e:
+            logger.warning(f"写入性能指标文件失败: {e}")
+        return True
+
+
+# 进程内共享的指标注册表
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """获取进程内共享的指标注册表"""
+    return _registry
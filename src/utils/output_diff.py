@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+处理结果比较模块
+
+逐字段比较 DataProcessor.process_region 的输出(嵌套的 dict/list/数值/字符串):
+1. 数值字段按字段名查找容差(绝对差值),未列出的字段要求相等
+2. strict=False 时只比较期望中列出的键,实际结果中多出的键不视为差异
+3. 返回可读的差异列表,每项形如 "name_groups[2].center_x: 期望 512, 实际 517"
+
+主要函数:
+- diff_outputs: 比较两个处理结果
+"""
+
+from typing import Any, Dict, List, Optional
+
+# 浮点数在差异信息中保留的小数位数
+FLOAT_DIGITS = 4
+
+
+def _format(value: Any) -> str:
+    """差异信息中的取值表示"""
+    if isinstance(value, float):
+        return repr(round(value, FLOAT_DIGITS))
+    return repr(value)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def diff_outputs(expected: Any, actual: Any, tolerances: Optional[Dict[str, float]] = None,
+                 strict: bool = True, path: str = '') -> List[str]:
+    """比较两个处理结果
+
+    Args:
+        expected: 期望结果
+        actual: 实际结果
+        tolerances: {字段名: 允许的绝对差值},按最近一级的字典键匹配
+        strict: 是否将实际结果中多出的键视为差异
+        path: 当前字段路径(递归使用)
+
+    Returns:
+        List[str]: 差异列表,为空表示一致
+    """
+    tolerances = tolerances or {}
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        diffs = []
+        for key, value in expected.items():
+            key_path = f"{path}.{key}" if path else str(key)
+            if key not in actual:
+                diffs.append(f"{key_path}: 缺失, 期望 {_format(value)}")
+            else:
+                diffs.extend(diff_outputs(value, actual[key], tolerances, strict, key_path))
+        if strict:
+            for key in actual.keys() - expected.keys():
+                key_path = f"{path}.{key}" if path else str(key)
+                diffs.append(f"{key_path}: 多出, 实际 {_format(actual[key])}")
+        return diffs
+
+    if isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)):
+        if len(expected) != len(actual):
+            return [f"{path or '.'}: 长度 期望 {len(expected)}, 实际 {len(actual)}"]
+        diffs = []
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            diffs.extend(diff_outputs(left, right, tolerances, strict, f"{path}[{index}]"))
+        return diffs
+
+    if _is_number(expected) and _is_number(actual):
+        field = path.rsplit('.', 1)[-1].split('[', 1)[0]
+        if abs(expected - actual) <= tolerances.get(field, 0):
+            return []
+    elif expected == actual:
+        return []
+    return [f"{path or '.'}: 期望 {_format(expected)}, 实际 {_format(actual)}"]
@@ -0,0 +1,532 @@
+# -*- coding: utf-8 -*-
+"""
+采集性能剖析模块
+
+定位性能回退时不再需要手工包装 process_frame。该模块在 DataCollector 上连续处理N帧,
+并用选定的剖析器记录,结果按流水线阶段与区域分组:
+1. cprofile: 每个(阶段, 区域)一个 cProfile,输出各组耗时最多的函数与 .prof 原始数据
+2. sampling: 后台线程按固定间隔对所有线程采样调用栈(挂钟时间,包含等待与I/O),
+   输出各组样本数、热点函数与折叠栈文件(可用 flamegraph.pl / speedscope 打开)
+3. tracemalloc: 记录各组的净分配与峰值内存,输出分配最多的代码行与快照原始数据
+
+阶段通过替换处理模块实例上的方法挂钩(与 @traced 装饰的方法相同),剖析结束后恢复:
+    capture      ScreenCapture.capture
+    split        ScreenSplitter.process_image
+    preprocess   ImagePreprocessor.process_images
+    ocr          TextRecognizer.process_and_recognize
+    process      DataProcessor.process_region
+    state        StateManager.update
+阶段之外的帧内开销(调度、依赖图、截止时间等)计入 other 阶段。
+
+注意:
+- 同一波次的区域并行处理时,cProfile 同一时刻只能有一个剖析器工作(Python 3.12+),
+  无法启用剖析器的调用只统计挂钟时间;tracemalloc 的内存统计是进程全局的,并行时会互相包含
+- 只剖析逐帧处理的 process_frame,不包含流水线与异步运行时
+
+输出目录 profile_<模式>_<时间>/:
+    report.txt / report.json   分组报告
+    cprofile:     <阶段>__<区域>.prof, all.prof
+    sampling:     samples.folded
+    tracemalloc:  allocations.snapshot
+
+主要类与函数:
+- FrameProfiler: 采集性能剖析器
+- profile_collection: 按配置文件创建采集器并剖析(main.py --profile 使用)
+"""
+
+import sys
+import json
+import time
+import pstats
+import cProfile
+import inspect
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from src.utils.metrics import ALL_REGIONS, LatencyHistogram
+
+# 剖析模式
+PROFILE_MODES = ('cprofile', 'sampling', 'tracemalloc')
+
+# 阶段挂钩: 阶段名 -> (处理模块属性名, 方法名, 区域参数名)
+STAGE_HOOKS = {
+    'capture': ('screen_capture', 'capture', None),
+    'split': ('screen_splitter', 'process_image', 'regions_to_process'),
+    'preprocess': ('image_preprocessor', 'process_images', 'regions_to_process'),
+    'ocr': ('text_recognizer', 'process_and_recognize', 'region_name'),
+    'process': ('data_processor', 'process_region', 'region_name'),
+    'state': ('state_manager', 'update', None)
+}
+
+# 阶段之外的帧内开销
+OTHER_STAGE = 'other'
+
+# 整帧耗时使用的阶段名
+FRAME_STAGE = 'frame'
+
+# 报告中每组输出的函数/代码行数
+DEFAULT_TOP = 20
+
+
+class FrameProfiler:
+    """
+    采集性能剖析器
+
+    属性:
+        MODULE_NAME (str): 模块名称
+        collector (DataCollector): 被剖析的数据采集器
+        mode (str): 剖析模式,见 PROFILE_MODES
+        wall (Dict[Tuple[str, str], LatencyHistogram]): (阶段, 区域) -> 挂钟耗时直方图
+        output_dir (Path): 本次剖析的输出目录
+    """
+
+    MODULE_NAME = 'FrameProfiler'
+
+    def __init__(self, collector, mode: str = 'cprofile', output_dir: Optional[Union[str, Path]] = None,
+                 logger: Optional[logging.Logger] = None, sample_interval: float = 0.005, top: int = DEFAULT_TOP):
+        """初始化剖析器
+
+        Args:
+            collector: 已初始化的 DataCollector
+            mode: 剖析模式 cprofile / sampling / tracemalloc
+            output_dir: 输出根目录,默认为 base_output_dir/profiles
+            logger: 日志实例,默认使用采集器的日志
+            sample_interval: sampling 模式的采样间隔(秒)
+            top: 报告中每组输出的函数/代码行数
+
+        Raises:
+            ValueError: 剖析模式无效时抛出
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"无效的剖析模式: {mode},可选 {PROFILE_MODES}")
+        self.collector = collector
+        self.mode = mode
+        self.logger = logger or collector.logger
+        self.sample_interval = float(sample_interval)
+        self.top = int(top)
+        root = Path(output_dir) if output_dir else Path(collector.base_output_dir) / 'profiles'
+        self.output_dir = root / f"profile_{mode}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        self.wall: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.unattributed = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._originals: List[Tuple[Any, str]] = []
+        # cprofile: [((阶段, 区域), Profile)],每个线程各自的剖析器
+        self._profiles: List[Tuple[Tuple[str, str], cProfile.Profile]] = []
+        # sampling: 线程ID -> 当前(阶段, 区域);正在处理帧的线程
+        self._contexts: Dict[int, Tuple[str, str]] = {}
+        self._frame_threads = set()
+        self._samples: Counter = Counter()
+        self._sampler = None
+        self._sampling = False
+        # tracemalloc: (阶段, 区域) -> [调用次数, 净分配字节, 最大峰值字节]
+        self._allocations: Dict[Tuple[str, str], List[int]] = {}
+        self._baseline = None
+
+    # 阶段挂钩
+    def _install_hooks(self):
+        """在处理模块实例上替换各阶段的方法"""
+        for stage, (attr, method_name, region_arg) in STAGE_HOOKS.items():
+            target = getattr(self.collector, attr, None)
+            method = getattr(target, method_name, None) if target is not None else None
+            if method is None:
+                continue
+            setattr(target, method_name, self._wrap(stage, method, region_arg))
+            self._originals.append((target, method_name))
+
+    def _remove_hooks(self):
+        """恢复被替换的方法"""
+        for target, method_name in self._originals:
+            delattr(target, method_name)
+        self._originals = []
+
+    def _wrap(self, stage: str, method: Callable, region_arg: Optional[str]) -> Callable:
+        """包装一个阶段方法: 记录挂钟耗时,并在最外层调用上执行当前模式的剖析"""
+        signature = inspect.signature(method)
+
+        def wrapper(*args, **kwargs):
+            region = ALL_REGIONS
+            if region_arg is not None:
+                try:
+                    region = signature.bind(*args, **kwargs).arguments.get(region_arg) or ALL_REGIONS
+                except TypeError:
+                    pass
+                if isinstance(region, (list, tuple)):
+                    region = ','.join(region)
+            # 阶段嵌套调用时只在最外层统计
+            if getattr(self._local, 'active', False):
+                return method(*args, **kwargs)
+            key = (stage, region)
+            self._local.active = True
+            start = time.perf_counter()
+            try:
+                return self._call(key, method, args, kwargs)
+            finally:
+                self._observe(key, (time.perf_counter() - start) * 1000)
+                self._local.active = False
+        return wrapper
+
+    def _observe(self, key: Tuple[str, str], value_ms: float):
+        """记录一次挂钟耗时"""
+        with self._lock:
+            histogram = self.wall.get(key)
+            if histogram is None:
+                histogram = self.wall[key] = LatencyHistogram()
+            histogram.observe(value_ms)
+
+    def _call(self, key: Tuple[str, str], method: Callable, args: tuple, kwargs: dict):
+        """按剖析模式执行一次阶段调用"""
+        if self.mode == 'cprofile':
+            profiles = self._local.__dict__.setdefault('profiles', {})
+            profile = profiles.get(key)
+            if profile is None:
+                profile = profiles[key] = cProfile.Profile()
+                with self._lock:
+                    self._profiles.append((key, profile))
+            try:
+                profile.enable()
+            except ValueError:
+                # 其他线程的剖析器正在工作
+                with self._lock:
+                    self.unattributed += 1
+                return method(*args, **kwargs)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                profile.disable()
+
+        if self.mode == 'sampling':
+            thread_id = threading.get_ident()
+            self._contexts[thread_id] = key
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._contexts.pop(thread_id, None)
+
+        # tracemalloc
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            with self._lock:
+                record = self._allocations.setdefault(key, [0, 0, 0])
+                record[0] += 1
+                record[1] += current - before
+                record[2] = max(record[2], peak - before)
+
+    # 采样
+    def _sample_loop(self):
+        """采样线程: 记录处于阶段内或正在处理帧的线程的调用栈"""
+        own_id = threading.get_ident()
+        while self._sampling:
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                key = self._contexts.get(thread_id)
+                if key is None:
+                    if thread_id not in self._frame_threads:
+                        continue
+                    key = (OTHER_STAGE, ALL_REGIONS)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self._samples[(key, tuple(reversed(stack)))] += 1
+            time.sleep(self.sample_interval)
+
+    # 运行
+    def _start(self):
+        """开始剖析"""
+        if self.mode == 'sampling':
+            self._sampling = True
+            self._sampler = threading.Thread(target=self._sample_loop, name='profile-sampler', daemon=True)
+            self._sampler.start()
+        elif self.mode == 'tracemalloc':
+            tracemalloc.start(25)
+            self._baseline = tracemalloc.take_snapshot()
+
+    def _stop(self):
+        """停止剖析,返回 tracemalloc 快照(其他模式为None)"""
+        if self.mode == 'sampling':
+            self._sampling = False
+            self._sampler.join()
+        elif self.mode == 'tracemalloc':
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            return snapshot
+        return None
+
+    def run(self, regions_list: List[str], frames: int = 50, warmup: int = 1) -> Path:
+        """剖析连续N帧的处理并输出报告
+
+        Args:
+            regions_list: 需要处理的区域名称列表
+            frames: 剖析的帧数
+            warmup: 剖析前不计入的预热帧数(缓存填充)
+
+        Returns:
+            Path: 本次剖析的输出目录
+
+        Raises:
+            RuntimeError: OCR模型加载失败
+        """
+        self.logger.info(f"开始性能剖析: 模式 {self.mode}, 预热 {warmup} 帧, 剖析 {frames} 帧")
+        # OCR后台预热期间的帧会跳过OCR区域,先等待模型就绪再开始预热与剖析
+        if not self.collector.wait_until_ready():
+            raise RuntimeError("OCR模型加载失败")
+        for _ in range(max(0, warmup)):
+            self.collector.process_frame(regions_list)
+
+        thread_id = threading.get_ident()
+        self._install_hooks()
+        self._start()
+        snapshot = None
+        started = time.perf_counter()
+        try:
+            for _ in range(max(1, frames)):
+                self._frame_threads.add(thread_id)
+                frame_start = time.perf_counter()
+                try:
+                    self.collector.process_frame(regions_list)
+                finally:
+                    self._frame_threads.discard(thread_id)
+                    self._observe((FRAME_STAGE, ALL_REGIONS), (time.perf_counter() - frame_start) * 1000)
+        finally:
+            elapsed = time.perf_counter() - started
+            snapshot = self._stop()
+            self._remove_hooks()
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        report = self.build_report(elapsed, snapshot)
+        with open(self.output_dir / 'report.json', 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        with open(self.output_dir / 'report.txt', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.report_lines(report)) + '\n')
+        self.logger.info(f"性能剖析完成: {self.output_dir}")
+        return self.output_dir
+
+    # 报告
+    def _wall_summary(self) -> Dict[str, Dict[str, dict]]:
+        """挂钟耗时: {阶段: {区域: {count, total, mean, p50, p95, p99, max}}},other 为帧内阶段之外的耗时"""
+        result: Dict[str, Dict[str, dict]] = {}
+        for (stage, region), histogram in sorted(self.wall.items()):
+            summary = histogram.summary()
+            summary['total'] = round(histogram.total, 3)
+            result.setdefault(stage, {})[region] = summary
+        frame = self.wall.get((FRAME_STAGE, ALL_REGIONS))
+        if frame is not None:
+            staged = sum(histogram.total for (stage, _), histogram in self.wall.items() if stage != FRAME_STAGE)
+            result.setdefault(OTHER_STAGE, {})[ALL_REGIONS] = {'total': round(max(frame.total - staged, 0.0), 3)}
+        return result
+
+    def _cprofile_report(self) -> Dict[str, Any]:
+        """合并各线程的剖析器,输出 .prof 原始数据与各组热点函数"""
+        merged: Dict[Tuple[str, str], pstats.Stats] = {}
+        for key, profile in self._profiles:
+            try:
+                if key in merged:
+                    merged[key].add(profile)
+                else:
+                    merged[key] = pstats.Stats(profile)
+            except TypeError:
+                # 剖析器未采集到任何调用
+                continue
+        groups = {}
+        combined = None
+        for (stage, region), stats in sorted(merged.items()):
+            safe_region = region.replace(',', '+').replace(ALL_REGIONS, 'all')
+            stats.dump_stats(str(self.output_dir / f"{stage}__{safe_region}.prof"))
+            combined = (combined or pstats.Stats()).add(stats)
+            groups.setdefault(stage, {})[region] = self._top_functions(stats)
+        if combined is not None:
+            combined.dump_stats(str(self.output_dir / 'all.prof'))
+        return {'groups': groups, 'unattributed_calls': self.unattributed}
+
+    def _top_functions(self, stats: pstats.Stats) -> List[dict]:
+        """按累计耗时排列的热点函数"""
+        rows = []
+        for (filename, lineno, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({
+                'function': f"{name} ({Path(filename).name}:{lineno})",
+                'calls': calls,
+                'tottime_ms': round(tottime * 1000, 3),
+                'cumtime_ms': round(cumtime * 1000, 3)
+            })
+        rows.sort(key=lambda row: row['cumtime_ms'], reverse=True)
+        return rows[:self.top]
+
+    def _sampling_report(self) -> Dict[str, Any]:
+        """输出折叠栈文件与各组样本数、热点函数"""
+        groups: Dict[str, Dict[str, dict]] = {}
+        leaves: Dict[Tuple[str, str], Counter] = {}
+        inclusive: Dict[Tuple[str, str], Counter] = {}
+        with open(self.output_dir / 'samples.folded', 'w', encoding='utf-8') as f:
+            for ((stage, region), stack), count in self._samples.most_common():
+                f.write(';'.join((stage, region) + stack) + f" {count}\n")
+                leaves.setdefault((stage, region), Counter())[stack[-1] if stack else '?'] += count
+                for function in set(stack):
+                    inclusive.setdefault((stage, region), Counter())[function] += count
+        for (stage, region), counter in sorted(leaves.items()):
+            samples = sum(counter.values())
+            groups.setdefault(stage, {})[region] = {
+                'samples': samples,
+                'estimated_ms': round(samples * self.sample_interval * 1000, 3),
+                'self': [{'function': name, 'samples': count} for name, count in counter.most_common(self.top)],
+                'inclusive': [
+                    {'function': name, 'samples': count}
+                    for name, count in inclusive[(stage, region)].most_common(self.top)
+                ]
+            }
+        return {'interval_ms': self.sample_interval * 1000, 'groups': groups}
+
+    def _tracemalloc_report(self, snapshot) -> Dict[str, Any]:
+        """输出快照原始数据、各组内存统计与分配最多的代码行"""
+        groups: Dict[str, Dict[str, dict]] = {}
+        for (stage, region), (calls, net, peak) in sorted(self._allocations.items()):
+            groups.setdefault(stage, {})[region] = {
+                'calls': calls,
+                'net_bytes': net,
+                'net_bytes_per_call': int(net / calls) if calls else 0,
+                'peak_bytes': peak
+            }
+        top_lines = []
+        if snapshot is not None:
+            snapshot.dump(str(self.output_dir / 'allocations.snapshot'))
+            # 排除剖析器自身的分配
+            filters = [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)]
+            snapshot = snapshot.filter_traces(filters)
+            baseline = self._baseline.filter_traces(filters)
+            for diff in snapshot.compare_to(baseline, 'lineno')[:self.top]:
+                frame = diff.traceback[0]
+                top_lines.append({
+                    'line': f"{Path(frame.filename).name}:{frame.lineno}",
+                    'size_diff': diff.size_diff,
+                    'count_diff': diff.count_diff,
+                    'size': diff.size
+                })
+        return {'groups': groups, 'top_lines': top_lines}
+
+    def build_report(self, elapsed: float, snapshot=None) -> Dict[str, Any]:
+        """生成报告,并写出当前模式的原始数据文件
+
+        Args:
+            elapsed: 剖析的总耗时(秒)
+            snapshot: tracemalloc 模式结束时的快照
+
+        Returns:
+            Dict: {'mode', 'created', 'frames', 'elapsed_s', 'wall': 挂钟耗时, <模式>: 模式结果}
+        """
+        frame = self.wall.get((FRAME_STAGE, ALL_REGIONS))
+        report = {
+            'mode': self.mode,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'frames': frame.count if frame else 0,
+            'elapsed_s': round(elapsed, 3),
+            'wall': self._wall_summary()
+        }
+        if self.mode == 'cprofile':
+            report['cprofile'] = self._cprofile_report()
+        elif self.mode == 'sampling':
+            report['sampling'] = self._sampling_report()
+        else:
+            report['tracemalloc'] = self._tracemalloc_report(snapshot)
+        return report
+
+    def report_lines(self, report: Dict[str, Any]) -> List[str]:
+        """报告文本"""
+        lines = [
+            f"性能剖析报告 模式={report['mode']} 帧数={report['frames']} 耗时={report['elapsed_s']}秒 ({report['created']})",
+            '',
+            '挂钟耗时(按总耗时排列):'
+        ]
+        rows = [
+            (stats.get('total', 0.0), stage, region, stats)
+            for stage, regions in report['wall'].items()
+            for region, stats in regions.items()
+        ]
+        for total, stage, region, stats in sorted(rows, key=lambda row: row[0], reverse=True):
+            if 'count' in stats:
+                lines.append(f"  {stage:<12} {region:<28} total={total:.1f}ms n={stats['count']:<6} "
+                             f"mean={stats['mean']:.2f}ms p95={stats['p95']:.2f}ms max={stats['max']:.2f}ms")
+            else:
+                lines.append(f"  {stage:<12} {region:<28} total={total:.1f}ms")
+
+        if report['mode'] == 'cprofile':
+            result = report['cprofile']
+            if result['unattributed_calls']:
+                lines.append(f"\n{result['unattributed_calls']} 次并行阶段调用未能启用剖析器,只统计了挂钟耗时")
+            for stage, regions in result['groups'].items():
+                for region, functions in regions.items():
+                    lines.append(f"\n[{stage} / {region}] 累计耗时最多的函数:")
+                    lines.extend(
+                        f"  {row['cumtime_ms']:>10.2f}ms cum {row['tottime_ms']:>10.2f}ms self "
+                        f"{row['calls']:>8} calls  {row['function']}"
+                        for row in functions
+                    )
+        elif report['mode'] == 'sampling':
+            result = report['sampling']
+            for stage, regions in result['groups'].items():
+                for region, group in regions.items():
+                    lines.append(f"\n[{stage} / {region}] {group['samples']} 个样本 (约 {group['estimated_ms']:.1f}ms),"
+                                 f"自身样本最多的函数:")
+                    lines.extend(f"  {row['samples']:>8}  {row['function']}" for row in group['self'])
+        else:
+            result = report['tracemalloc']
+            lines.append('\n各阶段/区域内存(净分配 / 单次峰值):')
+            for stage, regions in result['groups'].items():
+                for region, group in regions.items():
+                    lines.append(f"  {stage:<12} {region:<28} calls={group['calls']:<6} "
+                                 f"net={group['net_bytes'] / 1024:.1f}KiB "
+                                 f"net/call={group['net_bytes_per_call'] / 1024:.1f}KiB "
+                                 f"peak={group['peak_bytes'] / 1024:.1f}KiB")
+            lines.append('\n剖析期间内存增长最多的代码行:')
+            lines.extend(
+                f"  {row['size_diff'] / 1024:>10.1f}KiB {row['count_diff']:>8} blocks  {row['line']}"
+                for row in result['top_lines']
+            )
+        return lines
+
+
+def profile_collection(config_path: Union[str, Path], mode: str = 'cprofile', frames: int = 50, warmup: int = 1,
+                       output_dir: Optional[Union[str, Path]] = None,
+                       logger: Optional[logging.Logger] = None) -> Path:
+    """按采集配置文件创建 DataCollector 并剖析N帧
+
+    Args:
+        config_path: 采集配置文件路径(status_collection_config.yaml)
+        mode: 剖析模式 cprofile / sampling / tracemalloc
+        frames: 剖析的帧数
+        warmup: 预热帧数
+        output_dir: 输出根目录,默认为 base_output_dir/profiles
+        logger: 日志实例,默认按配置创建
+
+    Returns:
+        Path: 本次剖析的输出目录
+    """
+    from src.utils.config_manager import ConfigManager
+    from src.utils.logger_manager import LoggerManager
+    from src.data.collector import DataCollector
+
+    config_manager = ConfigManager(config_path)
+    if logger is None:
+        logger = LoggerManager(name=FrameProfiler.MODULE_NAME, **config_manager.get_logger_config()).get_logger()
+    collector = DataCollector(config_manager=config_manager, logger=logger)
+    regions_to_process = [
+        name for name in config_manager.config.keys()
+        if name != 'basic_config' and isinstance(config_manager.config[name], dict)
+    ]
+    profiler = FrameProfiler(collector, mode=mode, output_dir=output_dir, logger=logger)
+    try:
+        return profiler.run(regions_to_process, frames=frames, warmup=warmup)
+    finally:
+        collector.close()
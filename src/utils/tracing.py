@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+帧级追踪模块
+
+聚合指标(src/utils/metrics.py)只能看到分布,看不到某一帧慢在哪里。该模块记录每一帧的各个调用区间:
+1. ScreenCapture.capture、ScreenSplitter.process_image、ImagePreprocessor.process_images、
+   TextRecognizer.process_and_recognize、DataProcessor.process_region、StateManager.update
+   由 @traced 装饰,关闭追踪时只多一次属性判断
+2. 每个区间带帧ID、区域、进程ID与线程ID,保存在固定长度的环形缓冲区中
+3. 以 Chrome/Perfetto 的 trace-event JSON 格式输出(chrome://tracing 或 ui.perfetto.dev 打开),
+   可按需输出,或在某一帧耗时超过阈值时自动输出
+
+帧ID: 逐帧处理时由 begin_frame 设置为当前帧;流水线等多帧重叠的场景由工作线程调用
+set_thread_frame 设置本线程正在处理的帧。
+
+basic_config.tracing:
+    Enabled: 是否启用
+    buffer_size: 环形缓冲区保存的区间数
+    slow_frame_ms: 帧耗时超过该值时自动输出,0表示不自动输出
+    min_dump_interval: 两次自动输出的最小间隔(秒)
+    output_dir: 输出目录(相对 base_output_dir)
+
+主要类与函数:
+- Tracer: 追踪器
+- traced: 方法追踪装饰器
+- get_tracer: 获取进程内共享的追踪器
+"""
+
+import os
+import json
+import time
+import functools
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# 默认追踪配置
+DEFAULT_TRACING_CONFIG = {
+    'Enabled': False,
+    'buffer_size': 20000,
+    'slow_frame_ms': 500.0,
+    'min_dump_interval': 10.0,
+    'output_dir': 'traces'
+}
+
+
+class _Span:
+    """区间上下文"""
+
+    __slots__ = ('tracer', 'name', 'region', 'args', 'start')
+
+    def __init__(self, tracer: 'Tracer', name: str, region: Optional[str], args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.region = region
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.add_span(self.name, self.start, time.perf_counter_ns(), region=self.region, **self.args)
+        return False
+
+
+class _NullSpan:
+    """追踪关闭时使用的空区间"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    追踪器
+
+    属性:
+        enabled (bool): 是否启用
+        events (deque): 环形缓冲区中的 trace-event(完整事件 ph='X')
+        slow_frame_ms (float): 自动输出的帧耗时阈值
+        output_dir (Path): 输出目录
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_frame_ms = DEFAULT_TRACING_CONFIG['slow_frame_ms']
+        self.min_dump_interval = DEFAULT_TRACING_CONFIG['min_dump_interval']
+        self.output_dir = Path(DEFAULT_TRACING_CONFIG['output_dir'])
+        self.events = deque(maxlen=DEFAULT_TRACING_CONFIG['buffer_size'])
+        self.origin_ns = time.perf_counter_ns()
+        self.current_frame: Optional[int] = None
+        self._frame_starts: Dict[int, int] = {}
+        self._thread_frames = threading.local()
+        self._thread_names: Dict[int, str] = {}
+        self._last_dump = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, config: Optional[dict], base_dir: Optional[Path] = None) -> 'Tracer':
+        """按配置设置开关、缓冲区与输出
+
+        Args:
+            config: basic_config.tracing
+            base_dir: output_dir 的相对根目录
+
+        Returns:
+            Tracer: 自身,便于链式调用
+        """
+        merged = dict(DEFAULT_TRACING_CONFIG)
+        merged.update(config or {})
+        self.enabled = bool(merged['Enabled'])
+        self.slow_frame_ms = float(merged['slow_frame_ms'] or 0)
+        self.min_dump_interval = float(merged['min_dump_interval'])
+        output_dir = Path(merged['output_dir'])
+        self.output_dir = Path(base_dir) / output_dir if base_dir and not output_dir.is_absolute() else output_dir
+        if self.events.maxlen != int(merged['buffer_size']):
+            self.events = deque(self.events, maxlen=int(merged['buffer_size']))
+        return self
+
+    # 帧上下文
+    def begin_frame(self, frame_id: int):
+        """开始一帧,之后未指定帧ID的区间都归属该帧"""
+        if not self.enabled:
+            return
+        self.current_frame = frame_id
+        self._frame_starts[frame_id] = time.perf_counter_ns()
+
+    def end_frame(self, frame_id: Optional[int] = None) -> Optional[Path]:
+        """结束一帧并记录整帧区间,帧耗时超过阈值时自动输出
+
+        Returns:
+            Optional[Path]: 自动输出的文件路径,未输出时为None
+        """
+        if not self.enabled:
+            return None
+        frame_id = self.current_frame if frame_id is None else frame_id
+        start_ns = self._frame_starts.pop(frame_id, None)
+        if start_ns is None:
+            return None
+        return self.record_frame(frame_id, start_ns, time.perf_counter_ns())
+
+    def record_frame(self, frame_id: int, start_ns: int, end_ns: int) -> Optional[Path]:
+        """记录已知起止时间的整帧区间(如流水线中跨线程的帧),帧耗时超过阈值时自动输出"""
+        if not self.enabled:
+            return None
+        self.add_span('frame', start_ns, end_ns, frame_id=frame_id)
+        duration_ms = (end_ns - start_ns) / 1e6
+        now = time.time()
+        if self.slow_frame_ms and duration_ms > self.slow_frame_ms and now - self._last_dump >= self.min_dump_interval:
+            self._last_dump = now
+            return self.dump(reason=f'slow_frame_{frame_id}')
+        return None
+
+    def set_thread_frame(self, frame_id: Optional[int]):
+        """设置本线程正在处理的帧ID(多帧重叠时使用),None表示恢复为当前帧"""
+        self._thread_frames.frame_id = frame_id
+
+    def frame_id(self) -> Optional[int]:
+        """本线程正在处理的帧ID"""
+        frame_id = getattr(self._thread_frames, 'frame_id', None)
+        return self.current_frame if frame_id is None else frame_id
+
+    # 区间
+    def span(self, name: str, region: Optional[str] = None, **args):
+        """区间上下文: with tracer.span('ocr', 'game_area'): ..."""
+        return _Span(self, name, region, args) if self.enabled else NULL_SPAN
+
+    def add_span(self, name: str, start_ns: int, end_ns: int, region: Optional[str] = None,
+                 frame_id: Optional[int] = None, pid: Optional[int] = None, tid: Optional[int] = None, **args):
+        """记录一个完整区间
+
+        Args:
+            name: 区间名称
+            start_ns / end_ns: perf_counter_ns 起止时间
+            region: 区域名称
+            frame_id: 帧ID,默认为本线程正在处理的帧
+            pid / tid: 进程/线程ID,默认为当前进程与线程
+            **args: 附加到事件 args 中的信息
+        """
+        if not self.enabled:
+            return
+        if tid is None:
+            thread = threading.current_thread()
+            tid = thread.ident
+            if tid not in self._thread_names:
+                self._thread_names[tid] = thread.name
+        event_args = {'frame_id': self.frame_id() if frame_id is None else frame_id}
+        if region is not None:
+            event_args['region'] = region
+        event_args.update(args)
+        event = {
+            'name': name,
+            'cat': 'frame' if name == 'frame' else (region or 'stage'),
+            'ph': 'X',
+            'ts': (start_ns - self.origin_ns) / 1000,
+            'dur': max(end_ns - start_ns, 0) / 1000,
+            'pid': os.getpid() if pid is None else pid,
+            'tid': tid,
+            'args': event_args
+        }
+        with self._lock:
+            self.events.append(event)
+
+    # 输出
+    def trace_events(self, frame_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """生成 trace-event JSON 对象
+
+        Args:
+            frame_ids: 只输出这些帧的区间,默认输出缓冲区中的全部区间
+        """
+        with self._lock:
+            events = list(self.events)
+        if frame_ids is not None:
+            wanted = set(frame_ids)
+            events = [event for event in events if event['args'].get('frame_id') in wanted]
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+            for tid, name in self._thread_names.items()
+        ]
+        return {'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path: Optional[Path] = None, reason: str = 'manual',
+             frame_ids: Optional[List[int]] = None) -> Path:
+        """将缓冲区写入 trace-event JSON 文件
+
+        Args:
+            path: 输出文件,默认为 output_dir/trace_<时间>_<原因>.json
+            reason: 输出原因,用于默认文件名
+            frame_ids: 只输出这些帧的区间
+
+        Returns:
+            Path: 输出文件路径
+        """
+        if path is None:
+            path = self.output_dir / f"trace_{time.strftime('%Y%m%d_%H%M%S')}_{reason}.json"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.trace_events(frame_ids), f, ensure_ascii=False)
+        return path
+
+    def clear(self):
+        """清空缓冲区"""
+        with self._lock:
+            self.events.clear()
+            self._frame_starts.clear()
+
+
+# 进程内共享的追踪器
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """获取进程内共享的追踪器"""
+    return _tracer
+
+
+def traced(name: str, region_arg: Optional[str] = None) -> Callable:
+    """方法追踪装饰器
+
+    Args:
+        name: 区间名称,如 'TextRecognizer.process_and_recognize'
+        region_arg: 作为区域名称记录的参数名,可以是区域名或区域名列表
+    """
+    def decorator(func: Callable) -> Callable:
+        code = func.__code__
+        arg_names = code.co_varnames[:code.co_argcount]
+        region_index = arg_names.index(region_arg) if region_arg in arg_names else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                region = None
+                if region_arg is not None:
+                    region = kwargs.get(region_arg)
+                    if region is None and region_index is not None and region_index < len(args):
+                        region = args[region_index]
+                    if isinstance(region, (list, tuple)):
+                        region = ','.join(region)
+                tracer.add_span(name, start_ns, time.perf_counter_ns(), region=region)
+        return wrapper
+    return decorator